@@ -21,15 +21,13 @@ from datetime import date as _date, datetime as _dt, timedelta as _timedelta
 # =========================
 import jwt
 import requests
-from PIL import Image as PILImage
-from PIL import ImageFile, ImageOps
 from sqlalchemy import text
 from sqlalchemy.orm import joinedload
 from werkzeug.utils import secure_filename
 from flask_cors import cross_origin
 
-# PIL config
-ImageFile.LOAD_TRUNCATED_IMAGES = True
+# Dependências pesadas (ReportLab, PIL, openpyxl, OpenAI, boto3) são
+# importadas dentro das funções que as usam, para não pesar no cold start.
 
 # =========================
 # Flask
@@ -50,37 +48,6 @@ from flask import (
 from xml.sax.saxutils import escape as xml_escape
 from html import escape as html_escape
 
-# =========================
-# ReportLab (PDF)
-# =========================
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
-from reportlab.pdfgen.canvas import Canvas
-from reportlab.platypus import (
-    Flowable,
-    Image,
-    PageBreak,
-    Paragraph,
-    SimpleDocTemplate,
-    Spacer,
-    Table,
-    TableStyle,
-)
-from reportlab.graphics import renderPDF
-from reportlab.graphics.barcode import qr
-from reportlab.graphics.shapes import Drawing, String, Rect
-
-# =========================
-# OpenPyXL (Excel)
-# =========================
-from openpyxl import Workbook
-from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
-from openpyxl.utils import get_column_letter
-from openpyxl.chart.label import DataLabelList
-from openpyxl.formatting.rule import DataBarRule
-
 # =========================
 # App / Models / Utils
 # =========================
@@ -118,6 +85,8 @@ from services.chatbot_service import (
     send_telegram_document,
     send_telegram_photo,
 )
+from services.telegram_client import get_telegram_client
+from services.visit_calendar_service import calendar_visits, get_visit_calendar, window_for
 from services.field_data_service import (
     infer_field_data_category,
     create_field_data_record,
@@ -126,17 +95,29 @@ from services.field_data_service import (
     find_best_plot_by_name,
 )
 from services.planting_insights_service import (
-    calculate_days_since_planting,
     build_days_planted_text,
+    build_days_planted_portfolio,
 )
 from services.agent.agent_service import AgentService
 from services.agent.decision_logger import log_from_agent_result
+from services.agent.local_intent_model import (
+    predict_fenologia,
+    predict_intent,
+    predict_visit_purpose,
+)
+from services.media_staging_service import (
+    attach_pending_telegram_photos_to_visit,
+    clear_pending_telegram_photos,
+    get_pending_telegram_photos,
+    save_pending_telegram_photo,
+    should_send_photo_prompt,
+)
+from services.audio_transcription_service import (
+    find_cached_transcription,
+    transcribe_audio,
+)
 
-import io
-import subprocess
-from openai import OpenAI
 from zoneinfo import ZoneInfo
-from pathlib import Path
 import random
 
 
@@ -172,6 +153,7 @@ from routes import (
     messaging_bp,
     visits_bp,
     mobile_bp,
+    sync_bp,
 )
 
 # Registra os blueprints migrados no blueprint principal
@@ -186,6 +168,7 @@ bp.register_blueprint(chatbot_bp)
 bp.register_blueprint(messaging_bp)
 bp.register_blueprint(visits_bp)
 bp.register_blueprint(mobile_bp)
+bp.register_blueprint(sync_bp)
 
 UPLOAD_DIR = os.environ.get("UPLOAD_DIR", "/opt/render/project/src/uploads")
 BUILD_STAMP = "routes_2026_05_21_refactor_01"
@@ -849,15 +832,20 @@ def parse_visit_purpose_with_ai(text: str) -> Optional[str]:
     if result:
         return result
 
+    # Modelo local (sem rede) antes da OpenAI
+    result = predict_visit_purpose(text)
+    if result:
+        return result
+
     # Se não houver API key, retorna None
     if not os.getenv("OPENAI_API_KEY"):
         return None
 
     try:
-        from openai import OpenAI
-        client = OpenAI()
+        from services.llm_gateway import complete
 
-        response = client.chat.completions.create(
+        answer = complete(
+            "visit_purpose",
             model="gpt-4o-mini",
             messages=[
                 {
@@ -874,7 +862,6 @@ def parse_visit_purpose_with_ai(text: str) -> Optional[str]:
             max_tokens=20,
         )
 
-        answer = (response.choices[0].message.content or "").strip()
         normalized_answer = normalize_lookup_text(answer)
 
         if normalized_answer in VISIT_PURPOSES:
@@ -897,20 +884,25 @@ def parse_fenologia_with_ai(text: str, purpose: str) -> Optional[str]:
     if is_valid_fenologia(upper):
         return upper
 
+    # Modelo local (sem rede) antes da OpenAI
+    local = predict_fenologia(text, purpose)
+    if local:
+        return local
+
     # Se não houver API key, retorna None
     if not os.getenv("OPENAI_API_KEY"):
         return None
 
     try:
-        from openai import OpenAI
-        client = OpenAI()
+        from services.llm_gateway import complete
 
         if purpose == "Vegetativo":
             valid_options = "VE, V1, V2, V3, V4, V5, V6, V7, V8, V9, V10, V11, V12, VC, VT"
         else:
             valid_options = "R1, R2, R3, R4, R5, R6, R7, R8"
 
-        response = client.chat.completions.create(
+        answer = complete(
+            "fenologia",
             model="gpt-4o-mini",
             messages=[
                 {
@@ -925,9 +917,7 @@ def parse_fenologia_with_ai(text: str, purpose: str) -> Optional[str]:
                 {"role": "user", "content": text}
             ],
             max_tokens=10,
-        )
-
-        answer = (response.choices[0].message.content or "").strip().upper()
+        ).upper()
 
         if is_valid_fenologia(answer):
             return answer
@@ -1057,10 +1047,10 @@ def build_week_schedule_text(consultant_name: str, visits: list) -> str:
     ]
 
     for idx, visit in enumerate(visits, start=1):
-        client_name = visit.client.name if getattr(visit, "client", None) else f"Cliente {visit.client_id}"
-        recommendation = (visit.recommendation or "—").strip()
-        culture = visit.culture or "—"
-        visit_date = visit.date.isoformat() if visit.date else "—"
+        client_name = visit["client_name"]
+        recommendation = (visit["recommendation"] or "—").strip()
+        culture = visit["culture"] or "—"
+        visit_date = visit["date"] or "—"
 
         lines.append(f"{idx}. {visit_date} - {client_name} - {culture} - {recommendation}")
 
@@ -1257,19 +1247,8 @@ def find_consultant_pending_visits_for_week(consultant_id: int, reference_date=N
         return []
 
     start_date, end_date = get_week_date_range(reference_date)
-
-    visits = (
-        Visit.query
-        .filter(Visit.consultant_id == consultant_id)
-        .filter(Visit.date >= start_date)
-        .filter(Visit.date <= end_date)
-        .filter(Visit.status != "done")
-        .order_by(Visit.date.asc(), Visit.id.asc())
-        .limit(limit)
-        .all()
-    )
-
-    return visits
+    window = get_visit_calendar(consultant_id, start_date, end_date, today=reference_date)
+    return calendar_visits(window.payload, "pending", limit=limit)
 
 
 def find_client_by_name(client_name: str):
@@ -1360,30 +1339,21 @@ def find_client_by_name(client_name: str):
     return None, top_candidates, True
 
 
-def find_known_product_names(limit: int = 300) -> list[str]:
-    try:
-        rows = (
-            db.session.query(VisitProduct.product_name)
-            .filter(VisitProduct.product_name.isnot(None))
-            .distinct()
-            .limit(limit)
-            .all()
-        )
-        names = []
-        for row in rows:
-            value = row[0]
-            if value:
-                names.append(value.strip())
-        return names
-    except Exception:
-        return []
+def find_known_product_names(limit: int | None = None) -> list[str]:
+    from services.product_catalog_service import get_known_product_names
+
+    names = get_known_product_names()
+    return names[:limit] if limit else names
 
 
 def find_similar_product_name(raw_name: str, candidates: list[str] | None = None):
     if not raw_name:
         return None, 0.0
 
-    candidates = candidates or find_known_product_names()
+    if candidates is None:
+        from services.product_catalog_service import get_product_catalog
+        return get_product_catalog().best_match(raw_name)
+
     if not candidates:
         return None, 0.0
 
@@ -1402,8 +1372,10 @@ def find_similar_product_name(raw_name: str, candidates: list[str] | None = None
 
 
 def normalize_products_from_parsed(products: list[dict] | None):
+    from services.product_catalog_service import get_product_catalog
+
     products = products or []
-    known_names = find_known_product_names()
+    catalog = get_product_catalog() if products else None
 
     normalized_items = []
 
@@ -1412,7 +1384,7 @@ def normalize_products_from_parsed(products: list[dict] | None):
         if not product_name:
             continue
 
-        best_name, score = find_similar_product_name(product_name, known_names)
+        best_name, score = catalog.best_match(product_name)
 
         normalized_name = product_name
         if best_name and score >= 0.72:
@@ -1555,6 +1527,7 @@ def extract_telegram_audio_info(payload: dict):
     if voice and voice.get("file_id"):
         return {
             "file_id": voice.get("file_id"),
+            "file_unique_id": voice.get("file_unique_id"),
             "filename": "voice.ogg",
             "suffix": ".ogg",
             "mime_type": voice.get("mime_type") or "audio/ogg",
@@ -1567,6 +1540,7 @@ def extract_telegram_audio_info(payload: dict):
         suffix = os.path.splitext(filename)[1] or ".mp3"
         return {
             "file_id": audio.get("file_id"),
+            "file_unique_id": audio.get("file_unique_id"),
             "filename": filename,
             "suffix": suffix,
             "mime_type": audio.get("mime_type") or "audio/mpeg",
@@ -1578,104 +1552,30 @@ def extract_telegram_audio_info(payload: dict):
 
 
 
-def convert_audio_bytes_to_wav(audio_bytes: bytes, input_suffix: str = ".ogg"):
-    """
-    Converte áudio recebido em bytes para WAV usando ffmpeg.
-    Retorna: (wav_bytes, erro)
-    """
-    try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=input_suffix) as src:
-            src.write(audio_bytes)
-            src_path = src.name
-
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as dst:
-            dst_path = dst.name
-
-        cmd = [
-            "ffmpeg",
-            "-y",
-            "-i", src_path,
-            "-ar", "16000",
-            "-ac", "1",
-            dst_path,
-        ]
-
-        result = subprocess.run(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            timeout=120
-        )
-
-        if result.returncode != 0:
-            return None, result.stderr.decode("utf-8", errors="ignore")
-
-        with open(dst_path, "rb") as f:
-            wav_bytes = f.read()
-
-        return wav_bytes, None
-
-    except Exception as e:
-        return None, str(e)
-
-    finally:
-        try:
-            os.remove(src_path)
-        except:
-            pass
-        try:
-            os.remove(dst_path)
-        except:
-            pass
-
-def transcribe_audio_bytes(audio_bytes: bytes, filename: str = "audio.wav"):
-    """
-    Transcreve áudio usando OpenAI.
-    Retorna: (texto_transcrito, erro)
-    """
-    try:
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            return None, "OPENAI_API_KEY não configurada"
-
-        client = OpenAI(api_key=api_key)
-
-        audio_file = io.BytesIO(audio_bytes)
-        audio_file.name = filename
-
-        transcript = client.audio.transcriptions.create(
-            model="gpt-4o-transcribe",
-            file=audio_file,
-            language="pt",
-            prompt=(
-                "Contexto: assistente agrícola para consultores. "
-                "Termos comuns: visita, lavoura, soja, milho, fazenda, propriedade, talhão, "
-                "plantio, pulverização, pragas, doenças, defensivo, fertilizante, "
-                "V3, V4, V5, R1, R2, R3, R4, R5, R6, R7, R8, "
-                "variedades como AS 3815, AS 3707, K8575, S7025."
-            ),
-        )
-
-        text = getattr(transcript, "text", None) or ""
-        text = text.strip()
-
-        if not text:
-            return None, "transcrição vazia"
-
-        return text, None
-
-    except Exception as e:
-        print("DEBUG transcribe_audio_bytes exception:", repr(e))
-        return None, str(e)
-
-
-
 def build_visit_pdf_file(visit_id: int):
     """
     Gera o mesmo PDF da visita e retorna:
     - buffer (BytesIO)
     - filename (str)
     """
+    from PIL import Image as PILImage
+    from PIL import ImageFile, ImageOps
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_LEFT, TA_CENTER
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.platypus import (
+        Image,
+        PageBreak,
+        Paragraph,
+        SimpleDocTemplate,
+        Spacer,
+        Table,
+        TableStyle,
+    )
+
+    ImageFile.LOAD_TRUNCATED_IMAGES = True
+
     visit = Visit.query.get_or_404(visit_id)
     client = Client.query.get(visit.client_id)
     property_ = Property.query.get(visit.property_id) if visit.property_id else None
@@ -2131,14 +2031,28 @@ def build_visit_pdf_file(visit_id: int):
 
 
 
+# Intent do modelo local -> intent da IA, para respostas que não levam campos
+LOCAL_SLOTLESS_AI_INTENTS = {
+    "LIST_WEEK": "week_schedule_request",
+    "DAILY_ROUTINE": "daily_routine_request",
+    "CONFIRM": "confirm",
+    "CANCEL": "cancel",
+}
+
+
 def interpret_user_message_with_ai(message_text: str, current_state: str = ""):
     """
     Interpreta mensagem livre do usuário com OpenAI.
     Retorna um dict estruturado ou None.
     Muito mais tolerante a erro de digitação e linguagem natural.
     """
+    # Intents sem campos extras saem do modelo local, sem OpenAI
+    local = predict_intent(message_text)
+    if local and local["intent"] in LOCAL_SLOTLESS_AI_INTENTS:
+        return {"intent": LOCAL_SLOTLESS_AI_INTENTS[local["intent"]], "confidence": local["confidence"]}
+
     try:
-        client = OpenAI()
+        from services.llm_gateway import complete, is_json_object, parse_json_object
 
         cleaned_text = compact_user_text_for_ai(message_text)
 
@@ -2322,30 +2236,20 @@ Mensagem do usuário:
 {cleaned_text}
 """.strip()
 
-        response = client.responses.create(
+        output_text = complete(
+            "interpret_message",
             model="gpt-4.1-mini",
-            input=[
+            api="responses",
+            messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
             ],
+            validate=is_json_object,
         )
 
-        output_text = (response.output_text or "").strip()
-        if not output_text:
-            return None
-
-        # tentativa direta
-        try:
-            data = json.loads(output_text)
-        except Exception:
-            # fallback: tenta extrair primeiro bloco JSON da resposta
-            match = re.search(r"\{.*\}", output_text, re.DOTALL)
-            if not match:
-                return None
-            data = json.loads(match.group(0))
-
-        # saneamento mínimo
-        if not isinstance(data, dict):
+        # JSON direto ou o primeiro bloco {...} da resposta
+        data = parse_json_object(output_text)
+        if data is None:
             return None
 
         intent = data.get("intent")
@@ -2429,33 +2333,7 @@ def download_telegram_file_bytes(file_id: str) -> tuple[bytes | None, str | None
     Retorna: (bytes, erro)
     """
     try:
-        import os
-        import requests
-
-        bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
-        if not bot_token:
-            return None, "TELEGRAM_BOT_TOKEN não configurado"
-
-        get_file_url = f"https://api.telegram.org/bot{bot_token}/getFile"
-        resp = requests.get(get_file_url, params={"file_id": file_id}, timeout=20)
-        if resp.status_code != 200:
-            return None, f"falha getFile status={resp.status_code}"
-
-        data = resp.json()
-        if not data.get("ok"):
-            return None, f"getFile retornou ok=False: {data}"
-
-        file_path = data.get("result", {}).get("file_path")
-        if not file_path:
-            return None, "file_path ausente no getFile"
-
-        download_url = f"https://api.telegram.org/file/bot{bot_token}/{file_path}"
-        file_resp = requests.get(download_url, timeout=40)
-        if file_resp.status_code != 200:
-            return None, f"falha download status={file_resp.status_code}"
-
-        return file_resp.content, None
-
+        return get_telegram_client().download_file(file_id)
     except Exception as e:
         return None, str(e)
 
@@ -2621,28 +2499,9 @@ def find_consultant_visits_for_month(consultant_id: int, filter_mode: str = "all
     if not consultant_id:
         return []
 
-    start_date, end_date = get_month_date_range(reference_date)
-    today = reference_date or _date.today()
-
-    q = (
-        Visit.query
-        .filter(Visit.consultant_id == consultant_id)
-        .filter(Visit.date >= start_date)
-        .filter(Visit.date <= end_date)
-    )
-
-    if filter_mode == "done":
-        q = q.filter(Visit.status == "done")
-    elif filter_mode == "overdue":
-        q = q.filter(Visit.status != "done").filter(Visit.date < today)
-
-    visits = (
-        q.order_by(Visit.date.asc().nullslast(), Visit.id.asc())
-        .limit(limit)
-        .all()
-    )
-
-    return visits
+    start_date, end_date = window_for("month", reference_date or get_local_today())
+    window = get_visit_calendar(consultant_id, start_date, end_date, today=reference_date)
+    return calendar_visits(window.payload, filter_mode, limit=limit)
 
 
 def build_month_visits_text(consultant_name: str, visits: list, filter_mode: str = "all") -> str:
@@ -2668,11 +2527,11 @@ def build_month_visits_text(consultant_name: str, visits: list, filter_mode: str
     ]
 
     for i, v in enumerate(visits, start=1):
-        client_name = v.client.name if v.client else f"Cliente {v.client_id}"
-        date_label = v.date.isoformat() if v.date else "sem data"
-        status_label = v.status or "planned"
-        culture_label = v.culture or (v.planting.culture if getattr(v, "planting", None) else "")
-        stage_label = v.fenologia_real or ""
+        client_name = v["client_name"]
+        date_label = v["date"] or "sem data"
+        status_label = v["status"]
+        culture_label = v["culture"] or ""
+        stage_label = v["fenologia_real"] or ""
 
         extra = " - ".join([x for x in [culture_label, stage_label] if x])
         if extra:
@@ -2857,158 +2716,10 @@ def get_local_today() -> date:
 
 
 
-def get_pending_media_dir(chat_id: str) -> Path:
-    base_dir = Path("/tmp") / "telegram_pending_media" / str(chat_id)
-    base_dir.mkdir(parents=True, exist_ok=True)
-    return base_dir
-
-
-def get_pending_media_manifest_path(chat_id: str) -> Path:
-    return get_pending_media_dir(chat_id) / "pending_media.json"
-
-
-def load_pending_media_manifest(chat_id: str) -> dict:
-    manifest_path = get_pending_media_manifest_path(chat_id)
-    if not manifest_path.exists():
-        return {"photos": []}
-
-    try:
-        return json.loads(manifest_path.read_text(encoding="utf-8"))
-    except Exception:
-        return {"photos": []}
-
-
-def save_pending_media_manifest(chat_id: str, data: dict) -> None:
-    manifest_path = get_pending_media_manifest_path(chat_id)
-    manifest_path.write_text(
-        json.dumps(data, ensure_ascii=False, indent=2),
-        encoding="utf-8"
-    )
-
-
-def save_pending_telegram_photo(chat_id: str, photo_bytes: bytes, filename: str, caption: str = "") -> dict:
-    media_dir = get_pending_media_dir(chat_id)
-    ext = Path(filename).suffix or ".jpg"
-    unique_name = f"{uuid.uuid4().hex}{ext}"
-    file_path = media_dir / unique_name
-
-    with open(file_path, "wb") as f:
-        f.write(photo_bytes)
-
-    manifest = load_pending_media_manifest(chat_id)
-    row = {
-        "filename": unique_name,
-        "original_filename": filename,
-        "caption": caption or "",
-    }
-    manifest["photos"].append(row)
-    save_pending_media_manifest(chat_id, manifest)
-    print("DEBUG save_pending_telegram_photo manifest_count:", len(manifest.get("photos", [])))
-    return row
-
-
-def get_pending_telegram_photos(chat_id: str) -> list:
-    manifest = load_pending_media_manifest(chat_id)
-    media_dir = get_pending_media_dir(chat_id)
-
-    photos = []
-    for item in manifest.get("photos", []):
-        file_path = media_dir / item["filename"]
-        if file_path.exists():
-            photos.append({
-                "path": str(file_path),
-                "filename": item["original_filename"] or item["filename"],
-                "caption": item.get("caption") or "",
-            })
-    print("DEBUG get_pending_telegram_photos count:", len(photos))
-    return photos
-
-
-def clear_pending_telegram_photos(chat_id: str) -> None:
-    media_dir = get_pending_media_dir(chat_id)
-    if not media_dir.exists():
-        return
-
-    for child in media_dir.iterdir():
-        try:
-            if child.is_file():
-                child.unlink()
-        except Exception:
-            pass
-
-    try:
-        media_dir.rmdir()
-    except Exception:
-        pass
-
-
-def attach_pending_telegram_photos_to_visit(chat_id: str, visit):
-    pending = get_pending_telegram_photos(chat_id)
-    print("DEBUG attach_pending_telegram_photos_to_visit visit_id:", getattr(visit, "id", None))
-    print("DEBUG attach_pending_telegram_photos_to_visit pending_count:", len(pending))
-    attached = 0
-    errors = []
-
-    for item in pending:
-        print("DEBUG attach_pending item path:", item["path"])
-        print("DEBUG attach_pending item filename:", item["filename"])
-        print("DEBUG attach_pending item caption:", item.get("caption"))
-        try:
-            with open(item["path"], "rb") as f:
-                photo_bytes = f.read()
-                print("DEBUG attach_pending bytes_len:", len(photo_bytes) if photo_bytes else 0)
-
-            _, attach_error = attach_photo_to_visit_from_telegram(
-                visit=visit,
-                photo_bytes=photo_bytes,
-                filename=item["filename"],
-                caption=item["caption"],
-            )
-            print("DEBUG attach_pending attach_error:", attach_error)
-
-            if attach_error:
-                errors.append(attach_error)
-            else:
-                attached += 1
-
-        except Exception as e:
-            errors.append(str(e))
-
-    if attached > 0:
-        clear_pending_telegram_photos(chat_id)
-    print("DEBUG attach_pending_telegram_photos_to_visit attached:", attached)
-    print("DEBUG attach_pending_telegram_photos_to_visit errors:", errors)
-    return attached, errors
-
-
-
-
-def get_pending_media_group_marker_path(chat_id: str, media_group_id: str) -> Path:
-    media_dir = get_pending_media_dir(chat_id)
-    return media_dir / f"media_group_{media_group_id}.marker"
-
-
-def should_send_photo_prompt(chat_id: str, photo_info: dict | None) -> bool:
-    if not photo_info:
-        return False
-
-    media_group_id = photo_info.get("media_group_id")
-    if not media_group_id:
-        return True
-
-    marker = get_pending_media_group_marker_path(chat_id, str(media_group_id))
-    if marker.exists():
-        return False
-
-    marker.write_text("sent", encoding="utf-8")
-    return True
-
-
-
 def resolve_audio_message_text(chat_message, payload, current_text: str):
     """
     Se a mensagem não tiver texto/caption mas tiver áudio,
-    baixa, converte, transcreve e devolve o texto final.
+    transcreve (com cache por file_unique_id/hash) e devolve o texto final.
     Se falhar, já responde ao usuário e devolve None.
     """
     message_text = (current_text or "").strip()
@@ -3020,38 +2731,32 @@ def resolve_audio_message_text(chat_message, payload, current_text: str):
     if not audio_info:
         return message_text
 
-    audio_bytes, download_error = download_telegram_file_bytes(audio_info["file_id"])
-    if download_error or not audio_bytes:
-        send_telegram_message(
-            chat_id=chat_message.chat_id,
-            text="Recebi seu áudio, mas não consegui baixar para transcrever."
-        )
-        return None
+    # Reenvio do webhook ou áudio encaminhado: já transcrito, nem baixa
+    transcript_text = find_cached_transcription(file_unique_id=audio_info.get("file_unique_id"))
 
-    wav_bytes, convert_error = convert_audio_bytes_to_wav(
-        audio_bytes=audio_bytes,
-        input_suffix=audio_info["suffix"],
-    )
-    if convert_error or not wav_bytes:
-        send_telegram_message(
-            chat_id=chat_message.chat_id,
-            text="Recebi seu áudio, mas não consegui converter para transcrição."
-        )
-        return None
-
-    transcript_text, transcript_error = transcribe_audio_bytes(
-        audio_bytes=wav_bytes,
-        filename="audio.wav",
-    )
-    if transcript_error or not transcript_text:
-        send_telegram_message(
-            chat_id=chat_message.chat_id,
-            text=bot_phrase(
-                "audio_fail",
-                "Recebi seu áudio, mas não consegui transcrever. Tente novamente ou envie em texto."
+    if not transcript_text:
+        audio_bytes, download_error = download_telegram_file_bytes(audio_info["file_id"])
+        if download_error or not audio_bytes:
+            send_telegram_message(
+                chat_id=chat_message.chat_id,
+                text="Recebi seu áudio, mas não consegui baixar para transcrever."
             )
+            return None
+
+        transcript_text, transcript_error = transcribe_audio(
+            audio_bytes=audio_bytes,
+            suffix=audio_info["suffix"],
+            file_unique_id=audio_info.get("file_unique_id"),
         )
-        return None
+        if transcript_error or not transcript_text:
+            send_telegram_message(
+                chat_id=chat_message.chat_id,
+                text=bot_phrase(
+                    "audio_fail",
+                    "Recebi seu áudio, mas não consegui transcrever. Tente novamente ou envie em texto."
+                )
+            )
+            return None
 
     message_text = transcript_text.strip()
 
@@ -3091,6 +2796,7 @@ def resolve_pending_photo_for_message(chat_message, payload, current_text: str):
         print("DEBUG telegram photo download error:", photo_download_error)
         downloaded_photo_bytes = None
 
+    saved_media = None
     if downloaded_photo_bytes:
         try:
             saved_media = save_pending_telegram_photo(
@@ -3098,13 +2804,15 @@ def resolve_pending_photo_for_message(chat_message, payload, current_text: str):
                 photo_bytes=downloaded_photo_bytes,
                 filename=downloaded_photo_name,
                 caption=photo_info.get("caption") or "",
+                media_group_id=photo_info.get("media_group_id"),
             )
             print("DEBUG pending telegram photo saved:", saved_media)
         except Exception as e:
+            db.session.rollback()
             print("DEBUG save_pending_telegram_photo error:", str(e))
 
     if not message_text:
-        if should_send_photo_prompt(chat_message.chat_id, photo_info):
+        if should_send_photo_prompt(chat_message.chat_id, photo_info, saved_media):
             send_telegram_message(
                 chat_id=chat_message.chat_id,
                 text=(
@@ -3565,38 +3273,23 @@ def find_candidate_cycles_for_agent(
     normalized_culture = (culture or "").strip().lower()
     normalized_variety = (variety or "").strip().lower()
 
-    plantings = (
-        Planting.query
-        .order_by(Planting.planting_date.desc().nullslast(), Planting.id.desc())
-        .all()
-    )
-
-    for planting in plantings:
-        plot_obj = Plot.query.get(planting.plot_id) if getattr(planting, "plot_id", None) else None
-        if not plot_obj:
-            continue
-
-        property_obj = Property.query.get(getattr(plot_obj, "property_id", None)) if getattr(plot_obj, "property_id", None) else None
-        if not property_obj:
-            continue
-
-        if property_obj.client_id != client_id:
-            continue
+    from services.cycle_lookup_service import get_client_cycles
 
+    for cycle in get_client_cycles(client_id):
         score = 0
 
-        if plot_id and plot_obj.id == plot_id:
+        if plot_id and cycle.plot_id == plot_id:
             score += 100
-        elif plot_id and plot_obj.id != plot_id:
+        elif plot_id and cycle.plot_id != plot_id:
             score -= 50
 
-        if property_id and property_obj.id == property_id:
+        if property_id and cycle.property_id == property_id:
             score += 50
-        elif property_id and property_obj.id != property_id:
+        elif property_id and cycle.property_id != property_id:
             score -= 20
 
-        planting_culture = (getattr(planting, "culture", None) or "").strip()
-        planting_variety = (getattr(planting, "variety", None) or "").strip()
+        planting_culture = (cycle.culture or "").strip()
+        planting_variety = (cycle.variety or "").strip()
 
         if normalized_culture and planting_culture.lower() == normalized_culture:
             score += 20
@@ -3611,14 +3304,14 @@ def find_candidate_cycles_for_agent(
         candidates.append({
             "source": "planting",
             "score": score,
-            "planting_id": planting.id,
-            "property_id": property_obj.id,
-            "plot_id": plot_obj.id,
-            "property_name": property_obj.name,
-            "plot_name": plot_obj.name,
+            "planting_id": cycle.planting_id,
+            "property_id": cycle.property_id,
+            "plot_id": cycle.plot_id,
+            "property_name": cycle.property_name,
+            "plot_name": cycle.plot_name,
             "culture": planting_culture,
             "variety": planting_variety,
-            "planting_date": planting.planting_date.isoformat() if getattr(planting, "planting_date", None) else None,
+            "planting_date": cycle.planting_date.isoformat() if cycle.planting_date else None,
         })
 
     if not candidates:
@@ -4952,75 +4645,11 @@ def build_consultant_days_planted_portfolio(consultant_id: int):
     - prioriza Planting.planting_date
     - fallback para visita de Plantio
     - usa client + property + plot + culture + variety como chave segura
-    """
-    if not consultant_id:
-        return []
-
-    visits = (
-        Visit.query
-        .filter(Visit.consultant_id == consultant_id)
-        .order_by(Visit.date.desc().nullslast(), Visit.id.desc())
-        .all()
-    )
-
-    grouped = {}
-
-    for visit in visits:
-        client_id = getattr(visit, "client_id", None)
-        if not client_id:
-            continue
-
-        key = (
-            client_id,
-            visit.property_id,
-            visit.plot_id,
-            (visit.culture or "").strip(),
-            (visit.variety or "").strip(),
-        )
-
-        if key not in grouped:
-            grouped[key] = visit
-
-    items = []
-
-    for key, base_visit in grouped.items():
-        client_id, property_id, plot_id, culture, variety = key
 
-        result = calculate_days_since_planting(
-            client_id=client_id,
-            property_id=property_id,
-            plot_id=plot_id,
-            culture=culture or None,
-            variety=variety or None,
-            planting_id=base_visit.planting_id,
-        )
-
-        if not result:
-            continue
-
-        client_name = base_visit.client.name if base_visit.client else f"Cliente {client_id}"
-        property_name = base_visit.property.name if getattr(base_visit, "property", None) else ""
-        plot_name = base_visit.plot.name if getattr(base_visit, "plot", None) else ""
-
-        items.append({
-            "client_name": client_name,
-            "property_name": property_name,
-            "plot_name": plot_name,
-            "culture": culture or "—",
-            "variety": variety or "—",
-            "planting_date": result["planting_date"],
-            "days": result["days"],
-        })
-
-    items.sort(
-        key=lambda x: (
-            -(x["days"] or 0),
-            x["client_name"] or "",
-            x["variety"] or "",
-        )
-    )
-
-    return items
+    As datas de todas as chaves são resolvidas em lote
+    (planting_insights_service.build_days_planted_portfolio).
+    """
+    return build_days_planted_portfolio(consultant_id)
 
 
 def build_consultant_days_planted_text(consultant_name: str, items: list) -> str:
@@ -6014,16 +5643,11 @@ def handle_week_schedule_flow(chat_message, consultant, resolved_consultant_id:
         state.pending_visit_suggestions_json = json.dumps(
             [
                 {
-                    "id": v.id,
-                    "client_id": v.client_id,
-                    "property_id": v.property_id,
-                    "plot_id": v.plot_id,
-                    "culture": v.culture,
-                    "variety": v.variety,
-                    "date": v.date.isoformat() if v.date else None,
-                    "recommendation": v.recommendation or "",
-                    "fenologia_real": v.fenologia_real,
-                    "status": v.status,
+                    key: v[key]
+                    for key in (
+                        "id", "client_id", "property_id", "plot_id", "culture", "variety",
+                        "date", "recommendation", "fenologia_real", "status",
+                    )
                 }
                 for v in week_visits
             ],
@@ -6497,16 +6121,11 @@ def handle_month_visits_flow(chat_message, consultant, message_text: str):
         state.pending_visit_suggestions_json = json.dumps(
             [
                 {
-                    "id": v.id,
-                    "client_id": v.client_id,
-                    "property_id": v.property_id,
-                    "plot_id": v.plot_id,
-                    "culture": v.culture,
-                    "variety": v.variety,
-                    "date": v.date.isoformat() if v.date else None,
-                    "recommendation": v.recommendation or "",
-                    "fenologia_real": v.fenologia_real,
-                    "status": v.status,
+                    key: v[key]
+                    for key in (
+                        "id", "client_id", "property_id", "plot_id", "culture", "variety",
+                        "date", "recommendation", "fenologia_real", "status",
+                    )
                 }
                 for v in month_visits
             ],
@@ -6754,16 +6373,8 @@ def find_consultant_visits_for_day(consultant_id: int, reference_date=None, limi
         return []
 
     day_ref = reference_date or get_local_today()
-
-    visits = (
-        Visit.query
-        .filter(Visit.consultant_id == consultant_id)
-        .filter(Visit.date == day_ref)
-        .order_by(Visit.date.asc(), Visit.id.asc())
-        .limit(limit)
-        .all()
-    )
-    return visits
+    window = get_visit_calendar(consultant_id, day_ref, day_ref, today=reference_date)
+    return calendar_visits(window.payload, limit=limit)
 
 
 def build_today_schedule_text(consultant_name: str, visits: list, reference_date=None) -> str:
@@ -6785,10 +6396,10 @@ def build_today_schedule_text(consultant_name: str, visits: list, reference_date
     ]
 
     for idx, visit in enumerate(visits, start=1):
-        client_name = visit.client.name if getattr(visit, "client", None) else f"Cliente {visit.client_id}"
-        culture = visit.culture or "—"
-        stage = visit.fenologia_real or visit.recommendation or "—"
-        status = visit.status or "planned"
+        client_name = visit["client_name"]
+        culture = visit["culture"] or "—"
+        stage = visit["fenologia_real"] or visit["recommendation"] or "—"
+        status = visit["status"]
         lines.append(f"{idx}. {client_name} - {culture} - {stage} - {status}")
 
     return "\n".join(lines)
@@ -6807,8 +6418,8 @@ def build_daily_routine_text(consultant_name: str, today_visits: list, overdue_m
     if today_visits:
         lines.append("Hoje:")
         for v in today_visits[:5]:
-            client_name = v.client.name if getattr(v, "client", None) else f"Cliente {v.client_id}"
-            culture = v.culture or "—"
+            client_name = v["client_name"]
+            culture = v["culture"] or "—"
             lines.append(f"- {client_name} - {culture}")
         lines.append("")
 
@@ -7681,25 +7292,23 @@ def create_planting():
     db.session.flush()  # para ter p.id
 
     # === Gerar Visitas automáticas pela fenologia ===
-    # Usa a tabela real phenology_stage do banco
+    # Mesma fonte do /phenology/schedule e da criação de visita:
+    # tabela phenology_stages (services/phenology_service.py)
     if planting_date and culture:
-        from sqlalchemy import text
+        from services.phenology_service import get_culture_stages
 
-        # busca do banco conforme cultura
-        stages = db.session.run(
-            text("SELECT code, name, days FROM phenology_stage WHERE culture = :culture ORDER BY days"),
-            {"culture": culture}
-        ).fetchall()
+        stages = get_culture_stages(culture)
 
         if stages:
             prop = Property.query.get(plot.property_id) if plot.property_id else None
             client = Client.query.get(prop.client_id) if (prop and prop.client_id) else None
+            consultant_id = data.get('consultant_id')
 
             for st in stages:
                 if st.days == 0:
                     continue  # ignora o plantio (já criado)
 
-                visit_date = planting_date + datetime.timedelta(days=int(st.days))
+                visit_date = planting_date + timedelta(days=int(st.days))
 
                 v = Visit(
                     client_id=(client.id if client else None),
@@ -1,11 +1,12 @@
 import os
 from flask import Flask, jsonify, send_from_directory, abort
 from flask_cors import CORS
-from flask_migrate import Migrate
 from sqlalchemy import text, create_engine
 from models import db, Client, Consultant
 from api_routes import bp as api_bp
 from services.agent.metrics_routes import agent_metrics_bp
+from utils.auth_helper import load_request_principal
+from utils.db_pool import build_engine_options
 
 
 BASE_DIR = os.path.dirname(__file__)
@@ -40,7 +41,11 @@ def create_app(test_config=None):
     sqlite_path = os.path.join(UPLOAD_DIR, "fallback_local.db")
 
     # =====================================================
-    # 🧠 Testa PostgreSQL corretamente (sem criar outro Flask)
+    # 🧠 Teste de conexão no boot (opcional)
+    # Por padrão o banco é escolhido só pela configuração: com
+    # DATABASE_URL usa PostgreSQL, sem ele usa SQLite. O teste de
+    # conexão com fallback para SQLite só roda com DB_STARTUP_PROBE=1,
+    # porque abre uma conexão síncrona antes do gunicorn responder.
     # =====================================================
     def try_postgres_connection():
         if not pg_url:
@@ -49,11 +54,19 @@ def create_app(test_config=None):
             engine = create_engine(pg_url, pool_pre_ping=True)
             with engine.connect() as conn:
                 conn.execute(text("SELECT 1"))
+            engine.dispose()
             return True
         except Exception as e:
             print("⚠️ PostgreSQL indisponível:", e)
             return False
 
+    def use_postgres():
+        if not pg_url:
+            return False
+        if os.environ.get("DB_STARTUP_PROBE") == "1":
+            return try_postgres_connection()
+        return True
+
     @app.route("/api/ping")
     def ping():
         return jsonify({"status": "ok"})
@@ -63,19 +76,12 @@ def create_app(test_config=None):
     # =====================================================
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
     app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "dev-secret")
-    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-        "pool_pre_ping": True,
-        "pool_size": 10,
-        "max_overflow": 20,
-        "pool_recycle": 180,
-        "pool_timeout": 30
-    }
 
     # =====================================================
     # 🔌 Seleção final do banco
     # =====================================================
-    if try_postgres_connection():
-        print("🟢 Conectado ao PostgreSQL do Render.")
+    if use_postgres():
+        print("🟢 Usando PostgreSQL do Render.")
         app.config["SQLALCHEMY_DATABASE_URI"] = pg_url
         db_status["engine"] = "postgresql"
     else:
@@ -83,9 +89,24 @@ def create_app(test_config=None):
         app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{sqlite_path}"
         db_status["engine"] = "sqlite"
 
+    # Pool por worker derivado de WEB_CONCURRENCY / DB_MAX_CONNECTIONS (utils/db_pool.py)
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = build_engine_options(app.config["SQLALCHEMY_DATABASE_URI"])
+
+    command_line = " ".join(os.sys.argv).lower()
+    is_flask_cli = "flask" in command_line
+    is_db_command = is_flask_cli and " db " in f" {command_line} "
+
     # 🔥 Inicializa DB
     db.init_app(app)
-    Migrate(app, db)
+
+    # Flask-Migrate (alembic) só é necessário nos comandos `flask db ...`;
+    # carregar no gunicorn custa ~0.3 s de import sem uso.
+    if is_flask_cli or os.environ.get("ENABLE_FLASK_MIGRATE") == "1":
+        from flask_migrate import Migrate
+        Migrate(app, db)
+
+    # Usuário do token resolvido uma vez por request (g.auth_principal)
+    app.before_request(load_request_principal)
 
     # =====================================================
     # Rotas
@@ -123,9 +144,6 @@ def create_app(test_config=None):
     # Seeds — só roda em SQLite
     # =====================================================
     with app.app_context():
-        command_line = " ".join(os.sys.argv).lower()
-        is_db_command = "flask" in command_line and " db " in f" {command_line} "
-
         if db_status["engine"] == "sqlite" and not is_db_command:
             try:
                 db.create_all()
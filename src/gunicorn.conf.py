@@ -0,0 +1,62 @@
+"""
+Configuração do gunicorn (carregada com `gunicorn -c gunicorn.conf.py app:app`).
+
+Modelo padrão: gthread. O tráfego do bot é quase todo espera de rede
+(OpenAI, Telegram, R2, geração de PDF); com workers sync cada chamada
+lenta prende um processo inteiro. Com threads, 2 processos x 8 threads
+atendem 16 requests ao mesmo tempo cabendo nos 512 MB do plano (cada
+processo custa ~120 MB; a thread a mais custa só a pilha).
+
+Variáveis (defaults abaixo, exportados para os workers para que o
+pool do banco em utils/db_pool.py use os mesmos números):
+- WEB_CONCURRENCY: processos
+- GUNICORN_WORKER_CLASS: gthread | sync | gevent
+- GUNICORN_THREADS: threads por processo (gthread)
+- GUNICORN_WORKER_CONNECTIONS: greenlets por processo (gevent)
+- GUNICORN_MAX_REQUESTS: recicla o processo após N requests (0 desliga)
+
+gevent precisa do pacote gevent instalado e do psycogreen para o
+psycopg2 não bloquear o hub; sem psycogreen cada query trava o worker.
+
+Teste de carga dos modelos: scripts/load_test_bot.py.
+"""
+
+import os
+
+
+DEFAULTS = {
+    "WEB_CONCURRENCY": "2",
+    "GUNICORN_WORKER_CLASS": "gthread",
+    "GUNICORN_THREADS": "8",
+    "GUNICORN_WORKER_CONNECTIONS": "50",
+}
+for _name, _value in DEFAULTS.items():
+    os.environ.setdefault(_name, _value)
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+worker_class = os.environ["GUNICORN_WORKER_CLASS"]
+workers = int(os.environ["WEB_CONCURRENCY"])
+threads = int(os.environ["GUNICORN_THREADS"])
+worker_connections = int(os.environ["GUNICORN_WORKER_CONNECTIONS"])
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+
+# Recicla processos aos poucos: segura a fragmentação de memória no plano de 512 MB
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = max_requests // 10
+
+# Sem preload: engine, pools de threads e clientes HTTP nascem em cada worker
+preload_app = False
+
+
+def post_fork(server, worker):
+    if worker_class != "gevent":
+        return
+    try:
+        from psycogreen.gevent import patch_psycopg
+    except ImportError:
+        server.log.warning("gevent sem psycogreen: queries do psycopg2 bloqueiam o worker")
+        return
+    patch_psycopg()
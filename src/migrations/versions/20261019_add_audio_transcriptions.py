@@ -0,0 +1,54 @@
+"""add audio_transcriptions
+
+Revision ID: 20261019_audio_transcriptions
+Revises: 20260527_update_users
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261019_audio_transcriptions"
+down_revision = "20260527_update_users"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "audio_transcriptions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column("telegram_file_unique_id", sa.String(length=120), nullable=True),
+        sa.Column("source_format", sa.String(length=20), nullable=True),
+        sa.Column("size_bytes", sa.Integer(), nullable=True),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            server_default=sa.text("(CURRENT_TIMESTAMP)"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    with op.batch_alter_table("audio_transcriptions", schema=None) as batch_op:
+        batch_op.create_index(
+            batch_op.f("ix_audio_transcriptions_content_hash"),
+            ["content_hash"],
+            unique=True,
+        )
+        batch_op.create_index(
+            batch_op.f("ix_audio_transcriptions_telegram_file_unique_id"),
+            ["telegram_file_unique_id"],
+            unique=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("audio_transcriptions", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_audio_transcriptions_telegram_file_unique_id"))
+        batch_op.drop_index(batch_op.f("ix_audio_transcriptions_content_hash"))
+
+    op.drop_table("audio_transcriptions")
@@ -0,0 +1,38 @@
+"""add composite indexes for client cycle lookup
+
+Revision ID: 20261019_cycle_lookup_indexes
+Revises: 20261019_reminder_runs
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+
+revision = "20261019_cycle_lookup_indexes"
+down_revision = "20261019_reminder_runs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("plots", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_plots_property_id_id",
+            ["property_id", "id"],
+            unique=False,
+        )
+
+    with op.batch_alter_table("plantings", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_plantings_plot_id_planting_date",
+            ["plot_id", "planting_date"],
+            unique=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("plantings", schema=None) as batch_op:
+        batch_op.drop_index("ix_plantings_plot_id_planting_date")
+
+    with op.batch_alter_table("plots", schema=None) as batch_op:
+        batch_op.drop_index("ix_plots_property_id_id")
@@ -0,0 +1,50 @@
+"""add llm_response_cache (persistent OpenAI response cache)
+
+Revision ID: 20261019_llm_response_cache
+Revises: 20261019_sync_changes
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261019_llm_response_cache"
+down_revision = "20261019_sync_changes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "llm_response_cache",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("prompt_hash", sa.String(length=64), nullable=False),
+        sa.Column("model", sa.String(length=80), nullable=False),
+        sa.Column("purpose", sa.String(length=60), nullable=True),
+        sa.Column("response", sa.Text(), nullable=False),
+        sa.Column("prompt_tokens", sa.Integer(), nullable=True),
+        sa.Column("completion_tokens", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    with op.batch_alter_table("llm_response_cache", schema=None) as batch_op:
+        batch_op.create_index(
+            batch_op.f("ix_llm_response_cache_prompt_hash"),
+            ["prompt_hash"],
+            unique=True,
+        )
+        batch_op.create_index(
+            batch_op.f("ix_llm_response_cache_created_at"),
+            ["created_at"],
+            unique=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("llm_response_cache", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_llm_response_cache_created_at"))
+        batch_op.drop_index(batch_op.f("ix_llm_response_cache_prompt_hash"))
+
+    op.drop_table("llm_response_cache")
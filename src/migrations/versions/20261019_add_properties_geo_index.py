@@ -0,0 +1,28 @@
+"""add lat/lon index on properties for the map bbox filter
+
+Revision ID: 20261019_properties_geo_index
+Revises: 20261019_cycle_lookup_indexes
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+
+revision = "20261019_properties_geo_index"
+down_revision = "20261019_cycle_lookup_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("properties", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_properties_latitude_longitude",
+            ["latitude", "longitude"],
+            unique=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("properties", schema=None) as batch_op:
+        batch_op.drop_index("ix_properties_latitude_longitude")
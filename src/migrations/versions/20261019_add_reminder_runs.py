@@ -0,0 +1,52 @@
+"""add reminder_runs
+
+Revision ID: 20261019_reminder_runs
+Revises: 20261019_telegram_pending_media
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261019_reminder_runs"
+down_revision = "20261019_telegram_pending_media"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "reminder_runs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(length=40), nullable=False, server_default="daily"),
+        sa.Column("started_at", sa.DateTime(), nullable=False),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column("duration_ms", sa.Integer(), nullable=True),
+        sa.Column("total_consultants", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("sent", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("skipped", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("failed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("results_json", sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    with op.batch_alter_table("reminder_runs", schema=None) as batch_op:
+        batch_op.create_index(
+            batch_op.f("ix_reminder_runs_kind"),
+            ["kind"],
+            unique=False,
+        )
+        batch_op.create_index(
+            batch_op.f("ix_reminder_runs_started_at"),
+            ["started_at"],
+            unique=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("reminder_runs", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_reminder_runs_started_at"))
+        batch_op.drop_index(batch_op.f("ix_reminder_runs_kind"))
+
+    op.drop_table("reminder_runs")
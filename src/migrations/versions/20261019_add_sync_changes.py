@@ -0,0 +1,41 @@
+"""add sync_changes (change log for incremental mobile sync)
+
+Revision ID: 20261019_sync_changes
+Revises: 20261019_properties_geo_index
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261019_sync_changes"
+down_revision = "20261019_properties_geo_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "sync_changes",
+        sa.Column("id", sa.BigInteger().with_variant(sa.Integer(), "sqlite"), nullable=False),
+        sa.Column("entity", sa.String(length=40), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("op", sa.String(length=10), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    with op.batch_alter_table("sync_changes", schema=None) as batch_op:
+        batch_op.create_index(
+            batch_op.f("ix_sync_changes_created_at"),
+            ["created_at"],
+            unique=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("sync_changes", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_sync_changes_created_at"))
+
+    op.drop_table("sync_changes")
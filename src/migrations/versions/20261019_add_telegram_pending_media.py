@@ -0,0 +1,58 @@
+"""add telegram_pending_media
+
+Revision ID: 20261019_telegram_pending_media
+Revises: 20261019_audio_transcriptions
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261019_telegram_pending_media"
+down_revision = "20261019_audio_transcriptions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "telegram_pending_media",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("chat_id", sa.String(length=120), nullable=False),
+        sa.Column("media_group_id", sa.String(length=120), nullable=True),
+        sa.Column("group_prompt_key", sa.String(length=255), nullable=True),
+        sa.Column("storage", sa.String(length=10), nullable=False, server_default="r2"),
+        sa.Column("storage_key", sa.String(length=500), nullable=False),
+        sa.Column("filename", sa.String(length=255), nullable=True),
+        sa.Column("caption", sa.String(length=255), nullable=True),
+        sa.Column("size_bytes", sa.Integer(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            server_default=sa.text("(CURRENT_TIMESTAMP)"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("group_prompt_key"),
+    )
+
+    with op.batch_alter_table("telegram_pending_media", schema=None) as batch_op:
+        batch_op.create_index(
+            batch_op.f("ix_telegram_pending_media_chat_id"),
+            ["chat_id"],
+            unique=False,
+        )
+        batch_op.create_index(
+            batch_op.f("ix_telegram_pending_media_created_at"),
+            ["created_at"],
+            unique=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("telegram_pending_media", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_telegram_pending_media_created_at"))
+        batch_op.drop_index(batch_op.f("ix_telegram_pending_media_chat_id"))
+
+    op.drop_table("telegram_pending_media")
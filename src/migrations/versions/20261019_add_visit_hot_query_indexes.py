@@ -0,0 +1,58 @@
+"""add composite and partial indexes for hot visit queries
+
+Revision ID: 20261019_visit_hot_query_indexes
+Revises: 20261019_llm_response_cache
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261019_visit_hot_query_indexes"
+down_revision = "20261019_llm_response_cache"
+branch_labels = None
+depends_on = None
+
+
+OPEN_VISITS = sa.text("status <> 'done'")
+
+
+def upgrade():
+    with op.batch_alter_table("visits", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_visits_consultant_id_date_status",
+            ["consultant_id", "date", "status"],
+            unique=False,
+        )
+        batch_op.create_index(
+            "ix_visits_open_consultant_id_date",
+            ["consultant_id", "date"],
+            unique=False,
+            postgresql_where=OPEN_VISITS,
+            sqlite_where=OPEN_VISITS,
+        )
+        batch_op.create_index(
+            "ix_visits_client_id_status_date",
+            ["client_id", "status", "date"],
+            unique=False,
+        )
+        batch_op.create_index(
+            "ix_visits_planting_id_date",
+            ["planting_id", "date"],
+            unique=False,
+        )
+        batch_op.create_index(
+            "ix_visits_cycle",
+            ["client_id", "property_id", "plot_id", "culture", "variety"],
+            unique=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("visits", schema=None) as batch_op:
+        batch_op.drop_index("ix_visits_cycle")
+        batch_op.drop_index("ix_visits_planting_id_date")
+        batch_op.drop_index("ix_visits_client_id_status_date")
+        batch_op.drop_index("ix_visits_open_consultant_id_date")
+        batch_op.drop_index("ix_visits_consultant_id_date_status")
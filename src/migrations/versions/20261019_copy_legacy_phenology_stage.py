@@ -0,0 +1,53 @@
+"""copy legacy phenology_stage rows into phenology_stages
+
+O código passou a ler só phenology_stages (services/phenology_service.py).
+Bancos antigos têm o cronograma na tabela phenology_stage (sem migration,
+lida com SQL cru): copia as linhas quando ela existe e phenology_stages
+está vazia. Nos demais casos não faz nada.
+
+Revision ID: 20261019_copy_phenology_stage
+Revises: 20261019_visit_hot_query_indexes
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261019_copy_phenology_stage"
+down_revision = "20261019_visit_hot_query_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    tables = sa.inspect(conn).get_table_names()
+
+    if "phenology_stage" not in tables:
+        return
+
+    if "phenology_stages" not in tables:
+        op.create_table(
+            "phenology_stages",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("culture", sa.String(length=50), nullable=False),
+            sa.Column("code", sa.String(length=20), nullable=False),
+            sa.Column("name", sa.String(length=100), nullable=False),
+            sa.Column("days", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    elif conn.execute(sa.text("SELECT 1 FROM phenology_stages LIMIT 1")).first():
+        return
+
+    conn.execute(sa.text(
+        "INSERT INTO phenology_stages (culture, code, name, days) "
+        "SELECT culture, code, name, days FROM phenology_stage "
+        "WHERE culture IS NOT NULL AND code IS NOT NULL AND name IS NOT NULL AND days IS NOT NULL "
+        "ORDER BY culture, days"
+    ))
+
+
+def downgrade():
+    # Cópia de dados: phenology_stage continua intacta, nada a desfazer
+    pass
@@ -1,3 +1,4 @@
+import json
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
@@ -181,6 +182,10 @@ class Client(db.Model):
 # ============================================================
 class Property(db.Model):
     __tablename__ = 'properties'
+    __table_args__ = (
+        # Filtro por bbox do mapa (/properties/map)
+        db.Index('ix_properties_latitude_longitude', 'latitude', 'longitude'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     client_id = db.Column(db.Integer, db.ForeignKey('clients.id'), nullable=False, index=True)
     name = db.Column(db.String(200), nullable=False)
@@ -212,6 +217,9 @@ class Property(db.Model):
 # ============================================================
 class Plot(db.Model):
     __tablename__ = 'plots'
+    __table_args__ = (
+        db.Index('ix_plots_property_id_id', 'property_id', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     property_id = db.Column(db.Integer, db.ForeignKey('properties.id'), nullable=False, index=True)
     name = db.Column(db.String(200), nullable=False)
@@ -239,6 +247,10 @@ class Plot(db.Model):
 # ============================================================
 class Planting(db.Model):
     __tablename__ = 'plantings'
+    __table_args__ = (
+        # Busca de ciclos por cliente: join plots → plantings ordenado por data
+        db.Index('ix_plantings_plot_id_planting_date', 'plot_id', 'planting_date'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     plot_id = db.Column(db.Integer, db.ForeignKey('plots.id'), nullable=True, index=True)
     culture = db.Column(db.String(120), nullable=True)
@@ -265,6 +277,22 @@ class Planting(db.Model):
 # ============================================================
 class Visit(db.Model):
     __tablename__ = 'visits'
+    __table_args__ = (
+        # Agenda / insights / mês: consultor + intervalo de datas (+ status)
+        db.Index('ix_visits_consultant_id_date_status', 'consultant_id', 'date', 'status'),
+        # Pendências (status != 'done'), só com as visitas em aberto
+        db.Index(
+            'ix_visits_open_consultant_id_date', 'consultant_id', 'date',
+            postgresql_where=db.text("status <> 'done'"),
+            sqlite_where=db.text("status <> 'done'"),
+        ),
+        # Última visita concluída do cliente / clientes sem visita
+        db.Index('ix_visits_client_id_status_date', 'client_id', 'status', 'date'),
+        # Ciclo do PDF por plantio, ordenado por data
+        db.Index('ix_visits_planting_id_date', 'planting_id', 'date'),
+        # Mesmo ciclo sem plantio (build_same_cycle_visit_query / agrupamento do PDF)
+        db.Index('ix_visits_cycle', 'client_id', 'property_id', 'plot_id', 'culture', 'variety'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     client_id = db.Column(db.Integer, db.ForeignKey('clients.id'), nullable=False, index=True)
@@ -691,4 +719,138 @@ class AgentDecisionLog(db.Model):
             "executed": bool(self.executed) if self.executed is not None else False,
             "extra_json": self.extra_json,
             "created_at": self.created_at.isoformat() if self.created_at else None,
-        }
\ No newline at end of file
+        }
+
+# ============================================================
+# Cache de transcrições de áudio
+# Chaveado pelo hash do conteúdo e pelo file_unique_id do Telegram,
+# para que reenvios e áudios encaminhados não sejam transcritos de novo.
+# ============================================================
+class AudioTranscription(db.Model):
+    __tablename__ = "audio_transcriptions"
+
+    id = db.Column(db.Integer, primary_key=True)
+    content_hash = db.Column(db.String(64), unique=True, nullable=False, index=True)
+    telegram_file_unique_id = db.Column(db.String(120), nullable=True, index=True)
+    source_format = db.Column(db.String(20), nullable=True)
+    size_bytes = db.Column(db.Integer, nullable=True)
+    text = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, server_default=db.func.now(), nullable=False)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "content_hash": self.content_hash,
+            "telegram_file_unique_id": self.telegram_file_unique_id,
+            "source_format": self.source_format,
+            "size_bytes": self.size_bytes,
+            "text": self.text,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+
+# ============================================================
+# Fotos pendentes do Telegram (staging)
+# Cada foto recebida antes do contexto da visita vira uma linha aqui;
+# os bytes ficam no R2 (staging/...) ou no spool local do worker.
+# ============================================================
+class TelegramPendingMedia(db.Model):
+    __tablename__ = "telegram_pending_media"
+
+    id = db.Column(db.Integer, primary_key=True)
+    chat_id = db.Column(db.String(120), nullable=False, index=True)
+    media_group_id = db.Column(db.String(120), nullable=True)
+    # Preenchido só na primeira foto de um álbum ("<chat_id>:<media_group_id>"):
+    # o índice único garante um único aviso por álbum entre workers.
+    group_prompt_key = db.Column(db.String(255), unique=True, nullable=True)
+    storage = db.Column(db.String(10), nullable=False, server_default="r2")  # r2, local
+    storage_key = db.Column(db.String(500), nullable=False)
+    filename = db.Column(db.String(255), nullable=True)
+    caption = db.Column(db.String(255), nullable=True)
+    size_bytes = db.Column(db.Integer, nullable=True)
+    created_at = db.Column(db.DateTime, server_default=db.func.now(), nullable=False, index=True)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "chat_id": self.chat_id,
+            "media_group_id": self.media_group_id,
+            "storage": self.storage,
+            "storage_key": self.storage_key,
+            "filename": self.filename,
+            "caption": self.caption,
+            "size_bytes": self.size_bytes,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+
+# ============================================================
+# Execuções do lembrete diário (cron /api/cron/daily-reminders)
+# Uma linha por execução, com contagens e o resultado por consultor.
+# ============================================================
+class ReminderRun(db.Model):
+    __tablename__ = "reminder_runs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(40), nullable=False, server_default="daily", index=True)
+    started_at = db.Column(db.DateTime, nullable=False, index=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    duration_ms = db.Column(db.Integer, nullable=True)
+
+    total_consultants = db.Column(db.Integer, nullable=False, server_default="0")
+    sent = db.Column(db.Integer, nullable=False, server_default="0")
+    skipped = db.Column(db.Integer, nullable=False, server_default="0")
+    failed = db.Column(db.Integer, nullable=False, server_default="0")
+
+    # JSON com o resultado por consultor (status, tentativas, erro)
+    results_json = db.Column(db.Text, nullable=True)
+
+    def to_dict(self, include_results=False):
+        data = {
+            "id": self.id,
+            "kind": self.kind,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "duration_ms": self.duration_ms,
+            "total_consultants": self.total_consultants,
+            "sent": self.sent,
+            "skipped": self.skipped,
+            "failed": self.failed,
+        }
+        if include_results:
+            try:
+                data["results"] = json.loads(self.results_json) if self.results_json else []
+            except ValueError:
+                data["results"] = []
+        return data
+
+
+# ============================================================
+# Log de alterações para sincronização incremental do app
+# O id (autoincremento) é a versão monotônica usada em /api/sync?since=
+# ============================================================
+class SyncChange(db.Model):
+    __tablename__ = "sync_changes"
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, "sqlite"), primary_key=True)
+    entity = db.Column(db.String(40), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(10), nullable=False)  # upsert, delete
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+
+# ============================================================
+# Cache persistente de respostas da OpenAI (services/llm_gateway.py)
+# Chave: sha256 de (modelo, mensagens, parâmetros)
+# ============================================================
+class LLMResponseCache(db.Model):
+    __tablename__ = "llm_response_cache"
+
+    id = db.Column(db.Integer, primary_key=True)
+    prompt_hash = db.Column(db.String(64), unique=True, nullable=False, index=True)
+    model = db.Column(db.String(80), nullable=False)
+    purpose = db.Column(db.String(60), nullable=True)
+    response = db.Column(db.Text, nullable=False)
+    prompt_tokens = db.Column(db.Integer, nullable=True)
+    completion_tokens = db.Column(db.Integer, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
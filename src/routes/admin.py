@@ -2,14 +2,20 @@
 """
 Endpoints administrativos e cron jobs.
 - /admin/diseases (GET)
+- /admin/diseases/reload (POST)
 - /admin/diseases/<slug>/image (POST)
 - /admin/diseases/upload-batch (POST)
 - /admin/generate-seed (GET)
 - /admin/seed-stats (GET)
 - /cron/daily-reminders (POST)
+- /cron/reminder-runs (GET)
 - /cron/test-reminder/<id> (POST)
+- /cron/sweep-pending-media (POST)
+- /insights (GET)
 - /insights/<id> (GET)
 - /reports/monthly.xlsx (GET)
+- /reports/monthly.csv (GET)
+- /reports/monthly.parquet (GET)
 """
 
 import os
@@ -30,6 +36,7 @@ from models import (
     TelegramContactBinding,
 )
 from services.chatbot_service import send_telegram_message
+from services.sync_service import get_current_version
 from utils.auth_helper import get_consultant_id_filter
 
 admin_bp = Blueprint('admin', __name__)
@@ -45,6 +52,18 @@ def report_monthly_xlsx():
     return generate_monthly_xlsx(request)
 
 
+@admin_bp.route("/reports/monthly.csv", methods=["GET"])
+def report_monthly_csv():
+    from services.report_export_service import generate_report_csv
+    return generate_report_csv(request)
+
+
+@admin_bp.route("/reports/monthly.parquet", methods=["GET"])
+def report_monthly_parquet():
+    from services.report_export_service import generate_report_parquet
+    return generate_report_parquet(request)
+
+
 # ================================================================
 # DASHBOARD INSIGHTS - Dados agregados para o dashboard
 # ================================================================
@@ -107,21 +126,8 @@ def get_dashboard_insights():
         })
 
     # 2) Sugestões de visitas baseadas em fenologia e tempo
-    # Dias estimados entre estágios fenológicos (soja/milho)
-    STAGE_INTERVALS = {
-        "VE": 7, "V1": 7, "V2": 7, "V3": 7, "V4": 7, "V5": 7, "V6": 7,
-        "V7": 7, "V8": 7, "V9": 7, "V10": 7, "V11": 7, "V12": 7,
-        "R1": 10, "R2": 10, "R3": 12, "R4": 12, "R5": 14,
-        "R5.1": 7, "R5.2": 7, "R5.3": 7, "R5.4": 7, "R5.5": 7,
-        "R6": 14, "R7": 14, "R8": 21,
-    }
-    STAGE_NEXT = {
-        "VE": "V1", "V1": "V2", "V2": "V3", "V3": "V4", "V4": "V5", "V5": "V6",
-        "V6": "V7", "V7": "V8", "V8": "V9", "V9": "V10", "V10": "V11", "V11": "V12",
-        "V12": "R1", "R1": "R2", "R2": "R3", "R3": "R4", "R4": "R5",
-        "R5": "R5.1", "R5.1": "R5.2", "R5.2": "R5.3", "R5.3": "R5.4", "R5.4": "R5.5",
-        "R5.5": "R6", "R6": "R7", "R7": "R8",
-    }
+    # Intervalos vêm do modelo fenológico da cultura (fallback: soja/milho)
+    from services.phenology_service import get_next_stage
 
     # Busca última visita por cliente com fenologia registrada (últimos 60 dias)
     sixty_days_ago = today - timedelta(days=60)
@@ -149,27 +155,31 @@ def get_dashboard_insights():
         )
     ).all()
 
+    client_names = dict(
+        db.session.query(Client.id, Client.name).filter(
+            Client.id.in_({v.client_id for v in latest_visits if v.client_id})
+        ).all()
+    ) if latest_visits else {}
+
     suggestions = []
     for v in latest_visits:
         stage = (v.fenologia_real or "").strip().upper()
-        if not stage or stage not in STAGE_INTERVALS:
+        next_stage, interval = get_next_stage(v.culture, stage)
+        if interval is None:
             continue
 
         days_since = (today - v.date).days if v.date else 0
-        interval = STAGE_INTERVALS.get(stage, 14)
-        next_stage = STAGE_NEXT.get(stage, "—")
 
         # Se já passou do intervalo esperado, sugerir visita
         days_until = interval - days_since
         if days_until <= 7:  # Sugerir se falta 7 dias ou menos (ou já passou)
-            client = Client.query.get(v.client_id) if v.client_id else None
             priority = "high" if days_until <= 0 else "medium"
             suggestions.append({
                 "client_id": v.client_id,
-                "client_name": client.name if client else "—",
+                "client_name": client_names.get(v.client_id, "—"),
                 "culture": v.culture or "",
                 "current_stage": stage,
-                "next_stage": next_stage,
+                "next_stage": next_stage or "—",
                 "days_since_visit": days_since,
                 "days_until_next": max(0, days_until),
                 "priority": priority,
@@ -280,6 +290,39 @@ def get_dashboard_insights():
 # PROACTIVE INSIGHTS - Lembretes e alertas proativos
 # ================================================================
 
+@admin_bp.route("/insights", methods=["GET"])
+@cross_origin(origins=["https://agrocrm-frontend.onrender.com", "https://localhost", "capacitor://localhost", "http://localhost"])
+def get_team_insights_endpoint():
+    """
+    Insights proativos de vários consultores numa chamada.
+    ?consultant_ids=1,2,3 (sem parâmetro: todos). Usuário não-admin só
+    recebe os próprios insights.
+    """
+    from services.proactive_insights import get_insights_for_consultants
+
+    raw_ids = (request.args.get("consultant_ids") or "").strip()
+    try:
+        requested = {int(x) for x in raw_ids.split(",") if x.strip()}
+    except ValueError:
+        return jsonify({"ok": False, "error": "consultant_ids inválido"}), 400
+
+    query = db.session.query(Consultant.id)
+    if requested:
+        query = query.filter(Consultant.id.in_(requested))
+
+    filter_id = get_consultant_id_filter()
+    if filter_id is not None:
+        query = query.filter(Consultant.id == filter_id)
+
+    ids = [cid for (cid,) in query.all()]
+    insights = get_insights_for_consultants(ids)
+
+    return jsonify({
+        "ok": True,
+        "insights": [insights[cid] for cid in ids],
+    }), 200
+
+
 @admin_bp.route("/insights/<int:consultant_id>", methods=["GET"])
 @cross_origin(origins=["https://agrocrm-frontend.onrender.com", "https://localhost", "capacitor://localhost", "http://localhost"])
 def get_consultant_insights_endpoint(consultant_id: int):
@@ -287,13 +330,12 @@ def get_consultant_insights_endpoint(consultant_id: int):
     Retorna insights proativos para um consultor.
     Usado pelo app/site para exibir alertas e lembretes.
     """
-    from services.proactive_insights import get_consultant_insights
+    from services.proactive_insights import get_insights_for_consultants
 
-    consultant = Consultant.query.get(consultant_id)
-    if not consultant:
+    if not db.session.get(Consultant, consultant_id):
         return jsonify({"ok": False, "error": "Consultor não encontrado"}), 404
 
-    insights = get_consultant_insights(consultant_id)
+    insights = get_insights_for_consultants([consultant_id])[consultant_id]
 
     return jsonify({
         "ok": True,
@@ -313,10 +355,7 @@ def cron_daily_reminders():
 
     Segurança: aceita apenas requests com header X-Cron-Secret válido.
     """
-    from services.proactive_insights import (
-        get_all_consultants_for_daily_reminder,
-        build_daily_reminder_text,
-    )
+    from services.daily_reminder_service import run_daily_reminders
 
     cron_secret = os.getenv("CRON_SECRET")
     request_secret = request.headers.get("X-Cron-Secret")
@@ -324,40 +363,49 @@ def cron_daily_reminders():
     if cron_secret and request_secret != cron_secret:
         return jsonify({"ok": False, "error": "unauthorized"}), 401
 
-    consultants = get_all_consultants_for_daily_reminder()
-    sent_count = 0
-    errors = []
+    report = run_daily_reminders()
 
-    for c in consultants:
-        try:
-            text = build_daily_reminder_text(c["consultant_id"], c["consultant_name"])
-
-            if text:
-                result = send_telegram_message(
-                    chat_id=c["telegram_chat_id"],
-                    text=text,
-                )
-                if result.get("ok"):
-                    sent_count += 1
-                else:
-                    errors.append({
-                        "consultant_id": c["consultant_id"],
-                        "error": result.get("error", "unknown"),
-                    })
-        except Exception as e:
-            errors.append({
-                "consultant_id": c["consultant_id"],
-                "error": str(e),
-            })
+    errors = [
+        {"consultant_id": r["consultant_id"], "error": r["error"] or "unknown"}
+        for r in report["results"]
+        if r["status"] == "failed"
+    ]
 
     return jsonify({
         "ok": True,
-        "sent": sent_count,
-        "total_consultants": len(consultants),
+        "run_id": report["run_id"],
+        "sent": report["sent"],
+        "skipped": report["skipped"],
+        "failed": report["failed"],
+        "total_consultants": report["total_consultants"],
+        "duration_ms": report["duration_ms"],
         "errors": errors if errors else None,
     }), 200
 
 
+@admin_bp.route("/cron/reminder-runs", methods=["GET"])
+def cron_reminder_runs():
+    """Últimas execuções do lembrete diário (?id=<run> traz o detalhe por consultor)."""
+    from models import ReminderRun
+
+    cron_secret = os.getenv("CRON_SECRET")
+    request_secret = request.headers.get("X-Cron-Secret")
+
+    if cron_secret and request_secret != cron_secret:
+        return jsonify({"ok": False, "error": "unauthorized"}), 401
+
+    run_id = request.args.get("id", type=int)
+    if run_id:
+        run = db.session.get(ReminderRun, run_id)
+        if not run:
+            return jsonify({"ok": False, "error": "Execução não encontrada"}), 404
+        return jsonify({"ok": True, "run": run.to_dict(include_results=True)}), 200
+
+    limit = min(request.args.get("limit", 20, type=int) or 20, 100)
+    runs = ReminderRun.query.order_by(ReminderRun.started_at.desc()).limit(limit).all()
+    return jsonify({"ok": True, "runs": [r.to_dict() for r in runs]}), 200
+
+
 @admin_bp.route("/cron/test-reminder/<int:consultant_id>", methods=["POST"])
 def cron_test_reminder(consultant_id: int):
     """
@@ -405,6 +453,29 @@ def cron_test_reminder(consultant_id: int):
     }), 200
 
 
+@admin_bp.route("/cron/sweep-pending-media", methods=["POST"])
+def cron_sweep_pending_media():
+    """
+    Remove fotos pendentes do Telegram que expiraram (TTL) sem serem
+    vinculadas a uma visita. Mesma proteção X-Cron-Secret dos lembretes.
+    """
+    from services.media_staging_service import sweep_expired_pending_media
+
+    cron_secret = os.getenv("CRON_SECRET")
+    request_secret = request.headers.get("X-Cron-Secret")
+
+    if cron_secret and request_secret != cron_secret:
+        return jsonify({"ok": False, "error": "unauthorized"}), 401
+
+    try:
+        removed = sweep_expired_pending_media()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"ok": False, "error": str(e)}), 500
+
+    return jsonify({"ok": True, "removed": removed}), 200
+
+
 # ================================================================
 # ADMIN - Gerenciamento de imagens de doenças
 # ================================================================
@@ -412,12 +483,16 @@ def cron_test_reminder(consultant_id: int):
 @admin_bp.route("/admin/diseases", methods=["GET"])
 def admin_list_diseases():
     """Lista todas as doenças cadastradas e status das imagens."""
-    from services.diseases_database import DISEASES_DATABASE, get_r2_base_url
+    from services.diseases_database import (
+        get_diseases_database,
+        get_diseases_version,
+        get_r2_base_url,
+    )
 
     base_url = get_r2_base_url()
     diseases = []
 
-    for d in DISEASES_DATABASE:
+    for d in get_diseases_database():
         slug = d.get("slug", "")
         image_url = f"{base_url}/diseases/{slug}.jpg" if base_url else None
         diseases.append({
@@ -432,11 +507,30 @@ def admin_list_diseases():
     return jsonify({
         "ok": True,
         "count": len(diseases),
+        "version": get_diseases_version(),
         "r2_base_url": base_url,
         "diseases": diseases,
     }), 200
 
 
+@admin_bp.route("/admin/diseases/reload", methods=["POST"])
+def admin_reload_diseases():
+    """
+    Recarrega a base de doenças do arquivo de dados, sem redeploy.
+    Os outros workers detectam a mudança pelo mtime do arquivo.
+    """
+    from services.diseases_database import reload_diseases_database
+
+    try:
+        info = reload_diseases_database()
+    except Exception as e:
+        # A mensagem pode trazer o caminho do arquivo no servidor: fica só no log
+        print(f"⚠️ Falha ao recarregar base de doenças: {e}")
+        return jsonify({"ok": False, "error": "falha ao recarregar a base de doenças"}), 500
+
+    return jsonify({"ok": True, **info}), 200
+
+
 @admin_bp.route("/admin/diseases/<slug>/image", methods=["POST"])
 def admin_upload_disease_image(slug: str):
     """
@@ -446,10 +540,10 @@ def admin_upload_disease_image(slug: str):
         - image_url: URL pública para baixar a imagem
         - image_base64: Imagem em base64 (alternativa)
     """
-    from services.diseases_database import DISEASES_DATABASE
+    from services.diseases_database import get_diseases_database
     import requests as req
 
-    disease = next((d for d in DISEASES_DATABASE if d.get("slug") == slug), None)
+    disease = next((d for d in get_diseases_database() if d.get("slug") == slug), None)
     if not disease:
         return jsonify({"ok": False, "error": f"Doença '{slug}' não encontrada"}), 404
 
@@ -516,7 +610,7 @@ def admin_upload_disease_images_batch():
         - images: [{"slug": "ferrugem-asiatica", "url": "https://..."}]
     """
     import requests as req
-    from services.diseases_database import DISEASES_DATABASE
+    from services.diseases_database import get_diseases_database
     from utils.r2_client import get_r2_client
 
     data = request.get_json(force=True) or {}
@@ -542,7 +636,7 @@ def admin_upload_disease_images_batch():
             results.append({"slug": slug, "ok": False, "error": "slug ou url faltando"})
             continue
 
-        disease = next((d for d in DISEASES_DATABASE if d.get("slug") == slug), None)
+        disease = next((d for d in get_diseases_database() if d.get("slug") == slug), None)
         if not disease:
             results.append({"slug": slug, "ok": False, "error": "slug não encontrado"})
             continue
@@ -592,8 +686,14 @@ def admin_generate_seed():
     """
     Gera seed.json com dados atuais do banco para embutir no APK.
     O arquivo gerado deve ser copiado para frontend/public/seed/data.json
+    Depois da instalação o app se atualiza por /api/sync?since=<sync_version>;
+    "version" é só o carimbo de geração do arquivo.
     """
     try:
+        # Versão lida antes dos dados: no pior caso o primeiro delta reenvia
+        # algo que já veio no seed (upsert é idempotente).
+        sync_version = get_current_version()
+
         consultants = [
             {"id": c.id, "name": c.name}
             for c in Consultant.query.order_by(Consultant.id).all()
@@ -620,13 +720,19 @@ def admin_generate_seed():
         ]
 
         varieties = [
-            {"id": v.id, "name": v.name, "culture_id": v.culture_id, "culture_name": v.culture.name if v.culture else None}
-            for v in Variety.query.order_by(Variety.name).all()
+            {"id": v_id, "name": v_name, "culture_id": culture_id, "culture_name": culture_name}
+            for v_id, v_name, culture_id, culture_name in (
+                db.session.query(Variety.id, Variety.name, Variety.culture_id, Culture.name)
+                .outerjoin(Culture, Culture.id == Variety.culture_id)
+                .order_by(Variety.name)
+                .all()
+            )
         ]
 
         seed_data = {
             "version": datetime.now().strftime("%Y%m%d_%H%M"),
             "generated_at": datetime.now().isoformat(),
+            "sync_version": sync_version,
             "consultants": consultants,
             "clients": clients,
             "properties": properties,
@@ -8,6 +8,7 @@ import os
 from datetime import datetime, timedelta
 
 from models import db, User, Consultant
+from utils.auth_helper import get_request_principal, invalidate_user_cache
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -41,17 +42,15 @@ def decode_token(token: str) -> dict | None:
 
 
 def get_current_user() -> User | None:
-    """Retorna o usuário atual baseado no token do header."""
-    auth_header = request.headers.get('Authorization', '')
-    if not auth_header.startswith('Bearer '):
-        return None
-
-    token = auth_header[7:]  # Remove 'Bearer '
-    payload = decode_token(token)
-    if not payload:
+    """
+    Retorna o usuário atual baseado no token do header.
+    Reaproveita o token já decodificado no before_request.
+    """
+    principal = get_request_principal()
+    if not principal:
         return None
 
-    user = User.query.get(payload.get('user_id'))
+    user = db.session.get(User, principal.user_id)
     if not user or not user.active:
         return None
 
@@ -259,6 +258,7 @@ def update_user(user_id: int):
         user.is_admin = bool(data.get('is_admin'))
 
     db.session.commit()
+    invalidate_user_cache(user.id)
 
     return jsonify({
         'ok': True,
@@ -315,6 +315,7 @@ def toggle_user_active(user_id: int):
 
     user.active = not user.active
     db.session.commit()
+    invalidate_user_cache(user.id)
 
     status = 'ativado' if user.active else 'desativado'
     return jsonify({
@@ -342,6 +343,7 @@ def delete_user(user_id: int):
     username = user.username
     db.session.delete(user)
     db.session.commit()
+    invalidate_user_cache(user_id)
 
     return jsonify({
         'ok': True,
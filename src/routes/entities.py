@@ -2,6 +2,7 @@
 """
 CRUD de entidades hierárquicas.
 - /properties (GET, POST)
+- /properties/map (GET)
 - /properties/<id> (GET, PUT, DELETE)
 - /plots (GET, POST)
 - /plots/<id> (GET, PUT, DELETE)
@@ -41,78 +42,217 @@ def get_properties():
     return jsonify([p.to_dict() for p in props]), 200
 
 
-@entities_bp.route('/properties/map', methods=['GET'])
-def get_properties_for_map():
-    """
-    Retorna propriedades com coordenadas para exibição no mapa.
-    Inclui dados do cliente e última visita.
-    Query params opcionais: consultant_id, region
-    """
-    from sqlalchemy import func
+# Abaixo deste zoom o mapa recebe clusters (grade) em vez de pontos
+MAP_CLUSTER_MAX_ZOOM = 9
+MAP_CLUSTER_CELL_PX = 60
 
-    consultant_id = request.args.get('consultant_id', type=int)
-    region = request.args.get('region', type=str)
 
-    # Busca propriedades que têm coordenadas
-    q = Property.query.filter(
+def _parse_bbox(value):
+    """bbox=minLon,minLat,maxLon,maxLat -> tupla de floats ou None."""
+    if not value:
+        return None
+    parts = [_parse_optional_float(p.strip()) for p in value.split(',')]
+    if len(parts) != 4 or any(p is None for p in parts):
+        raise ValueError("bbox deve ser minLon,minLat,maxLon,maxLat")
+    min_lon, min_lat, max_lon, max_lat = parts
+    if min_lat > max_lat:
+        raise ValueError("bbox com latitude mínima maior que a máxima")
+    return min_lon, min_lat, max_lon, max_lat
+
+
+def _map_properties_query(columns, consultant_id=None, region=None, bbox=None):
+    """Propriedades com coordenadas + filtros do mapa (consultor, região, bbox)."""
+    q = db.session.query(*columns).select_from(Property).outerjoin(
+        Client, Client.id == Property.client_id
+    ).filter(
         Property.latitude.isnot(None),
         Property.longitude.isnot(None)
     )
 
     # Se filtrar por consultor, filtra pelos clientes que o consultor atende
     if consultant_id:
-        # Busca clientes que têm visitas do consultor
         client_ids_with_visits = db.session.query(Visit.client_id).filter(
             Visit.consultant_id == consultant_id
-        ).distinct().subquery()
+        ).distinct()
         q = q.filter(Property.client_id.in_(client_ids_with_visits))
 
     # Filtro por região do cliente
     if region:
-        q = q.join(Client).filter(Client.region == region)
+        q = q.filter(Client.region == region)
 
-    properties = q.all()
+    if bbox:
+        min_lon, min_lat, max_lon, max_lat = bbox
+        q = q.filter(Property.latitude.between(min_lat, max_lat))
+        if min_lon <= max_lon:
+            q = q.filter(Property.longitude.between(min_lon, max_lon))
+        else:
+            # bbox cruzando o antimeridiano
+            q = q.filter(db.or_(Property.longitude >= min_lon, Property.longitude <= max_lon))
+
+    return q
 
+
+def _latest_done_visits(property_ids, client_ids):
+    """
+    Última visita concluída por propriedade e por cliente, numa query
+    (ROW_NUMBER particionado pelos dois). Retorna (por_propriedade, por_cliente).
+    """
+    if not property_ids:
+        return {}, {}
+
+    order = (Visit.date.desc().nullslast(), Visit.id.desc())
+    subq = db.session.query(
+        Visit.id.label("id"),
+        Visit.property_id.label("property_id"),
+        Visit.client_id.label("client_id"),
+        Visit.date.label("date"),
+        Visit.culture.label("culture"),
+        Visit.variety.label("variety"),
+        Visit.fenologia_real.label("fenologia_real"),
+        db.func.row_number().over(partition_by=Visit.property_id, order_by=order).label("rn_property"),
+        db.func.row_number().over(partition_by=Visit.client_id, order_by=order).label("rn_client"),
+    ).filter(
+        Visit.status == 'done',
+        db.or_(Visit.property_id.in_(property_ids), Visit.client_id.in_(client_ids)),
+    ).subquery()
+
+    rows = db.session.query(subq).filter(
+        db.or_(subq.c.rn_property == 1, subq.c.rn_client == 1)
+    ).all()
+
+    by_property = {}
+    by_client = {}
+    for row in rows:
+        if row.rn_property == 1 and row.property_id is not None:
+            by_property[row.property_id] = row
+        if row.rn_client == 1:
+            by_client[row.client_id] = row
+    return by_property, by_client
+
+
+def _map_clusters(zoom, consultant_id=None, region=None, bbox=None):
+    """
+    Agrupa as propriedades numa grade de ~MAP_CLUSTER_CELL_PX pixels no
+    zoom pedido, direto no banco (GROUP BY da célula).
+    """
+    cell = MAP_CLUSTER_CELL_PX * 360.0 / (256 * (2 ** zoom))
+    # floor antes do CAST: no Postgres o CAST para inteiro arredonda (2.5 -> 3)
+    cell_lat = db.cast(db.func.floor((Property.latitude + 90) / cell), db.Integer).label("cell_lat")
+    cell_lon = db.cast(db.func.floor((Property.longitude + 180) / cell), db.Integer).label("cell_lon")
+
+    q = _map_properties_query(
+        [
+            cell_lat,
+            cell_lon,
+            db.func.count(Property.id),
+            db.func.avg(Property.latitude),
+            db.func.avg(Property.longitude),
+            db.func.min(Property.id),
+            db.func.coalesce(db.func.sum(Property.area_ha), 0),
+        ],
+        consultant_id=consultant_id,
+        region=region,
+        bbox=bbox,
+    ).group_by(cell_lat, cell_lon)
+
+    clusters = []
+    for _, _, count, lat, lon, first_id, area in q.all():
+        clusters.append({
+            'count': count,
+            'latitude': float(lat),
+            'longitude': float(lon),
+            'area_ha': float(area or 0),
+            'property_id': first_id if count == 1 else None,
+        })
+    return clusters
+
+
+@entities_bp.route('/properties/map', methods=['GET'])
+def get_properties_for_map():
+    """
+    Retorna propriedades com coordenadas para exibição no mapa.
+    Inclui dados do cliente e última visita.
+    Query params opcionais: consultant_id, region,
+    bbox=minLon,minLat,maxLon,maxLat e zoom.
+
+    Sem zoom: lista de propriedades (formato antigo).
+    Com zoom: {"zoom", "clusters", "properties"}; abaixo de
+    MAP_CLUSTER_MAX_ZOOM vêm só clusters, acima só propriedades.
+    """
+    consultant_id = request.args.get('consultant_id', type=int)
+    region = request.args.get('region', type=str)
+    zoom = request.args.get('zoom', type=int)
+
+    try:
+        bbox = _parse_bbox(request.args.get('bbox'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if zoom is not None:
+        zoom = max(0, min(zoom, 22))
+        if zoom < MAP_CLUSTER_MAX_ZOOM:
+            return jsonify({
+                'zoom': zoom,
+                'clusters': _map_clusters(zoom, consultant_id, region, bbox),
+                'properties': [],
+            }), 200
+
+    rows = _map_properties_query(
+        [
+            Property.id,
+            Property.name,
+            Property.latitude,
+            Property.longitude,
+            Property.area_ha,
+            Property.city_state,
+            Property.client_id,
+            Client.name,
+            Client.region,
+        ],
+        consultant_id=consultant_id,
+        region=region,
+        bbox=bbox,
+    ).all()
+
+    by_property, by_client = _latest_done_visits(
+        [row[0] for row in rows],
+        list({row[6] for row in rows}),
+    )
+
+    today = datetime.now().date()
     result = []
-    for prop in properties:
-        # Busca última visita - primeiro tenta pela propriedade, depois pelo cliente
-        last_visit = Visit.query.filter(
-            Visit.property_id == prop.id,
-            Visit.status == 'done'
-        ).order_by(Visit.date.desc()).first()
-
-        # Se não encontrou visita pela propriedade, busca pelo cliente
-        if not last_visit:
-            last_visit = Visit.query.filter(
-                Visit.client_id == prop.client_id,
-                Visit.status == 'done'
-            ).order_by(Visit.date.desc()).first()
+    for prop_id, name, lat, lon, area_ha, city_state, client_id, client_name, client_region in rows:
+        # Última visita - primeiro pela propriedade, depois pelo cliente
+        last_visit = by_property.get(prop_id) or by_client.get(client_id)
 
         # Calcula dias desde última visita
         days_since_visit = None
         if last_visit and last_visit.date:
-            days_since_visit = (datetime.now().date() - last_visit.date).days
+            days_since_visit = (today - last_visit.date).days
 
         result.append({
-            'id': prop.id,
-            'name': prop.name,
-            'latitude': prop.latitude,
-            'longitude': prop.longitude,
-            'area_ha': prop.area_ha,
-            'city_state': prop.city_state,
-            'client_id': prop.client_id,
-            'client_name': prop.client.name if prop.client else None,
-            'client_region': prop.client.region if prop.client else None,
+            'id': prop_id,
+            'name': name,
+            'latitude': lat,
+            'longitude': lon,
+            'area_ha': area_ha,
+            'city_state': city_state,
+            'client_id': client_id,
+            'client_name': client_name,
+            'client_region': client_region,
             'last_visit': {
                 'id': last_visit.id,
-                'date': last_visit.date.isoformat() if last_visit and last_visit.date else None,
-                'culture': last_visit.culture if last_visit else None,
-                'variety': last_visit.variety if last_visit else None,
-                'fenologia': last_visit.fenologia_real if last_visit else None,
+                'date': last_visit.date.isoformat() if last_visit.date else None,
+                'culture': last_visit.culture,
+                'variety': last_visit.variety,
+                'fenologia': last_visit.fenologia_real,
                 'days_ago': days_since_visit,
             } if last_visit else None,
         })
 
+    if zoom is not None:
+        return jsonify({'zoom': zoom, 'clusters': [], 'properties': result}), 200
+
     return jsonify(result), 200
 
 
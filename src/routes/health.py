@@ -5,6 +5,7 @@ Endpoints de saúde e debug.
 - /status
 - /hello
 - /db-test
+- /db/pool
 - /debug/*
 """
 
@@ -54,6 +55,14 @@ def db_test():
         return jsonify(status='error', error=str(e)), 500
 
 
+@health_bp.route("/db/pool", methods=["GET"])
+def db_pool():
+    """Pool de conexões deste worker: ocupação, overflow e espera no checkout."""
+    from utils.db_pool import get_pool_metrics
+
+    return jsonify(get_pool_metrics(db.engine)), 200
+
+
 @health_bp.route("/debug/build-stamp", methods=["GET"])
 def debug_build_stamp():
     return jsonify({
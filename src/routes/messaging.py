@@ -769,17 +769,11 @@ def _handle_telegram_callback(h, callback_query):
 
 def _answer_callback_query(callback_id: str):
     """Responde ao callback para remover o indicador de carregamento."""
-    import os
-    import requests
-    token = os.getenv("TELEGRAM_BOT_TOKEN")
-    if not token or not callback_id:
+    from services.telegram_client import get_telegram_client
+    if not callback_id:
         return
     try:
-        requests.post(
-            f"https://api.telegram.org/bot{token}/answerCallbackQuery",
-            json={"callback_query_id": callback_id},
-            timeout=5
-        )
+        get_telegram_client().answer_callback_query(callback_id)
     except Exception:
         pass
 
@@ -80,10 +80,10 @@ def _get_helpers():
         find_stale_clients_ranking,
         build_stale_clients_ranking_text,
         build_month_visits_text,
+        find_consultant_visits_for_month,
         build_weekly_report_text,
         build_visit_pdf_file,
-        convert_audio_bytes_to_wav,
-        transcribe_audio_bytes,
+        transcribe_audio,
         AGENT_SERVICE,
     )
     return {
@@ -119,10 +119,10 @@ def _get_helpers():
         'find_stale_clients_ranking': find_stale_clients_ranking,
         'build_stale_clients_ranking_text': build_stale_clients_ranking_text,
         'build_month_visits_text': build_month_visits_text,
+        'find_consultant_visits_for_month': find_consultant_visits_for_month,
         'build_weekly_report_text': build_weekly_report_text,
         'build_visit_pdf_file': build_visit_pdf_file,
-        'convert_audio_bytes_to_wav': convert_audio_bytes_to_wav,
-        'transcribe_audio_bytes': transcribe_audio_bytes,
+        'transcribe_audio': transcribe_audio,
         'AGENT_SERVICE': AGENT_SERVICE,
     }
 
@@ -312,11 +312,7 @@ def mobile_transcribe():
     except Exception as e:
         return jsonify({"ok": False, "error": f"Base64 invalido: {e}"}), 400
 
-    wav_bytes, err = h['convert_audio_bytes_to_wav'](audio_bytes, input_suffix=f".{audio_format}")
-    if err or not wav_bytes:
-        return jsonify({"ok": False, "error": f"Conversao de audio falhou: {err}"}), 500
-
-    text, err = h['transcribe_audio_bytes'](wav_bytes, filename="audio.wav")
+    text, err = h['transcribe_audio'](audio_bytes, suffix=f".{audio_format}")
     if err or not text:
         return jsonify({"ok": False, "error": f"Transcricao falhou: {err}"}), 500
 
@@ -1277,15 +1273,8 @@ def _mob_month_visits_text(consultant, resolved_consultant_id) -> str:
     h = _get_helpers()
     if not consultant:
         return "Voce precisa estar vinculado a um consultor para ver as visitas do mes."
-    from datetime import date as _d
-    today = _d.today()
-    visits = Visit.query.filter(
-        db.extract("month", Visit.date) == today.month,
-        db.extract("year", Visit.date) == today.year,
-        Visit.consultant_id == resolved_consultant_id,
-    ).order_by(Visit.date).all() if resolved_consultant_id else []
-    visit_dicts = [v.to_dict() for v in visits]
-    return h['build_month_visits_text'](consultant.name, visit_dicts)
+    visits = h['find_consultant_visits_for_month'](resolved_consultant_id) if resolved_consultant_id else []
+    return h['build_month_visits_text'](consultant.name, visits)
 
 
 def _mob_weekly_report_text(consultant) -> str:
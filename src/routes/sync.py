@@ -0,0 +1,97 @@
+# routes/sync.py
+"""
+Sincronização incremental do catálogo para o app mobile.
+- /sync?since=<versão> (GET)
+- /sync/snapshot (GET)
+"""
+
+import gzip
+import json
+import threading
+
+from flask import Blueprint, Response, jsonify, request
+
+from services.sync_service import build_delta, build_snapshot, get_current_version
+
+sync_bp = Blueprint('sync', __name__)
+
+GZIP_MIN_BYTES = 1024
+
+# Snapshot já serializado + comprimido, por versão (um por worker)
+_snapshot_cache = {"version": None, "raw": None, "gzip": None}
+_snapshot_lock = threading.Lock()
+
+
+def _accepts_gzip() -> bool:
+    return "gzip" in (request.headers.get("Accept-Encoding") or "").lower()
+
+
+def _json_response(body: bytes, gzipped: bytes | None = None, etag: str | None = None) -> Response:
+    if _accepts_gzip() and len(body) >= GZIP_MIN_BYTES:
+        response = Response(gzipped or gzip.compress(body, 6), mimetype="application/json")
+        response.headers["Content-Encoding"] = "gzip"
+    else:
+        response = Response(body, mimetype="application/json")
+
+    response.headers["Vary"] = "Accept-Encoding"
+    if etag:
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def _dumps(payload: dict) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _get_snapshot_bytes():
+    version = get_current_version()
+    with _snapshot_lock:
+        if _snapshot_cache["version"] == version:
+            return version, _snapshot_cache["raw"], _snapshot_cache["gzip"]
+
+    raw = _dumps(build_snapshot())
+    compressed = gzip.compress(raw, 6)
+
+    with _snapshot_lock:
+        _snapshot_cache.update({"version": version, "raw": raw, "gzip": compressed})
+    return version, raw, compressed
+
+
+@sync_bp.route('/sync/snapshot', methods=['GET'])
+def sync_snapshot():
+    """
+    Catálogo completo para a primeira instalação.
+    ETag = versão do log: If-None-Match igual devolve 304.
+    """
+    etag = f"sync-{get_current_version()}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+
+    version, raw, compressed = _get_snapshot_bytes()
+    return _json_response(raw, compressed, etag=f"sync-{version}")
+
+
+@sync_bp.route('/sync', methods=['GET'])
+def sync_delta():
+    """
+    Alterações desde ?since=<versão>. Sem since (ou versão maior que a do
+    servidor, ex.: banco restaurado) devolve o snapshot completo.
+    Com has_more=true o app deve chamar de novo com a versão recebida;
+    com retry_after (também no header Retry-After), só depois desse tempo.
+    """
+    since = request.args.get('since', type=int)
+    if since is not None and since < 0:
+        return jsonify({"ok": False, "error": "since inválido"}), 400
+
+    if not since or since > get_current_version():
+        _, raw, compressed = _get_snapshot_bytes()
+        return _json_response(raw, compressed)
+
+    delta = build_delta(since)
+    response = _json_response(_dumps(delta))
+    if delta["retry_after"]:
+        response.headers["Retry-After"] = str(delta["retry_after"])
+    return response
@@ -8,7 +8,9 @@ CRUD de visitas e relacionados.
 - /visits/<id>/products (POST)
 - /visits/<id>/link-planting (PATCH)
 - /visits/bulk (POST)
+- /visits/calendar (GET)
 - /phenology/schedule (GET)
+- /phenology/projections (GET)
 - /photos/<id> (PUT, DELETE)
 - /products/<id> (PUT, DELETE)
 - /view/visit/<id> (GET)
@@ -21,7 +23,7 @@ import os
 import uuid
 from datetime import datetime, timedelta, date as _date
 
-from flask import Blueprint, jsonify, request, send_file, render_template_string, make_response
+from flask import Blueprint, jsonify, request, send_file, make_response, abort
 from flask_cors import cross_origin
 from sqlalchemy.orm import joinedload
 from werkzeug.utils import secure_filename
@@ -36,7 +38,6 @@ from models import (
     Planting,
     Consultant,
     VisitProduct,
-    PhenologyStage,
 )
 from utils.r2_client import get_r2_client
 from utils.auth_helper import apply_consultant_filter, get_consultant_id_filter
@@ -81,6 +82,11 @@ UPLOAD_DIR = os.environ.get("UPLOAD_DIR", os.path.join(os.path.dirname(__file__)
 # VISITS CRUD
 # ============================================================
 
+def _month_end(day):
+    next_month = (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+    return next_month - timedelta(days=1)
+
+
 def _get_group_key(v):
     """Gera chave de agrupamento para uma visita."""
     if v.planting_id:
@@ -140,8 +146,7 @@ def get_visits():
             q = (
                 Visit.query
                 .options(joinedload(Visit.photos), joinedload(Visit.products))
-                .filter(db.extract('month', Visit.date) == today.month)
-                .filter(db.extract('year', Visit.date) == today.year)
+                .filter(Visit.date.between(today.replace(day=1), _month_end(today)))
                 .order_by(Visit.date.asc())
             )
             # Aplica filtro por consultor se autenticado
@@ -363,7 +368,9 @@ def create_visit():
         )
         db.session.add(v0)
 
-        stages = PhenologyStage.query.filter_by(culture=culture).order_by(PhenologyStage.days.asc()).all()
+        from services.phenology_service import get_culture_stages
+
+        stages = get_culture_stages(culture)
         if culture.lower() == "soja":
             stages = [s for s in stages if "maturacao fisiologica" not in s.name.lower()]
 
@@ -719,56 +726,199 @@ def delete_visit(visit_id):
         return jsonify({'error': f'Erro interno ao excluir visita: {str(e)}'}), 500
 
 
+BULK_VISITS_MAX_ITEMS = 1000
+
+
+def _parse_bulk_id(value):
+    if value in (None, ""):
+        return None
+    return int(value)
+
+
+def _load_names(model, ids):
+    """{id: name} de uma tabela numa única query IN."""
+    if not ids:
+        return {}
+    rows = db.session.query(model.id, model.name).filter(model.id.in_(ids)).all()
+    return {row_id: name for row_id, name in rows}
+
+
 @visits_bp.route('/visits/bulk', methods=['POST'])
 def create_visits_bulk():
+    """
+    Cria várias visitas (planejamento de safra) de uma vez.
+    Valida todos os ids com uma query IN por tabela e grava com um único
+    INSERT em lote (RETURNING id).
+
+    Resposta: lista das visitas criadas (formato de sempre); itens
+    inválidos são ignorados e contados no header X-Bulk-Rejected.
+    Com ?details=1 devolve {"ok", "created", "rejected", "visits",
+    "results"}, com o motivo da rejeição por item.
+
+    O INSERT é de tabela (Core): hooks after_flush do ORM não rodam.
+    """
     data = request.get_json(silent=True) or {}
-    items = data.get('items', [])
-    created = []
+    items = data.get('items') or []
 
-    for it in items:
-        client_id = it.get('client_id')
-        property_id = it.get('property_id')
-        plot_id = it.get('plot_id')
-        consultant_id = it.get('consultant_id')
-        status = (it.get('status') or 'planned').strip().lower()
+    if not isinstance(items, list):
+        return jsonify({"ok": False, "error": "items deve ser uma lista"}), 400
+    if len(items) > BULK_VISITS_MAX_ITEMS:
+        return jsonify({"ok": False, "error": f"máximo de {BULK_VISITS_MAX_ITEMS} itens por envio"}), 400
 
-        if not (client_id and property_id and plot_id and it.get('date')):
-            continue
-        if not Client.query.get(client_id):
-            continue
-        if not Property.query.get(property_id):
+    # 1) parse + validação local
+    parsed = []
+    results = []
+    for index, it in enumerate(items):
+        it = it if isinstance(it, dict) else {}
+        result = {"index": index, "ok": False}
+        results.append(result)
+
+        try:
+            client_id = _parse_bulk_id(it.get('client_id'))
+            property_id = _parse_bulk_id(it.get('property_id'))
+            plot_id = _parse_bulk_id(it.get('plot_id'))
+            consultant_id = _parse_bulk_id(it.get('consultant_id'))
+        except (TypeError, ValueError):
+            result["error"] = "id inválido"
             continue
-        if not Plot.query.get(plot_id):
+
+        if not (client_id and property_id and plot_id and it.get('date')):
+            result["error"] = "client_id, property_id, plot_id e date são obrigatórios"
             continue
-        if consultant_id:
-            try:
-                consultant_id = int(consultant_id)
-            except (TypeError, ValueError):
-                continue
-            if not Consultant.query.get(consultant_id):
-                continue
 
         try:
-            visit_date = _date.fromisoformat(it['date'])
-        except Exception:
+            visit_date = _date.fromisoformat(str(it['date']))
+        except ValueError:
+            result["error"] = "data inválida"
             continue
 
-        v = Visit(
-            client_id=client_id,
-            property_id=property_id,
-            plot_id=plot_id,
-            consultant_id=consultant_id,
-            date=visit_date,
-            checklist=None,
-            diagnosis=None,
-            recommendation=it.get('recommendation'),
-            status=status
-        )
-        db.session.add(v)
-        created.append(v)
+        parsed.append((result, {
+            "client_id": client_id,
+            "property_id": property_id,
+            "plot_id": plot_id,
+            "consultant_id": consultant_id,
+            "date": visit_date,
+            "recommendation": it.get('recommendation'),
+            "status": (it.get('status') or 'planned').strip().lower(),
+        }))
+
+    # 2) ids referenciados: uma query por tabela
+    clients = _load_names(Client, {m["client_id"] for _, m in parsed})
+    properties = _load_names(Property, {m["property_id"] for _, m in parsed})
+    plots = _load_names(Plot, {m["plot_id"] for _, m in parsed})
+    consultants = _load_names(Consultant, {m["consultant_id"] for _, m in parsed if m["consultant_id"]})
+
+    valid = []
+    for result, mapping in parsed:
+        if mapping["client_id"] not in clients:
+            result["error"] = "cliente não encontrado"
+        elif mapping["property_id"] not in properties:
+            result["error"] = "propriedade não encontrada"
+        elif mapping["plot_id"] not in plots:
+            result["error"] = "talhão não encontrado"
+        elif mapping["consultant_id"] and mapping["consultant_id"] not in consultants:
+            result["error"] = "consultor não encontrado"
+        else:
+            valid.append((result, mapping))
 
-    db.session.commit()
-    return jsonify([v.to_dict() | {"status": v.status} for v in created]), 201
+    # 3) INSERT em lote. As linhas do RETURNING voltam casadas com os itens
+    # pelos próprios valores gravados (itens idênticos são intercambiáveis),
+    # o que evita o modo "uma linha por vez" de sort_by_parameter_order.
+    created = []
+    if valid:
+        columns = ("client_id", "property_id", "plot_id", "consultant_id", "date", "recommendation", "status")
+        try:
+            # insert() da tabela (Core): o insert ORM omite chaves None e
+            # quebraria o lote em um INSERT por combinação de campos
+            table = Visit.__table__
+            rows = db.session.execute(
+                table.insert().returning(
+                    table.c.id, table.c.created_at, table.c.source,
+                    *[table.c[col] for col in columns],
+                ),
+                [mapping for _, mapping in valid],
+            ).all()
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Erro ao criar visitas em lote: {e}")
+            return jsonify({"ok": False, "error": f"Erro ao gravar visitas: {str(e)}"}), 500
+
+        # O INSERT de tabela não passa pelo after_flush do ORM: invalida à mão
+        from services.visit_calendar_service import invalidate_calendar
+        for consultant_id in {mapping["consultant_id"] for _, mapping in valid}:
+            if consultant_id:
+                invalidate_calendar(consultant_id)
+
+        inserted = {}
+        for row in rows:
+            inserted.setdefault(tuple(row[3:]), []).append(row[:3])
+
+        for result, mapping in valid:
+            visit_id, created_at, source = inserted[tuple(mapping[col] for col in columns)].pop(0)
+            result["ok"] = True
+            result["id"] = visit_id
+            created.append(_build_bulk_visit_dict(
+                visit_id, mapping, created_at, source, clients, properties, plots, consultants
+            ))
+
+    rejected = len(results) - len(created)
+    if request.args.get('details') == '1':
+        return jsonify({
+            "ok": True,
+            "created": len(created),
+            "rejected": rejected,
+            "visits": created,
+            "results": results,
+        }), 201
+
+    response = jsonify(created)
+    response.headers['X-Bulk-Rejected'] = str(rejected)
+    return response, 201
+
+
+def _build_bulk_visit_dict(visit_id, mapping, created_at, source, clients, properties, plots, consultants):
+    """Mesmo formato de Visit.to_dict, montado com os nomes já carregados."""
+    consultant_id = mapping["consultant_id"]
+    consultant_name = None
+    if consultant_id:
+        consultant_name = consultants.get(consultant_id) or f"Consultor {consultant_id}"
+
+    client_name = clients.get(mapping["client_id"])
+    recommendation = (mapping["recommendation"] or "").strip()
+
+    display_text = "<br>".join(filter(None, [
+        f"👤 {client_name}" if client_name else "",
+        f"📍 {mapping['recommendation']}" if mapping["recommendation"] else "",
+        f"👨‍🌾 {consultant_name}" if consultant_name else "",
+    ]))
+
+    return {
+        'id': visit_id,
+        'client_id': mapping["client_id"],
+        'client_name': client_name,
+        'property_id': mapping["property_id"],
+        'property_name': properties.get(mapping["property_id"]),
+        'plot_id': mapping["plot_id"],
+        'plot_name': plots.get(mapping["plot_id"]),
+        'planting_id': None,
+        'consultant_id': consultant_id,
+        'consultant_name': consultant_name,
+        'date': mapping["date"].isoformat(),
+        'checklist': None,
+        'diagnosis': None,
+        'recommendation': recommendation,
+        'status': mapping["status"],
+        'culture': None,
+        'variety': None,
+        'fenologia_real': None,
+        'visit_purpose': None,
+        'latitude': None,
+        'longitude': None,
+        'created_at': created_at.isoformat() if created_at else None,
+        'source': source,
+        'display_text': display_text,
+    }
 
 
 @visits_bp.route('/visits/<int:visit_id>/pdf', methods=['GET', 'OPTIONS'])
@@ -988,8 +1138,8 @@ def delete_visit_product(product_id):
 
 @visits_bp.route('/phenology/schedule', methods=['GET'])
 def get_phenology_schedule():
-    """Retorna o cronograma fenologico real do banco de dados."""
-    from sqlalchemy import text
+    """Retorna o cronograma fenologico da cultura (modelo em memória)."""
+    from services.phenology_service import project_schedule
 
     culture = request.args.get("culture")
     planting_date = request.args.get("planting_date")
@@ -1002,26 +1152,143 @@ def get_phenology_schedule():
     except ValueError:
         return jsonify({"error": "invalid planting_date format"}), 400
 
-    stages = db.session.execute(
-        text("SELECT code, name, days FROM phenology_stage WHERE culture = :culture ORDER BY days"),
-        {"culture": culture}
-    ).fetchall()
-
-    if not stages:
-        print(f"Nenhum estagio encontrado para {culture}.")
-        return jsonify([]), 200
-
-    events = []
-    for s in stages:
-        date = planting_dt + timedelta(days=s.days)
-        events.append({
-            "stage": s.name,
-            "code": s.code,
-            "suggested_date": date.isoformat(),
+    return jsonify(project_schedule(culture, planting_dt)), 200
+
+
+PROJECTIONS_MAX_PLANTINGS = 2000
+
+
+@visits_bp.route('/phenology/projections', methods=['GET'])
+def get_phenology_projections():
+    """
+    Projeção fenológica de vários plantios numa chamada: estágio esperado
+    hoje, próximo estágio e datas de todos os estágios.
+    Filtros: ?planting_ids=1,2,3 | ?client_id= | ?consultant_id=
+    (plantios com visitas do consultor). ?stages=0 omite a lista completa.
+    """
+    from services.phenology_service import project_planting
+
+    raw_ids = (request.args.get("planting_ids") or "").strip()
+    client_id = request.args.get("client_id", type=int)
+    consultant_id = request.args.get("consultant_id", type=int)
+    include_stages = request.args.get("stages", "1") != "0"
+
+    try:
+        planting_ids = [int(x) for x in raw_ids.split(",") if x.strip()]
+    except ValueError:
+        return jsonify({"error": "planting_ids inválido"}), 400
+
+    # Usuário não-admin só enxerga plantios das próprias visitas
+    filter_id = get_consultant_id_filter()
+    if filter_id is not None:
+        consultant_id = filter_id
+
+    if not (planting_ids or client_id or consultant_id):
+        return jsonify({"error": "informe planting_ids, client_id ou consultant_id"}), 400
+
+    q = db.session.query(
+        Planting.id,
+        Planting.plot_id,
+        Planting.culture,
+        Planting.variety,
+        Planting.planting_date,
+    ).filter(
+        Planting.planting_date.isnot(None),
+        Planting.culture.isnot(None),
+    )
+
+    if planting_ids:
+        q = q.filter(Planting.id.in_(planting_ids))
+    if client_id:
+        q = q.join(Plot, Plot.id == Planting.plot_id).join(
+            Property, Property.id == Plot.property_id
+        ).filter(Property.client_id == client_id)
+    if consultant_id:
+        consultant_plantings = db.session.query(Visit.planting_id).filter(
+            Visit.consultant_id == consultant_id,
+            Visit.planting_id.isnot(None),
+        ).distinct()
+        q = q.filter(Planting.id.in_(consultant_plantings))
+
+    rows = q.order_by(Planting.planting_date.desc(), Planting.id.desc()).limit(PROJECTIONS_MAX_PLANTINGS).all()
+
+    today = _date.today()
+    items = []
+    for planting_id, plot_id, culture, variety, planting_date in rows:
+        projection = project_planting(culture, planting_date, today)
+        if not include_stages:
+            projection.pop("stages")
+        items.append({
+            "planting_id": planting_id,
+            "plot_id": plot_id,
+            "culture": culture,
+            "variety": variety,
+            "planting_date": planting_date.isoformat(),
+            **projection,
         })
 
-    print(f"{len(events)} estagios retornados para {culture}.")
-    return jsonify(events), 200
+    return jsonify({"date": today.isoformat(), "count": len(items), "plantings": items}), 200
+
+
+# ============================================================
+# CALENDAR
+# ============================================================
+
+@visits_bp.route('/visits/calendar', methods=['GET'])
+def get_visit_calendar_window():
+    """
+    Agenda do consultor agregada por dia (services/visit_calendar_service).
+    Janela: ?view=day|week|month&date=YYYY-MM-DD (padrão: mês de hoje)
+    ou ?start=YYYY-MM-DD&end=YYYY-MM-DD (até 62 dias).
+    Admin informa ?consultant_id=. If-None-Match com o ETag da janela
+    devolve 304.
+    """
+    from services.visit_calendar_service import (
+        CALENDAR_VIEWS,
+        get_cached_calendar,
+        get_visit_calendar,
+        window_for,
+    )
+
+    consultant_id = request.args.get("consultant_id", type=int)
+    filter_id = get_consultant_id_filter()
+    if filter_id == -1:
+        return jsonify({"error": "usuário sem consultor vinculado"}), 403
+    if filter_id is not None:
+        consultant_id = filter_id
+    if not consultant_id:
+        return jsonify({"error": "informe consultant_id"}), 400
+
+    try:
+        if request.args.get("start") or request.args.get("end"):
+            start = _date.fromisoformat(request.args.get("start", ""))
+            end = _date.fromisoformat(request.args.get("end", ""))
+        else:
+            view = request.args.get("view", "month")
+            if view not in CALENDAR_VIEWS:
+                return jsonify({"error": f"view deve ser um de {', '.join(CALENDAR_VIEWS)}"}), 400
+            reference = request.args.get("date")
+            start, end = window_for(view, _date.fromisoformat(reference) if reference else None)
+    except ValueError:
+        return jsonify({"error": "data inválida (use YYYY-MM-DD)"}), 400
+
+    # Janela sem mudança: 304 sem tocar no banco
+    cached = get_cached_calendar(consultant_id, start, end)
+    if cached and request.if_none_match.contains(cached.etag):
+        response = make_response("", 304)
+    else:
+        try:
+            cached = cached or get_visit_calendar(consultant_id, start, end)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if request.if_none_match.contains(cached.etag):
+            response = make_response("", 304)
+        else:
+            response = jsonify(cached.payload)
+
+    response.set_etag(cached.etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
 
 
 # ============================================================
@@ -1031,141 +1298,31 @@ def get_phenology_schedule():
 @visits_bp.route("/view/visit/<int:visit_id>", methods=["GET"])
 def public_visit_view(visit_id):
     """Pagina publica de visualizacao de visita (NutriCRM Viewer)."""
-    visit = Visit.query.get_or_404(visit_id)
-    client = Client.query.get(visit.client_id)
-    prop = Property.query.get(visit.property_id)
-    plot = Plot.query.get(visit.plot_id)
-    consultant = Consultant.query.get(visit.consultant_id) if hasattr(visit, "consultant_id") else None
-
-    lat = getattr(plot, "latitude", None)
-    lon = getattr(plot, "longitude", None)
-
-    photos = []
-    for p in (visit.photos or []):
-        photos.append({
-            "id": p.id,
-            "url": resolve_photo_url(p.url),
-            "caption": p.caption or ""
-        })
+    from services.visit_view_service import (
+        VISIT_VIEW_MAX_AGE_SECONDS,
+        get_cached_visit_page,
+        render_visit_page,
+    )
 
-    html_template = """
-    <!DOCTYPE html>
-    <html lang="pt-BR">
-    <head>
-        <meta charset="UTF-8" />
-        <meta name="viewport" content="width=device-width, initial-scale=1.0" />
-        <title>Visita #{{ visit.id }} - NutriCRM</title>
-        <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/css/bootstrap.min.css" rel="stylesheet" />
-        <link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css" />
-        <script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
-        <style>
-            body { background-color:#f9fafb; font-family:'Inter', sans-serif; padding-bottom:60px; }
-            header { background:#1B5E20; color:white; padding:16px; display:flex; justify-content:space-between; align-items:center; flex-wrap:wrap; }
-            header img { height:46px; object-fit:contain; }
-            .info-card { background:white; border-radius:10px; box-shadow:0 2px 10px rgba(0,0,0,0.05); padding:20px; margin-top:20px; }
-            .photos img { width:100%; border-radius:8px; cursor:pointer; transition:transform 0.2s; }
-            .photos img:hover { transform:scale(1.02); }
-            #map { height:300px; border-radius:10px; margin-top:15px; }
-            footer { margin-top:40px; text-align:center; color:#888; }
-            .download-btn { background:#2E7D32; color:white; padding:10px 18px; border-radius:6px; text-decoration:none; transition:opacity .2s; }
-            .download-btn:hover { opacity:.85; }
-            .lightbox { display:none; position:fixed; z-index:9999; top:0; left:0; width:100%; height:100%; background:rgba(0,0,0,0.9); justify-content:center; align-items:center; }
-            .lightbox img { max-width:90%; max-height:90%; }
-        </style>
-    </head>
-    <body>
-        <header>
-            <img src="/static/nutricrm_logo.png" alt="NutriCRM Logo" />
-            <h4>Relatorio Tecnico - Visita #{{ visit.id }}</h4>
-            <a class="download-btn" href="/api/visits/{{ visit.id }}/pdf" target="_blank">Baixar PDF</a>
-        </header>
-
-        <main class="container">
-            <div class="info-card">
-                <h4>Informacoes Gerais</h4>
-                <table class="table table-borderless mt-3">
-                    <tr><th>Cliente:</th><td>{{ client.name if client else '-' }}</td></tr>
-                    <tr><th>Fazenda:</th><td>{{ prop.name if prop else '-' }}</td></tr>
-                    <tr><th>Talhao:</th><td>{{ plot.name if plot else '-' }}</td></tr>
-                    <tr><th>Consultor:</th><td>{{ consultant.name if consultant else '-' }}</td></tr>
-                    <tr><th>Data:</th><td>{{ visit.date.strftime('%d/%m/%Y') if visit.date else '-' }}</td></tr>
-                    <tr><th>Status:</th><td>{{ visit.status }}</td></tr>
-                </table>
-                {% if lat and lon %}
-                <div id="map"></div>
-                {% endif %}
-            </div>
-
-            {% if visit.diagnosis %}
-            <div class="info-card">
-                <h4>Diagnostico</h4>
-                <p>{{ visit.diagnosis }}</p>
-            </div>
-            {% endif %}
-
-            {% if visit.recommendation %}
-            <div class="info-card">
-                <h4>Recomendacoes Tecnicas</h4>
-                <p>{{ visit.recommendation }}</p>
-            </div>
-            {% endif %}
-
-            {% if photos %}
-            <div class="info-card photos">
-                <h4>Fotos da Visita</h4>
-                <div class="row mt-3">
-                    {% for p in photos %}
-                    <div class="col-md-6 mb-3">
-                        <img src="{{ p.url }}" onclick="openLightbox('{{ p.url }}')" />
-                    </div>
-                    {% endfor %}
-                </div>
-            </div>
-            {% endif %}
-        </main>
-
-        <div id="lightbox" class="lightbox" onclick="closeLightbox()">
-            <img id="lightbox-img" src="">
-        </div>
-
-        <footer>
-            <small>NutriCRM - Relatorio tecnico automatizado</small>
-        </footer>
-
-        <script>
-            function openLightbox(src) {
-                document.getElementById('lightbox-img').src = src;
-                document.getElementById('lightbox').style.display = 'flex';
-            }
-            function closeLightbox() {
-                document.getElementById('lightbox').style.display = 'none';
-            }
-
-            {% if lat and lon %}
-            const map = L.map('map').setView([{{ lat }}, {{ lon }}], 15);
-            L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
-                attribution: 'OpenStreetMap contributors'
-            }).addTo(map);
-            L.marker([{{ lat }}, {{ lon }}]).addTo(map)
-                .bindPopup("{{ plot.name if plot else 'Talhao' }}")
-                .openPopup();
-            {% endif %}
-        </script>
-    </body>
-    </html>
-    """
+    # Revalidação do navegador/WhatsApp: responde 304 sem tocar no banco
+    cached = get_cached_visit_page(visit_id)
+    if cached and request.if_none_match.contains(cached.etag):
+        response = make_response("", 304)
+    else:
+        page = cached or render_visit_page(visit_id, resolve_photo_url)
+        if page is None:
+            abort(404)
+        cached = page
+        # Re-renderizada após o TTL costuma manter o mesmo ETag
+        if request.if_none_match.contains(page.etag):
+            response = make_response("", 304)
+        else:
+            response = make_response(page.html, 200)
+            response.headers["Content-Type"] = "text/html; charset=utf-8"
 
-    return render_template_string(
-        html_template,
-        visit=visit,
-        client=client,
-        prop=prop,
-        plot=plot,
-        consultant=consultant,
-        photos=photos,
-        lat=lat,
-        lon=lon
-    )
+    response.set_etag(cached.etag)
+    response.headers["Cache-Control"] = f"public, max-age={VISIT_VIEW_MAX_AGE_SECONDS}, must-revalidate"
+    return response
 
 
 # ============================================================
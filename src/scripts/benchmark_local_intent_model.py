@@ -0,0 +1,154 @@
+"""
+Benchmark do modelo local contra o caminho atual (regras + OpenAI).
+
+Usa o hold-out do treino (mesmo split por hash do texto) e compara, por
+cabeça:
+- regras: heurísticas de hoje (IntentClassifier.classify_fast sem o
+  modelo, parse_visit_purpose, is_valid_fenologia); o que elas não
+  decidem vai para embeddings/OpenAI
+- regras + modelo: idem, com o modelo local antes da rede
+
+Mede acurácia do que foi decidido localmente, fração que ainda iria
+para a rede e latência local por mensagem. A latência da rede vem do
+agent_decision_log (pipeline.stages_ms.classify_slow, com --from-db) ou
+de --llm-ms.
+
+Uso:
+    cd src
+    python scripts/benchmark_local_intent_model.py [--from-db] [--llm-ms 700]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+# Adiciona src ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# O modelo vem desligado no app; o benchmark mede justamente ele
+os.environ["LOCAL_INTENT_MODEL_ENABLED"] = "1"
+
+from api_routes import is_valid_fenologia, parse_visit_purpose
+from services.agent import intent_classifier
+from services.agent.intent_classifier import IntentClassifier
+from services.agent.local_intent_model import (
+    predict_fenologia,
+    predict_intent,
+    predict_visit_purpose,
+    split_holdout,
+)
+from train_local_intent_model import build_examples, load_app
+
+
+def _rule_fenologia(text):
+    upper = text.strip().upper()
+    return upper if is_valid_fenologia(upper) else None
+
+
+def _timed(fn, examples, repeat=20):
+    """(predições, latências em µs) — mediana de `repeat` execuções por exemplo."""
+    predictions, latencies = [], []
+    for text, _ in examples:
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = fn(text)
+            samples.append((time.perf_counter() - started) * 1e6)
+        predictions.append(result)
+        latencies.append(statistics.median(samples))
+    return predictions, latencies
+
+
+def _report(name, examples, predictions, latencies, llm_ms):
+    total = len(examples)
+    decided = [(p, y) for p, (_, y) in zip(predictions, examples) if p is not None]
+    correct = sum(1 for p, y in decided if p == y)
+    miss_rate = 1 - len(decided) / total if total else 0.0
+    latencies = sorted(latencies)
+    p50 = latencies[len(latencies) // 2] if latencies else 0.0
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+    expected_ms = statistics.mean(latencies) / 1000 + miss_rate * llm_ms if latencies else 0.0
+    print(
+        f"   {name:<16} decide={len(decided) / total:6.1%}  acc={correct / len(decided) if decided else 0:6.1%}  "
+        f"vai p/ rede={miss_rate:6.1%}  local p50={p50:7.1f}µs p95={p95:7.1f}µs  "
+        f"esperado≈{expected_ms:6.1f}ms/msg"
+    )
+
+
+def llm_latency_from_logs():
+    from models import AgentDecisionLog, db
+
+    app = load_app()
+    values = []
+    with app.app_context():
+        rows = db.session.query(AgentDecisionLog.extra_json).filter(
+            AgentDecisionLog.extra_json.isnot(None)
+        ).order_by(AgentDecisionLog.id.desc()).limit(5000)
+        for (extra_json,) in rows:
+            try:
+                stage = json.loads(extra_json)["pipeline"]["stages_ms"].get("classify_slow")
+            except Exception:
+                continue
+            if stage:
+                values.append(stage)
+    return statistics.median(values) if values else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--from-db", action="store_true", help="inclui o agent_decision_log no hold-out")
+    parser.add_argument("--llm-ms", type=float, default=700.0, help="latência estimada do caminho com OpenAI")
+    args = parser.parse_args()
+
+    heads = build_examples(seeds_only=not args.from_db)
+    holdout = {name: [(t, y) for t, y in examples if split_holdout(t)] for name, examples in heads.items()}
+
+    llm_ms = args.llm_ms
+    if args.from_db:
+        llm_ms = llm_latency_from_logs() or llm_ms
+    print(f"Latência do caminho com rede: {llm_ms:.0f}ms/msg ({'decision log' if llm_ms != args.llm_ms else '--llm-ms'})")
+
+    classifier = IntentClassifier()
+
+    def rules_only(text):
+        original = intent_classifier.predict_intent
+        intent_classifier.predict_intent = lambda _text: None
+        try:
+            result = classifier.classify_fast(text)
+        finally:
+            intent_classifier.predict_intent = original
+        return result["intent"] if result else None
+
+    def rules_and_model(text):
+        result = classifier.classify_fast(text)
+        return result["intent"] if result else None
+
+    def model_only(text):
+        result = predict_intent(text)
+        return result["intent"] if result else None
+
+    benchmarks = {
+        "intent": [("regras", rules_only), ("regras + modelo", rules_and_model), ("só modelo", model_only)],
+        "fenologia": [
+            ("regras", _rule_fenologia),
+            ("regras + modelo", lambda t: _rule_fenologia(t) or predict_fenologia(t)),
+        ],
+        "visit_purpose": [
+            ("regras", parse_visit_purpose),
+            ("regras + modelo", lambda t: parse_visit_purpose(t) or predict_visit_purpose(t)),
+        ],
+    }
+
+    for head, variants in benchmarks.items():
+        examples = holdout.get(head) or []
+        print(f"\n{head}: {len(examples)} exemplos de hold-out")
+        for name, fn in variants:
+            predictions, latencies = _timed(fn, examples)
+            _report(name, examples, predictions, latencies, llm_ms)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Script para regenerar o arquivo de dados da base de pragas e doenças.
+
+Recalcula os campos de busca pré-normalizados ("search") de cada doença,
+incrementa a versão e grava o arquivo no formato compacto (uma doença por
+linha), pronto para ser recarregado via POST /api/admin/diseases/reload.
+
+Uso:
+    cd src
+    python scripts/build_diseases_data.py [caminho/para/diseases.json]
+
+Sem argumento, usa DISEASES_DATA_PATH ou services/data/diseases.json.
+"""
+
+import os
+import sys
+from datetime import datetime
+
+# Adiciona src ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.diseases_database import (
+    get_diseases_data_path,
+    read_diseases_file,
+    write_diseases_file,
+)
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else get_diseases_data_path()
+
+    data = read_diseases_file(path)
+    version = int(data.get("version") or 0) + 1
+
+    write_diseases_file(path, data.get("diseases") or [], version=version)
+
+    print(f"✅ {len(data.get('diseases') or [])} doenças gravadas em {path}")
+    print(f"   versão: {version} ({datetime.now().isoformat(timespec='seconds')})")
+
+
+if __name__ == "__main__":
+    main()
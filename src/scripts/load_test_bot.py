@@ -0,0 +1,280 @@
+"""
+Teste de carga do webhook do Telegram por modelo de worker do gunicorn.
+
+Sobe um servidor falso no lugar do api.telegram.org e da OpenAI, que
+responde depois de --upstream-ms (o tráfego do bot é quase todo espera
+de rede), inicia o gunicorn com gunicorn.conf.py em cada perfil e
+dispara --requests updates de texto com --concurrency conexões
+simultâneas. Mede vazão, latência e a memória (RSS) somada dos
+processos do gunicorn, para comparar os perfis no mesmo orçamento de
+512 MB.
+
+Perfis (PROFILES): sync (3 processos, o deploy antigo), gthread (2 x 8
+threads, o padrão) e gevent (2 x 50 greenlets, precisa do gevent).
+
+Uso:
+    cd src
+    python scripts/load_test_bot.py [--profiles sync,gthread] [--requests 200]
+        [--concurrency 16] [--upstream-ms 800] [--database-url postgresql://...]
+
+Sem --database-url usa um SQLite temporário.
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILES = {
+    "sync": {"WEB_CONCURRENCY": "3", "GUNICORN_WORKER_CLASS": "sync", "GUNICORN_THREADS": "1"},
+    "gthread": {"WEB_CONCURRENCY": "2", "GUNICORN_WORKER_CLASS": "gthread", "GUNICORN_THREADS": "8"},
+    "gevent": {"WEB_CONCURRENCY": "2", "GUNICORN_WORKER_CLASS": "gevent", "GUNICORN_WORKER_CONNECTIONS": "50"},
+}
+
+MESSAGES = (
+    "visitei o João hoje, soja em R5, sem pragas",
+    "quais visitas tenho essa semana?",
+    "adiciona que tinha lagarta",
+    "agenda de hoje",
+    "milho V8 na fazenda Boa Vista, recomendação de fungicida",
+)
+
+
+# ============================================================
+# Upstream falso (Telegram + OpenAI)
+# ============================================================
+
+def start_fake_upstream(latency_ms: int) -> ThreadingHTTPServer:
+    delay = latency_ms / 1000
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            self.rfile.read(length)
+            time.sleep(delay)
+
+            if self.path.startswith("/bot"):
+                body = {"ok": True, "result": {"message_id": 1}}
+            elif self.path.endswith("/chat/completions"):
+                body = {
+                    "id": "chatcmpl-load", "object": "chat.completion", "created": int(time.time()),
+                    "model": "gpt-4o-mini",
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": "{}"}}],
+                    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+                }
+            elif self.path.endswith("/responses"):
+                body = {
+                    "id": "resp-load", "object": "response", "created_at": int(time.time()),
+                    "model": "gpt-4o-mini", "status": "completed",
+                    "output": [{"type": "message", "id": "msg-load", "status": "completed", "role": "assistant",
+                                "content": [{"type": "output_text", "text": "{}", "annotations": []}]}],
+                }
+            elif self.path.endswith("/embeddings"):
+                body = {"object": "list", "model": "text-embedding-3-small",
+                        "data": [{"object": "embedding", "index": 0, "embedding": [0.0] * 8}],
+                        "usage": {"prompt_tokens": 1, "total_tokens": 1}}
+            else:
+                body = {"ok": False}
+
+            data = json.dumps(body).encode()
+            self.send_response(200 if body.get("ok", True) else 404)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ============================================================
+# Gunicorn
+# ============================================================
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _rss_mb(pid: int) -> float:
+    """RSS do processo e dos filhos (Linux /proc)."""
+    total_kb = 0
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            pids += [int(p) for p in f.read().split()]
+    except OSError:
+        pass
+    for p in pids:
+        try:
+            with open(f"/proc/{p}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+        except OSError:
+            continue
+    return total_kb / 1024
+
+
+def start_gunicorn(profile: dict, port: int, upstream_url: str, database_url: str, upload_dir: str):
+    env = dict(os.environ)
+    env.update(profile)
+    env.update({
+        "PORT": str(port),
+        "UPLOAD_DIR": upload_dir,
+        "TELEGRAM_BOT_TOKEN": "LOAD",
+        "TELEGRAM_API_BASE_URL": upstream_url,
+        # O teste mede o servidor, não o rate limit do Bot API
+        "TELEGRAM_GLOBAL_RATE": "10000",
+        "TELEGRAM_PER_CHAT_RATE": "10000",
+        "OPENAI_API_KEY": "load-test",
+        "OPENAI_BASE_URL": f"{upstream_url}/v1",
+        "GUNICORN_MAX_REQUESTS": "0",
+    })
+    if database_url:
+        env["DATABASE_URL"] = database_url
+    else:
+        env.pop("DATABASE_URL", None)
+
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:app"],
+        cwd=SRC_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"gunicorn saiu com código {proc.returncode}")
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/api/ping", timeout=1).ok:
+                return proc
+        except requests.RequestException:
+            pass
+        time.sleep(0.3)
+    proc.kill()
+    raise RuntimeError("gunicorn não respondeu em 60s")
+
+
+def stop_gunicorn(proc) -> None:
+    proc.send_signal(signal.SIGTERM)
+    try:
+        proc.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+# ============================================================
+# Carga
+# ============================================================
+
+def _update(n: int) -> dict:
+    chat_id = 900000 + n % 200
+    return {
+        "update_id": n,
+        "message": {
+            "message_id": n,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "Carga"},
+            "text": MESSAGES[n % len(MESSAGES)],
+        },
+    }
+
+
+def run_load(port: int, total: int, concurrency: int, rss_pid: int) -> dict:
+    url = f"http://127.0.0.1:{port}/api/telegram/webhook"
+    local = threading.local()
+    peak_rss = [_rss_mb(rss_pid)]
+    done = threading.Event()
+
+    def sample_rss():
+        while not done.wait(0.5):
+            peak_rss[0] = max(peak_rss[0], _rss_mb(rss_pid))
+
+    def send(n: int):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        started = time.perf_counter()
+        try:
+            # 4xx são respostas do bot (ex.: consultor não vinculado); erro é 5xx ou falha de conexão
+            ok = session.post(url, json=_update(n), timeout=300).status_code < 500
+        except requests.RequestException:
+            ok = False
+        return ok, (time.perf_counter() - started) * 1000
+
+    sampler = threading.Thread(target=sample_rss, daemon=True)
+    sampler.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(send, range(total)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    sampler.join()
+
+    latencies = sorted(ms for _, ms in results)
+    return {
+        "requests": total,
+        "errors": sum(1 for ok, _ in results if not ok),
+        "seconds": round(elapsed, 2),
+        "rps": round(total / elapsed, 2),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(latencies[max(0, int(len(latencies) * 0.95) - 1)], 1),
+        "max_ms": round(latencies[-1], 1),
+        "peak_rss_mb": round(peak_rss[0], 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", default="sync,gthread")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--upstream-ms", type=int, default=800)
+    parser.add_argument("--database-url", default="")
+    args = parser.parse_args()
+
+    upstream = start_fake_upstream(args.upstream_ms)
+    upstream_url = f"http://127.0.0.1:{upstream.server_address[1]}"
+
+    report = {}
+    for name in args.profiles.split(","):
+        profile = PROFILES[name.strip()]
+        port = _free_port()
+        with tempfile.TemporaryDirectory() as upload_dir:
+            proc = start_gunicorn(profile, port, upstream_url, args.database_url, upload_dir)
+            try:
+                run_load(port, min(args.requests, args.concurrency), args.concurrency, proc.pid)  # aquecimento
+                report[name] = run_load(port, args.requests, args.concurrency, proc.pid)
+            finally:
+                stop_gunicorn(proc)
+        print(f"{name:8s} {json.dumps(report[name])}")
+
+    upstream.shutdown()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Script para treinar o modelo local de intents / fenologia / objetivo.
+
+Lê as decisões do agent_decision_log (mensagens fora de fluxo guiado,
+confiança high/medium), junta com os exemplos semente abaixo (com
+variações de digitação geradas de forma determinística) e grava o
+artefato em services/data/local_intent_model.json. As métricas do
+hold-out (1/5 das mensagens, split por hash do texto) ficam em "meta".
+
+Uso:
+    cd src
+    python scripts/train_local_intent_model.py [--seeds-only] [--output caminho.json]
+
+Depois de gravar, os workers carregam o novo artefato no próximo restart.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+# Adiciona src ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.agent.embedding_classifier import INTENT_EXAMPLES
+from services.agent.local_intent_model import (
+    examples_from_decision_logs,
+    get_model_path,
+    save_model,
+    train_model,
+)
+
+
+# ================================================================
+# Exemplos semente
+# ================================================================
+
+EXTRA_INTENT_EXAMPLES = {
+    "LIST_WEEK": [
+        "minha agenda", "agenda semanal", "visitas da semana", "semana que vem o que tenho",
+        "quais sao minhas visitas da semana", "lista as visitas da semana",
+    ],
+    "DAILY_ROUTINE": [
+        "meu dia", "o que eu faco hoje", "programacao de hoje", "roteiro de hoje",
+        "quais clientes visito hoje", "plano do dia",
+    ],
+    "GENERATE_PDF": [
+        "pdf da ultima", "manda o pdf da ultima visita", "ultimo pdf", "quero pdf",
+        "gera o relatorio da visita", "me envia o pdf do produtor",
+    ],
+    "LIST_LATE": [
+        "quem ta sem visita", "clientes que nao visitei", "quem faz tempo que nao vou",
+        "lista de clientes atrasados", "quem esta esquecido",
+    ],
+    "PLANTING_DAYS": [
+        "quantos dias tem a lavoura", "dias de plantio de cada cliente", "quanto tempo plantado",
+        "idade das lavouras", "dap dos clientes",
+    ],
+    "LIST_MONTH": [
+        "visitas desse mes", "quantas visitas fiz no mes", "lista do mes", "mes de visitas",
+    ],
+    "WEEKLY_REPORT": [
+        "fechamento da semana", "resumo semanal", "como foram as visitas da semana",
+    ],
+    "PEST_DIAGNOSIS": [
+        "o que e mancha alvo", "como controlar ferrugem", "folha com pintas amarelas",
+        "praga no milho", "tratamento para cigarrinha", "doenca na soja",
+    ],
+    "CONFIRM": ["ok pode salvar", "certo", "isso", "fechou", "sim", "pode lancar"],
+    "CANCEL": ["para", "desconsidera", "nao quero", "cancela tudo", "aborta"],
+    "ORGANIZE_WEEK": ["organiza a semana", "planejamento semanal", "roteiriza minhas visitas"],
+    "FIELD_DATA_SAVE": ["salva no perfil do produtor", "anota que ele planta 500 ha", "registra no cadastro"],
+    "FIELD_DATA_QUERY": ["perfil do produtor", "dados do cliente", "o que temos do cliente"],
+    "CREATE_VISIT_LIKE_MESSAGE": [
+        "cliente marcelo soja v4 hoje aplicar fungicida",
+        "visitei o joao hoje milho v6 tudo certo",
+        "fazenda santa rita soja r3 ferrugem",
+        "produtor carlos plantio de soja ontem",
+        "passei no talhao 3 do pedro milho em v8",
+        "lavoura do ze soja r5 percevejo alto",
+        "visita no evaristo algodao em floracao",
+        "hoje fui no cliente ana soja emergencia boa",
+    ],
+    # Conversa fora do escopo: o modelo devolve UNKNOWN e a decisão fica com a IA
+    "UNKNOWN": [
+        "oi", "ola", "bom dia", "boa tarde", "boa noite", "tudo bem", "obrigado", "valeu",
+        "blz", "kkkk", "qual a previsao do tempo", "quanto custa", "quem e voce", "teste",
+    ],
+}
+
+FENOLOGIA_NUMBERS = [
+    "um", "dois", "tres", "quatro", "cinco", "seis", "sete", "oito", "nove", "dez", "onze", "doze",
+]
+FENOLOGIA_ORDINALS = [
+    "primeira", "segunda", "terceira", "quarta", "quinta", "sexta",
+    "setima", "oitava", "nona", "decima", "decima primeira", "decima segunda",
+]
+FENOLOGIA_NAMES = {
+    "VE": ["emergencia", "emergindo", "nascendo", "ve"],
+    "VC": ["cotiledone", "cotiledones abertos", "vc"],
+    "VT": ["pendoamento", "pendoando", "soltando pendao", "vt"],
+    "R1": ["inicio do florescimento", "comecando a florir", "primeiras flores"],
+    "R2": ["florescimento pleno", "florada cheia", "plena flor"],
+    "R3": ["inicio de vagem", "formando vagem", "canivete"],
+    "R4": ["vagem formada", "vagem completa"],
+    "R5": ["enchimento de grao", "enchendo grao", "granacao"],
+    "R6": ["grao cheio", "vagem cheia"],
+    "R7": ["inicio da maturacao", "maturacao fisiologica", "amarelando"],
+    "R8": ["maturacao plena", "pronta para colher", "ponto de colheita"],
+}
+
+VISIT_PURPOSE_EXAMPLES = {
+    "Plantio": ["plantio", "plantando", "semeadura", "vou plantar", "pre plantio", "acompanhar plantio", "1"],
+    "Emergência": ["emergencia", "emergindo", "nascendo", "stand de plantas", "germinacao", "2"],
+    "Vegetativo": ["vegetativo", "fase vegetativa", "crescimento", "desenvolvimento vegetativo", "em v", "3"],
+    "Reprodutivo": ["reprodutivo", "florescimento", "florada", "enchimento de grao", "formando vagem", "em r", "4"],
+    "Colheita": ["colheita", "colhendo", "pre colheita", "maturacao", "dessecacao", "5"],
+}
+
+
+def fenologia_seed_examples():
+    examples = []
+    for n in range(1, 13):
+        for code in (f"V{n}", f"R{n}") if n <= 8 else (f"V{n}",):
+            prefix = code[0].lower()
+            examples += [
+                (f"{prefix}{n}", code), (f"{prefix} {n}", code), (f"{prefix}-{n}", code),
+                (f"ta em {prefix}{n}", code), (f"estadio {prefix}{n}", code),
+                (f"{prefix} {FENOLOGIA_NUMBERS[n - 1]}", code),
+            ]
+            if prefix == "v":
+                examples += [
+                    (f"{n} folhas", code), (f"{FENOLOGIA_ORDINALS[n - 1]} folha", code),
+                    (f"{FENOLOGIA_NUMBERS[n - 1]} folhas", code),
+                ]
+    for code, phrases in FENOLOGIA_NAMES.items():
+        examples += [(phrase, code) for phrase in phrases]
+    return examples
+
+
+def _typo_variants(text: str, rng: random.Random, count: int = 2):
+    variants = []
+    for _ in range(count):
+        words = text.split()
+        candidates = [i for i, w in enumerate(words) if len(w) > 3]
+        if not candidates:
+            break
+        i = rng.choice(candidates)
+        word = words[i]
+        j = rng.randrange(1, len(word) - 1)
+        op = rng.choice(("drop", "double", "swap"))
+        if op == "drop":
+            word = word[:j] + word[j + 1:]
+        elif op == "double":
+            word = word[:j] + word[j] + word[j:]
+        else:
+            word = word[:j - 1] + word[j] + word[j - 1] + word[j + 1:]
+        words[i] = word
+        variants.append(" ".join(words))
+    return variants
+
+
+def seed_examples(seed: int = 7):
+    intents = {}
+    for source in (INTENT_EXAMPLES, EXTRA_INTENT_EXAMPLES):
+        for intent, phrases in source.items():
+            intents.setdefault(intent, []).extend(phrases)
+
+    heads = {
+        "intent": [(p, intent) for intent, phrases in intents.items() for p in phrases],
+        "fenologia": fenologia_seed_examples(),
+        "visit_purpose": [(p, label) for label, phrases in VISIT_PURPOSE_EXAMPLES.items() for p in phrases],
+    }
+    for name, examples in heads.items():
+        rng = random.Random(f"{name}:{seed}")
+        augmented = list(examples)
+        for text, label in examples:
+            augmented += [(variant, label) for variant in _typo_variants(text, rng)]
+        heads[name] = augmented
+    return heads
+
+
+def load_app():
+    """
+    App para ler o agent_decision_log de DATABASE_URL. Sem ele o app cria o
+    SQLite de fallback em UPLOAD_DIR (servido em /uploads): aponta para um
+    diretório temporário em vez de src/uploads.
+    """
+    if not os.environ.get("DATABASE_URL"):
+        os.environ.setdefault("UPLOAD_DIR", tempfile.mkdtemp(prefix="intent_model_"))
+    from app import app
+    return app
+
+
+def decision_log_examples():
+    from models import AgentDecisionLog, db
+
+    app = load_app()
+    with app.app_context():
+        rows = db.session.query(
+            AgentDecisionLog.raw_message,
+            AgentDecisionLog.current_state,
+            AgentDecisionLog.intent,
+            AgentDecisionLog.intent_confidence,
+            AgentDecisionLog.entities_json,
+        ).yield_per(2000)
+        return examples_from_decision_logs(rows)
+
+
+def build_examples(seeds_only: bool = False):
+    heads = seed_examples()
+    if not seeds_only:
+        for name, examples in decision_log_examples().items():
+            print(f"   {name}: {len(examples)} exemplos do agent_decision_log")
+            heads.setdefault(name, []).extend(examples)
+    return heads
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seeds-only", action="store_true", help="não lê o agent_decision_log")
+    parser.add_argument("--output", default=get_model_path())
+    parser.add_argument("--epochs", type=int, default=80)
+    args = parser.parse_args()
+
+    heads = build_examples(seeds_only=args.seeds_only)
+    model = train_model(heads, epochs=args.epochs)
+    save_model(model, args.output)
+
+    print(f"✅ Modelo gravado em {args.output} ({os.path.getsize(args.output) // 1024} KB)")
+    for name, info in model.meta["heads"].items():
+        holdout = info["holdout"]
+        print(
+            f"   {name}: {info['train_examples']} treino, {info['labels']} rótulos, "
+            f"hold-out acc={holdout['accuracy']} cobertura={holdout['coverage']} "
+            f"acc@limiar={holdout['accuracy_when_confident']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
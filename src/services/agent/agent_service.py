@@ -1,5 +1,33 @@
+"""
+Pipeline do agente: classificação → extração → skill → resolução →
+decisão → execução.
+
+As etapas de rede (slow path do classificador e skill de lançamento, ambas
+na OpenAI) rodam num pool de threads, em paralelo com as etapas locais
+(extração por regex e resolução no banco, que ficam na thread da
+requisição). A latência percebida fica perto de max(LLM, banco) em vez
+da soma:
+
+- heurística decide CREATE_VISIT_LIKE_MESSAGE: a skill começa junto
+  com a extração/resolução;
+- heurística não decide: o slow path roda em paralelo com a
+  extração/resolução e, se a mensagem tem cara de visita
+  (IntentClassifier.predicts_visit), a skill é adiantada
+  especulativamente. Se o intent final for outro o resultado é
+  descartado (ou a tarefa cancelada, se ainda não começou).
+
+Se a skill preencher campos que o resolver usa (cliente, fazenda,
+talhão, variedade, cultura), a resolução é refeita com eles.
+O tempo de cada etapa vai em result["pipeline"] e no log de decisão.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from typing import Any, Dict
 
+from flask import current_app, has_app_context
+
 from .intent_classifier import IntentClassifier
 from .entity_extractor import EntityExtractor
 from .entity_resolver import EntityResolver
@@ -8,7 +36,72 @@ from .action_executor import ActionExecutor
 from .skill_loader import interpret_with_skill
 
 
+AGENT_STAGE_WORKERS = int(os.getenv("AGENT_STAGE_WORKERS", "4"))
+# Margem sobre o prazo do gateway de LLM antes de desistir de uma etapa
+AGENT_STAGE_TIMEOUT_SECONDS = float(os.getenv("AGENT_STAGE_TIMEOUT", "30"))
+
+VISIT_SKILL_NAME = "lancamento_visita"
+
+# Campos que EntityExtractor detectou com mais precisão - não sobrescrever
+SKILL_PROTECTED_FIELDS = {"culture", "recommendation", "client_name", "variety", "visit_purpose"}
+
+# Entradas do EntityResolver: se a skill mudar alguma, resolve de novo
+RESOLVER_INPUT_FIELDS = ("client_name", "property_name", "plot_name", "variety", "culture")
+
+_stage_pool = ThreadPoolExecutor(max_workers=AGENT_STAGE_WORKERS, thread_name_prefix="agent-stage")
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+def _submit_stage(fn, *args, **kwargs):
+    """Roda fn no pool (com app context, se houver). Future de (resultado, ms)."""
+    app = current_app._get_current_object() if has_app_context() else None
+
+    def run():
+        started = time.perf_counter()
+        if app is not None:
+            with app.app_context():
+                value = fn(*args, **kwargs)
+        else:
+            value = fn(*args, **kwargs)
+        return value, _elapsed_ms(started)
+
+    return _stage_pool.submit(run)
+
+
+def _wait_stage(future, stage: str):
+    """(resultado, ms) da etapa; (None, None) em erro ou timeout."""
+    try:
+        return future.result(timeout=AGENT_STAGE_TIMEOUT_SECONDS)
+    except FutureTimeoutError:
+        print(f"[AgentService] etapa {stage} passou de {AGENT_STAGE_TIMEOUT_SECONDS}s, seguindo sem ela")
+    except Exception as e:
+        print(f"[AgentService] erro na etapa {stage}: {e}")
+    return None, None
+
+
+def merge_skill_result(entities: Dict[str, Any], skill_result: Dict[str, Any] | None) -> bool:
+    """Aplica parsed_visit da skill em entities. True se aplicou algo."""
+    if not skill_result or not skill_result.get("parsed_visit"):
+        return False
+    for key, value in skill_result["parsed_visit"].items():
+        if key in SKILL_PROTECTED_FIELDS and entities.get(key):
+            # Mantém valor do EntityExtractor se já foi detectado
+            continue
+        if value is not None and value != "":
+            entities[key] = value
+    return True
+
+
 class AgentService:
+    """
+    Uma instância por worker (AGENT_SERVICE em api_routes), usada por
+    todas as threads: as etapas não guardam estado da request nos
+    atributos, só em variáveis locais e nos dicts devolvidos.
+    """
+
     def __init__(self) -> None:
         self.intent_classifier = IntentClassifier()
         self.entity_extractor = EntityExtractor()
@@ -16,37 +109,98 @@ class AgentService:
         self.decision_engine = DecisionEngine()
         self.action_executor = ActionExecutor()
 
+    def _start_skill(self, message_text: str, context: Dict[str, Any]):
+        return _submit_stage(
+            interpret_with_skill,
+            message_text=message_text,
+            skill_name=VISIT_SKILL_NAME,
+            current_state=context.get("current_state", ""),
+        )
+
     def process(self, message_text: str, context: Dict[str, Any] | None = None) -> Dict[str, Any]:
         context = context or {}
-        intent_result = self.intent_classifier.classify(message_text, context=context)
+        started = time.perf_counter()
+        stages: Dict[str, Any] = {}
+        pipeline: Dict[str, Any] = {"stages_ms": stages, "skill": None, "re_resolved": False}
+
+        # 1. Heurística local; sem decisão, o slow path (rede) vai para o pool
+        t0 = time.perf_counter()
+        intent_result = self.intent_classifier.classify_fast(message_text, context=context)
+        stages["classify_fast"] = _elapsed_ms(t0)
+
+        slow_future = None
+        if intent_result is None:
+            slow_future = _submit_stage(self.intent_classifier.classify_slow, message_text, context=context)
+
+        # 2. Skill de visita: certa pela heurística ou especulativa
+        skill_future = None
+        if intent_result is not None and intent_result["intent"] == "CREATE_VISIT_LIKE_MESSAGE":
+            skill_future = self._start_skill(message_text, context)
+            pipeline["skill"] = "parallel"
+        elif slow_future is not None and self.intent_classifier.predicts_visit(message_text):
+            skill_future = self._start_skill(message_text, context)
+            pipeline["skill"] = "speculative"
+
+        # 3. Extração + resolução (banco) enquanto a rede trabalha
+        t0 = time.perf_counter()
         entities = self.entity_extractor.extract(message_text, context=context)
-        
-        if intent_result["intent"] == "CREATE_VISIT_LIKE_MESSAGE":
-            skill_result = interpret_with_skill(
-                message_text=message_text,
-                skill_name="lancamento_visita",
-                current_state=context.get("current_state", ""),
-            )
-            if skill_result and skill_result.get("parsed_visit"):
-                parsed_visit = skill_result["parsed_visit"]
-                # Campos que EntityExtractor detectou com mais precisão - não sobrescrever
-                protected_fields = {"culture", "recommendation", "client_name", "variety", "visit_purpose"}
-                for key, value in parsed_visit.items():
-                    if key in protected_fields and entities.get(key):
-                        # Mantém valor do EntityExtractor se já foi detectado
-                        continue
-                    if value is not None and value != "":
-                        entities[key] = value
+        stages["extract"] = _elapsed_ms(t0)
+
+        t0 = time.perf_counter()
+        resolved = self.entity_resolver.resolve(entities, context=context)
+        stages["resolve"] = _elapsed_ms(t0)
+
+        # 4. Junta os resultados da rede
+        if slow_future is not None:
+            intent_result, stages["classify_slow"] = _wait_stage(slow_future, "classify_slow")
+            if intent_result is None:
+                intent_result = {"intent": "UNKNOWN", "confidence": "low", "matched_by": "none"}
+
+        is_visit = intent_result["intent"] == "CREATE_VISIT_LIKE_MESSAGE"
+
+        if skill_future is not None and not is_visit:
+            # Especulação errada: cancela se ainda não começou, senão ignora
+            skill_future.cancel()
+            pipeline["skill"] = "discarded"
+            skill_future = None
+        elif skill_future is None and is_visit:
+            # Slow path decidiu visita sem sinal prévio: skill em sequência
+            skill_future = self._start_skill(message_text, context)
+            pipeline["skill"] = "sequential"
+
+        if skill_future is not None:
+            skill_result, stages["skill"] = _wait_stage(skill_future, "skill")
+            merged = dict(entities)
+            if merge_skill_result(merged, skill_result):
                 intent_result["confidence"] = skill_result.get("confidence", "medium")
-                intent_result["matched_by"] = "skill:lancamento_visita"
-        
-        entities = self.entity_resolver.resolve(entities, context=context)
+                intent_result["matched_by"] = f"skill:{VISIT_SKILL_NAME}"
+
+                if any(merged.get(k) != entities.get(k) for k in RESOLVER_INPUT_FIELDS):
+                    t0 = time.perf_counter()
+                    resolved = self.entity_resolver.resolve(merged, context=context)
+                    stages["re_resolve"] = _elapsed_ms(t0)
+                    pipeline["re_resolved"] = True
+                else:
+                    for key, value in merged.items():
+                        if key not in RESOLVER_INPUT_FIELDS:
+                            resolved[key] = value
+
+        entities = resolved
+
+        t0 = time.perf_counter()
         decision = self.decision_engine.decide(intent_result, entities, context=context)
+        stages["decide"] = _elapsed_ms(t0)
+
+        t0 = time.perf_counter()
         execution = self.action_executor.execute(decision, context=context)
-        
+        stages["execute"] = _elapsed_ms(t0)
+
+        pipeline["total_ms"] = _elapsed_ms(started)
+
         return {
             "intent_result": intent_result,
             "entities": entities,
             "decision": decision,
             "execution": execution,
-        }
\ No newline at end of file
+            "pipeline": pipeline,
+        }
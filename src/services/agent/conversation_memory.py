@@ -15,6 +15,10 @@ Exemplo:
 STORAGE:
   Cache em memória com TTL. Não persiste no banco.
   Se o servidor reiniciar, o histórico é perdido (aceitável).
+  O cache é do worker e compartilhado pelas threads dele: todo acesso
+  passa por _memory_lock, as listas devolvidas são cópias e as
+  mensagens não são alteradas depois de guardadas (update troca a
+  mensagem por uma nova).
 
 PRIVACIDADE:
   Mensagens antigas são automaticamente removidas após TTL.
@@ -22,8 +26,9 @@ PRIVACIDADE:
 ================================================================
 """
 
+import threading
 import time
-from dataclasses import dataclass, field
+from dataclasses import dataclass, replace
 from typing import Any, Dict, List, Optional
 from datetime import datetime
 
@@ -60,6 +65,7 @@ class ConversationContext:
 # Cache global: {chat_key: [ConversationMessage, ...]}
 _memory_cache: Dict[str, List[ConversationMessage]] = {}
 _last_cleanup: float = 0
+_memory_lock = threading.Lock()
 
 
 def _chat_key(platform: str, chat_id: str) -> str:
@@ -68,7 +74,7 @@ def _chat_key(platform: str, chat_id: str) -> str:
 
 
 def _cleanup_old_messages() -> None:
-    """Remove mensagens expiradas do cache."""
+    """Remove mensagens expiradas do cache. Chamar com _memory_lock."""
     global _last_cleanup
 
     now = time.time()
@@ -111,13 +117,8 @@ def add_message(
         entities: Entidades extraídas (opcional)
         visit_id: ID da visita criada (opcional)
     """
-    _cleanup_old_messages()
-
     key = _chat_key(platform, chat_id)
 
-    if key not in _memory_cache:
-        _memory_cache[key] = []
-
     message = ConversationMessage(
         text=text,
         timestamp=time.time(),
@@ -127,11 +128,14 @@ def add_message(
         visit_id=visit_id,
     )
 
-    _memory_cache[key].append(message)
+    with _memory_lock:
+        _cleanup_old_messages()
+        messages = _memory_cache.setdefault(key, [])
+        messages.append(message)
 
-    # Mantém apenas as últimas N mensagens
-    if len(_memory_cache[key]) > MAX_MESSAGES_PER_CHAT:
-        _memory_cache[key] = _memory_cache[key][-MAX_MESSAGES_PER_CHAT:]
+        # Mantém apenas as últimas N mensagens
+        if len(messages) > MAX_MESSAGES_PER_CHAT:
+            del messages[:-MAX_MESSAGES_PER_CHAT]
 
 
 def get_recent_messages(
@@ -150,14 +154,13 @@ def get_recent_messages(
     Returns:
         Lista de mensagens (mais recente por último)
     """
-    _cleanup_old_messages()
-
     key = _chat_key(platform, chat_id)
-    messages = _memory_cache.get(key, [])
-
-    # Filtra mensagens expiradas
     cutoff = time.time() - MESSAGE_TTL_SECONDS
-    valid_messages = [m for m in messages if m.timestamp > cutoff]
+
+    with _memory_lock:
+        _cleanup_old_messages()
+        # Filtra mensagens expiradas (a lista nova é uma cópia)
+        valid_messages = [m for m in _memory_cache.get(key, ()) if m.timestamp > cutoff]
 
     return valid_messages[-limit:]
 
@@ -219,8 +222,8 @@ def get_conversation_context(
 def clear_chat_memory(platform: str, chat_id: str) -> None:
     """Limpa o histórico de um chat específico."""
     key = _chat_key(platform, chat_id)
-    if key in _memory_cache:
-        del _memory_cache[key]
+    with _memory_lock:
+        _memory_cache.pop(key, None)
 
 
 def update_last_message_with_result(
@@ -235,18 +238,23 @@ def update_last_message_with_result(
     Chamado após o agente processar a mensagem.
     """
     key = _chat_key(platform, chat_id)
-    messages = _memory_cache.get(key, [])
-
-    if not messages:
+    changes = {}
+    if intent:
+        changes["intent"] = intent
+    if entities:
+        changes["entities"] = entities
+    if visit_id:
+        changes["visit_id"] = visit_id
+    if not changes:
         return
 
-    # Encontra a última mensagem do usuário
-    for msg in reversed(messages):
-        if msg.role == "user":
-            if intent:
-                msg.intent = intent
-            if entities:
-                msg.entities = entities
-            if visit_id:
-                msg.visit_id = visit_id
-            break
+    with _memory_lock:
+        messages = _memory_cache.get(key)
+        if not messages:
+            return
+
+        # Encontra a última mensagem do usuário
+        for index in range(len(messages) - 1, -1, -1):
+            if messages[index].role == "user":
+                messages[index] = replace(messages[index], **changes)
+                break
@@ -219,6 +219,7 @@ def log_from_agent_result(
             "entities": {...},    # agora ja vem enriquecido pelo EntityResolver
             "decision": {...},
             "execution": {...},
+            "pipeline": {...},    # tempo de cada etapa (vai para extra_json)
         }
     """
     try:
@@ -227,6 +228,10 @@ def log_from_agent_result(
         entities = agent_result.get("entities") or {}
         decision = agent_result.get("decision") or {}
 
+        pipeline = agent_result.get("pipeline")
+        if pipeline:
+            extra = {**(extra or {}), "pipeline": pipeline}
+
         log_agent_decision(
             platform=platform,
             chat_id=chat_id,
@@ -164,15 +164,17 @@ class EmbeddingCache:
         """Carrega embeddings de referência do disco (lazy loading)."""
         if self._refs_loaded:
             return
-        try:
-            if self._ref_file.exists():
-                self._reference_embeddings = json.loads(
-                    self._ref_file.read_text(encoding="utf-8")
-                )
-                print(f"[EmbeddingCache] referências carregadas: {len(self._reference_embeddings)} intents")
-            self._refs_loaded = True
-        except Exception as e:
-            print(f"[EmbeddingCache] erro ao carregar referências: {e}")
+        with self._lock:
+            if self._refs_loaded:
+                return
+            try:
+                if self._ref_file.exists():
+                    self._reference_embeddings = json.loads(
+                        self._ref_file.read_text(encoding="utf-8")
+                    )
+                    print(f"[EmbeddingCache] referências carregadas: {len(self._reference_embeddings)} intents")
+            except Exception as e:
+                print(f"[EmbeddingCache] erro ao carregar referências: {e}")
             self._refs_loaded = True
 
     def save_reference_embeddings(self):
@@ -187,12 +189,13 @@ class EmbeddingCache:
             print(f"[EmbeddingCache] erro ao salvar referências: {e}")
 
     def get_cached_classification(self, text: str) -> Optional[Dict[str, Any]]:
-        """Retorna classificação cacheada se existir."""
+        """Retorna cópia da classificação cacheada se existir."""
         msg_hash = self._hash_message(text)
         with self._lock:
             entry = self._cache.get(msg_hash)
             if entry and time.time() - entry.get("timestamp", 0) < CACHE_TTL_SECONDS:
-                return entry.get("classification")
+                classification = entry.get("classification")
+                return dict(classification) if classification else None
         return None
 
     def get_cached_embedding(self, text: str) -> Optional[List[float]]:
@@ -294,7 +297,7 @@ def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
     return dot_product / (norm1 * norm2)
 
 
-def get_embedding(text: str, client=None) -> Optional[List[float]]:
+def get_embedding(text: str) -> Optional[List[float]]:
     """
     Obtém embedding para um texto usando OpenAI.
     Usa cache se disponível.
@@ -311,22 +314,16 @@ def get_embedding(text: str, client=None) -> Optional[List[float]]:
         return None
 
     try:
-        if client is None:
-            from openai import OpenAI
-            client = OpenAI()
+        from services.llm_gateway import embed
 
-        response = client.embeddings.create(
-            model="text-embedding-3-small",
-            input=text,
-        )
-        return response.data[0].embedding
+        return embed("intent_embedding", text, model="text-embedding-3-small")[0]
 
     except Exception as e:
         print(f"[EmbeddingClassifier] erro ao obter embedding: {e}")
         return None
 
 
-def get_embeddings_batch(texts: List[str], client=None) -> List[Optional[List[float]]]:
+def get_embeddings_batch(texts: List[str], purpose: str = "intent_embedding") -> List[Optional[List[float]]]:
     """Obtém embeddings para múltiplos textos em uma única chamada."""
     if not texts:
         return []
@@ -335,15 +332,9 @@ def get_embeddings_batch(texts: List[str], client=None) -> List[Optional[List[fl
         return [None] * len(texts)
 
     try:
-        if client is None:
-            from openai import OpenAI
-            client = OpenAI()
+        from services.llm_gateway import embed
 
-        response = client.embeddings.create(
-            model="text-embedding-3-small",
-            input=texts,
-        )
-        return [item.embedding for item in response.data]
+        return embed(purpose, texts, model="text-embedding-3-small")
 
     except Exception as e:
         print(f"[EmbeddingClassifier] erro batch: {e}")
@@ -370,15 +361,23 @@ def initialize_reference_embeddings(force: bool = False) -> bool:
     print("[EmbeddingClassifier] Gerando embeddings de referência...")
 
     try:
-        from openai import OpenAI
-        client = OpenAI()
+        # Uma única chamada para todos os exemplos de todos os intents
+        all_examples = [
+            (intent, example)
+            for intent, examples in INTENT_EXAMPLES.items()
+            for example in examples
+        ]
+        embeddings = get_embeddings_batch([example for _, example in all_examples], "intent_reference")
+
+        by_intent: Dict[str, List[Optional[List[float]]]] = {}
+        for (intent, _), embedding in zip(all_examples, embeddings):
+            by_intent.setdefault(intent, []).append(embedding)
 
         new_embeddings: Dict[str, List[List[float]]] = {}
 
-        for intent, examples in INTENT_EXAMPLES.items():
-            embeddings = get_embeddings_batch(examples, client)
+        for intent, intent_embeddings in by_intent.items():
             # Filtra None
-            valid_embeddings = [e for e in embeddings if e is not None]
+            valid_embeddings = [e for e in intent_embeddings if e is not None]
             if valid_embeddings:
                 new_embeddings[intent] = valid_embeddings
                 print(f"  - {intent}: {len(valid_embeddings)} embeddings")
@@ -35,41 +35,54 @@ SEGURANCA:
 """
 
 import re
+import threading
 import time
 import unicodedata
+from collections import namedtuple
 from difflib import SequenceMatcher
 from typing import Any, Dict, List, Optional
 
 
 # ================================================================
 # Cache em memória com TTL (evita queries repetidas)
+#
+# Compartilhado entre as threads do worker (gthread/gevent): guarda
+# só valores imutáveis (tuplas e frozensets), nunca objetos ORM, que
+# pertencem à sessão da request que os carregou.
 # ================================================================
 _CACHE_TTL_SECONDS = 300  # 5 minutos
-_cache: Dict[str, Any] = {}
-_cache_timestamps: Dict[str, float] = {}
+_CACHE_MAX_ENTRIES = 512
+_cache: Dict[str, tuple] = {}  # key -> (timestamp, valor)
+_cache_lock = threading.Lock()
+
+NamedRow = namedtuple("NamedRow", ["id", "name"])
+VarietyRow = namedtuple("VarietyRow", ["id", "name", "culture"])
 
 
 def _get_cached(key: str) -> Optional[Any]:
     """Retorna valor do cache se ainda válido, None caso contrário."""
-    if key not in _cache:
-        return None
-    if time.time() - _cache_timestamps.get(key, 0) > _CACHE_TTL_SECONDS:
-        _cache.pop(key, None)
-        _cache_timestamps.pop(key, None)
-        return None
-    return _cache[key]
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry[0] > _CACHE_TTL_SECONDS:
+            _cache.pop(key, None)
+            return None
+        return entry[1]
 
 
 def _set_cached(key: str, value: Any) -> None:
     """Armazena valor no cache com timestamp atual."""
-    _cache[key] = value
-    _cache_timestamps[key] = time.time()
+    with _cache_lock:
+        if len(_cache) >= _CACHE_MAX_ENTRIES:
+            _cache.clear()
+        _cache[key] = (time.time(), value)
 
 
 def invalidate_entity_cache() -> None:
     """Limpa todo o cache. Chamar após criar/editar cliente/propriedade/talhão."""
-    _cache.clear()
-    _cache_timestamps.clear()
+    with _cache_lock:
+        _cache.clear()
 
 
 # Stopwords usadas pelo find_client_by_name do routes.py,
@@ -86,13 +99,13 @@ _CLIENT_STOPWORDS = {
 _PORTFOLIO_BOOST = 0.15
 
 
-def _get_consultant_portfolio_client_ids(consultant_id: int) -> set:
+def _get_consultant_portfolio_client_ids(consultant_id: int) -> frozenset:
     """
-    Retorna set de client_ids que o consultor já visitou.
+    Retorna os client_ids que o consultor já visitou.
     Usa cache para evitar queries repetidas.
     """
     if not consultant_id:
-        return set()
+        return frozenset()
 
     cache_key = f"portfolio:{consultant_id}"
     cached = _get_cached(cache_key)
@@ -108,12 +121,12 @@ def _get_consultant_portfolio_client_ids(consultant_id: int) -> set:
             Visit.client_id.isnot(None)
         ).distinct().all()
 
-        client_ids = {row[0] for row in result}
+        client_ids = frozenset(row[0] for row in result)
         _set_cached(cache_key, client_ids)
         return client_ids
     except Exception as e:
         print(f"[EntityResolver] warning - portfolio query falhou: {e}")
-        return set()
+        return frozenset()
 
 
 def _normalize(text: str) -> str:
@@ -258,7 +271,7 @@ class EntityResolver:
             return _empty_resolved(client_name)
 
         try:
-            from models import Client
+            from models import Client, db
         except Exception as e:
             print(f"[EntityResolver] warning - import Client falhou: {e}")
             return _empty_resolved(client_name)
@@ -273,7 +286,7 @@ class EntityResolver:
         target_clean = " ".join(target_tokens).strip() or target
 
         # Busca carteira do consultor para dar boost
-        portfolio_client_ids = _get_consultant_portfolio_client_ids(consultant_id) if consultant_id else set()
+        portfolio_client_ids = _get_consultant_portfolio_client_ids(consultant_id) if consultant_id else frozenset()
 
         try:
             # Cache de clientes (todos)
@@ -281,7 +294,7 @@ class EntityResolver:
             clients = _get_cached(cache_key)
 
             if clients is None:
-                clients = Client.query.all()
+                clients = tuple(NamedRow(*row) for row in db.session.query(Client.id, Client.name))
                 _set_cached(cache_key, clients)
         except Exception as e:
             print(f"[EntityResolver] warning - query Client falhou: {e}")
@@ -330,7 +343,7 @@ class EntityResolver:
             return _empty_resolved(property_name)
 
         try:
-            from models import Property
+            from models import Property, db
         except Exception as e:
             print(f"[EntityResolver] warning - import Property falhou: {e}")
             return _empty_resolved(property_name)
@@ -344,10 +357,10 @@ class EntityResolver:
             properties = _get_cached(cache_key)
 
             if properties is None:
-                query = Property.query
+                query = db.session.query(Property.id, Property.name)
                 if client_id:
-                    query = query.filter_by(client_id=client_id)
-                properties = query.all()
+                    query = query.filter(Property.client_id == client_id)
+                properties = tuple(NamedRow(*row) for row in query)
                 _set_cached(cache_key, properties)
         except Exception as e:
             print(f"[EntityResolver] warning - query Property falhou: {e}")
@@ -389,7 +402,7 @@ class EntityResolver:
             return _empty_resolved(plot_name)
 
         try:
-            from models import Plot
+            from models import Plot, db
         except Exception as e:
             print(f"[EntityResolver] warning - import Plot falhou: {e}")
             return _empty_resolved(plot_name)
@@ -403,10 +416,10 @@ class EntityResolver:
             plots = _get_cached(cache_key)
 
             if plots is None:
-                query = Plot.query
+                query = db.session.query(Plot.id, Plot.name)
                 if property_id:
-                    query = query.filter_by(property_id=property_id)
-                plots = query.all()
+                    query = query.filter(Plot.property_id == property_id)
+                plots = tuple(NamedRow(*row) for row in query)
                 _set_cached(cache_key, plots)
         except Exception as e:
             print(f"[EntityResolver] warning - query Plot falhou: {e}")
@@ -452,7 +465,7 @@ class EntityResolver:
             return _empty_resolved(variety_name)
 
         try:
-            from models import Variety
+            from models import Culture, Variety, db
         except Exception as e:
             print(f"[EntityResolver] warning - import Variety falhou: {e}")
             return _empty_resolved(variety_name)
@@ -466,7 +479,11 @@ class EntityResolver:
             varieties = _get_cached(cache_key)
 
             if varieties is None:
-                varieties = Variety.query.all()
+                rows = (
+                    db.session.query(Variety.id, Variety.name, Culture.name)
+                    .outerjoin(Culture, Culture.id == Variety.culture_id)
+                )
+                varieties = tuple(VarietyRow(*row) for row in rows)
                 _set_cached(cache_key, varieties)
         except Exception as e:
             print(f"[EntityResolver] warning - query Variety falhou: {e}")
@@ -497,7 +514,7 @@ class EntityResolver:
                     {
                         "id": v.id,
                         "name": v.name,
-                        "culture": v.culture.name if v.culture else None,
+                        "culture": v.culture,
                         "score": round(float(s), 3),
                     }
                     for v, s in scored[:5]
@@ -505,25 +522,17 @@ class EntityResolver:
                 ],
             }
 
-        # Pega a cultura da variedade resolvida
-        culture_name = None
-        try:
-            if best_variety.culture:
-                culture_name = best_variety.culture.name
-        except Exception:
-            pass
-
         return {
             "id": best_variety.id,
             "name": best_variety.name,
-            "culture": culture_name,
+            "culture": best_variety.culture,
             "raw_name": variety_name,
             "score": round(float(best_score), 3),
             "candidates": [
                 {
                     "id": v.id,
                     "name": v.name,
-                    "culture": v.culture.name if v.culture else None,
+                    "culture": v.culture,
                     "score": round(float(s), 3),
                 }
                 for v, s in scored[:5]
@@ -1,7 +1,5 @@
 import re
-import json
 import os
-import time
 import unicodedata
 from typing import Any, Dict
 
@@ -9,6 +7,7 @@ from services.agent.embedding_classifier import (
     classify_with_embeddings,
     get_cache_stats as get_embedding_cache_stats,
 )
+from services.agent.local_intent_model import predict_intent
 
 
 def normalize_text(text: str) -> str:
@@ -48,24 +47,6 @@ AI_INTENT_MAP = {
 }
 
 
-def _call_openai_with_retry(client, messages, max_retries: int = 3) -> str:
-    """Chama OpenAI com retry e exponential backoff."""
-    last_error = None
-    for attempt in range(max_retries):
-        try:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=messages,
-            )
-            return (response.choices[0].message.content or "").strip()
-        except Exception as e:
-            last_error = e
-            if attempt < max_retries - 1:
-                wait_time = (2 ** attempt) * 0.5  # 0.5s, 1s, 2s
-                time.sleep(wait_time)
-    raise last_error
-
-
 def classify_with_ai_fallback(message_text: str, current_state: str = ""):
     """
     So chama a OpenAI se existir chave configurada.
@@ -79,8 +60,7 @@ def classify_with_ai_fallback(message_text: str, current_state: str = ""):
         return None
 
     try:
-        from openai import OpenAI
-        client = OpenAI()
+        from services.llm_gateway import complete, is_json_object, parse_json_object
 
         system_prompt = (
             "Voce e um interpretador de intencoes de um bot agricola. "
@@ -108,21 +88,11 @@ def classify_with_ai_fallback(message_text: str, current_state: str = ""):
             {"role": "user", "content": user_prompt},
         ]
 
-        output_text = _call_openai_with_retry(client, messages)
-        if not output_text:
+        output_text = complete("intent_fallback", messages, model="gpt-4o-mini", validate=is_json_object)
+        data = parse_json_object(output_text)
+        if data is None:
             return None
 
-        try:
-            data = json.loads(output_text)
-        except Exception:
-            match = re.search(r"\{.*\}", output_text, flags=re.DOTALL)
-            if not match:
-                return None
-            try:
-                data = json.loads(match.group(0))
-            except Exception:
-                return None
-
         ai_intent = (data.get("intent") or "").strip()
         ai_confidence = (data.get("confidence") or "low").strip().lower()
 
@@ -166,6 +136,24 @@ class IntentClassifier:
         return any(stage in line3_lower for stage in stages)
 
     def classify(self, text: str, context: Dict[str, Any] | None = None) -> Dict[str, Any]:
+        return self.classify_fast(text, context=context) or self.classify_slow(text, context=context)
+
+    def predicts_visit(self, text: str) -> bool:
+        """
+        Sinal fraco de lançamento de visita para mensagens que a heurística
+        não decidiu (cultura, cliente/fazenda/talhão ou código fenológico).
+        Usado para adiantar a skill de visita enquanto o slow path roda.
+        """
+        normalized = normalize_text(text)
+        if any(s in normalized for s in ("milho", "soja", "algodao", "cliente", "produtor", "fazenda", "talhao")):
+            return True
+        return bool(re.search(r"\b(v\d{1,2}|r\d{1,2}|ve|vc|vt)\b", normalized))
+
+    def classify_fast(self, text: str, context: Dict[str, Any] | None = None) -> Dict[str, Any] | None:
+        """
+        Heurísticas + modelo local (sem rede). Devolve None quando a
+        mensagem precisa de embeddings / IA (classify_slow).
+        """
         normalized = normalize_text(text)
         context = context or {}
         current_state = (context.get("current_state") or "").strip()
@@ -517,6 +505,24 @@ class IntentClassifier:
             })
             return result
 
+        # ============================================================
+        # MODELO LOCAL (n-gramas hasheados, treinado no decision log)
+        # Microssegundos, sem rede. Abaixo do limiar segue para
+        # embeddings / IA.
+        # ============================================================
+        return predict_intent(text)
+
+    def classify_slow(self, text: str, context: Dict[str, Any] | None = None) -> Dict[str, Any]:
+        """Embeddings e fallback com IA (chamadas à OpenAI)."""
+        context = context or {}
+        current_state = (context.get("current_state") or "").strip()
+
+        result = {
+            "intent": "UNKNOWN",
+            "confidence": "low",
+            "matched_by": "none",
+        }
+
         # ============================================================
         # CLASSIFICAÇÃO POR EMBEDDINGS
         # Usa similaridade semântica para classificar. Inclui cache
@@ -0,0 +1,428 @@
+"""
+================================================================
+Modelo local de intents / fenologia / objetivo da visita
+================================================================
+
+Regressão logística multinomial sobre n-gramas hasheados (palavras,
+bigramas e n-gramas de caracteres), 100% Python, sem dependências.
+Treinado offline (scripts/train_local_intent_model.py) a partir do
+agent_decision_log + exemplos semente, servido em memória: uma predição
+custa dezenas de microssegundos.
+
+Cabeças (heads) do artefato:
+- intent:        nomes internos do agente (LIST_WEEK, GENERATE_PDF, ...)
+- fenologia:     códigos V*/R* (VE, VC, VT, V1..., R1...)
+- visit_purpose: Plantio, Emergência, Vegetativo, Reprodutivo, Colheita
+
+Quem chama usa a predição só acima de LOCAL_MODEL_MIN_CONFIDENCE;
+abaixo disso segue para a OpenAI como antes. Sem artefato (ou com
+artefato inválido) todas as predições devolvem None.
+
+Desligado por padrão (LOCAL_INTENT_MODEL_ENABLED=1 liga): o artefato
+versionado foi treinado só com as frases semente e erra com confiança
+em texto comum. Ligar só com um artefato treinado no agent_decision_log.
+Mesmo ligado, a predição é descartada quando nenhuma palavra do texto
+apareceu no treino (só n-gramas de caracteres batem) e CONFIRM/CANCEL
+nunca saem de frases com negação ("não cancela").
+================================================================
+"""
+
+import json
+import math
+import os
+import random
+import threading
+import unicodedata
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_MODEL_PATH = str(Path(__file__).resolve().parent.parent / "data" / "local_intent_model.json")
+
+LOCAL_MODEL_MIN_CONFIDENCE = float(os.getenv("LOCAL_MODEL_MIN_CONFIDENCE", "0.75"))
+
+N_BUCKETS = 1 << 18
+CHAR_NGRAMS = (2, 3, 4)
+# Pesos menores que isso saem do artefato (não mudam as predições do hold-out)
+WEIGHT_PRUNE = 0.05
+
+# Intents que dependem do estado da conversa (não dá para prever só pelo texto)
+CONTEXT_DEPENDENT_INTENTS = {"STATEFUL_REPLY", "CONTEXTUAL_ADD_TO_VISIT", "UNKNOWN"}
+
+# Respostas que decidem o fluxo: com negação na frase ficam para a IA
+NEGATION_SENSITIVE_INTENTS = {"CONFIRM", "CANCEL"}
+NEGATION_WORDS = {"nao", "n", "nem", "nunca", "jamais", "negativo"}
+
+
+def get_model_path() -> str:
+    return os.environ.get("LOCAL_INTENT_MODEL_PATH") or DEFAULT_MODEL_PATH
+
+
+def is_enabled() -> bool:
+    return os.environ.get("LOCAL_INTENT_MODEL_ENABLED") == "1"
+
+
+def normalize_text(text: str) -> str:
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFD", text.strip().lower())
+    text = "".join(ch for ch in text if unicodedata.category(ch) != "Mn")
+    text = "".join(ch if ch.isalnum() else " " for ch in text)
+    return " ".join(text.split())
+
+
+# ================================================================
+# Features
+# ================================================================
+
+def _bucket(feature: str) -> int:
+    # crc32 é estável entre processos (hash() do Python não é)
+    return zlib.crc32(feature.encode("utf-8")) % N_BUCKETS
+
+
+def extract_features(text: str) -> Dict[int, float]:
+    """Bucket -> peso (vetor normalizado L2)."""
+    words = normalize_text(text).split()
+    if not words:
+        return {}
+
+    counts: Dict[int, float] = {}
+
+    def add(feature: str) -> None:
+        b = _bucket(feature)
+        counts[b] = counts.get(b, 0.0) + 1.0
+
+    for i, word in enumerate(words):
+        add("w:" + word)
+        if i:
+            add("b:" + words[i - 1] + "_" + word)
+        padded = f" {word} "
+        for n in CHAR_NGRAMS:
+            for j in range(len(padded) - n + 1):
+                add(f"c{n}:" + padded[j:j + n])
+
+    norm = math.sqrt(sum(v * v for v in counts.values()))
+    return {b: v / norm for b, v in counts.items()}
+
+
+def has_negation(text: str) -> bool:
+    return any(word in NEGATION_WORDS for word in normalize_text(text).split())
+
+
+# ================================================================
+# Modelo
+# ================================================================
+
+class LinearHead:
+    """Softmax linear sobre features hasheadas; pesos esparsos por bucket."""
+
+    __slots__ = ("labels", "bias", "weights")
+
+    def __init__(self, labels: Sequence[str], bias: Sequence[float] | None = None,
+                 weights: Dict[int, List[float]] | None = None) -> None:
+        self.labels = list(labels)
+        self.bias = list(bias) if bias is not None else [0.0] * len(self.labels)
+        self.weights = weights if weights is not None else {}
+
+    def scores(self, features: Dict[int, float]) -> List[float]:
+        scores = list(self.bias)
+        weights = self.weights
+        for bucket, value in features.items():
+            row = weights.get(bucket)
+            if row is None:
+                continue
+            for k, w in row:
+                scores[k] += w * value
+        return scores
+
+    def known_words(self, text: str) -> int:
+        """Quantas palavras do texto têm peso no modelo (vistas no treino)."""
+        return sum(1 for word in normalize_text(text).split() if _bucket("w:" + word) in self.weights)
+
+    def predict_proba(self, text: str, allowed: Optional[Iterable[str]] = None) -> Tuple[Optional[str], float]:
+        features = extract_features(text)
+        if not features or not self.labels:
+            return None, 0.0
+
+        scores = self.scores(features)
+        indices = range(len(self.labels))
+        if allowed is not None:
+            allowed = set(allowed)
+            indices = [k for k in indices if self.labels[k] in allowed]
+            if not indices:
+                return None, 0.0
+
+        top = max(scores[k] for k in indices)
+        exps = {k: math.exp(scores[k] - top) for k in indices}
+        total = sum(exps.values())
+        best = max(exps, key=exps.get)
+        return self.labels[best], exps[best] / total
+
+    # ---------------- treino ----------------
+
+    @classmethod
+    def train(cls, examples: Sequence[Tuple[str, str]], epochs: int = 80, learning_rate: float = 1.0,
+              l2: float = 1e-5, seed: int = 13) -> "LinearHead":
+        """SGD com softmax cross-entropy. examples: (texto, rótulo)."""
+        labels = sorted({label for _, label in examples})
+        index = {label: k for k, label in enumerate(labels)}
+        n_labels = len(labels)
+
+        data = [(extract_features(text), index[label]) for text, label in examples]
+        data = [(f, y) for f, y in data if f]
+
+        bias = [0.0] * n_labels
+        dense: Dict[int, List[float]] = {}
+        rng = random.Random(seed)
+
+        for epoch in range(epochs):
+            rng.shuffle(data)
+            lr = learning_rate / (1 + epoch * 0.1)
+            for features, y in data:
+                scores = list(bias)
+                for bucket, value in features.items():
+                    row = dense.get(bucket)
+                    if row is not None:
+                        for k in range(n_labels):
+                            scores[k] += row[k] * value
+                top = max(scores)
+                exps = [math.exp(s - top) for s in scores]
+                total = sum(exps)
+                grads = [e / total for e in exps]
+                grads[y] -= 1.0
+
+                for k in range(n_labels):
+                    bias[k] -= lr * grads[k]
+                for bucket, value in features.items():
+                    row = dense.get(bucket)
+                    if row is None:
+                        row = dense[bucket] = [0.0] * n_labels
+                    for k in range(n_labels):
+                        row[k] -= lr * (grads[k] * value + l2 * row[k])
+
+        weights = {}
+        for bucket, row in dense.items():
+            sparse = [(k, round(w, 3)) for k, w in enumerate(row) if abs(w) >= WEIGHT_PRUNE]
+            if sparse:
+                weights[bucket] = sparse
+        return cls(labels, [round(b, 4) for b in bias], weights)
+
+    def to_dict(self) -> dict:
+        return {
+            "labels": self.labels,
+            "bias": self.bias,
+            "weights": {str(b): [[k, w] for k, w in row] for b, row in self.weights.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LinearHead":
+        weights = {
+            int(b): [(int(k), float(w)) for k, w in row]
+            for b, row in (data.get("weights") or {}).items()
+        }
+        return cls(data.get("labels") or [], data.get("bias"), weights)
+
+
+class LocalIntentModel:
+    def __init__(self, heads: Dict[str, LinearHead], meta: dict | None = None) -> None:
+        self.heads = heads
+        self.meta = meta or {}
+
+    def predict(self, head: str, text: str, allowed: Optional[Iterable[str]] = None) -> Tuple[Optional[str], float]:
+        model = self.heads.get(head)
+        if model is None:
+            return None, 0.0
+        return model.predict_proba(text, allowed=allowed)
+
+    def to_dict(self) -> dict:
+        return {
+            "format": "hashed-ngram-softmax/1",
+            "n_buckets": N_BUCKETS,
+            "char_ngrams": list(CHAR_NGRAMS),
+            "meta": self.meta,
+            "heads": {name: head.to_dict() for name, head in self.heads.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LocalIntentModel":
+        if data.get("n_buckets") != N_BUCKETS or tuple(data.get("char_ngrams") or ()) != CHAR_NGRAMS:
+            raise ValueError("artefato gerado com outra configuração de features")
+        heads = {name: LinearHead.from_dict(head) for name, head in (data.get("heads") or {}).items()}
+        return cls(heads, data.get("meta"))
+
+
+def save_model(model: LocalIntentModel, path: str) -> None:
+    """Grava de forma atômica (workers podem estar lendo)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(model.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def load_model(path: str) -> LocalIntentModel:
+    with open(path, "r", encoding="utf-8") as f:
+        return LocalIntentModel.from_dict(json.load(f))
+
+
+# ================================================================
+# Dados de treino a partir do agent_decision_log
+# ================================================================
+
+def split_holdout(text: str, folds: int = 5) -> bool:
+    """Split determinístico por texto: ~1/folds das mensagens vai para teste."""
+    return zlib.crc32(normalize_text(text).encode("utf-8")) % folds == 0
+
+
+def examples_from_decision_logs(rows) -> Dict[str, List[Tuple[str, str]]]:
+    """
+    rows: (raw_message, current_state, intent, intent_confidence, entities_json).
+    Só entram decisões fora de fluxo guiado, com confiança high/medium e
+    intents que dependem apenas do texto. Respostas curtas com
+    fenologia/objetivo extraídos viram exemplos dessas cabeças.
+    """
+    heads: Dict[str, List[Tuple[str, str]]] = {"intent": [], "fenologia": [], "visit_purpose": []}
+    for raw_message, current_state, intent, confidence, entities_json in rows:
+        text = (raw_message or "").strip()
+        if not text:
+            continue
+
+        if (
+            not (current_state or "").strip()
+            and intent
+            and intent not in CONTEXT_DEPENDENT_INTENTS
+            and (confidence or "").lower() in ("high", "medium")
+        ):
+            heads["intent"].append((text, intent))
+
+        if len(text.split()) > 4 or not entities_json:
+            continue
+        try:
+            entities = json.loads(entities_json)
+        except Exception:
+            continue
+        if not isinstance(entities, dict):
+            continue
+        fenologia = (entities.get("fenologia_real") or "").strip().upper()
+        if fenologia:
+            heads["fenologia"].append((text, fenologia))
+        purpose = (entities.get("visit_purpose") or "").strip()
+        if purpose:
+            heads["visit_purpose"].append((text, purpose))
+    return heads
+
+
+def evaluate(head: LinearHead, examples: Sequence[Tuple[str, str]],
+             threshold: float = LOCAL_MODEL_MIN_CONFIDENCE) -> dict:
+    """Acurácia geral, cobertura acima do limiar e acurácia na cobertura."""
+    total = correct = covered = covered_correct = 0
+    for text, label in examples:
+        predicted, prob = head.predict_proba(text)
+        total += 1
+        correct += predicted == label
+        if prob >= threshold:
+            covered += 1
+            covered_correct += predicted == label
+    return {
+        "examples": total,
+        "accuracy": round(correct / total, 4) if total else None,
+        "coverage": round(covered / total, 4) if total else None,
+        "accuracy_when_confident": round(covered_correct / covered, 4) if covered else None,
+        "threshold": threshold,
+    }
+
+
+def train_model(heads_examples: Dict[str, List[Tuple[str, str]]], **train_kwargs) -> LocalIntentModel:
+    heads = {}
+    meta = {"trained_at": datetime.utcnow().isoformat(timespec="seconds"), "heads": {}}
+    for name, examples in heads_examples.items():
+        train = [(t, y) for t, y in examples if not split_holdout(t)]
+        test = [(t, y) for t, y in examples if split_holdout(t)]
+        if len({y for _, y in train}) < 2:
+            continue
+        head = LinearHead.train(train, **train_kwargs)
+        heads[name] = head
+        meta["heads"][name] = {
+            "train_examples": len(train),
+            "labels": len(head.labels),
+            "buckets": len(head.weights),
+            "holdout": evaluate(head, test),
+        }
+    return LocalIntentModel(heads, meta)
+
+
+# ================================================================
+# Serviço em memória
+# ================================================================
+
+_state = {"model": None, "loaded": False}
+_lock = threading.Lock()
+
+
+def get_local_model() -> Optional[LocalIntentModel]:
+    if not is_enabled():
+        return None
+    if _state["loaded"]:
+        return _state["model"]
+    with _lock:
+        if not _state["loaded"]:
+            path = get_model_path()
+            try:
+                _state["model"] = load_model(path)
+            except FileNotFoundError:
+                _state["model"] = None
+            except Exception as e:
+                print(f"[LocalIntentModel] artefato inválido em {path}: {e}")
+                _state["model"] = None
+            _state["loaded"] = True
+    return _state["model"]
+
+
+def reload_local_model() -> None:
+    with _lock:
+        _state["model"] = None
+        _state["loaded"] = False
+
+
+def _confident(head: str, text: str, allowed=None, threshold: float | None = None) -> Tuple[Optional[str], float]:
+    model = get_local_model()
+    if model is None or not text or head not in model.heads:
+        return None, 0.0
+    # Palavra fora do vocabulário: a "confiança" viria só de n-gramas de caracteres
+    if not model.heads[head].known_words(text):
+        return None, 0.0
+    label, prob = model.predict(head, text, allowed=allowed)
+    if label is None or prob < (LOCAL_MODEL_MIN_CONFIDENCE if threshold is None else threshold):
+        return None, prob
+    return label, prob
+
+
+def predict_intent(text: str, threshold: float | None = None) -> Optional[Dict[str, object]]:
+    """Dict no formato do IntentClassifier, ou None abaixo do limiar."""
+    label, prob = _confident("intent", text, threshold=threshold)
+    if label is None or label == "UNKNOWN":
+        return None
+    if label in NEGATION_SENSITIVE_INTENTS and has_negation(text):
+        return None
+    return {
+        "intent": label,
+        "confidence": "high" if prob >= 0.9 else "medium",
+        "matched_by": "local_model",
+        "score": round(prob, 3),
+    }
+
+
+def predict_fenologia(text: str, purpose: str | None = None) -> Optional[str]:
+    model = get_local_model()
+    head = model.heads.get("fenologia") if model else None
+    allowed = None
+    if head is not None and purpose in ("Vegetativo", "Reprodutivo"):
+        prefix = "R" if purpose == "Reprodutivo" else "V"
+        allowed = [label for label in head.labels if label.startswith(prefix)]
+    label, _ = _confident("fenologia", text, allowed=allowed)
+    return label
+
+
+def predict_visit_purpose(text: str) -> Optional[str]:
+    label, _ = _confident("visit_purpose", text)
+    return label
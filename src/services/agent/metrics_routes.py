@@ -20,6 +20,10 @@ Endpoints:
     -> ultimas mensagens que cairam em UNKNOWN
        (util para saber o que o bot nao entendeu)
 
+  GET /api/agent/metrics/llm
+    -> chamadas a OpenAI por finalidade (latencia, tokens, cache hits,
+       erros) e estado do circuit breaker de cada modelo (deste worker)
+
 Estes endpoints sao apenas de LEITURA. Nao mexem em dado.
 ================================================================
 """
@@ -314,3 +318,14 @@ def embeddings_test():
 
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
+
+
+@agent_metrics_bp.route("/llm", methods=["GET"])
+def metrics_llm():
+    """Métricas do gateway de LLM deste worker."""
+    try:
+        from services.llm_gateway import get_llm_metrics
+
+        return jsonify({"ok": True, **get_llm_metrics()}), 200
+    except Exception as e:
+        return jsonify({"ok": False, "error": str(e)}), 500
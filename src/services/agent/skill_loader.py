@@ -1,34 +1,37 @@
 import os
-import json
 import re
-import time
+import threading
 from pathlib import Path
 from typing import Any, Dict, Optional
 
 
 SKILLS_DIR = Path(__file__).parent / "skills"
 
-# Cache de skills (carregadas uma vez, ficam em memória)
+# Cache de skills (carregadas uma vez, ficam em memória; compartilhado pelas threads)
 _skills_cache: Dict[str, str] = {}
+_skills_lock = threading.Lock()
 
 
 def load_skill(skill_name: str) -> Optional[str]:
     """Carrega skill do disco com cache em memória."""
-    if skill_name in _skills_cache:
-        return _skills_cache[skill_name]
+    with _skills_lock:
+        content = _skills_cache.get(skill_name)
+    if content is not None:
+        return content
 
     path = SKILLS_DIR / skill_name / "SKILL.md"
     if not path.exists():
         return None
 
     content = path.read_text(encoding="utf-8")
-    _skills_cache[skill_name] = content
-    return content
+    with _skills_lock:
+        return _skills_cache.setdefault(skill_name, content)
 
 
 def invalidate_skills_cache() -> None:
     """Limpa cache de skills. Chamar após editar SKILL.md em dev."""
-    _skills_cache.clear()
+    with _skills_lock:
+        _skills_cache.clear()
 
 
 def list_skills_metadata() -> Dict[str, str]:
@@ -46,24 +49,6 @@ def list_skills_metadata() -> Dict[str, str]:
     return metadata
 
 
-def _call_openai_with_retry(client, messages, max_retries: int = 3) -> str:
-    """Chama OpenAI com retry e exponential backoff."""
-    last_error = None
-    for attempt in range(max_retries):
-        try:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=messages,
-            )
-            return (response.choices[0].message.content or "").strip()
-        except Exception as e:
-            last_error = e
-            if attempt < max_retries - 1:
-                wait_time = (2 ** attempt) * 0.5  # 0.5s, 1s, 2s
-                time.sleep(wait_time)
-    raise last_error
-
-
 def interpret_with_skill(
     message_text: str,
     skill_name: str,
@@ -77,8 +62,7 @@ def interpret_with_skill(
         return None
 
     try:
-        from openai import OpenAI
-        client = OpenAI()
+        from services.llm_gateway import complete, is_json_object, parse_json_object
 
         system_prompt = (
             skill_content
@@ -95,17 +79,8 @@ def interpret_with_skill(
             {"role": "user", "content": user_prompt},
         ]
 
-        output = _call_openai_with_retry(client, messages)
-        if not output:
-            return None
-
-        try:
-            return json.loads(output)
-        except Exception:
-            match = re.search(r"\{.*\}", output, flags=re.DOTALL)
-            if not match:
-                return None
-            return json.loads(match.group(0))
+        output = complete(f"skill:{skill_name}", messages, model="gpt-4o-mini", validate=is_json_object)
+        return parse_json_object(output)
 
     except Exception as e:
         print(f"[SkillLoader] erro: {e}")
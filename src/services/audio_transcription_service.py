@@ -0,0 +1,260 @@
+"""
+Pipeline de transcrição de áudio (Telegram e app mobile).
+
+- Cache no banco (AudioTranscription) chaveado pelo sha256 do conteúdo e
+  pelo file_unique_id do Telegram: reenvios do webhook e áudios
+  encaminhados não baixam, não convertem e não transcrevem de novo.
+- Formatos aceitos direto pela API de transcrição (ogg/opus do Telegram,
+  webm do app, mp3, m4a, wav...) são enviados sem conversão; o ffmpeg só
+  entra quando o formato não é aceito ou quando o envio direto falha.
+- A conversão usa stdin/stdout do ffmpeg, sem arquivos temporários.
+- ffmpeg + OpenAI rodam num pool limitado por processo: uma rajada de
+  áudios não ocupa todos os workers, e o que passa do limite recebe erro
+  de "fila cheia" na hora em vez de travar a requisição.
+"""
+
+import hashlib
+import io
+import os
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from models import db, AudioTranscription
+
+
+TRANSCRIBE_MODEL = "gpt-4o-transcribe"
+TRANSCRIBE_PROMPT = (
+    "Contexto: assistente agrícola para consultores. "
+    "Termos comuns: visita, lavoura, soja, milho, fazenda, propriedade, talhão, "
+    "plantio, pulverização, pragas, doenças, defensivo, fertilizante, "
+    "V3, V4, V5, R1, R2, R3, R4, R5, R6, R7, R8, "
+    "variedades como AS 3815, AS 3707, K8575, S7025."
+)
+
+# Formatos aceitos pela API de transcrição sem conversão
+NATIVE_AUDIO_SUFFIXES = {
+    ".ogg", ".oga", ".opus", ".webm", ".mp3", ".mpga", ".mpeg",
+    ".m4a", ".mp4", ".wav", ".flac",
+}
+
+FFMPEG_TIMEOUT_SECONDS = int(os.getenv("AUDIO_FFMPEG_TIMEOUT", "60"))
+AUDIO_WORKERS = int(os.getenv("AUDIO_TRANSCRIBE_WORKERS", "2"))
+AUDIO_QUEUE_SIZE = int(os.getenv("AUDIO_TRANSCRIBE_QUEUE", "4"))
+AUDIO_JOB_TIMEOUT_SECONDS = int(os.getenv("AUDIO_TRANSCRIBE_TIMEOUT", "90"))
+# Prazo de cada envio à API (envio direto + fallback ffmpeg cabem no job)
+TRANSCRIBE_DEADLINE_SECONDS = int(os.getenv("AUDIO_TRANSCRIBE_DEADLINE", "40"))
+
+_pool = ThreadPoolExecutor(max_workers=AUDIO_WORKERS, thread_name_prefix="audio")
+_slots = threading.BoundedSemaphore(AUDIO_WORKERS + AUDIO_QUEUE_SIZE)
+_inflight = {}
+_inflight_lock = threading.RLock()
+
+
+def get_audio_content_hash(audio_bytes: bytes) -> str:
+    return hashlib.sha256(audio_bytes or b"").hexdigest()
+
+
+def normalize_audio_suffix(suffix: str) -> str:
+    suffix = (suffix or "").strip().lower()
+    if suffix and not suffix.startswith("."):
+        suffix = f".{suffix}"
+    return suffix
+
+
+# ============================================================
+# Cache (banco)
+# ============================================================
+
+def find_cached_transcription(content_hash: str = None, file_unique_id: str = None):
+    """Retorna o texto já transcrito para o áudio, ou None."""
+    try:
+        if file_unique_id:
+            row = AudioTranscription.query.filter_by(
+                telegram_file_unique_id=file_unique_id
+            ).first()
+            if row:
+                return row.text
+
+        if content_hash:
+            row = AudioTranscription.query.filter_by(content_hash=content_hash).first()
+            if row:
+                return row.text
+    except Exception as e:
+        print("⚠️ Falha ao consultar cache de transcrição:", e)
+        db.session.rollback()
+
+    return None
+
+
+def save_cached_transcription(
+    content_hash: str,
+    text: str,
+    file_unique_id: str = None,
+    source_format: str = None,
+    size_bytes: int = None,
+) -> None:
+    try:
+        row = AudioTranscription.query.filter_by(content_hash=content_hash).first()
+        if row:
+            if file_unique_id and not row.telegram_file_unique_id:
+                row.telegram_file_unique_id = file_unique_id
+        else:
+            db.session.add(AudioTranscription(
+                content_hash=content_hash,
+                telegram_file_unique_id=file_unique_id,
+                source_format=(source_format or "").lstrip(".")[:20] or None,
+                size_bytes=size_bytes,
+                text=text,
+            ))
+        db.session.commit()
+    except Exception as e:
+        # Corrida entre workers pelo mesmo hash: o outro já gravou
+        print("⚠️ Falha ao gravar cache de transcrição:", e)
+        db.session.rollback()
+
+
+# ============================================================
+# Conversão e transcrição
+# ============================================================
+
+def convert_audio_bytes_to_wav(audio_bytes: bytes, input_suffix: str = ".ogg"):
+    """
+    Converte áudio recebido em bytes para WAV 16 kHz mono usando ffmpeg
+    via pipes (stdin/stdout), sem arquivos temporários.
+    Retorna: (wav_bytes, erro)
+    """
+    fmt = normalize_audio_suffix(input_suffix).lstrip(".")
+
+    cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error"]
+    # Containers sem header de formato confiável (ogg/webm) se beneficiam
+    # de indicar o demuxer; os demais o ffmpeg detecta sozinho.
+    if fmt in ("ogg", "oga", "opus", "webm"):
+        cmd += ["-f", "webm" if fmt == "webm" else "ogg"]
+    cmd += ["-i", "pipe:0", "-ar", "16000", "-ac", "1", "-f", "wav", "pipe:1"]
+
+    try:
+        result = subprocess.run(
+            cmd,
+            input=audio_bytes,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=FFMPEG_TIMEOUT_SECONDS,
+        )
+    except Exception as e:
+        return None, str(e)
+
+    if result.returncode != 0 or not result.stdout:
+        return None, result.stderr.decode("utf-8", errors="ignore") or "ffmpeg sem saída"
+
+    return result.stdout, None
+
+
+def transcribe_audio_bytes(audio_bytes: bytes, filename: str = "audio.wav"):
+    """
+    Transcreve áudio usando OpenAI.
+    Retorna: (texto_transcrito, erro)
+    """
+    try:
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            return None, "OPENAI_API_KEY não configurada"
+
+        from services.llm_gateway import transcribe
+
+        audio_file = io.BytesIO(audio_bytes)
+        audio_file.name = filename
+
+        text = transcribe(
+            "audio_transcription",
+            audio_file,
+            model=TRANSCRIBE_MODEL,
+            deadline_seconds=TRANSCRIBE_DEADLINE_SECONDS,
+            language="pt",
+            prompt=TRANSCRIBE_PROMPT,
+        )
+
+        if not text:
+            return None, "transcrição vazia"
+
+        return text, None
+
+    except Exception as e:
+        print("DEBUG transcribe_audio_bytes exception:", repr(e))
+        return None, str(e)
+
+
+def _transcribe_job(audio_bytes: bytes, suffix: str):
+    """Executado no pool: envio direto quando possível, senão ffmpeg."""
+    if not os.getenv("OPENAI_API_KEY"):
+        return None, "OPENAI_API_KEY não configurada"
+
+    if suffix in NATIVE_AUDIO_SUFFIXES:
+        text, error = transcribe_audio_bytes(audio_bytes, filename=f"audio{suffix}")
+        if text:
+            return text, None
+        print(f"⚠️ Transcrição direta ({suffix}) falhou, convertendo: {error}")
+
+    wav_bytes, convert_error = convert_audio_bytes_to_wav(audio_bytes, input_suffix=suffix)
+    if convert_error or not wav_bytes:
+        return None, f"conversão falhou: {convert_error}"
+
+    return transcribe_audio_bytes(wav_bytes, filename="audio.wav")
+
+
+def _run_bounded(key: str, audio_bytes: bytes, suffix: str):
+    """
+    Roda o job no pool limitado. Requisições simultâneas para o mesmo
+    áudio (retry do Telegram) aguardam o mesmo job em vez de criar outro.
+    """
+    with _inflight_lock:
+        future = _inflight.get(key)
+        if future is None:
+            if not _slots.acquire(blocking=False):
+                return None, "fila de transcrição cheia"
+
+            future = _pool.submit(_transcribe_job, audio_bytes, suffix)
+            _inflight[key] = future
+
+            def _release(_f, _key=key):
+                with _inflight_lock:
+                    _inflight.pop(_key, None)
+                _slots.release()
+
+            future.add_done_callback(_release)
+
+    try:
+        return future.result(timeout=AUDIO_JOB_TIMEOUT_SECONDS)
+    except FutureTimeoutError:
+        return None, "tempo de transcrição esgotado"
+    except Exception as e:
+        return None, str(e)
+
+
+def transcribe_audio(audio_bytes: bytes, suffix: str = ".ogg", file_unique_id: str = None):
+    """
+    Ponto de entrada do pipeline: cache → pool limitado → cache.
+    Retorna: (texto_transcrito, erro)
+    """
+    if not audio_bytes:
+        return None, "áudio vazio"
+
+    suffix = normalize_audio_suffix(suffix) or ".ogg"
+    content_hash = get_audio_content_hash(audio_bytes)
+
+    cached = find_cached_transcription(content_hash=content_hash, file_unique_id=file_unique_id)
+    if cached:
+        return cached, None
+
+    text, error = _run_bounded(content_hash, audio_bytes, suffix)
+    if error or not text:
+        return None, error or "transcrição vazia"
+
+    save_cached_transcription(
+        content_hash=content_hash,
+        text=text,
+        file_unique_id=file_unique_id,
+        source_format=suffix,
+        size_bytes=len(audio_bytes),
+    )
+    return text, None
@@ -1,12 +1,11 @@
 import re
-import os
-import requests
 import unicodedata
 from datetime import date, timedelta
 from typing import Any, Dict, List, Optional
 from dataclasses import dataclass, field
 
 from services.agent.agro_knowledge import infer_culture, extract_variety_with_culture
+from services.telegram_client import get_telegram_client
 
 
 def normalize_text(text: str) -> str:
@@ -723,36 +722,7 @@ class ChatbotService:
 
 
 def send_telegram_document(chat_id: str, file_bytes: bytes, filename: str, caption: str = "") -> Dict[str, Any]:
-    token = os.getenv("TELEGRAM_BOT_TOKEN")
-    if not token:
-        return {
-            "ok": False,
-            "error": "TELEGRAM_BOT_TOKEN not configured"
-        }
-
-    url = f"https://api.telegram.org/bot{token}/sendDocument"
-
-    files = {
-        "document": (filename, file_bytes, "application/pdf")
-    }
-    data = {
-        "chat_id": chat_id,
-        "caption": caption or ""
-    }
-
-    try:
-        response = requests.post(url, data=data, files=files, timeout=60)
-        return {
-            "ok": response.ok,
-            "status_code": response.status_code,
-            "response": response.json() if response.content else {}
-        }
-    except Exception as e:
-        return {
-            "ok": False,
-            "error": str(e)
-        }
-
+    return get_telegram_client().send_document(chat_id, file_bytes, filename, caption=caption)
 
 
 def send_telegram_message(
@@ -761,68 +731,14 @@ def send_telegram_message(
     parse_mode: str = None,
     reply_markup: Dict[str, Any] = None
 ) -> Dict[str, Any]:
-    token = os.getenv("TELEGRAM_BOT_TOKEN")
-    if not token:
-        return {
-            "ok": False,
-            "error": "TELEGRAM_BOT_TOKEN not configured"
-        }
-
-    url = f"https://api.telegram.org/bot{token}/sendMessage"
-
-    payload = {
-        "chat_id": chat_id,
-        "text": text,
-    }
-
-    if parse_mode:
-        payload["parse_mode"] = parse_mode
-
-    if reply_markup:
-        payload["reply_markup"] = reply_markup
-
-    try:
-        response = requests.post(url, json=payload, timeout=20)
-        return {
-            "ok": response.ok,
-            "status_code": response.status_code,
-            "response": response.json() if response.content else {}
-        }
-    except Exception as e:
-        return {
-            "ok": False,
-            "error": str(e)
-        }
+    return get_telegram_client().send_message(
+        chat_id,
+        text,
+        parse_mode=parse_mode,
+        reply_markup=reply_markup,
+    )
 
 
 def send_telegram_photo(chat_id: str, photo_url: str, caption: str = None) -> Dict[str, Any]:
     """Envia uma foto via Telegram."""
-    token = os.getenv("TELEGRAM_BOT_TOKEN")
-    if not token:
-        return {
-            "ok": False,
-            "error": "TELEGRAM_BOT_TOKEN not configured"
-        }
-
-    url = f"https://api.telegram.org/bot{token}/sendPhoto"
-
-    payload = {
-        "chat_id": chat_id,
-        "photo": photo_url,
-    }
-
-    if caption:
-        payload["caption"] = caption
-
-    try:
-        response = requests.post(url, json=payload, timeout=30)
-        return {
-            "ok": response.ok,
-            "status_code": response.status_code,
-            "response": response.json() if response.content else {}
-        }
-    except Exception as e:
-        return {
-            "ok": False,
-            "error": str(e)
-        }
\ No newline at end of file
+    return get_telegram_client().send_photo(chat_id, photo_url, caption=caption)
@@ -0,0 +1,119 @@
+"""
+Busca de ciclos (plantios) de um cliente para o agente.
+
+Um único SELECT faz o join Planting → Plot → Property filtrado por
+client_id (índices compostos plots(property_id, id) e
+plantings(plot_id, planting_date)), então o custo é proporcional aos
+plantios do cliente e não à tabela inteira.
+
+O resultado fica num cache por cliente (tuplas simples, sem objetos ORM).
+Qualquer commit que grave Planting, Plot ou Property limpa o cache deste
+worker; o TTL limita o tempo que outros workers enxergam dados antigos.
+"""
+
+import os
+import threading
+import time
+from collections import namedtuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import db, Planting, Plot, Property
+
+
+CYCLE_CACHE_TTL_SECONDS = int(os.getenv("CYCLE_CACHE_TTL", "120"))
+CYCLE_CACHE_MAX_CLIENTS = 1024
+
+ClientCycle = namedtuple("ClientCycle", [
+    "planting_id",
+    "plot_id",
+    "plot_name",
+    "property_id",
+    "property_name",
+    "culture",
+    "variety",
+    "planting_date",
+])
+
+_cache: dict = {}
+_cache_lock = threading.Lock()
+
+_CYCLE_MODELS = (Planting, Plot, Property)
+
+
+def invalidate_client_cycles(client_id: int | None = None) -> None:
+    """Remove o cliente (ou todos) do cache."""
+    with _cache_lock:
+        if client_id is None:
+            _cache.clear()
+        else:
+            _cache.pop(client_id, None)
+
+
+def load_client_cycles(client_id: int) -> list:
+    """Plantios do cliente, mais recentes primeiro (sem cache)."""
+    rows = (
+        db.session.query(
+            Planting.id,
+            Plot.id,
+            Plot.name,
+            Property.id,
+            Property.name,
+            Planting.culture,
+            Planting.variety,
+            Planting.planting_date,
+        )
+        .join(Plot, Plot.id == Planting.plot_id)
+        .join(Property, Property.id == Plot.property_id)
+        .filter(Property.client_id == client_id)
+        .order_by(Planting.planting_date.desc().nullslast(), Planting.id.desc())
+        .all()
+    )
+    return [ClientCycle(*row) for row in rows]
+
+
+def get_client_cycles(client_id: int) -> list:
+    """Plantios do cliente com cache por cliente."""
+    if not client_id:
+        return []
+
+    now = time.monotonic()
+    with _cache_lock:
+        cached = _cache.get(client_id)
+        if cached and cached[0] > now:
+            return cached[1]
+
+    cycles = load_client_cycles(client_id)
+
+    with _cache_lock:
+        if len(_cache) >= CYCLE_CACHE_MAX_CLIENTS:
+            _cache.clear()
+        _cache[client_id] = (now + CYCLE_CACHE_TTL_SECONDS, cycles)
+
+    return cycles
+
+
+# ============================================================
+# Invalidação em gravações de Planting / Plot / Property
+# ============================================================
+
+def _touches_cycles(session) -> bool:
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, _CYCLE_MODELS):
+            return True
+    return False
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_cycles_dirty(session, flush_context):
+    if _touches_cycles(session):
+        session.info["cycles_dirty"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    # Um rollback não limpa a marca: no pior caso o próximo commit invalida à toa
+    if session.info.pop("cycles_dirty", False):
+        invalidate_client_cycles()
+
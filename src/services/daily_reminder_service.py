@@ -0,0 +1,102 @@
+"""
+Execução do lembrete diário (cron /api/cron/daily-reminders).
+
+1. Consultores com Telegram vinculado: 1 query (join binding → consultor).
+2. Insights de todos: 3 queries agrupadas (get_insights_for_consultants).
+3. Textos montados em memória; envio pelo sender com limite global e
+   por chat, concorrente e com retry (services.telegram_sender).
+4. Relatório da execução gravado em reminder_runs.
+"""
+
+import json
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from models import db, ReminderRun
+from services.proactive_insights import (
+    build_daily_reminder_text_from_insights,
+    get_all_consultants_for_daily_reminder,
+    get_insights_for_consultants,
+)
+from services.telegram_sender import send_telegram_messages
+
+
+def run_daily_reminders(send=None, persist: bool = True) -> Dict[str, Any]:
+    """
+    Calcula e envia o lembrete de todos os consultores vinculados.
+    Retorna o relatório da execução (mesmo conteúdo gravado em reminder_runs).
+    """
+    started_at = datetime.utcnow()
+    started = time.monotonic()
+
+    consultants = get_all_consultants_for_daily_reminder()
+    insights_by_id = get_insights_for_consultants(c["consultant_id"] for c in consultants)
+
+    results = []
+    messages = []
+    for c in consultants:
+        entry = {
+            "consultant_id": c["consultant_id"],
+            "chat_id": c["telegram_chat_id"],
+            "status": "skipped",
+            "attempts": 0,
+            "error": None,
+        }
+        results.append(entry)
+
+        try:
+            insights = insights_by_id.get(c["consultant_id"])
+            text = build_daily_reminder_text_from_insights(insights, c["consultant_name"]) if insights else None
+        except Exception as e:
+            entry["status"] = "failed"
+            entry["error"] = str(e)
+            continue
+
+        if text:
+            messages.append({"key": len(results) - 1, "chat_id": c["telegram_chat_id"], "text": text})
+
+    send_kwargs = {"send": send} if send else {}
+    for outcome in send_telegram_messages(messages, **send_kwargs):
+        entry = results[outcome["key"]]
+        entry["status"] = "sent" if outcome["ok"] else "failed"
+        entry["attempts"] = outcome["attempts"]
+        entry["error"] = outcome["error"]
+
+    report = {
+        "started_at": started_at.isoformat(),
+        "duration_ms": int((time.monotonic() - started) * 1000),
+        "total_consultants": len(consultants),
+        "sent": sum(1 for r in results if r["status"] == "sent"),
+        "skipped": sum(1 for r in results if r["status"] == "skipped"),
+        "failed": sum(1 for r in results if r["status"] == "failed"),
+        "results": results,
+        "run_id": None,
+    }
+
+    if persist:
+        report["run_id"] = save_reminder_run(report, started_at)
+
+    return report
+
+
+def save_reminder_run(report: Dict[str, Any], started_at: datetime, kind: str = "daily") -> Optional[int]:
+    try:
+        run = ReminderRun(
+            kind=kind,
+            started_at=started_at,
+            finished_at=datetime.utcnow(),
+            duration_ms=report["duration_ms"],
+            total_consultants=report["total_consultants"],
+            sent=report["sent"],
+            skipped=report["skipped"],
+            failed=report["failed"],
+            results_json=json.dumps(report["results"], ensure_ascii=False),
+        )
+        db.session.add(run)
+        db.session.commit()
+        return run.id
+    except Exception as e:
+        db.session.rollback()
+        print("⚠️ Falha ao gravar relatório do lembrete diário:", e)
+        return None
@@ -2,21 +2,26 @@
 excel_report_service.py — v5 (PowerBI-inspired redesign)
 """
 
+import threading
 from io import BytesIO
-from datetime import date as _date, datetime, timedelta
-import datetime as _dt
-from collections import Counter, defaultdict
+from datetime import date as _date, datetime
+from contextlib import contextmanager
 
 from flask import jsonify, send_file
+from sqlalchemy import event
 from openpyxl import Workbook
 from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
 from openpyxl.chart import BarChart, Reference
 from openpyxl.chart.shapes import GraphicalProperties
 from openpyxl.formatting.rule import DataBarRule, CellIsRule
-from models import db, Visit
-
-META_VISITAS_CLIENTE = 5
+from models import db
+from services.report_engine import (
+    META_VISITAS_CLIENTE,
+    build_report,
+    filters_label,
+    from_ordinal,
+)
 
 # ── Palette ──────────────────────────────────────────────────────────
 NAV_DARKEST    = "0F172A"   # banner background (near-black navy)
@@ -122,11 +127,6 @@ def _translate_status(status):
     return mapping.get((status or "").lower(), status or "—")
 
 
-def _has_valid_photo(visit):
-    photos = getattr(visit, "photos", []) or []
-    return any(getattr(p, "url", None) for p in photos)
-
-
 def _truncate(text, limit=200):
     if not text:
         return ""
@@ -136,238 +136,55 @@ def _truncate(text, limit=200):
     return text[:limit].rstrip() + "…"
 
 
-def _build_consultants_map():
-    consultants_map = {}
-    try:
-        from models import Consultant
-        consultants_map = {c.id: c.name for c in Consultant.query.all()}
-        if consultants_map:
-            return consultants_map
-    except Exception as e:
-        print(f"[excel_report] Consultant.query falhou: {e}")
-    try:
-        from routes import CONSULTANTS
-        consultants_map = {c["id"]: c["name"] for c in CONSULTANTS}
-    except Exception:
-        pass
-    return consultants_map
+# ── Contador de queries (header de debug do relatório) ───────────────
 
+_query_count = threading.local()
+_listening_engines = set()
+_listening_lock = threading.Lock()
 
-def _resolve_visit_culture(visit):
-    c = (visit.culture or "").strip()
-    if c:
-        return c
-    planting = getattr(visit, "planting", None)
-    if planting:
-        c = (getattr(planting, "culture", None) or "").strip()
-        if c:
-            return c
-    return ""
 
+def _on_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if getattr(_query_count, "value", None) is not None:
+        _query_count.value += 1
 
-def _build_active_clients_for_seasons(seasons_list, region_filter=None):
-    from models import Planting, Plot, Property, Client
 
-    if not seasons_list:
-        return set()
+@contextmanager
+def _count_queries():
+    """Conta as queries desta thread dentro do bloco (counter["queries"])."""
+    engine = db.engine
+    with _listening_lock:
+        if id(engine) not in _listening_engines:
+            event.listen(engine, "before_cursor_execute", _on_cursor_execute)
+            _listening_engines.add(id(engine))
 
-    plantings_q = (
-        Planting.query
-        .join(Plot, Planting.plot_id == Plot.id)
-        .join(Property, Plot.property_id == Property.id)
-        .join(Client, Property.client_id == Client.id)
-    )
-    if region_filter:
-        plantings_q = plantings_q.filter(Client.region == region_filter)
-
-    plantings = plantings_q.all()
-
-    active_ids = set()
-    for p in plantings:
-        if not p.planting_date or not p.culture:
-            continue
-        culture_norm = (p.culture or "").strip().lower()
-        for s in seasons_list:
-            if culture_norm != s["culture"].strip().lower():
-                continue
-            try:
-                s_start = _date.fromisoformat(s["start"])
-                s_end = _date.fromisoformat(s["end"])
-            except Exception:
-                continue
-            if s_start <= p.planting_date <= s_end:
-                try:
-                    cid = p.plot.property.client_id if p.plot and p.plot.property else None
-                    if cid:
-                        active_ids.add(cid)
-                except Exception:
-                    pass
-                break
-
-    return active_ids
-
-
-def _dedupe_visits(visits_list):
-    grouped = {}
-    for v in visits_list:
-        if not v.client_id or not v.date:
-            continue
-        culture = _resolve_visit_culture(v)
-        key = (v.client_id, v.date, culture)
-        if key not in grouped:
-            grouped[key] = {
-                "client_id": v.client_id,
-                "date": v.date,
-                "culture": culture,
-                "consultant_id": v.consultant_id,
-                "has_photo": _has_valid_photo(v),
-                "launches": [v],
-            }
-        else:
-            grouped[key]["launches"].append(v)
-            if _has_valid_photo(v):
-                grouped[key]["has_photo"] = True
-            if not grouped[key]["consultant_id"]:
-                grouped[key]["consultant_id"] = v.consultant_id
+    counter = {"queries": 0}
+    _query_count.value = 0
+    try:
+        yield counter
+    finally:
+        counter["queries"] = _query_count.value
+        _query_count.value = None
 
-    return list(grouped.values())
 
+def generate_monthly_xlsx(request):
+    with _count_queries() as counter:
+        response = _generate_monthly_xlsx(request)
 
-def _week_label(d):
-    iso_year, iso_week, _ = d.isocalendar()
-    monday = d - timedelta(days=d.weekday())
-    sunday = monday + timedelta(days=6)
-    return f"{monday.strftime('%d/%m')}–{sunday.strftime('%d/%m')}", (iso_year, iso_week)
+    if not isinstance(response, tuple):
+        response.headers["X-Report-Query-Count"] = str(counter["queries"])
+    return response
 
 
-def generate_monthly_xlsx(request):
+def _generate_monthly_xlsx(request):
     try:
-        from models import (
-            Visit, Client, Property, Plot,
-            get_season_by_key, AVAILABLE_SEASONS,
-        )
-
-        month = request.args.get("month")
-        start = request.args.get("start")
-        end = request.args.get("end")
-
-        filter_region = (request.args.get("region") or "").strip()
-        filter_season_key = (request.args.get("season") or "").strip()
-        filter_consultant_id = (request.args.get("consultant") or "").strip()
         try:
-            filter_consultant_id = int(filter_consultant_id) if filter_consultant_id else None
-        except ValueError:
-            filter_consultant_id = None
-
-        if month:
-            y, m = [int(x) for x in month.split("-")]
-            start_date = _date(y, m, 1)
-            next_month = _date(y + 1, 1, 1) if m == 12 else _date(y, m + 1, 1)
-            end_date = next_month - _dt.timedelta(days=1)
-        else:
-            if not start or not end:
-                return jsonify(message="Informe ?month=YYYY-MM ou ?start=YYYY-MM-DD&end=YYYY-MM-DD"), 400
-            start_date = _date.fromisoformat(start)
-            end_date = _date.fromisoformat(end)
-
-        season = get_season_by_key(filter_season_key) if filter_season_key else None
-        if season:
-            season_start = _date.fromisoformat(season["start"])
-            season_end = _date.fromisoformat(season["end"])
-            start_date = max(start_date, season_start)
-            end_date = min(end_date, season_end)
-            seasons_for_carteira = [season]
-            season_culture = season["culture"]
-        else:
-            seasons_for_carteira = AVAILABLE_SEASONS
-            season_culture = None
-
-        carteira_ids = _build_active_clients_for_seasons(
-            seasons_for_carteira,
-            region_filter=filter_region or None,
-        )
+            params, data, kpis = build_report(request.args)
+        except ValueError as e:
+            return jsonify(message=str(e)), 400
 
-        visits_clients_q = (
-            db.session.query(Visit.client_id)
-            .filter(Visit.date >= start_date)
-            .filter(Visit.date <= end_date)
-            .filter(Visit.client_id.isnot(None))
-        )
-        if filter_consultant_id:
-            visits_clients_q = visits_clients_q.filter(Visit.consultant_id == filter_consultant_id)
-
-        visits_clients_ids = {row[0] for row in visits_clients_q.distinct().all()}
-        effective_client_ids = carteira_ids | visits_clients_ids
-        total_clients = len(carteira_ids)
-
-        if effective_client_ids:
-            visits_query = (
-                Visit.query
-                .filter(Visit.date >= start_date)
-                .filter(Visit.date <= end_date)
-                .filter(Visit.client_id.in_(effective_client_ids))
-            )
-            if filter_consultant_id:
-                visits_query = visits_query.filter(Visit.consultant_id == filter_consultant_id)
-            visits_raw = visits_query.order_by(Visit.date.asc().nullslast()).all()
-        else:
-            visits_raw = []
-
-        if season_culture:
-            sc_norm = season_culture.strip().lower()
-            visits_raw = [
-                v for v in visits_raw
-                if _resolve_visit_culture(v).strip().lower() == sc_norm
-            ]
-
-        unique_visits = _dedupe_visits(visits_raw)
-
-        client_ids_in_visits = sorted({v["client_id"] for v in unique_visits if v["client_id"]})
-        prop_ids = sorted({l.property_id for v in unique_visits for l in v["launches"] if l.property_id})
-        plot_ids = sorted({l.plot_id for v in unique_visits for l in v["launches"] if l.plot_id})
-
-        all_client_ids = sorted(carteira_ids | set(client_ids_in_visits))
-        total_clients = len(all_client_ids)
-        clients_map = (
-            {c.id: c.name for c in Client.query.filter(Client.id.in_(all_client_ids)).all()}
-            if all_client_ids else {}
-        )
-        props_map = (
-            {p.id: p.name for p in Property.query.filter(Property.id.in_(prop_ids)).all()}
-            if prop_ids else {}
-        )
-        plots_map = (
-            {pl.id: pl.name for pl in Plot.query.filter(Plot.id.in_(plot_ids)).all()}
-            if plot_ids else {}
-        )
-        consultants_map = _build_consultants_map()
-
-        total_visits_unique = len(unique_visits)
-        visits_with_photo = sum(1 for v in unique_visits if v["has_photo"])
-        total_launches_with_photo = sum(
-            1 for v in unique_visits for l in v["launches"] if _has_valid_photo(l)
-        )
-        unique_clients_attended = len({v["client_id"] for v in unique_visits if v["has_photo"]})
-        coverage = (unique_clients_attended / total_clients) if total_clients else 0
-
-        photo_visits_by_client = Counter()
-        for v in unique_visits:
-            if v["has_photo"]:
-                photo_visits_by_client[v["client_id"]] += 1
-
-        clients_in_target = sum(
-            1 for cnt in photo_visits_by_client.values() if cnt >= META_VISITAS_CLIENTE
-        )
-
-        meta_total = total_clients * META_VISITAS_CLIENTE
-        target_pct = (visits_with_photo / meta_total) if meta_total else 0
-
-        filter_labels = []
-        if filter_region:
-            filter_labels.append(f"Região: {filter_region}")
-        if season:
-            filter_labels.append(f"Safra: {season['label']} ({season['culture']})")
-        filters_applied = " • ".join(filter_labels) if filter_labels else "Carteira completa (todas as safras conhecidas)"
+        start_date, end_date = params.start_date, params.end_date
+        filters_applied = filters_label(params)
+        all_client_ids = set(data.all_client_ids)
 
         wb = Workbook()
         wb.remove(wb.active)
@@ -379,29 +196,19 @@ def generate_monthly_xlsx(request):
         period_label = f"{start_date.strftime('%d/%m/%Y')} a {end_date.strftime('%d/%m/%Y')}"
 
         _render_dashboard(
-            ws_dash, unique_visits, period_label, filters_applied,
-            total_visits_unique, visits_with_photo, total_launches_with_photo,
-            total_clients,
-            coverage, clients_in_target, target_pct, meta_total,
-            unique_clients_attended,
-            photo_visits_by_client, clients_map, consultants_map,
-            set(all_client_ids)
+            ws_dash, kpis, period_label, filters_applied,
+            data.clients_map, data.consultants_map, all_client_ids
         )
         _render_visits(
-            ws_visits, visits_raw, period_label,
-            total_launches_with_photo, unique_clients_attended,
-            clients_map, props_map, plots_map, consultants_map,
+            ws_visits, data, period_label,
+            kpis.total_launches_with_photo, kpis.unique_clients_attended,
             filters_applied
         )
         _render_atraso(
-            ws_atraso, total_clients, photo_visits_by_client, clients_map,
-            period_label, filters_applied, set(all_client_ids)
-        )
-        _render_products(
-            ws_prods, visits_raw, period_label,
-            clients_map, props_map, consultants_map,
-            filters_applied
+            ws_atraso, kpis.total_clients, kpis.photo_visits_by_client, data.clients_map,
+            period_label, filters_applied, all_client_ids
         )
+        _render_products(ws_prods, data, period_label, filters_applied)
 
         bio = BytesIO()
         wb.save(bio)
@@ -494,14 +301,19 @@ def _style_header_row(ws, row, col_start, col_end, s):
 
 
 def _render_dashboard(
-    ws, unique_visits, period_label, filters_applied,
-    total_visits_unique, visits_with_photo, total_launches_with_photo,
-    total_clients,
-    coverage, clients_in_target, target_pct, meta_total,
-    unique_clients_attended,
-    photo_visits_by_client, clients_map, consultants_map,
-    effective_client_ids
+    ws, kpis, period_label, filters_applied,
+    clients_map, consultants_map, effective_client_ids
 ):
+    visits_with_photo = kpis.visits_with_photo
+    total_launches_with_photo = kpis.total_launches_with_photo
+    total_clients = kpis.total_clients
+    coverage = kpis.coverage
+    clients_in_target = kpis.clients_in_target
+    target_pct = kpis.target_pct
+    meta_total = kpis.meta_total
+    unique_clients_attended = kpis.unique_clients_attended
+    photo_visits_by_client = kpis.photo_visits_by_client
+
     s = _styles()
     ws.sheet_view.showGridLines = False
     ws.sheet_view.zoomScale = 100
@@ -594,12 +406,8 @@ def _render_dashboard(
     ws["C16"] = "% do total"
     _style_header_row(ws, 16, 1, 3, s)
 
-    cons_counts = Counter(
-        v["consultant_id"] for v in unique_visits
-        if v["consultant_id"] and v["has_photo"]
-    )
     r = 17
-    for cid, cnt in cons_counts.most_common():
+    for cid, cnt in kpis.consultant_counts.most_common():
         ws[f"A{r}"] = consultants_map.get(cid, f"Consultor #{cid}")
         ws[f"B{r}"] = cnt
         ws[f"C{r}"] = (cnt / visits_with_photo) if visits_with_photo else 0
@@ -621,15 +429,8 @@ def _render_dashboard(
     ws["G16"] = "% do total"
     _style_header_row(ws, 16, 5, 7, s)
 
-    cult_counts = Counter()
-    for v in unique_visits:
-        if not v["has_photo"]:
-            continue
-        cult = (v["culture"] or "—").strip() or "—"
-        cult_counts[cult] += 1
-
     r = 17
-    for culture, cnt in cult_counts.most_common():
+    for culture, cnt in kpis.culture_counts.most_common():
         ws[f"E{r}"] = culture
         ws[f"F{r}"] = cnt
         ws[f"G{r}"] = (cnt / visits_with_photo) if visits_with_photo else 0
@@ -668,18 +469,6 @@ def _render_dashboard(
         r += 1
 
     # ── Weekly chart ─────────────────────────────────────────────────
-    week_buckets = defaultdict(lambda: {"label": "", "key": None, "count": 0})
-    for v in unique_visits:
-        if not v["date"] or not v["has_photo"]:
-            continue
-        label, key = _week_label(v["date"])
-        bucket = week_buckets[key]
-        bucket["label"] = label
-        bucket["key"] = key
-        bucket["count"] += 1
-
-    weeks_sorted = sorted(week_buckets.values(), key=lambda x: x["key"])
-
     section_row_days = 27
     ws.row_dimensions[section_row_days].height = 24
     ws.row_dimensions[section_row_days + 1].height = 22
@@ -694,9 +483,9 @@ def _render_dashboard(
     _style_header_row(ws, section_row_days + 1, 1, 2, s)
 
     r = section_row_days + 2
-    for w in weeks_sorted:
-        ws[f"A{r}"] = w["label"]
-        ws[f"B{r}"] = w["count"]
+    for label, count in kpis.weeks:
+        ws[f"A{r}"] = label
+        ws[f"B{r}"] = count
         ws.row_dimensions[r].height = 22
         for col in (1, 2):
             ws.cell(r, col).border = s["border_data"]
@@ -823,8 +612,7 @@ def _render_dashboard(
     ws.column_dimensions["L"].width = 14
 
 
-def _render_visits(ws, visits_raw, period_label, total_lancamentos, unique_clients,
-                   clients_map, props_map, plots_map, consultants_map,
+def _render_visits(ws, data, period_label, total_lancamentos, unique_clients,
                    filters_applied):
     s = _styles()
     ws.sheet_view.showGridLines = False
@@ -873,43 +661,47 @@ def _render_visits(ws, visits_raw, period_label, total_lancamentos, unique_clien
     ws.row_dimensions[header_row].height = 26
     ws.freeze_panes = "A7"
 
+    clients_map, props_map = data.clients_map, data.props_map
+    plots_map, consultants_map = data.plots_map, data.consultants_map
+    v = data.visits
+    text = data.strings.decode
+
     row_idx = header_row
-    for v in visits_raw:
+    for i in range(data.visit_count):
         row_idx += 1
         ws.row_dimensions[row_idx].height = 18
 
-        client_name = clients_map.get(v.client_id, "—") if v.client_id else "—"
-        prop_name = props_map.get(v.property_id, "—") if v.property_id else "—"
-        plot_name = plots_map.get(v.plot_id, "—") if v.plot_id else "—"
-        cons_name = consultants_map.get(v.consultant_id, f"#{v.consultant_id}" if v.consultant_id else "—")
+        client_id, property_id = v["client_id"][i], v["property_id"][i]
+        plot_id, consultant_id = v["plot_id"][i], v["consultant_id"][i]
+        visit_date = from_ordinal(v["date"][i])
+
+        client_name = clients_map.get(client_id, "—") if client_id else "—"
+        prop_name = props_map.get(property_id, "—") if property_id else "—"
+        plot_name = plots_map.get(plot_id, "—") if plot_id else "—"
+        cons_name = consultants_map.get(consultant_id, f"#{consultant_id}") if consultant_id else "—"
 
-        culture = _resolve_visit_culture(v) or "—"
-        variety = v.variety or (v.planting.variety if getattr(v, "planting", None) else "—")
+        culture = text(v["culture"][i]) or "—"
+        variety = text(v["variety"][i]) or (text(v["planting_variety"][i]) if v["has_planting"][i] else "—")
 
         dias_plantio = "—"
-        planting = getattr(v, "planting", None)
-        planting_date = getattr(planting, "planting_date", None) if planting else None
-        if planting_date and v.date:
-            try:
-                dias_plantio = (v.date - planting_date).days
-            except Exception:
-                dias_plantio = "—"
-
-        has_photo = "Sim" if _has_valid_photo(v) else "Não"
-        status_pt = _translate_status(v.status)
-        obs = _truncate(v.recommendation, 200)
+        if v["planting_date"][i] and v["date"][i]:
+            dias_plantio = v["date"][i] - v["planting_date"][i]
+
+        has_photo = "Sim" if v["has_photo"][i] else "Não"
+        status_pt = _translate_status(text(v["status"][i]))
+        obs = _truncate(data.recommendations[i], 200)
 
         row_values = [
-            _br_date(v.date), client_name, prop_name, plot_name, cons_name,
-            culture, variety, v.fenologia_real or "—", status_pt, has_photo,
+            _br_date(visit_date), client_name, prop_name, plot_name, cons_name,
+            culture, variety, text(v["fenologia"][i]) or "—", status_pt, has_photo,
             dias_plantio, obs,
         ]
-        for i, val in enumerate(row_values, start=1):
-            cell = ws.cell(row=row_idx, column=i)
+        for col, val in enumerate(row_values, start=1):
+            cell = ws.cell(row=row_idx, column=col)
             cell.value = val
             cell.border = s["border_data"]
             cell.font = s["row_font"]
-            cell.alignment = s["center"] if i in (1, 9, 10, 11) else s["left"]
+            cell.alignment = s["center"] if col in (1, 9, 10, 11) else s["left"]
             if (row_idx - header_row) % 2 == 0:
                 cell.fill = s["zebra_fill"]
 
@@ -1024,9 +816,7 @@ def _render_atraso(ws, total_clients, photo_visits_by_client, clients_map,
         ws.column_dimensions[get_column_letter(i)].width = w
 
 
-def _render_products(ws, visits_raw, period_label,
-                     clients_map, props_map, consultants_map,
-                     filters_applied):
+def _render_products(ws, data, period_label, filters_applied):
     s = _styles()
     ws.sheet_view.showGridLines = False
 
@@ -1065,42 +855,41 @@ def _render_products(ws, visits_raw, period_label,
     ws.row_dimensions[header_row].height = 26
     ws.freeze_panes = "A7"
 
+    clients_map, props_map, consultants_map = data.clients_map, data.props_map, data.consultants_map
+    v, p = data.visits, data.products
+    text = data.strings.decode
+
     r = header_row + 1
     has_data = False
-    for v in visits_raw:
-        produtos = getattr(v, "products", None) or []
-        for p in produtos:
-            has_data = True
-            client_name = clients_map.get(v.client_id, "—") if v.client_id else "—"
-            prop_name = props_map.get(v.property_id, "—") if v.property_id else "—"
-            cons_name = consultants_map.get(v.consultant_id, "—") if v.consultant_id else "—"
-            culture = _resolve_visit_culture(v) or "—"
-            fenologia = v.fenologia_real or "—"
-
-            dose_unidade = ""
-            try:
-                dose = getattr(p, "dose", "") or ""
-                unit = getattr(p, "unit", "") or ""
-                dose_unidade = f"{dose} {unit}".strip()
-            except Exception:
-                pass
-
-            row_values = [
-                _br_date(v.date), client_name, prop_name,
-                culture, fenologia, cons_name,
-                getattr(p, "product_name", "—"), dose_unidade,
-                _br_date(getattr(p, "application_date", None) or v.date),
-            ]
-            ws.row_dimensions[r].height = 18
-            for i, val in enumerate(row_values, start=1):
-                cell = ws.cell(row=r, column=i)
-                cell.value = val
-                cell.border = s["border_data"]
-                cell.font = s["row_font"]
-                cell.alignment = s["center"] if i in (1, 4, 5, 8, 9) else s["left_center"]
-                if (r - header_row - 1) % 2 == 0:
-                    cell.fill = s["zebra_fill"]
-            r += 1
+    for j in range(data.product_count):
+        has_data = True
+        i = p["visit_row"][j]
+        client_id, property_id, consultant_id = v["client_id"][i], v["property_id"][i], v["consultant_id"][i]
+        visit_date = from_ordinal(v["date"][i])
+
+        client_name = clients_map.get(client_id, "—") if client_id else "—"
+        prop_name = props_map.get(property_id, "—") if property_id else "—"
+        cons_name = consultants_map.get(consultant_id, "—") if consultant_id else "—"
+        culture = text(v["culture"][i]) or "—"
+        fenologia = text(v["fenologia"][i]) or "—"
+        dose_unidade = f"{text(p['dose'][j]) or ''} {text(p['unit'][j]) or ''}".strip()
+
+        row_values = [
+            _br_date(visit_date), client_name, prop_name,
+            culture, fenologia, cons_name,
+            text(p["product_name"][j]), dose_unidade,
+            _br_date(from_ordinal(p["application_date"][j]) or visit_date),
+        ]
+        ws.row_dimensions[r].height = 18
+        for col, val in enumerate(row_values, start=1):
+            cell = ws.cell(row=r, column=col)
+            cell.value = val
+            cell.border = s["border_data"]
+            cell.font = s["row_font"]
+            cell.alignment = s["center"] if col in (1, 4, 5, 8, 9) else s["left_center"]
+            if (r - header_row - 1) % 2 == 0:
+                cell.fill = s["zebra_fill"]
+        r += 1
 
     if not has_data:
         ws.merge_cells(start_row=header_row + 2, start_column=1,
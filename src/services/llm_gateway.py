@@ -0,0 +1,492 @@
+"""
+Gateway único para chamadas à OpenAI (chat, responses, embeddings, áudio).
+
+- Um cliente OpenAI por processo (pool HTTP do httpx reaproveitado);
+  o retry interno do SDK fica desligado: quem manda é o prazo da chamada.
+- Prazo total por chamada (deadline): cada tentativa usa como timeout o
+  que resta do prazo, e o backoff nunca dorme além dele.
+- Circuit breaker por modelo: após CIRCUIT_FAILURE_THRESHOLD falhas
+  transitórias seguidas (timeout, conexão, 429, 5xx) as chamadas falham na
+  hora por CIRCUIT_RESET_SECONDS; depois uma tentativa de teste reabre.
+- Cache de respostas chaveado por sha256(modelo + mensagens + parâmetros):
+  LRU em memória na frente da tabela llm_response_cache (persistente e
+  compartilhada entre workers). Prompts de skill/sistema idênticos com a
+  mesma mensagem não vão para a rede. Com validate= só respostas que
+  passam na validação (ex.: JSON que o chamador consegue ler) são gravadas.
+- Métricas por finalidade (purpose): chamadas, erros, cache hits,
+  latência e tokens, expostas em /api/agent/metrics/llm.
+
+Erros sobem como exceção (LLMUnavailable para circuito aberto / prazo
+esgotado); os chamadores já tratam qualquer Exception como "sem IA".
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
+
+from models import db, LLMResponseCache
+
+
+LLM_DEFAULT_DEADLINE_SECONDS = float(os.getenv("LLM_DEADLINE_SECONDS", "20"))
+LLM_MAX_ATTEMPTS = 3
+LLM_BACKOFF_BASE_SECONDS = 0.5
+
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("LLM_CIRCUIT_FAILURES", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("LLM_CIRCUIT_RESET_SECONDS", "30"))
+
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_MEMORY_CACHE_SIZE = 256
+LATENCY_SAMPLE_SIZE = 200
+
+
+class LLMUnavailable(Exception):
+    """Circuito aberto ou prazo esgotado: a chamada nem foi (re)tentada."""
+
+
+# ============================================================
+# Cliente
+# ============================================================
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Cliente OpenAI compartilhado (thread-safe, pool de conexões)."""
+    global _client
+    if _client is not None:
+        return _client
+
+    with _client_lock:
+        if _client is None:
+            from openai import OpenAI
+
+            _client = OpenAI(
+                api_key=os.getenv("OPENAI_API_KEY"),
+                max_retries=0,
+                timeout=LLM_DEFAULT_DEADLINE_SECONDS,
+            )
+    return _client
+
+
+def is_configured() -> bool:
+    return bool(os.getenv("OPENAI_API_KEY"))
+
+
+# ============================================================
+# Circuit breaker
+# ============================================================
+
+class CircuitBreaker:
+    """closed → open (após N falhas) → half-open (1 tentativa) → closed."""
+
+    def __init__(self, failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+                 reset_seconds=CIRCUIT_RESET_SECONDS, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self.half_open_in_flight = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self.clock() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self.lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self.half_open_in_flight:
+                self.half_open_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.half_open_in_flight = False
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            if self.half_open_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+            self.half_open_in_flight = False
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(model: str) -> CircuitBreaker:
+    with _breakers_lock:
+        breaker = _breakers.get(model)
+        if breaker is None:
+            breaker = _breakers[model] = CircuitBreaker()
+        return breaker
+
+
+def _is_transient(error) -> bool:
+    try:
+        import openai
+    except ImportError:
+        return False
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError, openai.RateLimitError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return getattr(error, "status_code", 0) >= 500
+    return False
+
+
+# ============================================================
+# Métricas por finalidade
+# ============================================================
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+
+def _record(purpose: str, latency_ms: float = None, error: bool = False, cache_hit: bool = False,
+            prompt_tokens: int = 0, completion_tokens: int = 0) -> None:
+    with _metrics_lock:
+        m = _metrics.get(purpose)
+        if m is None:
+            m = _metrics[purpose] = {
+                "calls": 0, "errors": 0, "cache_hits": 0,
+                "prompt_tokens": 0, "completion_tokens": 0,
+                "latency_total_ms": 0.0, "latency_max_ms": 0.0,
+                "latencies": deque(maxlen=LATENCY_SAMPLE_SIZE),
+            }
+        m["calls"] += 1
+        if cache_hit:
+            m["cache_hits"] += 1
+            return
+        if error:
+            m["errors"] += 1
+        m["prompt_tokens"] += prompt_tokens or 0
+        m["completion_tokens"] += completion_tokens or 0
+        if latency_ms is not None:
+            m["latency_total_ms"] += latency_ms
+            m["latency_max_ms"] = max(m["latency_max_ms"], latency_ms)
+            m["latencies"].append(latency_ms)
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[idx], 1)
+
+
+def get_llm_metrics() -> dict:
+    """Métricas deste worker por finalidade + estado dos circuitos."""
+    with _metrics_lock:
+        purposes = {}
+        for purpose, m in _metrics.items():
+            network_calls = m["calls"] - m["cache_hits"]
+            latencies = list(m["latencies"])
+            purposes[purpose] = {
+                "calls": m["calls"],
+                "errors": m["errors"],
+                "cache_hits": m["cache_hits"],
+                "cache_hit_rate_pct": round(m["cache_hits"] / m["calls"] * 100, 1) if m["calls"] else 0.0,
+                "prompt_tokens": m["prompt_tokens"],
+                "completion_tokens": m["completion_tokens"],
+                "latency_avg_ms": round(m["latency_total_ms"] / network_calls, 1) if network_calls else None,
+                "latency_p50_ms": _percentile(latencies, 50),
+                "latency_p95_ms": _percentile(latencies, 95),
+                "latency_max_ms": round(m["latency_max_ms"], 1),
+            }
+    with _breakers_lock:
+        circuits = {model: b.state for model, b in _breakers.items()}
+    return {"purposes": purposes, "circuits": circuits}
+
+
+def reset_llm_metrics() -> None:
+    with _metrics_lock:
+        _metrics.clear()
+
+
+# ============================================================
+# Cache de respostas
+# ============================================================
+
+_memory_cache = OrderedDict()
+_memory_lock = threading.Lock()
+
+
+def prompt_hash(model: str, payload) -> str:
+    raw = json.dumps([model, payload], ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _memory_get(key: str):
+    with _memory_lock:
+        entry = _memory_cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            _memory_cache.pop(key, None)
+            return None
+        _memory_cache.move_to_end(key)
+        return entry[1]
+
+
+def _memory_put(key: str, text: str, ttl_seconds: float) -> None:
+    with _memory_lock:
+        _memory_cache[key] = (time.monotonic() + ttl_seconds, text)
+        _memory_cache.move_to_end(key)
+        while len(_memory_cache) > LLM_MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
+
+
+def _db_get(key: str):
+    # Conexão própria: não mistura com (nem commita) a sessão do chamador
+    table = LLMResponseCache.__table__
+    try:
+        with db.engine.connect() as conn:
+            row = conn.execute(
+                db.select(table.c.response, table.c.created_at).where(table.c.prompt_hash == key)
+            ).first()
+    except Exception as e:
+        print("⚠️ Falha ao consultar cache de LLM:", e)
+        return None
+
+    if row is None:
+        return None
+    response, created_at = row
+    age = (datetime.utcnow() - created_at).total_seconds() if created_at else 0
+    if age > LLM_CACHE_TTL_SECONDS:
+        return None
+    return response, max(LLM_CACHE_TTL_SECONDS - age, 1)
+
+
+def _db_put(key: str, model: str, purpose: str, text: str, usage) -> None:
+    table = LLMResponseCache.__table__
+    values = {
+        "response": text,
+        "model": model[:80],
+        "purpose": (purpose or "")[:60] or None,
+        "prompt_tokens": usage[0],
+        "completion_tokens": usage[1],
+        "created_at": datetime.utcnow(),
+    }
+    try:
+        with db.engine.begin() as conn:
+            updated = conn.execute(
+                table.update().where(table.c.prompt_hash == key).values(**values)
+            ).rowcount
+            if not updated:
+                conn.execute(table.insert().values(prompt_hash=key, **values))
+    except Exception as e:
+        # Corrida entre workers pelo mesmo hash: o outro já gravou
+        print("⚠️ Falha ao gravar cache de LLM:", e)
+
+
+def cache_lookup(key: str):
+    text = _memory_get(key)
+    if text is not None:
+        return text
+    found = _db_get(key)
+    if found is None:
+        return None
+    text, ttl = found
+    _memory_put(key, text, ttl)
+    return text
+
+
+def clear_memory_cache() -> None:
+    with _memory_lock:
+        _memory_cache.clear()
+
+
+def purge_expired_cache() -> int:
+    """Remove do banco as respostas mais velhas que o TTL."""
+    table = LLMResponseCache.__table__
+    limit = datetime.utcnow() - timedelta(seconds=LLM_CACHE_TTL_SECONDS)
+    with db.engine.begin() as conn:
+        return conn.execute(table.delete().where(table.c.created_at < limit)).rowcount
+
+
+# ============================================================
+# Execução com prazo + breaker
+# ============================================================
+
+def _call(purpose: str, model: str, request_fn, deadline_seconds: float = None,
+          max_attempts: int = LLM_MAX_ATTEMPTS, sleep=time.sleep):
+    """
+    Executa request_fn(timeout) com retry só para erros transitórios,
+    respeitando o prazo total. Retorna (resposta, latency_ms).
+    """
+    deadline_seconds = deadline_seconds or LLM_DEFAULT_DEADLINE_SECONDS
+    breaker = get_breaker(model)
+    started = time.monotonic()
+    deadline = started + deadline_seconds
+    last_error = None
+
+    for attempt in range(max_attempts):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0.05:
+            break
+        if not breaker.allow():
+            _record(purpose, error=True)
+            raise LLMUnavailable(f"circuito aberto para {model}")
+
+        try:
+            response = request_fn(remaining)
+        except Exception as e:
+            last_error = e
+            if not _is_transient(e):
+                breaker.record_success()  # erro do pedido, não do serviço
+                _record(purpose, (time.monotonic() - started) * 1000, error=True)
+                raise
+            breaker.record_failure()
+            wait = LLM_BACKOFF_BASE_SECONDS * (2 ** attempt)
+            if attempt + 1 < max_attempts and time.monotonic() + wait < deadline:
+                sleep(wait)
+                continue
+            break
+        else:
+            breaker.record_success()
+            return response, (time.monotonic() - started) * 1000
+
+    _record(purpose, (time.monotonic() - started) * 1000, error=True)
+    if last_error is not None:
+        raise last_error
+    raise LLMUnavailable(f"prazo de {deadline_seconds:.1f}s esgotado ({purpose})")
+
+
+def _usage(response):
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return 0, 0
+    prompt = getattr(usage, "prompt_tokens", None)
+    if prompt is None:
+        prompt = getattr(usage, "input_tokens", 0)
+    completion = getattr(usage, "completion_tokens", None)
+    if completion is None:
+        completion = getattr(usage, "output_tokens", 0)
+    return prompt or 0, completion or 0
+
+
+# ============================================================
+# API pública
+# ============================================================
+
+def parse_json_object(text: str):
+    """Objeto JSON da resposta (inteira ou o primeiro {...} dentro dela) ou None."""
+    if not text:
+        return None
+    try:
+        data = json.loads(text)
+    except Exception:
+        match = re.search(r"\{.*\}", text, flags=re.DOTALL)
+        if not match:
+            return None
+        try:
+            data = json.loads(match.group(0))
+        except Exception:
+            return None
+    return data if isinstance(data, dict) else None
+
+
+def is_json_object(text: str) -> bool:
+    return parse_json_object(text) is not None
+
+
+def _is_valid(validate, text: str) -> bool:
+    if validate is None:
+        return True
+    try:
+        return bool(validate(text))
+    except Exception:
+        return False
+
+
+def complete(purpose: str, messages: list, model: str = "gpt-4o-mini", max_tokens: int = None,
+             api: str = "chat", deadline_seconds: float = None, use_cache: bool = True,
+             validate=None) -> str:
+    """
+    Texto da resposta do modelo (strip). api="chat" usa chat.completions,
+    api="responses" usa responses.create.
+
+    validate(text) -> bool: resposta que não passa não vai para o cache
+    (e um hit antigo que não passa é ignorado), para uma saída truncada ou
+    malformada não ser repetida até o TTL.
+    """
+    params = {"api": api, "max_tokens": max_tokens}
+    key = prompt_hash(model, {"messages": messages, **params})
+
+    if use_cache:
+        cached = cache_lookup(key)
+        if cached is not None and _is_valid(validate, cached):
+            _record(purpose, cache_hit=True)
+            return cached
+
+    client = get_client()
+
+    def request_fn(timeout):
+        if api == "responses":
+            kwargs = {"max_output_tokens": max_tokens} if max_tokens else {}
+            return client.responses.create(model=model, input=messages, timeout=timeout, **kwargs)
+        kwargs = {"max_tokens": max_tokens} if max_tokens else {}
+        return client.chat.completions.create(model=model, messages=messages, timeout=timeout, **kwargs)
+
+    response, latency_ms = _call(purpose, model, request_fn, deadline_seconds)
+
+    if api == "responses":
+        text = (getattr(response, "output_text", None) or "").strip()
+    else:
+        text = (response.choices[0].message.content or "").strip()
+
+    usage = _usage(response)
+    _record(purpose, latency_ms, prompt_tokens=usage[0], completion_tokens=usage[1])
+
+    if use_cache and text and _is_valid(validate, text):
+        _memory_put(key, text, LLM_CACHE_TTL_SECONDS)
+        _db_put(key, model, purpose, text, usage)
+    return text
+
+
+def embed(purpose: str, texts, model: str = "text-embedding-3-small",
+          deadline_seconds: float = None) -> list:
+    """Lista de embeddings (um por texto, mesma ordem)."""
+    client = get_client()
+    single = isinstance(texts, str)
+
+    def request_fn(timeout):
+        return client.embeddings.create(model=model, input=texts, timeout=timeout)
+
+    response, latency_ms = _call(purpose, model, request_fn, deadline_seconds)
+    usage = _usage(response)
+    _record(purpose, latency_ms, prompt_tokens=usage[0])
+    vectors = [item.embedding for item in response.data]
+    return vectors[:1] if single else vectors
+
+
+def transcribe(purpose: str, audio_file, model: str, deadline_seconds: float = None, **kwargs) -> str:
+    """Texto transcrito (strip). audio_file precisa de .name."""
+    client = get_client()
+
+    def request_fn(timeout):
+        audio_file.seek(0)
+        return client.audio.transcriptions.create(model=model, file=audio_file, timeout=timeout, **kwargs)
+
+    response, latency_ms = _call(purpose, model, request_fn, deadline_seconds)
+    usage = _usage(response)
+    _record(purpose, latency_ms, prompt_tokens=usage[0], completion_tokens=usage[1])
+    return (getattr(response, "text", None) or "").strip()
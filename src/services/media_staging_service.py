@@ -0,0 +1,334 @@
+"""
+Staging de fotos pendentes do Telegram.
+
+Fotos que chegam antes do contexto da visita ficam registradas na tabela
+telegram_pending_media (um INSERT por foto, sem read-modify-write), o que
+funciona entre workers/instâncias e não perde fotos de álbuns (media
+groups) que chegam em paralelo.
+
+Os bytes vão direto para o R2 em staging/telegram/<chat>/..., ou para um
+spool local quando o R2 não está configurado. Ao confirmar a visita, as
+fotos são copiadas no próprio R2 (copy_object, sem trafegar bytes pelo
+app) e os registros Photo são gravados num único commit.
+
+Fotos esquecidas expiram após PENDING_MEDIA_TTL_HOURS: a limpeza roda de
+forma oportunista a cada gravação e pelo cron /api/cron/sweep-pending-media.
+"""
+
+import io
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy.exc import IntegrityError
+from werkzeug.utils import secure_filename
+
+from models import db, Photo, TelegramPendingMedia
+
+
+PENDING_MEDIA_TTL_HOURS = int(os.getenv("PENDING_MEDIA_TTL_HOURS", "24"))
+PENDING_MEDIA_SPOOL_DIR = os.getenv("PENDING_MEDIA_SPOOL_DIR") or "/tmp/telegram_pending_media"
+SWEEP_INTERVAL_SECONDS = 600
+COPY_WORKERS = 4
+
+_last_sweep = {"at": 0.0}
+_sweep_lock = threading.Lock()
+
+
+def _get_r2_config():
+    bucket = os.environ.get("R2_BUCKET")
+    public_base = (os.environ.get("R2_PUBLIC_BASE_URL") or "").rstrip("/")
+    if not bucket or not public_base:
+        return None, None
+    return bucket, public_base
+
+
+def _get_r2_client():
+    from utils.r2_client import get_r2_client
+    return get_r2_client()
+
+
+def _safe_photo_filename(filename: str | None) -> str:
+    original = secure_filename(filename or "telegram_photo.jpg")
+    if "." not in original:
+        original = f"{original}.jpg"
+    return original
+
+
+# ============================================================
+# Gravação
+# ============================================================
+
+def save_pending_telegram_photo(
+    chat_id: str,
+    photo_bytes: bytes,
+    filename: str,
+    caption: str = "",
+    media_group_id: str | None = None,
+) -> dict:
+    """
+    Guarda a foto (R2 ou spool local) e registra a linha de staging.
+    Retorna o dict da linha com "group_leader": True quando esta é a
+    primeira foto do álbum, usado para enviar um único aviso por álbum.
+    """
+    chat_id = str(chat_id)
+    ext = Path(filename or "").suffix or ".jpg"
+    unique_name = f"{uuid.uuid4().hex}{ext}"
+
+    bucket, _ = _get_r2_config()
+    if bucket:
+        storage = "r2"
+        storage_key = f"staging/telegram/{chat_id}/{unique_name}"
+        _get_r2_client().upload_fileobj(
+            Fileobj=io.BytesIO(photo_bytes),
+            Bucket=bucket,
+            Key=storage_key,
+            ExtraArgs={"ContentType": "image/jpeg"},
+        )
+    else:
+        storage = "local"
+        spool_dir = Path(PENDING_MEDIA_SPOOL_DIR) / chat_id
+        spool_dir.mkdir(parents=True, exist_ok=True)
+        file_path = spool_dir / unique_name
+        file_path.write_bytes(photo_bytes)
+        storage_key = str(file_path)
+
+    group_prompt_key = f"{chat_id}:{media_group_id}" if media_group_id else None
+
+    def _build_row(prompt_key):
+        return TelegramPendingMedia(
+            chat_id=chat_id,
+            media_group_id=str(media_group_id) if media_group_id else None,
+            group_prompt_key=prompt_key,
+            storage=storage,
+            storage_key=storage_key,
+            filename=(filename or "")[:255] or None,
+            caption=(caption or "")[:255] or None,
+            size_bytes=len(photo_bytes) if photo_bytes else 0,
+        )
+
+    group_leader = False
+    row = _build_row(group_prompt_key)
+    try:
+        with db.session.begin_nested():
+            db.session.add(row)
+        group_leader = bool(group_prompt_key)
+    except IntegrityError:
+        # Outra foto do mesmo álbum já ficou com a chave do aviso
+        row = _build_row(None)
+        db.session.add(row)
+    db.session.commit()
+
+    maybe_sweep_expired_pending_media()
+
+    data = row.to_dict()
+    data["group_leader"] = group_leader
+    return data
+
+
+def should_send_photo_prompt(chat_id: str, photo_info: dict | None, saved_media: dict | None = None) -> bool:
+    if not photo_info:
+        return False
+
+    if not photo_info.get("media_group_id"):
+        return True
+
+    if saved_media is None:
+        # Não conseguiu registrar a foto: avisa de qualquer forma
+        return True
+
+    return bool(saved_media.get("group_leader"))
+
+
+# ============================================================
+# Leitura / limpeza
+# ============================================================
+
+def _pending_query(chat_id: str):
+    cutoff = datetime.utcnow() - timedelta(hours=PENDING_MEDIA_TTL_HOURS)
+    return TelegramPendingMedia.query.filter(
+        TelegramPendingMedia.chat_id == str(chat_id),
+        TelegramPendingMedia.created_at >= cutoff,
+    )
+
+
+def get_pending_telegram_photos(chat_id: str) -> list:
+    rows = _pending_query(chat_id).order_by(TelegramPendingMedia.id.asc()).all()
+    return [row.to_dict() for row in rows]
+
+
+def _delete_stored_objects(objects: list) -> None:
+    """Remove os arquivos de staging. objects: [(storage, storage_key)]."""
+    r2_keys = [key for storage, key in objects if storage == "r2"]
+    local_paths = [key for storage, key in objects if storage == "local"]
+
+    for path in local_paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    bucket, _ = _get_r2_config()
+    if not r2_keys or not bucket:
+        return
+
+    try:
+        r2 = _get_r2_client()
+        for i in range(0, len(r2_keys), 1000):
+            r2.delete_objects(
+                Bucket=bucket,
+                Delete={"Objects": [{"Key": k} for k in r2_keys[i:i + 1000]], "Quiet": True},
+            )
+    except Exception as e:
+        print("⚠️ Falha ao remover fotos de staging do R2:", e)
+
+
+def _delete_rows(rows: list) -> None:
+    if not rows:
+        return
+    _delete_stored_objects([(row.storage, row.storage_key) for row in rows])
+    ids = [row.id for row in rows]
+    TelegramPendingMedia.query.filter(
+        TelegramPendingMedia.id.in_(ids)
+    ).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def clear_pending_telegram_photos(chat_id: str) -> None:
+    rows = TelegramPendingMedia.query.filter_by(chat_id=str(chat_id)).all()
+    _delete_rows(rows)
+
+
+def sweep_expired_pending_media(ttl_hours: int | None = None, batch_size: int = 500) -> int:
+    """Remove fotos de staging mais antigas que o TTL. Retorna quantas removeu."""
+    hours = PENDING_MEDIA_TTL_HOURS if ttl_hours is None else ttl_hours
+    cutoff = datetime.utcnow() - timedelta(hours=hours)
+
+    removed = 0
+    while True:
+        rows = TelegramPendingMedia.query.filter(
+            TelegramPendingMedia.created_at < cutoff
+        ).order_by(TelegramPendingMedia.id.asc()).limit(batch_size).all()
+        if not rows:
+            break
+        _delete_rows(rows)
+        removed += len(rows)
+        if len(rows) < batch_size:
+            break
+
+    return removed
+
+
+def maybe_sweep_expired_pending_media() -> None:
+    now = time.monotonic()
+    # Só uma thread do worker varre por intervalo
+    with _sweep_lock:
+        if now - _last_sweep["at"] < SWEEP_INTERVAL_SECONDS:
+            return
+        _last_sweep["at"] = now
+
+    try:
+        removed = sweep_expired_pending_media()
+        if removed:
+            print(f"🧹 {removed} foto(s) pendente(s) expirada(s) removida(s)")
+    except Exception as e:
+        db.session.rollback()
+        print("⚠️ Falha na limpeza de fotos pendentes:", e)
+
+
+# ============================================================
+# Vínculo com a visita
+# ============================================================
+
+def attach_pending_telegram_photos_to_visit(chat_id: str, visit):
+    """
+    Vincula as fotos pendentes do chat à visita numa operação: cópias no
+    R2 em paralelo e um único commit com todos os Photo e a remoção das
+    linhas de staging vinculadas. Só saem do staging as fotos copiadas
+    com sucesso: as que falharam e as que chegaram depois da leitura
+    (resto do álbum) continuam pendentes.
+    Retorna: (quantidade_vinculada, erros)
+    """
+    if not visit:
+        return 0, ["visita ausente"]
+
+    rows = _pending_query(chat_id).order_by(TelegramPendingMedia.id.asc()).all()
+    if not rows:
+        return 0, []
+
+    bucket, public_base = _get_r2_config()
+    if not bucket:
+        return 0, ["R2 não configurado: faltam variáveis de ambiente"]
+
+    r2 = _get_r2_client()
+    visit_id = visit.id
+
+    # Os threads do pool não têm app context: trabalham só com valores simples
+    items = [(row.storage, row.storage_key, row.filename, row.caption) for row in rows]
+
+    def _copy(item):
+        storage, storage_key, filename, _ = item
+        key = f"visits/{visit_id}/{uuid.uuid4().hex}_{_safe_photo_filename(filename)}"
+        try:
+            if storage == "r2":
+                r2.copy_object(
+                    Bucket=bucket,
+                    Key=key,
+                    CopySource={"Bucket": bucket, "Key": storage_key},
+                    ContentType="image/jpeg",
+                    MetadataDirective="REPLACE",
+                )
+            else:
+                with open(storage_key, "rb") as f:
+                    r2.upload_fileobj(
+                        Fileobj=f,
+                        Bucket=bucket,
+                        Key=key,
+                        ExtraArgs={"ContentType": "image/jpeg"},
+                    )
+            return key, None
+        except Exception as e:
+            return None, str(e)
+
+    if len(items) > 1:
+        with ThreadPoolExecutor(max_workers=min(COPY_WORKERS, len(items))) as pool:
+            results = list(pool.map(_copy, items))
+    else:
+        results = [_copy(items[0])]
+
+    photos = []
+    attached_ids = []
+    attached_objects = []
+    errors = []
+    for row, item, (key, error) in zip(rows, items, results):
+        if error:
+            errors.append(error)
+            continue
+        attached_ids.append(row.id)
+        attached_objects.append(item[:2])
+        photos.append(Photo(
+            visit_id=visit_id,
+            url=f"{public_base}/{key}",
+            caption=(item[3] or "").strip() or None,
+        ))
+
+    if not photos:
+        return 0, errors
+
+    try:
+        db.session.add_all(photos)
+        TelegramPendingMedia.query.filter(
+            TelegramPendingMedia.id.in_(attached_ids)
+        ).delete(synchronize_session=False)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return 0, errors + [str(e)]
+
+    # Objetos de staging só depois do commit (as linhas já não existem)
+    _delete_stored_objects(attached_objects)
+    return len(photos), errors
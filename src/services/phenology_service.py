@@ -0,0 +1,240 @@
+"""
+Modelo fenológico em memória (tabela phenology_stages).
+
+A tabela é carregada uma vez por worker e agrupada por cultura, com os
+estágios ordenados por dias após o plantio. Uma assinatura barata
+(count + max(id) + sum(days)) é conferida a cada
+PHENOLOGY_VERSION_CHECK_SECONDS, e gravações de PhenologyStage pelo ORM
+invalidam na hora.
+
+Usado por:
+- /phenology/schedule e /phenology/projections (datas esperadas por estágio)
+- criação de visita com cronograma e POST /plantings (visitas por estágio)
+- sugestões de visita do dashboard (próximo estágio + intervalo)
+
+Todos leem phenology_stages (model PhenologyStage). Enquanto ela está
+vazia e a tabela antiga phenology_stage existe (banco ainda sem a
+migration 20261019_copy_phenology_stage), o modelo vem da antiga.
+"""
+
+import threading
+import time
+import unicodedata
+from collections import namedtuple
+from datetime import timedelta
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session
+
+from models import db, PhenologyStage
+
+
+PHENOLOGY_VERSION_CHECK_SECONDS = 60
+LEGACY_PHENOLOGY_TABLE = "phenology_stage"
+
+PhenologyStep = namedtuple("PhenologyStep", ["code", "name", "days"])
+
+# Fallback quando a cultura/estágio não está na tabela: dias estimados
+# entre estágios (soja/milho) usados historicamente pelo dashboard.
+DEFAULT_STAGE_INTERVALS = {
+    "VE": 7, "V1": 7, "V2": 7, "V3": 7, "V4": 7, "V5": 7, "V6": 7,
+    "V7": 7, "V8": 7, "V9": 7, "V10": 7, "V11": 7, "V12": 7,
+    "R1": 10, "R2": 10, "R3": 12, "R4": 12, "R5": 14,
+    "R5.1": 7, "R5.2": 7, "R5.3": 7, "R5.4": 7, "R5.5": 7,
+    "R6": 14, "R7": 14, "R8": 21,
+}
+DEFAULT_STAGE_NEXT = {
+    "VE": "V1", "V1": "V2", "V2": "V3", "V3": "V4", "V4": "V5", "V5": "V6",
+    "V6": "V7", "V7": "V8", "V8": "V9", "V9": "V10", "V10": "V11", "V11": "V12",
+    "V12": "R1", "R1": "R2", "R2": "R3", "R3": "R4", "R4": "R5",
+    "R5": "R5.1", "R5.1": "R5.2", "R5.2": "R5.3", "R5.3": "R5.4", "R5.4": "R5.5",
+    "R5.5": "R6", "R6": "R7", "R7": "R8",
+}
+
+_state = {"model": None, "signature": None, "checked_at": 0.0}
+_lock = threading.Lock()
+
+
+def normalize_culture_key(culture: str) -> str:
+    if not culture:
+        return ""
+    value = unicodedata.normalize("NFD", culture.strip().lower())
+    return "".join(ch for ch in value if unicodedata.category(ch) != "Mn")
+
+
+def _read_signature():
+    """(tabela de origem, count, max(id), sum(days))."""
+    count, max_id, total_days = db.session.query(
+        db.func.count(PhenologyStage.id),
+        db.func.max(PhenologyStage.id),
+        db.func.sum(PhenologyStage.days),
+    ).one()
+    if count:
+        return (PhenologyStage.__tablename__, count, max_id or 0, int(total_days or 0))
+
+    if inspect(db.session.connection()).has_table(LEGACY_PHENOLOGY_TABLE):
+        count, total_days = db.session.execute(
+            text(f"SELECT count(*), sum(days) FROM {LEGACY_PHENOLOGY_TABLE}")
+        ).one()
+        if count:
+            return (LEGACY_PHENOLOGY_TABLE, count, 0, int(total_days or 0))
+
+    return (PhenologyStage.__tablename__, 0, 0, 0)
+
+
+def _load_rows(source: str):
+    if source == LEGACY_PHENOLOGY_TABLE:
+        return db.session.execute(text(
+            f"SELECT culture, code, name, days FROM {LEGACY_PHENOLOGY_TABLE} ORDER BY culture, days"
+        )).fetchall()
+    return db.session.query(
+        PhenologyStage.culture,
+        PhenologyStage.code,
+        PhenologyStage.name,
+        PhenologyStage.days,
+    ).order_by(PhenologyStage.culture, PhenologyStage.days, PhenologyStage.id).all()
+
+
+def _load_model(source: str = PhenologyStage.__tablename__) -> dict:
+    """{"exact": {cultura: [PhenologyStep]}, "normalized": {cultura_norm: [...]}}"""
+    exact = {}
+    for culture, code, name, days in _load_rows(source):
+        if not culture:
+            continue
+        exact.setdefault(culture, []).append(PhenologyStep(code, name, int(days or 0)))
+
+    normalized = {}
+    for culture, stages in exact.items():
+        normalized.setdefault(normalize_culture_key(culture), stages)
+
+    return {"exact": exact, "normalized": normalized}
+
+
+def get_phenology_model() -> dict:
+    now = time.monotonic()
+    if _state["model"] is not None and now - _state["checked_at"] < PHENOLOGY_VERSION_CHECK_SECONDS:
+        return _state["model"]
+
+    with _lock:
+        if _state["model"] is not None and now - _state["checked_at"] < PHENOLOGY_VERSION_CHECK_SECONDS:
+            return _state["model"]
+
+        try:
+            signature = _read_signature()
+            if _state["model"] is None or signature != _state["signature"]:
+                if signature[0] == LEGACY_PHENOLOGY_TABLE:
+                    print("⚠️ phenology_stages vazia: usando a tabela antiga phenology_stage até a migration")
+                _state["model"] = _load_model(signature[0])
+                _state["signature"] = signature
+        except Exception as e:
+            db.session.rollback()
+            print("⚠️ Falha ao carregar estágios fenológicos:", e)
+            if _state["model"] is None:
+                return {"exact": {}, "normalized": {}}
+
+        _state["checked_at"] = now
+        return _state["model"]
+
+
+def invalidate_phenology_model() -> None:
+    with _lock:
+        _state["checked_at"] = 0.0
+        _state["signature"] = None
+
+
+def get_culture_stages(culture: str) -> list:
+    """Estágios da cultura (ordenados por dias). Match exato, depois sem acento/caixa."""
+    if not culture:
+        return []
+    model = get_phenology_model()
+    stages = model["exact"].get(culture)
+    if stages is None:
+        stages = model["normalized"].get(normalize_culture_key(culture), [])
+    return stages
+
+
+def project_schedule(culture: str, planting_date) -> list:
+    """Datas sugeridas de cada estágio a partir do plantio."""
+    return [
+        {
+            "stage": step.name,
+            "code": step.code,
+            "suggested_date": (planting_date + timedelta(days=step.days)).isoformat(),
+        }
+        for step in get_culture_stages(culture)
+    ]
+
+
+def project_planting(culture: str, planting_date, today) -> dict:
+    """Estágio esperado hoje e o próximo, com as datas projetadas."""
+    stages = get_culture_stages(culture)
+    days_since = (today - planting_date).days
+
+    current = None
+    upcoming = None
+    for step in stages:
+        if step.days <= days_since:
+            current = step
+        elif upcoming is None:
+            upcoming = step
+
+    def _as_dict(step):
+        if not step:
+            return None
+        return {
+            "code": step.code,
+            "name": step.name,
+            "date": (planting_date + timedelta(days=step.days)).isoformat(),
+        }
+
+    return {
+        "days_since_planting": max(days_since, 0),
+        "current_stage": _as_dict(current),
+        "next_stage": _as_dict(upcoming),
+        "stages": [
+            {"code": step.code, "name": step.name, "suggested_date": (planting_date + timedelta(days=step.days)).isoformat()}
+            for step in stages
+        ],
+    }
+
+
+def get_next_stage(culture: str, stage_code: str):
+    """
+    (próximo_código, dias_até_ele) para o estágio observado.
+    Usa a tabela da cultura; sem ela, os intervalos padrão.
+    Retorna (None, None) se o estágio é desconhecido.
+    """
+    code = (stage_code or "").strip().upper()
+    if not code:
+        return None, None
+
+    stages = get_culture_stages(culture)
+    for i, step in enumerate(stages):
+        if (step.code or "").strip().upper() != code:
+            continue
+        if i + 1 < len(stages):
+            nxt = stages[i + 1]
+            return nxt.code, max(nxt.days - step.days, 0)
+        break
+
+    if code not in DEFAULT_STAGE_INTERVALS:
+        return None, None
+    return DEFAULT_STAGE_NEXT.get(code, "—"), DEFAULT_STAGE_INTERVALS[code]
+
+
+# ============================================================
+# Invalidação em gravações de PhenologyStage
+# ============================================================
+
+@event.listens_for(Session, "after_flush")
+def _mark_phenology_dirty(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, PhenologyStage):
+            session.info["phenology_dirty"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_phenology_after_commit(session):
+    if session.info.pop("phenology_dirty", False):
+        invalidate_phenology_model()
@@ -1,5 +1,5 @@
 from datetime import date as _date
-from models import db, Planting, Visit, Client
+from models import db, Planting, Visit, Client, Property, Plot
 
 
 def get_local_today():
@@ -107,6 +107,231 @@ def calculate_days_since_planting(
     }
 
 
+# ======================================================
+# Carteira do consultor (todas as chaves de uma vez)
+# ======================================================
+
+def _is_plantio_visit_filter():
+    return db.or_(
+        Visit.fenologia_real == "Plantio",
+        Visit.recommendation.ilike("%plantio%"),
+    )
+
+
+def _context_matches(row_property_id, row_plot_id, row_culture, row_variety, key) -> bool:
+    """Mesmos filtros de resolve_planting_date_for_context: só compara o que veio preenchido."""
+    _, property_id, plot_id, culture, variety = key
+    if property_id is not None and row_property_id != property_id:
+        return False
+    if plot_id is not None and row_plot_id != plot_id:
+        return False
+    if culture and row_culture != culture:
+        return False
+    if variety and row_variety != variety:
+        return False
+    return True
+
+
+def _earliest_plantio_visits(client_ids: list) -> dict:
+    """
+    Primeira visita de Plantio por (cliente, fazenda, talhão, cultura,
+    variedade) numa query com ROW_NUMBER. Retorna {client_id: [linhas]}.
+    """
+    row_number = db.func.row_number().over(
+        partition_by=(Visit.client_id, Visit.property_id, Visit.plot_id, Visit.culture, Visit.variety),
+        order_by=(Visit.date.asc().nullslast(), Visit.id.asc()),
+    ).label("rn")
+
+    subq = db.session.query(
+        Visit.client_id.label("client_id"),
+        Visit.property_id.label("property_id"),
+        Visit.plot_id.label("plot_id"),
+        Visit.culture.label("culture"),
+        Visit.variety.label("variety"),
+        Visit.date.label("date"),
+        Visit.id.label("id"),
+        row_number,
+    ).filter(
+        Visit.client_id.in_(client_ids),
+        _is_plantio_visit_filter(),
+    ).subquery()
+
+    rows = db.session.query(
+        subq.c.client_id,
+        subq.c.property_id,
+        subq.c.plot_id,
+        subq.c.culture,
+        subq.c.variety,
+        subq.c.date,
+        subq.c.id,
+    ).filter(subq.c.rn == 1).all()
+
+    by_client = {}
+    for row in rows:
+        by_client.setdefault(row[0], []).append(row)
+    return by_client
+
+
+def _earliest_plantings(keys: list) -> list:
+    """
+    Fallback por Planting (mesmo critério do passo 3 de
+    resolve_planting_date_for_context): primeiro plantio com data por
+    (talhão, cultura, variedade), numa query.
+    """
+    row_number = db.func.row_number().over(
+        partition_by=(Planting.plot_id, Planting.culture, Planting.variety),
+        order_by=(Planting.planting_date.asc(), Planting.id.asc()),
+    ).label("rn")
+
+    q = db.session.query(
+        Planting.plot_id.label("plot_id"),
+        Planting.culture.label("culture"),
+        Planting.variety.label("variety"),
+        Planting.planting_date.label("planting_date"),
+        Planting.id.label("id"),
+        row_number,
+    ).filter(Planting.planting_date.isnot(None))
+
+    # Chave sem talhão aceita qualquer talhão: só restringe quando todas têm
+    plot_ids = {key[2] for key in keys}
+    if None not in plot_ids:
+        q = q.filter(Planting.plot_id.in_(plot_ids))
+
+    subq = q.subquery()
+    return db.session.query(
+        subq.c.plot_id,
+        subq.c.culture,
+        subq.c.variety,
+        subq.c.planting_date,
+        subq.c.id,
+    ).filter(subq.c.rn == 1).all()
+
+
+def _first_by_date(rows, date_index: int, id_index: int):
+    best = None
+    for row in rows:
+        sort_key = (row[date_index] is None, row[date_index] or _date.min, row[id_index])
+        if best is None or sort_key < best[0]:
+            best = (sort_key, row)
+    return best[1] if best else None
+
+
+def build_days_planted_portfolio(consultant_id: int) -> list:
+    """
+    Carteira do consultor com dias de plantado, uma linha por
+    cliente + fazenda + talhão + cultura + variedade.
+
+    Mesmo resultado de chamar calculate_days_since_planting por chave,
+    mas em 2 ou 3 queries para qualquer tamanho de carteira:
+    1) visitas do consultor já com data do Planting vinculado e nomes
+    2) primeira visita de Plantio por chave (ROW_NUMBER)
+    3) só se sobrar chave sem data: primeiro Planting por talhão/cultura/variedade
+    """
+    if not consultant_id:
+        return []
+
+    rows = (
+        db.session.query(
+            Visit.client_id,
+            Visit.property_id,
+            Visit.plot_id,
+            Visit.culture,
+            Visit.variety,
+            Planting.planting_date,
+            Client.name,
+            Property.name,
+            Plot.name,
+        )
+        .outerjoin(Planting, Planting.id == Visit.planting_id)
+        .outerjoin(Client, Client.id == Visit.client_id)
+        .outerjoin(Property, Property.id == Visit.property_id)
+        .outerjoin(Plot, Plot.id == Visit.plot_id)
+        .filter(Visit.consultant_id == consultant_id)
+        .order_by(Visit.date.desc().nullslast(), Visit.id.desc())
+        .all()
+    )
+
+    # Visita mais recente de cada chave define o planting_id e os nomes
+    grouped = {}
+    for client_id, property_id, plot_id, culture, variety, linked_date, client_name, property_name, plot_name in rows:
+        if not client_id:
+            continue
+        key = (client_id, property_id, plot_id, (culture or "").strip(), (variety or "").strip())
+        if key not in grouped:
+            grouped[key] = {
+                "linked_date": linked_date,
+                "client_name": client_name or f"Cliente {client_id}",
+                "property_name": property_name or "",
+                "plot_name": plot_name or "",
+            }
+
+    if not grouped:
+        return []
+
+    planting_dates = {
+        key: info["linked_date"]
+        for key, info in grouped.items()
+        if info["linked_date"]
+    }
+
+    pending = [key for key in grouped if key not in planting_dates]
+    if pending:
+        plantio_by_client = _earliest_plantio_visits(sorted({key[0] for key in pending}))
+        still_pending = []
+        for key in pending:
+            candidates = [
+                row for row in plantio_by_client.get(key[0], [])
+                if _context_matches(row[1], row[2], row[3], row[4], key)
+            ]
+            first = _first_by_date(candidates, date_index=5, id_index=6)
+            if first and first[5]:
+                planting_dates[key] = first[5]
+            else:
+                still_pending.append(key)
+
+        if still_pending:
+            plantings = _earliest_plantings(still_pending)
+            for key in still_pending:
+                _, _, plot_id, culture, variety = key
+                candidates = [
+                    row for row in plantings
+                    if (not plot_id or row[0] == plot_id)
+                    and (not culture or row[1] == culture)
+                    and (not variety or row[2] == variety)
+                ]
+                first = _first_by_date(candidates, date_index=3, id_index=4)
+                if first:
+                    planting_dates[key] = first[3]
+
+    today = get_local_today()
+    items = []
+    for key, info in grouped.items():
+        planting_date = planting_dates.get(key)
+        if not planting_date:
+            continue
+
+        _, _, _, culture, variety = key
+        items.append({
+            "client_name": info["client_name"],
+            "property_name": info["property_name"],
+            "plot_name": info["plot_name"],
+            "culture": culture or "—",
+            "variety": variety or "—",
+            "planting_date": planting_date.isoformat(),
+            "days": max((today - planting_date).days, 0),
+        })
+
+    items.sort(
+        key=lambda x: (
+            -(x["days"] or 0),
+            x["client_name"] or "",
+            x["variety"] or "",
+        )
+    )
+
+    return items
+
+
 def build_days_planted_text(client_name: str, variety: str, result: dict | None) -> str:
     if not result:
         return f"Não encontrei data de plantio para {client_name}{' - ' + variety if variety else ''}."
@@ -15,7 +15,8 @@ Usado por:
 """
 
 from datetime import date, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy import case, func
 from models import Visit, Client, Consultant, TelegramContactBinding, db
 
 
@@ -24,18 +25,11 @@ def get_consultant_insights(consultant_id: int) -> Dict[str, Any]:
     Retorna todos os insights proativos para um consultor.
     Chamado pelo app/site ao carregar ou por polling.
     """
-    today = date.today()
+    return get_insights_for_consultants([consultant_id])[int(consultant_id)]
 
-    insights = {
-        "consultant_id": consultant_id,
-        "date": today.isoformat(),
-        "pending_today": get_pending_visits_today(consultant_id),
-        "stale_clients": get_stale_clients(consultant_id),
-        "week_summary": get_week_summary(consultant_id),
-        "alerts": [],
-    }
 
-    # Gera alertas baseados nos insights
+def build_insight_alerts(insights: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Gera alertas baseados nos insights."""
     alerts = []
 
     pending_count = len(insights["pending_today"])
@@ -67,33 +61,13 @@ def get_consultant_insights(consultant_id: int) -> Dict[str, Any]:
                 "count": stale_count,
             })
 
-    insights["alerts"] = alerts
-    return insights
+    return alerts
 
 
 def get_pending_visits_today(consultant_id: int) -> List[Dict[str, Any]]:
     """Retorna visitas planejadas para hoje."""
-    today = date.today()
-
-    visits = Visit.query.filter(
-        Visit.consultant_id == consultant_id,
-        Visit.date == today,
-        Visit.status == "planned",
-    ).all()
-
-    result = []
-    for v in visits:
-        client = Client.query.get(v.client_id) if v.client_id else None
-        result.append({
-            "id": v.id,
-            "client_id": v.client_id,
-            "client_name": client.name if client else "—",
-            "culture": v.culture,
-            "fenologia": v.fenologia_real,
-            "property_id": v.property_id,
-        })
-
-    return result
+    ids = [int(consultant_id)]
+    return _pending_today_by_consultant(ids, date.today()).get(ids[0], [])
 
 
 def get_stale_clients(consultant_id: int, days_threshold: int = 15, limit: int = 10) -> List[Dict[str, Any]]:
@@ -101,73 +75,172 @@ def get_stale_clients(consultant_id: int, days_threshold: int = 15, limit: int =
     Retorna clientes que não são visitados há mais de X dias.
     Ordenados pelo mais atrasado primeiro.
     """
+    ids = [int(consultant_id)]
+    return _stale_clients_by_consultant(ids, date.today(), days_threshold, limit).get(ids[0], [])
+
+
+def get_week_summary(consultant_id: int) -> Dict[str, Any]:
+    """Resumo rápido da semana atual."""
+    ids = [int(consultant_id)]
+    today = date.today()
+    return _week_summary_by_consultant(ids, today).get(ids[0]) or _empty_week_summary(today)
+
+
+# ================================================================
+# Consultas agrupadas (vários consultores de uma vez)
+# ================================================================
+
+def get_insights_for_consultants(
+    consultant_ids: Iterable[int],
+    stale_days_threshold: int = 15,
+    stale_limit: int = 10,
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Insights de vários consultores (equipe inteira no admin, cron) em 3
+    queries no total: pendentes de hoje (join com clients), clientes
+    atrasados e resumo da semana, todas com GROUP BY consultant_id.
+    Retorna {consultant_id: insights}.
+    """
+    ids = sorted({int(cid) for cid in consultant_ids if cid is not None})
+    if not ids:
+        return {}
+
     today = date.today()
+    pending = _pending_today_by_consultant(ids, today)
+    stale = _stale_clients_by_consultant(ids, today, stale_days_threshold, stale_limit)
+    weeks = _week_summary_by_consultant(ids, today)
+
+    result = {}
+    for cid in ids:
+        insights = {
+            "consultant_id": cid,
+            "date": today.isoformat(),
+            "pending_today": pending.get(cid, []),
+            "stale_clients": stale.get(cid, []),
+            "week_summary": weeks.get(cid) or _empty_week_summary(today),
+            "alerts": [],
+        }
+        insights["alerts"] = build_insight_alerts(insights)
+        result[cid] = insights
+
+    return result
+
+
+def _pending_today_by_consultant(ids: List[int], today: date) -> Dict[int, List[Dict[str, Any]]]:
+    rows = db.session.query(
+        Visit.id,
+        Visit.consultant_id,
+        Visit.client_id,
+        Client.name,
+        Visit.culture,
+        Visit.fenologia_real,
+        Visit.property_id,
+    ).outerjoin(
+        Client, Client.id == Visit.client_id
+    ).filter(
+        Visit.consultant_id.in_(ids),
+        Visit.date == today,
+        Visit.status == "planned",
+    ).order_by(Visit.consultant_id, Visit.id).all()
+
+    grouped: Dict[int, List[Dict[str, Any]]] = {}
+    for visit_id, cid, client_id, client_name, culture, fenologia, property_id in rows:
+        grouped.setdefault(cid, []).append({
+            "id": visit_id,
+            "client_id": client_id,
+            "client_name": client_name or "—",
+            "culture": culture,
+            "fenologia": fenologia,
+            "property_id": property_id,
+        })
+    return grouped
+
+
+def _stale_clients_by_consultant(
+    ids: List[int],
+    today: date,
+    days_threshold: int,
+    limit: int,
+) -> Dict[int, List[Dict[str, Any]]]:
     threshold_date = today - timedelta(days=days_threshold)
 
-    # Subconsulta: última visita por cliente do consultor
     subq = db.session.query(
-        Visit.client_id,
-        db.func.max(Visit.date).label("last_visit_date")
+        Visit.consultant_id.label("consultant_id"),
+        Visit.client_id.label("client_id"),
+        func.max(Visit.date).label("last_visit_date"),
     ).filter(
-        Visit.consultant_id == consultant_id,
+        Visit.consultant_id.in_(ids),
         Visit.status == "done",
         Visit.client_id.isnot(None),
-    ).group_by(Visit.client_id).subquery()
+    ).group_by(Visit.consultant_id, Visit.client_id).subquery()
 
-    # Clientes com última visita anterior ao threshold
-    results = db.session.query(
+    rows = db.session.query(
+        subq.c.consultant_id,
         Client.id,
         Client.name,
-        subq.c.last_visit_date
+        subq.c.last_visit_date,
     ).join(
         subq, Client.id == subq.c.client_id
     ).filter(
         subq.c.last_visit_date < threshold_date
     ).order_by(
-        subq.c.last_visit_date.asc()
-    ).limit(limit).all()
+        subq.c.consultant_id, subq.c.last_visit_date.asc()
+    ).all()
 
-    stale = []
-    for client_id, name, last_visit in results:
-        days_since = (today - last_visit).days if last_visit else 999
-        stale.append({
+    grouped: Dict[int, List[Dict[str, Any]]] = {}
+    for cid, client_id, name, last_visit in rows:
+        items = grouped.setdefault(cid, [])
+        if len(items) >= limit:
+            continue
+        items.append({
             "id": client_id,
             "name": name,
             "last_visit_date": last_visit.isoformat() if last_visit else None,
-            "days_since_visit": days_since,
+            "days_since_visit": (today - last_visit).days if last_visit else 999,
         })
+    return grouped
 
-    return stale
 
-
-def get_week_summary(consultant_id: int) -> Dict[str, Any]:
-    """Resumo rápido da semana atual."""
-    today = date.today()
+def _empty_week_summary(today: date) -> Dict[str, Any]:
     start_of_week = today - timedelta(days=today.weekday())
+    return {
+        "done_this_week": 0,
+        "planned_remaining": 0,
+        "week_start": start_of_week.isoformat(),
+        "week_end": (start_of_week + timedelta(days=6)).isoformat(),
+    }
 
-    # Visitas realizadas esta semana
-    done_visits = Visit.query.filter(
-        Visit.consultant_id == consultant_id,
-        Visit.date >= start_of_week,
-        Visit.date <= today,
-        Visit.status == "done",
-    ).count()
 
-    # Visitas planejadas restantes da semana
+def _week_summary_by_consultant(ids: List[int], today: date) -> Dict[int, Dict[str, Any]]:
+    start_of_week = today - timedelta(days=today.weekday())
     end_of_week = start_of_week + timedelta(days=6)
-    planned_visits = Visit.query.filter(
-        Visit.consultant_id == consultant_id,
-        Visit.date > today,
-        Visit.date <= end_of_week,
-        Visit.status == "planned",
-    ).count()
 
-    return {
-        "done_this_week": done_visits,
-        "planned_remaining": planned_visits,
-        "week_start": start_of_week.isoformat(),
-        "week_end": end_of_week.isoformat(),
-    }
+    done_expr = case(
+        ((Visit.status == "done") & (Visit.date <= today), 1),
+        else_=0,
+    )
+    planned_expr = case(
+        ((Visit.status == "planned") & (Visit.date > today), 1),
+        else_=0,
+    )
+
+    rows = db.session.query(
+        Visit.consultant_id,
+        func.sum(done_expr),
+        func.sum(planned_expr),
+    ).filter(
+        Visit.consultant_id.in_(ids),
+        Visit.date >= start_of_week,
+        Visit.date <= end_of_week,
+    ).group_by(Visit.consultant_id).all()
+
+    result = {}
+    for cid, done, planned in rows:
+        summary = _empty_week_summary(today)
+        summary["done_this_week"] = int(done or 0)
+        summary["planned_remaining"] = int(planned or 0)
+        result[cid] = summary
+    return result
 
 
 def build_daily_reminder_text(consultant_id: int, consultant_name: str) -> Optional[str]:
@@ -176,7 +249,11 @@ def build_daily_reminder_text(consultant_id: int, consultant_name: str) -> Optio
     Retorna None se não houver nada relevante para notificar.
     """
     insights = get_consultant_insights(consultant_id)
+    return build_daily_reminder_text_from_insights(insights, consultant_name)
 
+
+def build_daily_reminder_text_from_insights(insights: Dict[str, Any], consultant_name: str) -> Optional[str]:
+    """Monta o texto do lembrete a partir de insights já calculados."""
     lines = []
     lines.append(f"🌅 Bom dia, {consultant_name}!")
     lines.append("")
@@ -220,16 +297,21 @@ def get_all_consultants_for_daily_reminder() -> List[Dict[str, Any]]:
     Retorna lista de consultores com Telegram vinculado
     para envio de lembretes diários.
     """
-    bindings = TelegramContactBinding.query.filter_by(is_active=True).all()
-
-    consultants = []
-    for b in bindings:
-        consultant = Consultant.query.get(b.consultant_id)
-        if consultant:
-            consultants.append({
-                "consultant_id": consultant.id,
-                "consultant_name": consultant.name,
-                "telegram_chat_id": b.telegram_chat_id,
-            })
-
-    return consultants
+    rows = db.session.query(
+        Consultant.id,
+        Consultant.name,
+        TelegramContactBinding.telegram_chat_id,
+    ).join(
+        TelegramContactBinding, TelegramContactBinding.consultant_id == Consultant.id
+    ).filter(
+        TelegramContactBinding.is_active.is_(True)
+    ).order_by(TelegramContactBinding.id).all()
+
+    return [
+        {
+            "consultant_id": consultant_id,
+            "consultant_name": name,
+            "telegram_chat_id": chat_id,
+        }
+        for consultant_id, name, chat_id in rows
+    ]
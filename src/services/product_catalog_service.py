@@ -0,0 +1,179 @@
+"""
+Catálogo de nomes de produtos (defensivos/fertilizantes) já usados em visitas.
+
+O conjunto distinto de visit_products.product_name fica em memória, com
+um índice de trigramas dos nomes normalizados:
+- match exato (normalizado) é um lookup de dict;
+- fuzzy busca só os candidatos que mais compartilham trigramas com o
+  nome digitado e calcula o SequenceMatcher apenas neles (com os limites
+  real_quick_ratio/quick_ratio antes do ratio completo).
+
+Sem limite de quantidade. Produtos gravados neste worker entram no índice
+no commit (evento da sessão); o TTL recarrega do banco para enxergar o
+que outros workers gravaram.
+"""
+
+import os
+import threading
+import time
+import unicodedata
+from collections import Counter
+from difflib import SequenceMatcher
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import db, VisitProduct
+
+
+PRODUCT_CATALOG_TTL_SECONDS = int(os.getenv("PRODUCT_CATALOG_TTL", "600"))
+PRODUCT_MATCH_CANDIDATES = 25
+
+
+def normalize_product_name(value: str) -> str:
+    # Mesmo critério de normalize_lookup_text (api_routes)
+    if not value:
+        return ""
+    value = unicodedata.normalize("NFD", value.strip().lower())
+    return "".join(ch for ch in value if unicodedata.category(ch) != "Mn")
+
+
+def _trigrams(normalized: str) -> set:
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ProductCatalog:
+    """Índice em memória: nomes, forma normalizada e postings de trigramas."""
+
+    def __init__(self, names=()):
+        self.names = []
+        self.normalized = []
+        self.by_normalized = {}
+        self.postings = {}
+        self.lock = threading.Lock()
+        self.add_many(names)
+
+    def add_many(self, names) -> None:
+        with self.lock:
+            for name in names:
+                self._add(name)
+
+    def _add(self, name) -> None:
+        name = (name or "").strip()
+        if not name:
+            return
+        normalized = normalize_product_name(name)
+        if normalized in self.by_normalized:
+            return
+
+        idx = len(self.names)
+        self.names.append(name)
+        self.normalized.append(normalized)
+        self.by_normalized[normalized] = idx
+        for gram in _trigrams(normalized):
+            self.postings.setdefault(gram, []).append(idx)
+
+    def _candidates(self, normalized: str) -> list:
+        counts = Counter()
+        with self.lock:
+            for gram in _trigrams(normalized):
+                counts.update(self.postings.get(gram, ()))
+        return [idx for idx, _ in counts.most_common(PRODUCT_MATCH_CANDIDATES)]
+
+    def best_match(self, raw_name: str):
+        """Retorna (nome_mais_parecido, score) como find_similar_product_name."""
+        target = normalize_product_name(raw_name)
+        if not target:
+            return None, 0.0
+
+        exact = self.by_normalized.get(target)
+        if exact is not None:
+            return self.names[exact], 1.0
+
+        best_idx = None
+        best_score = 0.0
+        # Mesma orientação de find_similar_product_name: a=digitado, b=catálogo
+        matcher = SequenceMatcher(None, target, "")
+        for idx in self._candidates(target):
+            matcher.set_seq2(self.normalized[idx])
+            if matcher.real_quick_ratio() <= best_score or matcher.quick_ratio() <= best_score:
+                continue
+            score = matcher.ratio()
+            if score > best_score:
+                best_score = score
+                best_idx = idx
+
+        if best_idx is None:
+            return None, 0.0
+        return self.names[best_idx], best_score
+
+
+_catalog = {"index": None, "expires_at": 0.0}
+_catalog_lock = threading.Lock()
+
+
+def _load_catalog() -> ProductCatalog:
+    rows = (
+        db.session.query(VisitProduct.product_name)
+        .filter(VisitProduct.product_name.isnot(None))
+        .distinct()
+        .all()
+    )
+    return ProductCatalog(row[0] for row in rows)
+
+
+def get_product_catalog() -> ProductCatalog:
+    now = time.monotonic()
+    index = _catalog["index"]
+    if index is not None and _catalog["expires_at"] > now:
+        return index
+
+    with _catalog_lock:
+        if _catalog["index"] is None or _catalog["expires_at"] <= now:
+            try:
+                _catalog["index"] = _load_catalog()
+            except Exception as e:
+                db.session.rollback()
+                print("⚠️ Falha ao carregar catálogo de produtos:", e)
+                if _catalog["index"] is None:
+                    return ProductCatalog()
+            _catalog["expires_at"] = now + PRODUCT_CATALOG_TTL_SECONDS
+        return _catalog["index"]
+
+
+def invalidate_product_catalog() -> None:
+    with _catalog_lock:
+        _catalog["expires_at"] = 0.0
+
+
+def get_known_product_names() -> list:
+    return list(get_product_catalog().names)
+
+
+# ============================================================
+# Nomes novos entram no índice no commit
+# ============================================================
+
+@event.listens_for(Session, "after_flush")
+def _collect_product_names(session, flush_context):
+    names = [
+        obj.product_name
+        for obj in list(session.new) + list(session.dirty)
+        if isinstance(obj, VisitProduct) and obj.product_name
+    ]
+    if names:
+        session.info.setdefault("new_product_names", []).extend(names)
+
+
+@event.listens_for(Session, "after_commit")
+def _index_product_names(session):
+    names = session.info.pop("new_product_names", None)
+    index = _catalog["index"]
+    if names and index is not None:
+        index.add_many(names)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_product_names(session):
+    session.info.pop("new_product_names", None)
@@ -0,0 +1,463 @@
+"""
+Camada analítica dos relatórios de visitas (XLSX, CSV, Parquet).
+
+O período filtrado é carregado uma vez, direto em colunas compactas
+(array do stdlib: ids, datas em ordinal, flags e textos codificados por
+dicionário), sem objetos ORM por visita. Os KPIs saem de group-bys de uma
+passada sobre as colunas:
+
+- visita única = (cliente, dia, cultura); lançamentos repetidos contam 1
+- visita concluída = visita com foto
+- meta = META_VISITAS_CLIENTE visitas por cliente da carteira
+
+Os renderizadores (excel_report_service, report_export_service) só leem
+ReportData / ReportKPIs.
+"""
+
+from array import array
+from collections import Counter, namedtuple
+from datetime import date as _date, timedelta
+
+from sqlalchemy import and_, exists
+
+from models import (
+    db,
+    Visit,
+    Photo,
+    Planting,
+    VisitProduct,
+    Client,
+    Property,
+    Plot,
+    Consultant,
+    get_season_by_key,
+    AVAILABLE_SEASONS,
+)
+
+META_VISITAS_CLIENTE = 5
+
+ReportParams = namedtuple("ReportParams", [
+    "start_date",
+    "end_date",
+    "region",
+    "season",
+    "consultant_id",
+])
+
+
+# ============================================================
+# Parâmetros
+# ============================================================
+
+def parse_report_params(args) -> ReportParams:
+    """Lê ?month= ou ?start=&end=, mais region/season/consultant. ValueError se inválido."""
+    month = args.get("month")
+    start = args.get("start")
+    end = args.get("end")
+
+    region = (args.get("region") or "").strip()
+    season_key = (args.get("season") or "").strip()
+    consultant_id = (args.get("consultant") or "").strip()
+    try:
+        consultant_id = int(consultant_id) if consultant_id else None
+    except ValueError:
+        consultant_id = None
+
+    if month:
+        y, m = [int(x) for x in month.split("-")]
+        start_date = _date(y, m, 1)
+        next_month = _date(y + 1, 1, 1) if m == 12 else _date(y, m + 1, 1)
+        end_date = next_month - timedelta(days=1)
+    else:
+        if not start or not end:
+            raise ValueError("Informe ?month=YYYY-MM ou ?start=YYYY-MM-DD&end=YYYY-MM-DD")
+        start_date = _date.fromisoformat(start)
+        end_date = _date.fromisoformat(end)
+
+    season = get_season_by_key(season_key) if season_key else None
+    if season:
+        start_date = max(start_date, _date.fromisoformat(season["start"]))
+        end_date = min(end_date, _date.fromisoformat(season["end"]))
+
+    return ReportParams(start_date, end_date, region or None, season, consultant_id)
+
+
+def filters_label(params: ReportParams) -> str:
+    labels = []
+    if params.region:
+        labels.append(f"Região: {params.region}")
+    if params.season:
+        labels.append(f"Safra: {params.season['label']} ({params.season['culture']})")
+    return " • ".join(labels) if labels else "Carteira completa (todas as safras conhecidas)"
+
+
+# ============================================================
+# Colunas
+# ============================================================
+
+class StringPool:
+    """Codificação por dicionário: código 0 = None."""
+
+    def __init__(self):
+        self.values = [None]
+        self._codes = {}
+
+    def encode(self, value) -> int:
+        if value is None:
+            return 0
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self._codes[value] = code
+        return code
+
+    def decode(self, code: int):
+        return self.values[code]
+
+
+def _ordinal(d) -> int:
+    return d.toordinal() if d else 0
+
+
+def from_ordinal(value: int):
+    return _date.fromordinal(value) if value else None
+
+
+_VISIT_INT_COLUMNS = (
+    "id", "client_id", "property_id", "plot_id", "consultant_id",
+    "date", "planting_date",
+)
+_VISIT_CODE_COLUMNS = ("culture", "variety", "planting_variety", "fenologia", "status")
+_VISIT_FLAG_COLUMNS = ("has_planting", "has_photo")
+
+_PRODUCT_INT_COLUMNS = ("visit_row", "application_date")
+_PRODUCT_CODE_COLUMNS = ("product_name", "dose", "unit")
+
+
+class ReportData:
+    """
+    Visitas e produtos do período em colunas paralelas.
+    Ids/datas: array('q') com 0 para NULL. Textos curtos: códigos em `strings`.
+    culture já é a cultura resolvida (visita, senão plantio, "" se nenhuma).
+    """
+
+    def __init__(self, params: ReportParams):
+        self.params = params
+        self.strings = StringPool()
+        self.visits = {name: array("q") for name in _VISIT_INT_COLUMNS + _VISIT_CODE_COLUMNS}
+        self.visits.update({name: array("b") for name in _VISIT_FLAG_COLUMNS})
+        self.recommendations = []
+        self.products = {name: array("q") for name in _PRODUCT_INT_COLUMNS + _PRODUCT_CODE_COLUMNS}
+
+        self.carteira_ids = set()
+        self.all_client_ids = []
+        self.clients_map = {}
+        self.props_map = {}
+        self.plots_map = {}
+        self.consultants_map = {}
+
+    @property
+    def visit_count(self) -> int:
+        return len(self.visits["id"])
+
+    @property
+    def product_count(self) -> int:
+        return len(self.products["visit_row"])
+
+    def text(self, column: str, row: int, table: str = "visits"):
+        source = self.visits if table == "visits" else self.products
+        return self.strings.decode(source[column][row])
+
+
+def build_active_clients_for_seasons(seasons_list, region_filter=None) -> set:
+    """Clientes com plantio da cultura da safra dentro da janela da safra."""
+    if not seasons_list:
+        return set()
+
+    season_ranges = []
+    for s in seasons_list:
+        try:
+            season_ranges.append((
+                s["culture"].strip().lower(),
+                _date.fromisoformat(s["start"]),
+                _date.fromisoformat(s["end"]),
+            ))
+        except Exception:
+            continue
+
+    plantings_q = (
+        db.session.query(Planting.culture, Planting.planting_date, Property.client_id)
+        .join(Plot, Planting.plot_id == Plot.id)
+        .join(Property, Plot.property_id == Property.id)
+        .join(Client, Property.client_id == Client.id)
+        .filter(Planting.planting_date.isnot(None))
+        .filter(Planting.culture.isnot(None))
+    )
+    if region_filter:
+        plantings_q = plantings_q.filter(Client.region == region_filter)
+
+    active_ids = set()
+    for culture, planting_date, client_id in plantings_q.all():
+        if not planting_date or not culture or not client_id:
+            continue
+        culture_norm = culture.strip().lower()
+        for s_culture, s_start, s_end in season_ranges:
+            if culture_norm == s_culture and s_start <= planting_date <= s_end:
+                active_ids.add(client_id)
+                break
+
+    return active_ids
+
+
+def build_consultants_map() -> dict:
+    consultants_map = {}
+    try:
+        consultants_map = dict(db.session.query(Consultant.id, Consultant.name).all())
+        if consultants_map:
+            return consultants_map
+    except Exception as e:
+        db.session.rollback()
+        print(f"[report_engine] Consultant.query falhou: {e}")
+    try:
+        from routes import CONSULTANTS
+        consultants_map = {c["id"]: c["name"] for c in CONSULTANTS}
+    except Exception:
+        pass
+    return consultants_map
+
+
+def _names(model, ids) -> dict:
+    if not ids:
+        return {}
+    return dict(db.session.query(model.id, model.name).filter(model.id.in_(ids)).all())
+
+
+def load_report_data(params: ReportParams) -> ReportData:
+    """Carrega o período em colunas com um número fixo de queries."""
+    data = ReportData(params)
+    seasons = [params.season] if params.season else AVAILABLE_SEASONS
+
+    data.carteira_ids = build_active_clients_for_seasons(seasons, region_filter=params.region)
+
+    period_filter = [
+        Visit.date >= params.start_date,
+        Visit.date <= params.end_date,
+        Visit.client_id.isnot(None),
+    ]
+    if params.consultant_id:
+        period_filter.append(Visit.consultant_id == params.consultant_id)
+
+    visits_clients_ids = {
+        row[0] for row in db.session.query(Visit.client_id).filter(*period_filter).distinct().all()
+    }
+    effective_client_ids = data.carteira_ids | visits_clients_ids
+
+    if effective_client_ids:
+        visit_filter = [
+            Visit.date >= params.start_date,
+            Visit.date <= params.end_date,
+            Visit.client_id.in_(effective_client_ids),
+        ]
+        if params.consultant_id:
+            visit_filter.append(Visit.consultant_id == params.consultant_id)
+        _load_visit_columns(data, visit_filter)
+        _load_product_columns(data, visit_filter)
+
+    # Nomes: carteira + clientes com visita única; propriedades/talhões dos lançamentos
+    v = data.visits
+    eligible = [i for i in range(data.visit_count) if v["client_id"][i] and v["date"][i]]
+    client_ids = {v["client_id"][i] for i in eligible}
+    data.all_client_ids = sorted(data.carteira_ids | client_ids)
+    data.clients_map = _names(Client, data.all_client_ids)
+    data.props_map = _names(Property, sorted({v["property_id"][i] for i in eligible if v["property_id"][i]}))
+    data.plots_map = _names(Plot, sorted({v["plot_id"][i] for i in eligible if v["plot_id"][i]}))
+    data.consultants_map = build_consultants_map()
+    return data
+
+
+def _load_visit_columns(data: ReportData, visit_filter):
+    has_photo = exists().where(and_(
+        Photo.visit_id == Visit.id,
+        Photo.url.isnot(None),
+        Photo.url != "",
+    ))
+    rows = (
+        db.session.query(
+            Visit.id, Visit.client_id, Visit.property_id, Visit.plot_id, Visit.consultant_id,
+            Visit.date, Visit.culture, Visit.variety, Visit.fenologia_real, Visit.status,
+            Visit.recommendation,
+            Planting.id, Planting.culture, Planting.variety, Planting.planting_date,
+            has_photo.label("has_photo"),
+        )
+        .outerjoin(Planting, Planting.id == Visit.planting_id)
+        .filter(*visit_filter)
+        .order_by(Visit.date.asc().nullslast(), Visit.id.asc())
+        .yield_per(2000)
+    )
+
+    season_culture = (data.params.season["culture"].strip().lower()
+                      if data.params.season else None)
+    encode = data.strings.encode
+    cols = data.visits
+
+    for (visit_id, client_id, property_id, plot_id, consultant_id,
+         visit_date, culture, variety, fenologia, status, recommendation,
+         planting_id, planting_culture, planting_variety, planting_date, photo) in rows:
+
+        resolved = (culture or "").strip()
+        if not resolved and planting_id:
+            resolved = (planting_culture or "").strip()
+        if season_culture and resolved.strip().lower() != season_culture:
+            continue
+
+        cols["id"].append(visit_id)
+        cols["client_id"].append(client_id or 0)
+        cols["property_id"].append(property_id or 0)
+        cols["plot_id"].append(plot_id or 0)
+        cols["consultant_id"].append(consultant_id or 0)
+        cols["date"].append(_ordinal(visit_date))
+        cols["planting_date"].append(_ordinal(planting_date) if planting_id else 0)
+        cols["culture"].append(encode(resolved))
+        cols["variety"].append(encode(variety))
+        cols["planting_variety"].append(encode(planting_variety))
+        cols["fenologia"].append(encode(fenologia))
+        cols["status"].append(encode(status))
+        cols["has_planting"].append(1 if planting_id else 0)
+        cols["has_photo"].append(1 if photo else 0)
+        data.recommendations.append(recommendation)
+
+
+def _load_product_columns(data: ReportData, visit_filter):
+    if not data.visit_count:
+        return
+
+    row_by_visit = {visit_id: i for i, visit_id in enumerate(data.visits["id"])}
+    rows = (
+        db.session.query(
+            VisitProduct.visit_id, VisitProduct.product_name, VisitProduct.dose,
+            VisitProduct.unit, VisitProduct.application_date,
+        )
+        .join(Visit, Visit.id == VisitProduct.visit_id)
+        .filter(*visit_filter)
+        .order_by(Visit.date.asc().nullslast(), Visit.id.asc(), VisitProduct.id.asc())
+        .yield_per(2000)
+    )
+
+    encode = data.strings.encode
+    cols = data.products
+    for visit_id, product_name, dose, unit, application_date in rows:
+        row = row_by_visit.get(visit_id)
+        if row is None:  # visita fora da cultura da safra
+            continue
+        cols["visit_row"].append(row)
+        cols["product_name"].append(encode(product_name))
+        cols["dose"].append(encode(dose))
+        cols["unit"].append(encode(unit))
+        cols["application_date"].append(_ordinal(application_date))
+
+
+# ============================================================
+# KPIs
+# ============================================================
+
+class ReportKPIs:
+    """Agregados do relatório; visitas únicas também em colunas (group_*)."""
+
+    def __init__(self):
+        self.group_client = array("q")
+        self.group_date = array("q")
+        self.group_culture = array("q")
+        self.group_consultant = array("q")
+        self.group_has_photo = array("b")
+        self.group_launches = array("q")
+
+        self.total_visits_unique = 0
+        self.visits_with_photo = 0
+        self.total_launches_with_photo = 0
+        self.unique_clients_attended = 0
+        self.total_clients = 0
+        self.coverage = 0
+        self.photo_visits_by_client = Counter()
+        self.clients_in_target = 0
+        self.meta_total = 0
+        self.target_pct = 0
+        self.consultant_counts = Counter()
+        self.culture_counts = Counter()
+        self.weeks = []
+
+
+def week_label(d):
+    iso_year, iso_week, _ = d.isocalendar()
+    monday = d - timedelta(days=d.weekday())
+    sunday = monday + timedelta(days=6)
+    return f"{monday.strftime('%d/%m')}–{sunday.strftime('%d/%m')}", (iso_year, iso_week)
+
+
+def compute_kpis(data: ReportData) -> ReportKPIs:
+    k = ReportKPIs()
+    v = data.visits
+
+    # Group-by (cliente, dia, cultura) numa passada; ordem = primeira aparição
+    group_index = {}
+    for client_id, day, culture, consultant_id, photo in zip(
+        v["client_id"], v["date"], v["culture"], v["consultant_id"], v["has_photo"]
+    ):
+        if not client_id or not day:
+            continue
+        key = (client_id, day, culture)
+        g = group_index.get(key)
+        if g is None:
+            group_index[key] = len(k.group_client)
+            k.group_client.append(client_id)
+            k.group_date.append(day)
+            k.group_culture.append(culture)
+            k.group_consultant.append(consultant_id)
+            k.group_has_photo.append(photo)
+            k.group_launches.append(1)
+        else:
+            k.group_launches[g] += 1
+            if photo:
+                k.group_has_photo[g] = 1
+            if not k.group_consultant[g]:
+                k.group_consultant[g] = consultant_id
+        if photo:
+            k.total_launches_with_photo += 1
+
+    k.total_visits_unique = len(k.group_client)
+    k.total_clients = len(data.all_client_ids)
+
+    weeks = {}
+    decode = data.strings.decode
+    for client_id, day, culture, consultant_id, photo in zip(
+        k.group_client, k.group_date, k.group_culture, k.group_consultant, k.group_has_photo
+    ):
+        if not photo:
+            continue
+        k.visits_with_photo += 1
+        k.photo_visits_by_client[client_id] += 1
+        if consultant_id:
+            k.consultant_counts[consultant_id] += 1
+        k.culture_counts[(decode(culture) or "—").strip() or "—"] += 1
+
+        label, week_key = week_label(_date.fromordinal(day))
+        bucket = weeks.setdefault(week_key, [label, 0])
+        bucket[1] += 1
+
+    k.weeks = [(label, count) for _, (label, count) in sorted(weeks.items())]
+
+    k.unique_clients_attended = len(k.photo_visits_by_client)
+    k.coverage = (k.unique_clients_attended / k.total_clients) if k.total_clients else 0
+    k.clients_in_target = sum(
+        1 for cnt in k.photo_visits_by_client.values() if cnt >= META_VISITAS_CLIENTE
+    )
+    k.meta_total = k.total_clients * META_VISITAS_CLIENTE
+    k.target_pct = (k.visits_with_photo / k.meta_total) if k.meta_total else 0
+    return k
+
+
+def build_report(args):
+    """(params, data, kpis) a partir dos query params."""
+    params = parse_report_params(args)
+    data = load_report_data(params)
+    return params, data, compute_kpis(data)
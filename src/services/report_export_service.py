@@ -0,0 +1,249 @@
+"""
+Exportações do relatório de visitas para BI (CSV e Parquet).
+
+Leem as colunas de report_engine (mesmos filtros e regras do XLSX) e
+escrevem coluna a coluna, sem montar objetos por célula:
+- CSV: enviado em blocos de linhas; o período já está todo em memória
+  (report_engine), o streaming só evita montar o arquivo inteiro
+- Parquet: pyarrow (opcional; sem ele a rota responde 501), textos
+  como DictionaryArray direto dos códigos do StringPool
+
+Tabelas (?table=):
+- visits: um lançamento por linha
+- unique_visits: visitas únicas (cliente, dia, cultura)
+- products: produtos aplicados
+- clients: progresso da meta por cliente
+"""
+
+import csv
+import importlib.util
+import io
+from array import array
+from datetime import date as _date
+
+from flask import Response, jsonify
+
+from services.report_engine import META_VISITAS_CLIENTE, build_report, from_ordinal
+
+EXPORT_TABLES = ("visits", "unique_visits", "products", "clients")
+CSV_CHUNK_ROWS = 5000
+
+_EPOCH_ORDINAL = _date(1970, 1, 1).toordinal()
+
+
+class ExportColumn:
+    """
+    kind: "id" (0 = nulo), "int", "date" (ordinal, 0 = nulo),
+    "code" (StringPool), "str", "bool" ou "float".
+    """
+
+    __slots__ = ("name", "kind", "values")
+
+    def __init__(self, name, kind, values):
+        self.name = name
+        self.kind = kind
+        self.values = values
+
+
+def _lookup(ids, names_map, default=None):
+    return [names_map.get(i, default) if i else None for i in ids]
+
+
+def _take(column, rows):
+    return array(column.typecode, (column[i] for i in rows))
+
+
+def build_export_table(data, kpis, table: str) -> list:
+    """Lista de ExportColumn para a tabela pedida."""
+    v, p = data.visits, data.products
+
+    if table == "visits":
+        days_after_planting = [
+            d - pd if d and pd else None
+            for d, pd in zip(v["date"], v["planting_date"])
+        ]
+        return [
+            ExportColumn("visit_id", "id", v["id"]),
+            ExportColumn("date", "date", v["date"]),
+            ExportColumn("client_id", "id", v["client_id"]),
+            ExportColumn("client", "str", _lookup(v["client_id"], data.clients_map)),
+            ExportColumn("property_id", "id", v["property_id"]),
+            ExportColumn("property", "str", _lookup(v["property_id"], data.props_map)),
+            ExportColumn("plot_id", "id", v["plot_id"]),
+            ExportColumn("plot", "str", _lookup(v["plot_id"], data.plots_map)),
+            ExportColumn("consultant_id", "id", v["consultant_id"]),
+            ExportColumn("consultant", "str", _lookup(v["consultant_id"], data.consultants_map)),
+            ExportColumn("culture", "code", v["culture"]),
+            ExportColumn("variety", "code", v["variety"]),
+            ExportColumn("fenologia", "code", v["fenologia"]),
+            ExportColumn("status", "code", v["status"]),
+            ExportColumn("has_photo", "bool", v["has_photo"]),
+            ExportColumn("days_after_planting", "int", days_after_planting),
+        ]
+
+    if table == "unique_visits":
+        return [
+            ExportColumn("client_id", "id", kpis.group_client),
+            ExportColumn("client", "str", _lookup(kpis.group_client, data.clients_map)),
+            ExportColumn("date", "date", kpis.group_date),
+            ExportColumn("culture", "code", kpis.group_culture),
+            ExportColumn("consultant_id", "id", kpis.group_consultant),
+            ExportColumn("consultant", "str", _lookup(kpis.group_consultant, data.consultants_map)),
+            ExportColumn("launches", "int", kpis.group_launches),
+            ExportColumn("has_photo", "bool", kpis.group_has_photo),
+        ]
+
+    if table == "products":
+        rows = p["visit_row"]
+        client_ids = _take(v["client_id"], rows)
+        consultant_ids = _take(v["consultant_id"], rows)
+        return [
+            ExportColumn("visit_id", "id", _take(v["id"], rows)),
+            ExportColumn("date", "date", _take(v["date"], rows)),
+            ExportColumn("client_id", "id", client_ids),
+            ExportColumn("client", "str", _lookup(client_ids, data.clients_map)),
+            ExportColumn("consultant_id", "id", consultant_ids),
+            ExportColumn("consultant", "str", _lookup(consultant_ids, data.consultants_map)),
+            ExportColumn("culture", "code", _take(v["culture"], rows)),
+            ExportColumn("fenologia", "code", _take(v["fenologia"], rows)),
+            ExportColumn("product", "code", p["product_name"]),
+            ExportColumn("dose", "code", p["dose"]),
+            ExportColumn("unit", "code", p["unit"]),
+            ExportColumn("application_date", "date", p["application_date"]),
+        ]
+
+    if table == "clients":
+        counts = kpis.photo_visits_by_client
+        client_ids = array("q", sorted(set(data.all_client_ids) | set(counts)))
+        done = array("q", (counts.get(cid, 0) for cid in client_ids))
+        return [
+            ExportColumn("client_id", "id", client_ids),
+            ExportColumn("client", "str", _lookup(client_ids, data.clients_map)),
+            ExportColumn("in_portfolio", "bool", array("b", (cid in data.carteira_ids for cid in client_ids))),
+            ExportColumn("photo_visits", "int", done),
+            ExportColumn("target", "int", array("q", [META_VISITAS_CLIENTE]) * len(client_ids)),
+            ExportColumn("target_pct", "float", [min(cnt / META_VISITAS_CLIENTE, 1.0) for cnt in done]),
+        ]
+
+    raise KeyError(table)
+
+
+# ============================================================
+# CSV
+# ============================================================
+
+def _csv_formatter(column, strings):
+    if column.kind == "id":
+        return lambda value: value if value else ""
+    if column.kind == "date":
+        return lambda value: from_ordinal(value).isoformat() if value else ""
+    if column.kind == "code":
+        values = strings.values
+        return lambda value: values[value] if value else ""
+    if column.kind == "bool":
+        return lambda value: 1 if value else 0
+    return lambda value: "" if value is None else value
+
+
+def iter_csv(columns, strings, chunk_rows: int = CSV_CHUNK_ROWS):
+    """Gera o CSV em blocos de `chunk_rows` linhas."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow([c.name for c in columns])
+
+    formatters = [_csv_formatter(c, strings) for c in columns]
+    total = len(columns[0].values) if columns else 0
+    for start in range(0, total, chunk_rows):
+        end = min(start + chunk_rows, total)
+        formatted = [
+            map(fmt, column.values[start:end])
+            for fmt, column in zip(formatters, columns)
+        ]
+        writer.writerows(zip(*formatted))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    tail = buffer.getvalue()
+    if tail:
+        yield tail
+
+
+# ============================================================
+# Parquet
+# ============================================================
+
+def build_arrow_table(columns, strings):
+    import pyarrow as pa
+
+    dictionary = pa.array(strings.values, type=pa.string())
+    arrays = []
+    for column in columns:
+        values = column.values
+        if column.kind == "id":
+            arrays.append(pa.array([x if x else None for x in values], type=pa.int64()))
+        elif column.kind == "int":
+            arrays.append(pa.array(values, type=pa.int64()))
+        elif column.kind == "date":
+            days = pa.array([x - _EPOCH_ORDINAL if x else None for x in values], type=pa.int32())
+            arrays.append(days.cast(pa.date32()))
+        elif column.kind == "code":
+            indices = pa.array([x if x else None for x in values], type=pa.int32())
+            arrays.append(pa.DictionaryArray.from_arrays(indices, dictionary))
+        elif column.kind == "bool":
+            arrays.append(pa.array([bool(x) for x in values], type=pa.bool_()))
+        elif column.kind == "float":
+            arrays.append(pa.array(values, type=pa.float64()))
+        else:
+            arrays.append(pa.array(values, type=pa.string()))
+    return pa.Table.from_arrays(arrays, names=[c.name for c in columns])
+
+
+def write_parquet(columns, strings) -> bytes:
+    import pyarrow.parquet as pq
+
+    sink = io.BytesIO()
+    pq.write_table(build_arrow_table(columns, strings), sink, compression="zstd")
+    return sink.getvalue()
+
+
+# ============================================================
+# Respostas
+# ============================================================
+
+def _prepare(request):
+    table = (request.args.get("table") or "visits").strip()
+    if table not in EXPORT_TABLES:
+        return None, (jsonify(message=f"table deve ser um de: {', '.join(EXPORT_TABLES)}"), 400)
+    try:
+        params, data, kpis = build_report(request.args)
+    except ValueError as e:
+        return None, (jsonify(message=str(e)), 400)
+
+    filename = f"relatorio_{table}_{params.start_date.isoformat()}_a_{params.end_date.isoformat()}"
+    return (build_export_table(data, kpis, table), data.strings, filename), None
+
+
+def generate_report_csv(request):
+    prepared, error = _prepare(request)
+    if error:
+        return error
+
+    columns, strings, filename = prepared
+    response = Response(iter_csv(columns, strings), mimetype="text/csv")
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}.csv"'
+    return response
+
+
+def generate_report_parquet(request):
+    if importlib.util.find_spec("pyarrow") is None:
+        return jsonify(message="Exportação Parquet indisponível (pyarrow não instalado)"), 501
+
+    prepared, error = _prepare(request)
+    if error:
+        return error
+
+    columns, strings, filename = prepared
+    response = Response(write_parquet(columns, strings), mimetype="application/vnd.apache.parquet")
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}.parquet"'
+    return response
@@ -0,0 +1,200 @@
+"""
+Sincronização incremental do catálogo do app (consultores, clientes,
+propriedades, talhões, culturas e variedades).
+
+Toda gravação dessas tabelas pelo ORM registra uma linha em sync_changes
+no mesmo commit (evento after_flush). O id da linha é a versão monotônica:
+o app guarda a última versão recebida e pede só o que mudou depois dela.
+
+Formato compacto (igual no snapshot e no delta):
+    {
+      "version": 123, "full": false, "has_more": false,
+      "entities": {
+        "clients": {"columns": ["id", "name"], "rows": [[1, "João"]], "deleted": [7]},
+        ...
+      }
+    }
+
+retry_after (só no delta): segundos até o app pedir de novo quando o
+delta parou num buraco ainda dentro do SYNC_GAP_GRACE_SECONDS. Nesse caso
+has_more é false: chamar de novo na hora devolveria a mesma versão.
+"""
+
+import math
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import db, Client, Consultant, Culture, Plot, Property, SyncChange, Variety
+
+
+SYNC_MAX_CHANGES = 5000
+# Buracos na sequência mais novos que isso podem ser transações ainda
+# não commitadas: a versão devolvida para antes deles.
+SYNC_GAP_GRACE_SECONDS = 30
+IN_CHUNK_SIZE = 1000
+
+ENTITY_COLUMNS = {
+    "consultants": ("id", "name"),
+    "clients": ("id", "name"),
+    "properties": ("id", "name", "client_id"),
+    "plots": ("id", "name", "property_id"),
+    "cultures": ("id", "name"),
+    "varieties": ("id", "name", "culture_id", "culture_name"),
+}
+
+_MODEL_ENTITIES = {
+    Consultant: "consultants",
+    Client: "clients",
+    Property: "properties",
+    Plot: "plots",
+    Culture: "cultures",
+    Variety: "varieties",
+}
+
+
+# ============================================================
+# Registro das alterações
+# ============================================================
+
+@event.listens_for(Session, "after_flush")
+def _record_sync_changes(session, flush_context):
+    now = datetime.utcnow()
+    rows = []
+
+    for obj in session.new:
+        entity = _MODEL_ENTITIES.get(type(obj))
+        if entity and obj.id is not None:
+            rows.append({"entity": entity, "entity_id": obj.id, "op": "upsert", "created_at": now})
+
+    for obj in session.dirty:
+        entity = _MODEL_ENTITIES.get(type(obj))
+        if entity and session.is_modified(obj, include_collections=False):
+            rows.append({"entity": entity, "entity_id": obj.id, "op": "upsert", "created_at": now})
+
+    for obj in session.deleted:
+        entity = _MODEL_ENTITIES.get(type(obj))
+        if entity and obj.id is not None:
+            rows.append({"entity": entity, "entity_id": obj.id, "op": "delete", "created_at": now})
+
+    if rows:
+        session.connection().execute(SyncChange.__table__.insert(), rows)
+
+
+# ============================================================
+# Leitura
+# ============================================================
+
+def _entity_query(entity):
+    if entity == "consultants":
+        return db.session.query(Consultant.id, Consultant.name), Consultant.id
+    if entity == "clients":
+        return db.session.query(Client.id, Client.name), Client.id
+    if entity == "properties":
+        return db.session.query(Property.id, Property.name, Property.client_id), Property.id
+    if entity == "plots":
+        return db.session.query(Plot.id, Plot.name, Plot.property_id), Plot.id
+    if entity == "cultures":
+        return db.session.query(Culture.id, Culture.name), Culture.id
+    if entity == "varieties":
+        return (
+            db.session.query(Variety.id, Variety.name, Variety.culture_id, Culture.name)
+            .outerjoin(Culture, Culture.id == Variety.culture_id),
+            Variety.id,
+        )
+    raise KeyError(entity)
+
+
+def _load_rows(entity, ids=None):
+    query, id_column = _entity_query(entity)
+    if ids is None:
+        return [list(row) for row in query.order_by(id_column).all()]
+
+    rows = []
+    ids = sorted(ids)
+    for i in range(0, len(ids), IN_CHUNK_SIZE):
+        chunk = ids[i:i + IN_CHUNK_SIZE]
+        rows.extend(list(row) for row in query.filter(id_column.in_(chunk)).order_by(id_column).all())
+    return rows
+
+
+def get_current_version() -> int:
+    return db.session.query(db.func.max(SyncChange.id)).scalar() or 0
+
+
+def build_snapshot() -> dict:
+    """Catálogo completo (primeira instalação ou versão desconhecida)."""
+    # Versão lida antes dos dados: no pior caso o próximo delta reenvia
+    # algo que já veio no snapshot (upsert é idempotente).
+    version = get_current_version()
+    return {
+        "version": version,
+        "full": True,
+        "has_more": False,
+        "entities": {
+            entity: {"columns": list(columns), "rows": _load_rows(entity), "deleted": []}
+            for entity, columns in ENTITY_COLUMNS.items()
+        },
+    }
+
+
+def build_delta(since: int) -> dict:
+    """Upserts e tombstones por entidade desde a versão `since`."""
+    changes = (
+        db.session.query(SyncChange.id, SyncChange.entity, SyncChange.entity_id, SyncChange.op, SyncChange.created_at)
+        .filter(SyncChange.id > since)
+        .order_by(SyncChange.id.asc())
+        .limit(SYNC_MAX_CHANGES + 1)
+        .all()
+    )
+
+    has_more = len(changes) > SYNC_MAX_CHANGES
+    changes = changes[:SYNC_MAX_CHANGES]
+
+    grace_limit = datetime.utcnow() - timedelta(seconds=SYNC_GAP_GRACE_SECONDS)
+    version = since
+    retry_after = None
+    latest_ops = {}
+    for change_id, entity, entity_id, op, created_at in changes:
+        if change_id != version + 1 and created_at > grace_limit:
+            # Id anterior pode ser de uma transação ainda aberta: a versão
+            # não avança até o buraco sair da carência
+            has_more = False
+            retry_after = max(1, math.ceil((created_at - grace_limit).total_seconds()))
+            break
+        version = change_id
+        if entity in ENTITY_COLUMNS:
+            latest_ops[(entity, entity_id)] = op
+
+    upserts = {entity: set() for entity in ENTITY_COLUMNS}
+    deleted = {entity: set() for entity in ENTITY_COLUMNS}
+    for (entity, entity_id), op in latest_ops.items():
+        (upserts if op == "upsert" else deleted)[entity].add(entity_id)
+
+    # culture_name vai junto da variedade: cultura renomeada reenvia as variedades
+    if upserts["cultures"]:
+        culture_ids = sorted(upserts["cultures"])
+        for i in range(0, len(culture_ids), IN_CHUNK_SIZE):
+            upserts["varieties"].update(
+                variety_id for (variety_id,) in db.session.query(Variety.id).filter(
+                    Variety.culture_id.in_(culture_ids[i:i + IN_CHUNK_SIZE])
+                ).all()
+            )
+
+    entities = {}
+    for entity, columns in ENTITY_COLUMNS.items():
+        rows = _load_rows(entity, upserts[entity]) if upserts[entity] else []
+        # Alterado e removido depois, dentro da mesma janela
+        found = {row[0] for row in rows}
+        gone = deleted[entity] | (upserts[entity] - found)
+        if rows or gone:
+            entities[entity] = {"columns": list(columns), "rows": rows, "deleted": sorted(gone)}
+
+    return {
+        "version": version,
+        "full": False,
+        "has_more": has_more,
+        "retry_after": retry_after,
+        "entities": entities,
+    }
@@ -0,0 +1,341 @@
+"""
+Cliente único do Bot API do Telegram.
+
+- requests.Session com keep-alive e pool de conexões: mensagens seguidas
+  reaproveitam a mesma conexão TLS em vez de abrir uma por envio.
+- Limites do Bot API aplicados no processo inteiro (respostas do webhook
+  e lembretes em massa dividem o mesmo orçamento): token bucket global
+  (~30 msg/s) e um por chat (~1 msg/s, com rajada curta).
+- 429 espera o retry_after devolvido pelo Telegram; erros de rede e 5xx
+  repetem com backoff exponencial; 4xx não repete. Envios (sendMessage,
+  sendDocument...) não são idempotentes: erro de rede só repete quando a
+  conexão nem abriu; timeout de leitura pode ser mensagem já entregue.
+- Textos acima do limite de 4096 caracteres são quebrados em linhas e
+  reagrupados no menor número de mensagens (coalesce_texts).
+
+TELEGRAM_API_BASE_URL permite apontar para um servidor local (testes).
+Os retornos mantêm o formato de sempre: {"ok", "status_code",
+"response"} ou {"ok": False, "error"}.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+
+TELEGRAM_API_BASE_URL = os.getenv("TELEGRAM_API_BASE_URL", "https://api.telegram.org").rstrip("/")
+TELEGRAM_POOL_SIZE = int(os.getenv("TELEGRAM_POOL_SIZE", "16"))
+TELEGRAM_GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", "25"))
+TELEGRAM_PER_CHAT_RATE = float(os.getenv("TELEGRAM_PER_CHAT_RATE", "1.0"))
+TELEGRAM_PER_CHAT_BURST = float(os.getenv("TELEGRAM_PER_CHAT_BURST", "3"))
+TELEGRAM_CLIENT_RETRIES = 3
+TELEGRAM_BACKOFF_BASE_SECONDS = 0.5
+TELEGRAM_MAX_RETRY_AFTER_SECONDS = 30
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+TELEGRAM_CHAT_LIMITERS_MAX = 5000
+
+# Repetir depois que o pedido chegou ao Telegram duplica a mensagem
+TELEGRAM_NON_IDEMPOTENT_METHODS = frozenset({
+    "sendMessage", "sendPhoto", "sendDocument", "sendAudio", "sendVoice",
+    "sendVideo", "sendMediaGroup", "sendLocation", "forwardMessage", "copyMessage",
+})
+
+
+class RateLimiter:
+    """Token bucket thread-safe: acquire() bloqueia até liberar um envio."""
+
+    def __init__(self, rate_per_second: float, burst: Optional[float] = None):
+        self.rate = max(float(rate_per_second), 0.1)
+        self.capacity = float(burst if burst is not None else max(1.0, self.rate))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def get_retry_after(result: Dict[str, Any]) -> Optional[float]:
+    """Extrai parameters.retry_after de uma resposta 429 do Telegram."""
+    response = result.get("response")
+    if not isinstance(response, dict):
+        return None
+    parameters = response.get("parameters") or {}
+    retry_after = parameters.get("retry_after")
+    try:
+        return float(retry_after) if retry_after is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _request_not_sent(error: requests.RequestException) -> bool:
+    """Falha antes de a conexão abrir: o Telegram não recebeu o pedido."""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+        return isinstance(getattr(error.args[0], "reason", None), NewConnectionError)
+    return False
+
+
+# ============================================================
+# Agrupamento de textos
+# ============================================================
+
+def _split_long_line(line: str, limit: int) -> List[str]:
+    pieces = []
+    while len(line) > limit:
+        cut = line.rfind(" ", 0, limit)
+        if cut <= 0:
+            cut = limit
+        pieces.append(line[:cut].rstrip(" "))
+        line = line[cut:].lstrip(" ")
+    pieces.append(line.rstrip(" ") if pieces else line)
+    return pieces
+
+
+def coalesce_texts(parts: Iterable[str], limit: int = TELEGRAM_MAX_MESSAGE_LENGTH,
+                   separator: str = "\n\n") -> List[str]:
+    """
+    Junta as partes (na ordem) no menor número de mensagens de até
+    `limit` caracteres. Partes maiores que o limite são quebradas por
+    linha (e, se preciso, por palavra).
+    """
+    messages: List[str] = []
+    current = ""
+
+    def push(block: str, sep: str) -> None:
+        nonlocal current
+        if not current:
+            current = block
+        elif len(current) + len(sep) + len(block) <= limit:
+            current = current + sep + block
+        else:
+            messages.append(current)
+            current = block
+
+    for part in parts:
+        part = (part or "").strip("\n")
+        if not part:
+            continue
+        if len(part) <= limit:
+            push(part, separator)
+            continue
+        first = True
+        for line in part.split("\n"):
+            for piece in _split_long_line(line, limit):
+                push(piece, separator if first else "\n")
+                first = False
+
+    if current:
+        messages.append(current)
+    return messages
+
+
+# ============================================================
+# Cliente
+# ============================================================
+
+class TelegramClient:
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        base_url: Optional[str] = None,
+        global_rate: float = TELEGRAM_GLOBAL_RATE,
+        per_chat_rate: float = TELEGRAM_PER_CHAT_RATE,
+        per_chat_burst: float = TELEGRAM_PER_CHAT_BURST,
+        max_retries: int = TELEGRAM_CLIENT_RETRIES,
+        pool_size: int = TELEGRAM_POOL_SIZE,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self._token = token
+        self.base_url = (base_url or TELEGRAM_API_BASE_URL).rstrip("/")
+        self.max_retries = max_retries
+        self.sleep = sleep
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.global_limiter = RateLimiter(global_rate)
+        self.per_chat_rate = per_chat_rate
+        self.per_chat_burst = per_chat_burst
+        self._chat_limiters: Dict[str, RateLimiter] = {}
+        self._chat_lock = threading.Lock()
+
+    @property
+    def token(self) -> Optional[str]:
+        return self._token or os.getenv("TELEGRAM_BOT_TOKEN")
+
+    def _chat_limiter(self, chat_id) -> RateLimiter:
+        key = str(chat_id)
+        with self._chat_lock:
+            limiter = self._chat_limiters.get(key)
+            if limiter is None:
+                if len(self._chat_limiters) >= TELEGRAM_CHAT_LIMITERS_MAX:
+                    self._chat_limiters.clear()
+                limiter = self._chat_limiters[key] = RateLimiter(self.per_chat_rate, self.per_chat_burst)
+            return limiter
+
+    def call(
+        self,
+        method: str,
+        payload: Optional[Dict[str, Any]] = None,
+        files: Optional[Dict[str, Any]] = None,
+        chat_id=None,
+        timeout: float = 20,
+        max_retries: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Chama um método do Bot API. Com chat_id, respeita o limite do chat
+        e o global. Retorna {"ok", "status_code", "response", "attempts"}
+        ou {"ok": False, "error", "attempts"}.
+        Métodos de envio só repetem em 429, 5xx e falha de conexão.
+        """
+        token = self.token
+        if not token:
+            return {"ok": False, "error": "TELEGRAM_BOT_TOKEN not configured"}
+
+        url = f"{self.base_url}/bot{token}/{method}"
+        retries = self.max_retries if max_retries is None else max_retries
+        idempotent = method not in TELEGRAM_NON_IDEMPOTENT_METHODS
+        attempts = 0
+
+        while True:
+            attempts += 1
+            if chat_id is not None:
+                self._chat_limiter(chat_id).acquire()
+                self.global_limiter.acquire()
+
+            try:
+                if files:
+                    response = self.session.post(url, data=payload, files=files, timeout=timeout)
+                else:
+                    response = self.session.post(url, json=payload or {}, timeout=timeout)
+                try:
+                    body = response.json() if response.content else {}
+                except ValueError:
+                    body = {}
+                result = {"ok": response.ok, "status_code": response.status_code, "response": body}
+                transient = response.status_code == 429 or response.status_code >= 500
+            except requests.RequestException as e:
+                result = {"ok": False, "error": str(e)}
+                transient = idempotent or _request_not_sent(e)
+
+            if result["ok"] or not transient or attempts > retries:
+                result["attempts"] = attempts
+                return result
+
+            retry_after = get_retry_after(result)
+            if retry_after is not None:
+                delay = min(retry_after, TELEGRAM_MAX_RETRY_AFTER_SECONDS)
+            else:
+                delay = TELEGRAM_BACKOFF_BASE_SECONDS * (2 ** (attempts - 1))
+            self.sleep(delay)
+
+    # ---------------- métodos do Bot API ----------------
+
+    def send_message(self, chat_id, text: str, parse_mode: str = None,
+                     reply_markup: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Envia o texto; acima de 4096 caracteres vai em várias mensagens
+        (o teclado fica na última). Retorna o resultado da última, com
+        "messages" = quantidade enviada.
+        """
+        text = text or ""
+        chunks = [text] if len(text) <= TELEGRAM_MAX_MESSAGE_LENGTH else coalesce_texts([text])
+        result: Dict[str, Any] = {}
+        for i, chunk in enumerate(chunks):
+            payload = {"chat_id": chat_id, "text": chunk}
+            if parse_mode:
+                payload["parse_mode"] = parse_mode
+            if reply_markup and i == len(chunks) - 1:
+                payload["reply_markup"] = reply_markup
+            result = self.call("sendMessage", payload, chat_id=chat_id)
+            if not result.get("ok"):
+                break
+        result["messages"] = i + 1
+        return result
+
+    def send_texts(self, chat_id, parts: Iterable[str], parse_mode: str = None) -> Dict[str, Any]:
+        """Várias partes para o mesmo chat no menor número de mensagens."""
+        messages = coalesce_texts(parts)
+        if not messages:
+            return {"ok": True, "messages": 0}
+        result: Dict[str, Any] = {}
+        for i, text in enumerate(messages, start=1):
+            result = self.send_message(chat_id, text, parse_mode=parse_mode)
+            if not result.get("ok"):
+                break
+        result["messages"] = i
+        return result
+
+    def send_photo(self, chat_id, photo_url: str, caption: str = None) -> Dict[str, Any]:
+        payload = {"chat_id": chat_id, "photo": photo_url}
+        if caption:
+            payload["caption"] = caption
+        return self.call("sendPhoto", payload, chat_id=chat_id, timeout=30)
+
+    def send_document(self, chat_id, file_bytes: bytes, filename: str, caption: str = "",
+                      mime_type: str = "application/pdf") -> Dict[str, Any]:
+        files = {"document": (filename, file_bytes, mime_type)}
+        payload = {"chat_id": chat_id, "caption": caption or ""}
+        return self.call("sendDocument", payload, files=files, chat_id=chat_id, timeout=60)
+
+    def answer_callback_query(self, callback_id: str) -> Dict[str, Any]:
+        # Só tira o "carregando" do botão: sem fila de chat e sem retry
+        return self.call("answerCallbackQuery", {"callback_query_id": callback_id}, timeout=5, max_retries=0)
+
+    def download_file(self, file_id: str) -> Tuple[Optional[bytes], Optional[str]]:
+        """Baixa um arquivo pelo file_id. Retorna (bytes, erro)."""
+        token = self.token
+        if not token:
+            return None, "TELEGRAM_BOT_TOKEN não configurado"
+
+        result = self.call("getFile", {"file_id": file_id}, timeout=20)
+        if result.get("status_code") != 200:
+            return None, result.get("error") or f"falha getFile status={result.get('status_code')}"
+
+        data = result.get("response") or {}
+        if not data.get("ok"):
+            return None, f"getFile retornou ok=False: {data}"
+
+        file_path = (data.get("result") or {}).get("file_path")
+        if not file_path:
+            return None, "file_path ausente no getFile"
+
+        try:
+            file_resp = self.session.get(f"{self.base_url}/file/bot{token}/{file_path}", timeout=40)
+        except requests.RequestException as e:
+            return None, str(e)
+        if file_resp.status_code != 200:
+            return None, f"falha download status={file_resp.status_code}"
+        return file_resp.content, None
+
+
+_client: Optional[TelegramClient] = None
+_client_lock = threading.Lock()
+
+
+def get_telegram_client() -> TelegramClient:
+    """Cliente compartilhado pelo processo (sessão e limites únicos)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = TelegramClient()
+    return _client
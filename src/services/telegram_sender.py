@@ -0,0 +1,193 @@
+"""
+Envio em lote de mensagens do Telegram (lembretes, avisos em massa).
+
+- Envio concorrente num pool pequeno de threads.
+- Mensagens seguidas para o mesmo chat são agrupadas no menor número de
+  mensagens (até 4096 caracteres cada).
+- Com o envio padrão (send_telegram_message) os limites do Bot API, o
+  429/retry_after e os retries ficam com o TelegramClient, que é único
+  no processo: o lote divide o orçamento com as respostas do webhook.
+- Com um `send` próprio, o lote aplica seus limites (token bucket global
+  + intervalo mínimo por chat) e o retry com backoff.
+
+Os threads não usam app context nem sessão do banco: recebem só chat_id
+e texto, e devolvem dicts simples.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from services.chatbot_service import send_telegram_message
+from services.telegram_client import (
+    TELEGRAM_GLOBAL_RATE,
+    TELEGRAM_MAX_MESSAGE_LENGTH,
+    RateLimiter,
+    coalesce_texts,
+    get_retry_after,
+)
+
+
+TELEGRAM_PER_CHAT_INTERVAL = float(os.getenv("TELEGRAM_PER_CHAT_INTERVAL", "1.0"))
+TELEGRAM_SEND_WORKERS = int(os.getenv("TELEGRAM_SEND_WORKERS", "8"))
+TELEGRAM_SEND_RETRIES = 3
+TELEGRAM_BACKOFF_BASE_SECONDS = 0.5
+TELEGRAM_MAX_RETRY_AFTER_SECONDS = 30
+
+
+class ChatThrottle:
+    """Intervalo mínimo entre mensagens para o mesmo chat."""
+
+    def __init__(self, interval_seconds: float):
+        self.interval = max(float(interval_seconds), 0.0)
+        self.next_allowed = {}
+        self.lock = threading.Lock()
+
+    def wait(self, chat_id: str) -> None:
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_allowed.get(chat_id, 0.0))
+            self.next_allowed[chat_id] = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _is_transient(result: Dict[str, Any]) -> bool:
+    status = result.get("status_code")
+    if status is None:
+        # Falha de rede/timeout (send_telegram_message devolve só "error")
+        return "TELEGRAM_BOT_TOKEN" not in str(result.get("error") or "")
+    return status == 429 or status >= 500
+
+
+def send_with_retry(
+    chat_id: str,
+    text: str,
+    limiter: Optional[RateLimiter] = None,
+    throttle: Optional[ChatThrottle] = None,
+    send: Callable[..., Dict[str, Any]] = send_telegram_message,
+    max_retries: int = TELEGRAM_SEND_RETRIES,
+    sleep: Callable[[float], None] = time.sleep,
+    **kwargs,
+) -> Dict[str, Any]:
+    """Envia uma mensagem respeitando os limites; retorna o último resultado + attempts."""
+    attempts = 0
+    result: Dict[str, Any] = {}
+
+    while True:
+        attempts += 1
+        if throttle:
+            throttle.wait(str(chat_id))
+        if limiter:
+            limiter.acquire()
+
+        try:
+            result = send(chat_id=chat_id, text=text, **kwargs) or {}
+        except Exception as e:
+            result = {"ok": False, "error": str(e)}
+
+        if result.get("ok") or attempts > max_retries or not _is_transient(result):
+            break
+
+        retry_after = get_retry_after(result)
+        if retry_after is not None:
+            delay = min(retry_after, TELEGRAM_MAX_RETRY_AFTER_SECONDS)
+        else:
+            delay = TELEGRAM_BACKOFF_BASE_SECONDS * (2 ** (attempts - 1))
+        sleep(delay)
+
+    result = dict(result)
+    # O TelegramClient já conta as próprias tentativas
+    result["attempts"] = max(attempts, result.get("attempts") or 0)
+    return result
+
+
+def coalesce_batch(messages: List[Dict[str, Any]], limit: int = TELEGRAM_MAX_MESSAGE_LENGTH) -> List[Dict[str, Any]]:
+    """
+    Agrupa as mensagens de cada chat (na ordem) em envios de até `limit`
+    caracteres. Retorna [{"chat_id", "text", "members": [índices em messages]}].
+    """
+    batches: List[Dict[str, Any]] = []
+    open_batch: Dict[str, Dict[str, Any]] = {}
+
+    for index, message in enumerate(messages):
+        chat_key = str(message["chat_id"])
+        text = message["text"] or ""
+        current = open_batch.get(chat_key)
+        if current is not None and len(current["text"]) + 2 + len(text) <= limit:
+            current["text"] = coalesce_texts([current["text"], text], limit=limit)[0]
+            current["members"].append(index)
+            continue
+        current = {"chat_id": message["chat_id"], "text": text, "members": [index]}
+        batches.append(current)
+        open_batch[chat_key] = current
+    return batches
+
+
+def send_telegram_messages(
+    messages: List[Dict[str, Any]],
+    send: Callable[..., Dict[str, Any]] = send_telegram_message,
+    max_workers: int = TELEGRAM_SEND_WORKERS,
+    global_rate: float = TELEGRAM_GLOBAL_RATE,
+    per_chat_interval: float = TELEGRAM_PER_CHAT_INTERVAL,
+    max_retries: int = TELEGRAM_SEND_RETRIES,
+) -> List[Dict[str, Any]]:
+    """
+    Envia várias mensagens em paralelo.
+    messages: [{"chat_id": ..., "text": ..., "key": <opcional>}, ...]
+    Mensagens para o mesmo chat saem agrupadas (coalesce_batch); cada uma
+    recebe o resultado do envio em que entrou.
+    Retorna uma lista na mesma ordem: {"key", "chat_id", "ok", "attempts", "status_code", "error"}
+    """
+    if not messages:
+        return []
+
+    if send is send_telegram_message:
+        # O cliente compartilhado já limita, espera o 429 e repete
+        limiter, throttle, max_retries = None, None, 0
+    else:
+        limiter = RateLimiter(global_rate)
+        throttle = ChatThrottle(per_chat_interval)
+
+    def _send_one(batch):
+        started = time.monotonic()
+        result = send_with_retry(
+            chat_id=batch["chat_id"],
+            text=batch["text"],
+            limiter=limiter,
+            throttle=throttle,
+            send=send,
+            max_retries=max_retries,
+        )
+        error = None
+        if not result.get("ok"):
+            error = result.get("error")
+            if not error:
+                response = result.get("response") or {}
+                error = response.get("description") if isinstance(response, dict) else None
+            error = error or f"HTTP {result.get('status_code')}"
+        return {
+            "ok": bool(result.get("ok")),
+            "attempts": result.get("attempts", 1),
+            "status_code": result.get("status_code"),
+            "error": error,
+            "elapsed_ms": int((time.monotonic() - started) * 1000),
+        }
+
+    batches = coalesce_batch(messages)
+    workers = max(1, min(max_workers, len(batches)))
+    if workers == 1:
+        outcomes = [_send_one(b) for b in batches]
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tg-send") as pool:
+            outcomes = list(pool.map(_send_one, batches))
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(messages)
+    for batch, outcome in zip(batches, outcomes):
+        for index in batch["members"]:
+            message = messages[index]
+            results[index] = {"key": message.get("key"), "chat_id": message["chat_id"], **outcome}
+    return results
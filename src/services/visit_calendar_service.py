@@ -0,0 +1,257 @@
+"""
+Calendário de visitas por consultor (dia / semana / mês ou intervalo).
+
+Uma janela é carregada em 1 SELECT por intervalo de datas
+(consultant_id = ? AND date BETWEEN ? AND ?, índice
+ix_visits_consultant_id_date_status) e já sai agregada por dia:
+
+    {
+      "consultant_id": 3, "start": "2026-10-01", "end": "2026-10-31", "today": "2026-10-19",
+      "totals": {"total": 12, "done": 7, "pending": 5, "overdue": 2},
+      "days": [
+        {"date": "2026-10-01", "total": 2, "done": 1, "pending": 1, "overdue": 1,
+         "statuses": {"done": 1, "planned": 1},
+         "visits": [{"id", "client_id", "client_name", "status", "overdue", ...}]},
+        ...
+      ]
+    }
+
+Usado pelas agendas do Telegram, do app (/mobile/chat) e da web
+(/api/visits/calendar). A janela fica em cache no worker com um ETag
+(hash do conteúdo); commits que gravam visitas do consultor invalidam as
+janelas dele, gravações de Client/Planting (nomes e cultura) limpam tudo.
+INSERTs de tabela (Core, ex.: POST /visits/bulk) não passam pelo ORM e
+chamam invalidate_calendar() depois do commit.
+
+O cache é por worker: a invalidação só vale no worker que gravou. Nos
+outros, uma visita nova pode faltar na agenda (inclusive "agenda de
+hoje" do Telegram) por até VISIT_CALENDAR_CACHE_TTL segundos.
+
+As janelas em cache são compartilhadas: quem chama não deve alterar os
+dicts devolvidos.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from models import db, Client, Planting, Visit
+
+
+VISIT_CALENDAR_CACHE_TTL_SECONDS = int(os.getenv("VISIT_CALENDAR_CACHE_TTL", "60"))
+VISIT_CALENDAR_CACHE_MAX_ENTRIES = 1024
+VISIT_CALENDAR_MAX_DAYS = 62
+
+CALENDAR_VIEWS = ("day", "week", "month")
+
+CalendarWindow = namedtuple("CalendarWindow", ["key", "payload", "etag", "expires_at"])
+
+_cache: dict = {}
+_cache_lock = threading.Lock()
+
+
+def get_local_today() -> date:
+    from zoneinfo import ZoneInfo
+    return datetime.now(ZoneInfo("America/Cuiaba")).date()
+
+
+# ============================================================
+# Janelas
+# ============================================================
+
+def window_for(view: str, reference_date: Optional[date] = None):
+    """(início, fim) do dia, da semana (seg-dom) ou do mês de reference_date."""
+    ref = reference_date or get_local_today()
+    if view == "day":
+        return ref, ref
+    if view == "week":
+        start = ref - timedelta(days=ref.weekday())
+        return start, start + timedelta(days=6)
+    if view == "month":
+        start = ref.replace(day=1)
+        next_month = (start + timedelta(days=32)).replace(day=1)
+        return start, next_month - timedelta(days=1)
+    raise ValueError(f"view inválida: {view}")
+
+
+def _load_window(consultant_id: int, start: date, end: date, today: date) -> Dict[str, Any]:
+    rows = (
+        db.session.query(
+            Visit.id,
+            Visit.date,
+            Visit.status,
+            Visit.client_id,
+            Client.name,
+            Visit.property_id,
+            Visit.plot_id,
+            Visit.planting_id,
+            func.coalesce(Visit.culture, Planting.culture),
+            Visit.variety,
+            Visit.fenologia_real,
+            Visit.visit_purpose,
+            Visit.recommendation,
+        )
+        .outerjoin(Client, Client.id == Visit.client_id)
+        .outerjoin(Planting, Planting.id == Visit.planting_id)
+        .filter(Visit.consultant_id == consultant_id)
+        .filter(Visit.date.between(start, end))
+        .order_by(Visit.date.asc(), Visit.id.asc())
+        .all()
+    )
+
+    days = {}
+    day = start
+    while day <= end:
+        days[day] = {"date": day.isoformat(), "total": 0, "done": 0, "pending": 0, "overdue": 0,
+                     "statuses": {}, "visits": []}
+        day += timedelta(days=1)
+
+    totals = {"total": 0, "done": 0, "pending": 0, "overdue": 0}
+    for (visit_id, visit_date, status, client_id, client_name, property_id, plot_id, planting_id,
+         culture, variety, fenologia, purpose, recommendation) in rows:
+        status = status or "planned"
+        done = status == "done"
+        overdue = not done and visit_date < today
+
+        bucket = days[visit_date]
+        bucket["visits"].append({
+            "id": visit_id,
+            "date": visit_date.isoformat(),
+            "status": status,
+            "overdue": overdue,
+            "client_id": client_id,
+            "client_name": client_name or f"Cliente {client_id}",
+            "property_id": property_id,
+            "plot_id": plot_id,
+            "planting_id": planting_id,
+            "culture": culture,
+            "variety": variety,
+            "fenologia_real": fenologia,
+            "visit_purpose": purpose,
+            "recommendation": recommendation or "",
+        })
+        bucket["statuses"][status] = bucket["statuses"].get(status, 0) + 1
+        for counts in (bucket, totals):
+            counts["total"] += 1
+            counts["done" if done else "pending"] += 1
+            if overdue:
+                counts["overdue"] += 1
+
+    return {
+        "consultant_id": consultant_id,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "today": today.isoformat(),
+        "totals": totals,
+        "days": list(days.values()),
+    }
+
+
+def get_cached_calendar(consultant_id: int, start: date, end: date, today: Optional[date] = None):
+    """Janela em cache ainda válida (sem acesso ao banco) ou None."""
+    key = (consultant_id, start, end, today or get_local_today())
+    now = time.monotonic()
+    with _cache_lock:
+        entry = _cache.get(key)
+    if entry and entry.expires_at > now:
+        return entry
+    return None
+
+
+def get_visit_calendar(consultant_id: int, start: date, end: date, today: Optional[date] = None) -> CalendarWindow:
+    """Janela [start, end] do consultor (do cache ou de 1 SELECT)."""
+    if end < start:
+        raise ValueError("end antes de start")
+    if (end - start).days + 1 > VISIT_CALENDAR_MAX_DAYS:
+        raise ValueError(f"janela maior que {VISIT_CALENDAR_MAX_DAYS} dias")
+
+    today = today or get_local_today()
+    entry = get_cached_calendar(consultant_id, start, end, today)
+    if entry:
+        return entry
+
+    payload = _load_window(consultant_id, start, end, today)
+    body = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    etag = "cal-" + hashlib.sha1(body.encode("utf-8")).hexdigest()
+    key = (consultant_id, start, end, today)
+    entry = CalendarWindow(key, payload, etag, time.monotonic() + VISIT_CALENDAR_CACHE_TTL_SECONDS)
+
+    with _cache_lock:
+        if len(_cache) >= VISIT_CALENDAR_CACHE_MAX_ENTRIES:
+            _cache.clear()
+        _cache[key] = entry
+    return entry
+
+
+def calendar_visits(payload: Dict[str, Any], filter_mode: str = "all", limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Visitas da janela em ordem (data, id), filtradas por all/done/pending/overdue."""
+    visits = []
+    for day in payload["days"]:
+        for visit in day["visits"]:
+            if filter_mode == "done" and visit["status"] != "done":
+                continue
+            if filter_mode == "pending" and visit["status"] == "done":
+                continue
+            if filter_mode == "overdue" and not visit["overdue"]:
+                continue
+            visits.append(visit)
+            if limit is not None and len(visits) >= limit:
+                return visits
+    return visits
+
+
+def invalidate_calendar(consultant_id: Optional[int] = None) -> None:
+    with _cache_lock:
+        if consultant_id is None:
+            _cache.clear()
+            return
+        for key in [k for k in _cache if k[0] == consultant_id]:
+            _cache.pop(key, None)
+
+
+# ============================================================
+# Invalidação em gravações
+# ============================================================
+
+_NAME_MODELS = (Client, Planting)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_calendar_consultants(session, flush_context):
+    touched = session.info.setdefault("calendar_dirty", set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Visit):
+            # Troca de consultor: a janela do anterior também muda
+            history = db.inspect(obj).attrs.consultant_id.history
+            for consultant_id in (obj.consultant_id, *(history.deleted or ())):
+                if consultant_id is not None:
+                    touched.add(consultant_id)
+        elif isinstance(obj, _NAME_MODELS) and obj not in session.new:
+            touched.add(None)
+    if not touched:
+        session.info.pop("calendar_dirty", None)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_calendar(session):
+    touched = session.info.pop("calendar_dirty", None)
+    if not touched:
+        return
+    if None in touched:
+        invalidate_calendar()
+        return
+    for consultant_id in touched:
+        invalidate_calendar(consultant_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_calendar(session):
+    session.info.pop("calendar_dirty", None)
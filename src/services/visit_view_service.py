@@ -0,0 +1,298 @@
+"""
+Página pública da visita (/api/view/visit/<id>), compartilhada por WhatsApp.
+
+- Template Jinja compilado uma vez por worker (não re-parseia a cada hit).
+- Dados carregados em 2 SELECTs (visita + nomes via join, fotos).
+- HTML renderizado fica em cache por visita, com um ETag forte (hash do
+  HTML). Visualizações repetidas saem do cache sem tocar no banco.
+
+Commits que gravam Visit/Photo invalidam a visita neste worker; gravações
+de Client/Property/Plot/Consultant (nomes) limpam tudo. Gravações feitas
+em outro worker (ex.: fotos do bot do Telegram) não chegam aqui: o cache
+não é revalidado no hit, então o TTL curto é o limite de atraso.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import namedtuple
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import db, Visit, Photo, Client, Property, Plot, Consultant
+
+
+VISIT_VIEW_CACHE_TTL_SECONDS = int(os.getenv("VISIT_VIEW_CACHE_TTL", "60"))
+VISIT_VIEW_CACHE_MAX_ENTRIES = 2048
+# Navegador/WhatsApp não podem guardar a página por mais tempo que o cache
+# do servidor, senão fotos enviadas por outro worker demoram a aparecer.
+VISIT_VIEW_MAX_AGE_SECONDS = min(
+    int(os.getenv("VISIT_VIEW_MAX_AGE", str(VISIT_VIEW_CACHE_TTL_SECONDS))),
+    VISIT_VIEW_CACHE_TTL_SECONDS,
+)
+
+# Derivadas das fotos via resizing da CDN na frente do R2, ex.:
+# PHOTO_RESIZE_BASE_URL=https://fotos.nutricrm.com.br/cdn-cgi/image
+# Sem a variável as URLs originais são usadas.
+PHOTO_THUMB_WIDTH = 640
+PHOTO_FULL_WIDTH = 1600
+
+RenderedVisitPage = namedtuple("RenderedVisitPage", ["visit_id", "html", "etag", "expires_at"])
+
+_cache: dict = {}
+_cache_lock = threading.Lock()
+_template = {"compiled": None}
+
+
+VISIT_VIEW_TEMPLATE = """
+    <!DOCTYPE html>
+    <html lang="pt-BR">
+    <head>
+        <meta charset="UTF-8" />
+        <meta name="viewport" content="width=device-width, initial-scale=1.0" />
+        <title>Visita #{{ visit.id }} - NutriCRM</title>
+        <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/css/bootstrap.min.css" rel="stylesheet" />
+        <link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css" />
+        <script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
+        <style>
+            body { background-color:#f9fafb; font-family:'Inter', sans-serif; padding-bottom:60px; }
+            header { background:#1B5E20; color:white; padding:16px; display:flex; justify-content:space-between; align-items:center; flex-wrap:wrap; }
+            header img { height:46px; object-fit:contain; }
+            .info-card { background:white; border-radius:10px; box-shadow:0 2px 10px rgba(0,0,0,0.05); padding:20px; margin-top:20px; }
+            .photos img { width:100%; border-radius:8px; cursor:pointer; transition:transform 0.2s; }
+            .photos img:hover { transform:scale(1.02); }
+            #map { height:300px; border-radius:10px; margin-top:15px; }
+            footer { margin-top:40px; text-align:center; color:#888; }
+            .download-btn { background:#2E7D32; color:white; padding:10px 18px; border-radius:6px; text-decoration:none; transition:opacity .2s; }
+            .download-btn:hover { opacity:.85; }
+            .lightbox { display:none; position:fixed; z-index:9999; top:0; left:0; width:100%; height:100%; background:rgba(0,0,0,0.9); justify-content:center; align-items:center; }
+            .lightbox img { max-width:90%; max-height:90%; }
+        </style>
+    </head>
+    <body>
+        <header>
+            <img src="/static/nutricrm_logo.png" alt="NutriCRM Logo" />
+            <h4>Relatorio Tecnico - Visita #{{ visit.id }}</h4>
+            <a class="download-btn" href="/api/visits/{{ visit.id }}/pdf" target="_blank">Baixar PDF</a>
+        </header>
+
+        <main class="container">
+            <div class="info-card">
+                <h4>Informacoes Gerais</h4>
+                <table class="table table-borderless mt-3">
+                    <tr><th>Cliente:</th><td>{{ client_name or '-' }}</td></tr>
+                    <tr><th>Fazenda:</th><td>{{ property_name or '-' }}</td></tr>
+                    <tr><th>Talhao:</th><td>{{ plot_name or '-' }}</td></tr>
+                    <tr><th>Consultor:</th><td>{{ consultant_name or '-' }}</td></tr>
+                    <tr><th>Data:</th><td>{{ visit.date.strftime('%d/%m/%Y') if visit.date else '-' }}</td></tr>
+                    <tr><th>Status:</th><td>{{ visit.status }}</td></tr>
+                </table>
+                {% if lat and lon %}
+                <div id="map"></div>
+                {% endif %}
+            </div>
+
+            {% if visit.diagnosis %}
+            <div class="info-card">
+                <h4>Diagnostico</h4>
+                <p>{{ visit.diagnosis }}</p>
+            </div>
+            {% endif %}
+
+            {% if visit.recommendation %}
+            <div class="info-card">
+                <h4>Recomendacoes Tecnicas</h4>
+                <p>{{ visit.recommendation }}</p>
+            </div>
+            {% endif %}
+
+            {% if photos %}
+            <div class="info-card photos">
+                <h4>Fotos da Visita</h4>
+                <div class="row mt-3">
+                    {% for p in photos %}
+                    <div class="col-md-6 mb-3">
+                        <img src="{{ p.thumb_url }}" loading="lazy" decoding="async" alt="{{ p.caption }}" onclick="openLightbox('{{ p.full_url }}')" />
+                    </div>
+                    {% endfor %}
+                </div>
+            </div>
+            {% endif %}
+        </main>
+
+        <div id="lightbox" class="lightbox" onclick="closeLightbox()">
+            <img id="lightbox-img" src="">
+        </div>
+
+        <footer>
+            <small>NutriCRM - Relatorio tecnico automatizado</small>
+        </footer>
+
+        <script>
+            function openLightbox(src) {
+                document.getElementById('lightbox-img').src = src;
+                document.getElementById('lightbox').style.display = 'flex';
+            }
+            function closeLightbox() {
+                document.getElementById('lightbox').style.display = 'none';
+            }
+
+            {% if lat and lon %}
+            const map = L.map('map').setView([{{ lat }}, {{ lon }}], 15);
+            L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
+                attribution: 'OpenStreetMap contributors'
+            }).addTo(map);
+            L.marker([{{ lat }}, {{ lon }}]).addTo(map)
+                .bindPopup("{{ plot_name or 'Talhao' }}")
+                .openPopup();
+            {% endif %}
+        </script>
+    </body>
+    </html>
+    """
+
+
+def derivative_photo_url(url: str, width: int) -> str:
+    """URL redimensionada pela CDN (quando configurada)."""
+    base = (os.environ.get("PHOTO_RESIZE_BASE_URL") or "").rstrip("/")
+    if not base or not url or not url.startswith(("http://", "https://")):
+        return url
+    return f"{base}/width={width},quality=80,fit=scale-down,format=auto/{url}"
+
+
+def _get_template():
+    # Compilado no jinja_env do app (mesmo autoescape do render_template_string)
+    compiled = _template["compiled"]
+    if compiled is None:
+        compiled = current_app.jinja_env.from_string(VISIT_VIEW_TEMPLATE)
+        _template["compiled"] = compiled
+    return compiled
+
+
+def _load_page_data(visit_id: int, resolve_url):
+    row = (
+        db.session.query(Visit, Client.name, Property.name, Property.latitude, Property.longitude, Plot.name, Consultant.name)
+        .outerjoin(Client, Client.id == Visit.client_id)
+        .outerjoin(Property, Property.id == Visit.property_id)
+        .outerjoin(Plot, Plot.id == Visit.plot_id)
+        .outerjoin(Consultant, Consultant.id == Visit.consultant_id)
+        .filter(Visit.id == visit_id)
+        .first()
+    )
+    if row is None:
+        return None
+
+    visit, client_name, property_name, property_lat, property_lon, plot_name, consultant_name = row
+
+    # Talhão não tem coordenadas: usa o ponto da visita, senão o da fazenda
+    if visit.latitude is not None and visit.longitude is not None:
+        lat, lon = visit.latitude, visit.longitude
+    else:
+        lat, lon = property_lat, property_lon
+
+    photo_rows = (
+        db.session.query(Photo.id, Photo.url, Photo.caption)
+        .filter(Photo.visit_id == visit_id)
+        .order_by(Photo.id)
+        .all()
+    )
+    photos = []
+    for photo_id, url, caption in photo_rows:
+        resolved = resolve_url(url)
+        photos.append({
+            "id": photo_id,
+            "thumb_url": derivative_photo_url(resolved, PHOTO_THUMB_WIDTH),
+            "full_url": derivative_photo_url(resolved, PHOTO_FULL_WIDTH),
+            "caption": caption or "",
+        })
+
+    return {
+        "visit": visit,
+        "client_name": client_name,
+        "property_name": property_name,
+        "plot_name": plot_name,
+        "consultant_name": consultant_name,
+        "photos": photos,
+        "lat": lat,
+        "lon": lon,
+    }
+
+
+def get_cached_visit_page(visit_id: int):
+    """Página em cache ainda válida (sem acesso ao banco) ou None."""
+    now = time.monotonic()
+    with _cache_lock:
+        entry = _cache.get(visit_id)
+    if entry and entry.expires_at > now:
+        return entry
+    return None
+
+
+def render_visit_page(visit_id: int, resolve_url):
+    """Renderiza (ou devolve do cache) a página da visita. None se não existe."""
+    entry = get_cached_visit_page(visit_id)
+    if entry:
+        return entry
+
+    context = _load_page_data(visit_id, resolve_url)
+    if context is None:
+        return None
+
+    html = _get_template().render(**context)
+    etag = hashlib.sha1(f"{visit_id}:{html}".encode("utf-8")).hexdigest()
+    entry = RenderedVisitPage(visit_id, html, etag, time.monotonic() + VISIT_VIEW_CACHE_TTL_SECONDS)
+
+    with _cache_lock:
+        if len(_cache) >= VISIT_VIEW_CACHE_MAX_ENTRIES:
+            _cache.clear()
+        _cache[visit_id] = entry
+    return entry
+
+
+def invalidate_visit_page(visit_id: int | None = None) -> None:
+    with _cache_lock:
+        if visit_id is None:
+            _cache.clear()
+        else:
+            _cache.pop(visit_id, None)
+
+
+# ============================================================
+# Invalidação em gravações
+# ============================================================
+
+_NAME_MODELS = (Client, Property, Plot, Consultant)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_visit_pages(session, flush_context):
+    touched = session.info.setdefault("visit_pages_dirty", set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Visit):
+            touched.add(obj.id)
+        elif isinstance(obj, Photo):
+            touched.add(obj.visit_id)
+        elif isinstance(obj, _NAME_MODELS):
+            touched.add(None)
+    if not touched:
+        session.info.pop("visit_pages_dirty", None)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_visit_pages(session):
+    touched = session.info.pop("visit_pages_dirty", None)
+    if not touched:
+        return
+    if None in touched:
+        invalidate_visit_page()
+        return
+    for visit_id in touched:
+        invalidate_visit_page(visit_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_visit_pages(session):
+    session.info.pop("visit_pages_dirty", None)
@@ -1,39 +1,136 @@
 # utils/auth_helper.py
 """
 Helpers de autenticação para uso em múltiplas rotas.
+
+O token é decodificado uma única vez por request (hook before_request
+registrado em app.py) e o resultado fica em g.auth_principal. Os dados
+do usuário vêm de um cache curto em memória, chaveado por (user_id, iat
+do token) e invalidado quando o usuário é alterado pelo admin.
 """
 
-from flask import request, g
+from collections import namedtuple
+from flask import request, g, has_request_context
 from functools import wraps
+import threading
+import time
 import jwt
 import os
 
-from models import User
+from models import db, User
 
 
 SECRET_KEY = os.getenv('SECRET_KEY', os.getenv('JWT_SECRET', 'nutricrm-secret-key-change-in-production'))
 
+# Tempo máximo que outro worker pode enxergar um usuário desatualizado
+# depois de uma alteração (a invalidação explícita só vale no worker local).
+USER_CACHE_TTL_SECONDS = int(os.getenv('AUTH_USER_CACHE_TTL', '60'))
+USER_CACHE_MAX_ENTRIES = 512
 
-def get_current_user_from_token() -> User | None:
-    """
-    Obtém o usuário atual a partir do token JWT.
-    Retorna None se não autenticado ou token inválido.
-    """
+# Snapshot imutável do usuário autenticado (não é objeto ORM, pode ser
+# compartilhado entre requests sem problema de sessão).
+Principal = namedtuple('Principal', ['user_id', 'username', 'consultant_id', 'is_admin', 'active'])
+
+_user_cache: dict = {}
+_user_cache_lock = threading.Lock()
+
+
+def _decode_bearer_token() -> dict | None:
     auth_header = request.headers.get('Authorization', '')
     if not auth_header.startswith('Bearer '):
         return None
 
     token = auth_header[7:]
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
+        return jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
     except (jwt.ExpiredSignatureError, jwt.InvalidTokenError):
         return None
 
-    user = User.query.get(payload.get('user_id'))
-    if not user or not user.active:
+
+def _load_principal(user_id, iat) -> Principal | None:
+    key = (user_id, iat)
+    now = time.monotonic()
+
+    with _user_cache_lock:
+        cached = _user_cache.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+
+    user = db.session.get(User, user_id)
+    principal = None
+    if user:
+        principal = Principal(
+            user_id=user.id,
+            username=user.username,
+            consultant_id=user.consultant_id,
+            is_admin=bool(user.is_admin),
+            active=bool(user.active),
+        )
+
+    with _user_cache_lock:
+        if len(_user_cache) >= USER_CACHE_MAX_ENTRIES:
+            expired = [k for k, (exp, _) in _user_cache.items() if exp <= now]
+            for k in expired:
+                _user_cache.pop(k, None)
+            if len(_user_cache) >= USER_CACHE_MAX_ENTRIES:
+                _user_cache.clear()
+        _user_cache[key] = (now + USER_CACHE_TTL_SECONDS, principal)
+
+    return principal
+
+
+def invalidate_user_cache(user_id: int | None = None) -> None:
+    """Remove o usuário (ou todos) do cache. Chamar após update/toggle/delete."""
+    with _user_cache_lock:
+        if user_id is None:
+            _user_cache.clear()
+            return
+        for key in [k for k in _user_cache if k[0] == user_id]:
+            _user_cache.pop(key, None)
+
+
+def resolve_request_principal() -> Principal | None:
+    """Decodifica o token e resolve o usuário ativo. Sem cache de request."""
+    payload = _decode_bearer_token()
+    if not payload or not payload.get('user_id'):
+        return None
+
+    try:
+        principal = _load_principal(payload.get('user_id'), payload.get('iat'))
+    except Exception as e:
+        db.session.rollback()
+        print(f"[AUTH] Falha ao carregar usuário do token: {e}")
+        return None
+
+    if not principal or not principal.active:
         return None
 
-    return user
+    return principal
+
+
+def load_request_principal() -> None:
+    """Hook before_request: resolve o usuário uma vez e guarda em g."""
+    g.auth_principal = resolve_request_principal()
+    g.auth_principal_loaded = True
+
+
+def get_request_principal() -> Principal | None:
+    """Usuário autenticado do request atual (resolve sob demanda se o hook não rodou)."""
+    if not has_request_context():
+        return None
+    if not getattr(g, 'auth_principal_loaded', False):
+        load_request_principal()
+    return g.auth_principal
+
+
+def get_current_user_from_token() -> User | None:
+    """
+    Obtém o usuário atual a partir do token JWT.
+    Retorna None se não autenticado ou token inválido.
+    """
+    principal = get_request_principal()
+    if not principal:
+        return None
+    return db.session.get(User, principal.user_id)
 
 
 def get_consultant_id_filter() -> int | None:
@@ -43,23 +140,17 @@ def get_consultant_id_filter() -> int | None:
     - Retorna consultant_id se usuário tem um vinculado
     - Retorna -1 se usuário não-admin sem consultant (não vê nada)
     """
-    user = get_current_user_from_token()
-    if not user:
-        print("[AUTH] Sem token válido - sem filtro aplicado")
+    principal = get_request_principal()
+    if not principal:
         return None  # Sem auth, sem filtro (comportamento legado)
 
-    print(f"[AUTH] Usuário: {user.username}, is_admin: {user.is_admin}, consultant_id: {user.consultant_id}")
-
-    if user.is_admin:
-        print("[AUTH] Admin - sem filtro")
+    if principal.is_admin:
         return None  # Admin vê tudo
 
-    if user.consultant_id:
-        print(f"[AUTH] Filtrando por consultant_id: {user.consultant_id}")
-        return user.consultant_id
+    if principal.consultant_id:
+        return principal.consultant_id
 
     # Usuário não-admin sem consultant_id não deve ver nada
-    print("[AUTH] Usuário sem consultant_id - bloqueando acesso")
     return -1
 
 
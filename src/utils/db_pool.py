@@ -0,0 +1,208 @@
+"""
+Pool de conexões do SQLAlchemy dimensionado pelo modelo do gunicorn.
+
+O Postgres do Render aceita poucas conexões e cada worker do gunicorn
+tem o próprio pool. O orçamento DB_MAX_CONNECTIONS é dividido entre os
+workers (WEB_CONCURRENCY); dentro do worker o pool fixo cobre as
+threads que atendem requests (GUNICORN_THREADS; no gevent, as
+GUNICORN_WORKER_CONNECTIONS greenlets) mais as threads de fundo que
+usam o banco (AGENT_STAGE_WORKERS + AUDIO_TRANSCRIBE_WORKERS, com os
+mesmos defaults dos pools em services/; DB_BACKGROUND_CONNECTIONS
+substitui a soma) e o resto vira overflow. Os defaults do gunicorn ficam
+em gunicorn.conf.py, que os exporta para os workers.
+
+Sem pool_pre_ping: o SELECT 1 a cada checkout custava um round trip por
+request. Conexões caem por idade (pool_recycle) e, quando uma query
+falha por desconexão, o SQLAlchemy invalida o pool inteiro (padrão do
+handle_error) — só a request que pegou a conexão morta falha.
+DB_POOL_PRE_PING=1 religa.
+
+DB_PGBOUNCER=1: o PgBouncer (modo transaction) já faz o pool, então o
+app usa NullPool. O psycopg2 (requirements.txt) não usa prepared
+statements no servidor, então não há nada a desligar no driver.
+
+get_pool_metrics() expõe o estado do pool deste worker (checked out,
+overflow, espera no checkout) em /api/db/pool.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Mapping, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool, QueuePool
+
+
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_AGENT_STAGE_WORKERS = 4      # services/agent/agent_service.py
+DEFAULT_AUDIO_WORKERS = 2            # services/audio_transcription_service.py
+DEFAULT_POOL_RECYCLE_SECONDS = 180
+DEFAULT_POOL_TIMEOUT_SECONDS = 10
+DEFAULT_WORKER_CONNECTIONS = 1000  # default do gunicorn para gevent
+GREEN_WORKER_CLASSES = ("gevent", "eventlet")
+WAIT_SAMPLES = 1000
+
+
+def _env_int(env: Mapping[str, str], name: str, default: int) -> int:
+    try:
+        return int(env.get(name) or default)
+    except (TypeError, ValueError):
+        return default
+
+
+def pool_plan(env: Optional[Mapping[str, str]] = None) -> Dict[str, Any]:
+    """Tamanho do pool por worker a partir do modelo de deploy."""
+    env = os.environ if env is None else env
+    workers = max(1, _env_int(env, "WEB_CONCURRENCY", 1))
+    worker_class = env.get("GUNICORN_WORKER_CLASS") or "sync"
+    if worker_class in GREEN_WORKER_CLASSES:
+        threads = max(1, _env_int(env, "GUNICORN_WORKER_CONNECTIONS", DEFAULT_WORKER_CONNECTIONS))
+    else:
+        threads = max(1, _env_int(env, "GUNICORN_THREADS", 1))
+    if env.get("DB_BACKGROUND_CONNECTIONS"):
+        background = max(0, _env_int(env, "DB_BACKGROUND_CONNECTIONS", 0))
+    else:
+        background = (
+            max(0, _env_int(env, "AGENT_STAGE_WORKERS", DEFAULT_AGENT_STAGE_WORKERS))
+            + max(0, _env_int(env, "AUDIO_TRANSCRIBE_WORKERS", DEFAULT_AUDIO_WORKERS))
+        )
+    budget = max(1, _env_int(env, "DB_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS) // workers)
+
+    pool_size = min(threads + background, budget)
+    max_overflow = budget - pool_size
+    if env.get("DB_POOL_SIZE"):
+        pool_size = max(1, _env_int(env, "DB_POOL_SIZE", pool_size))
+    if env.get("DB_MAX_OVERFLOW"):
+        max_overflow = max(0, _env_int(env, "DB_MAX_OVERFLOW", max_overflow))
+
+    return {
+        "worker_class": worker_class,
+        "workers": workers,
+        "threads": threads,
+        "background": background,
+        "per_worker_budget": budget,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "max_connections": workers * (pool_size + max_overflow),
+    }
+
+
+def build_engine_options(database_url: str, env: Optional[Mapping[str, str]] = None) -> Dict[str, Any]:
+    """SQLALCHEMY_ENGINE_OPTIONS para o banco e o deploy atuais."""
+    env = os.environ if env is None else env
+    if database_url.startswith("sqlite"):
+        # Defaults do Flask-SQLAlchemy (StaticPool em memória etc.)
+        return {}
+
+    pre_ping = env.get("DB_POOL_PRE_PING") == "1"
+
+    if env.get("DB_PGBOUNCER") == "1":
+        return {"poolclass": NullPool, "pool_pre_ping": pre_ping}
+
+    plan = pool_plan(env)
+    return {
+        "poolclass": MeteredQueuePool,
+        "pool_size": plan["pool_size"],
+        "max_overflow": plan["max_overflow"],
+        "pool_recycle": _env_int(env, "DB_POOL_RECYCLE", DEFAULT_POOL_RECYCLE_SECONDS),
+        "pool_timeout": _env_int(env, "DB_POOL_TIMEOUT", DEFAULT_POOL_TIMEOUT_SECONDS),
+        # LIFO: as conexões quentes são reutilizadas e as ociosas envelhecem até o recycle
+        "pool_use_lifo": True,
+        "pool_pre_ping": pre_ping,
+    }
+
+
+# ============================================================
+# Métricas
+# ============================================================
+
+_lock = threading.Lock()
+_counters = {"checkouts": 0, "connects": 0, "timeouts": 0, "disconnects": 0, "invalidations": 0}
+_waits_ms: deque = deque(maxlen=WAIT_SAMPLES)
+
+
+def _bump(name: str, amount: int = 1) -> None:
+    with _lock:
+        _counters[name] += amount
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool que mede o tempo até conseguir uma conexão (fila + connect)."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            _bump("timeouts")
+            raise
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with _lock:
+            _counters["checkouts"] += 1
+            _waits_ms.append(elapsed_ms)
+        return record
+
+
+@event.listens_for(MeteredQueuePool, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    _bump("connects")
+
+
+@event.listens_for(MeteredQueuePool, "invalidate")
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    _bump("invalidations")
+
+
+@event.listens_for(Engine, "handle_error")
+def _count_disconnects(context):
+    """
+    Só conta: numa desconexão o SQLAlchemy já invalida o pool inteiro
+    (invalidate_pool_on_disconnect é True por padrão).
+    """
+    if context.is_disconnect:
+        _bump("disconnects")
+
+
+def get_pool_metrics(engine) -> Dict[str, Any]:
+    """Estado do pool deste worker + contadores desde o boot."""
+    pool = engine.pool
+    data: Dict[str, Any] = {"pool_class": type(pool).__name__, "pid": os.getpid()}
+
+    if isinstance(pool, QueuePool):
+        data.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(0, pool.overflow()),
+            "max_overflow": pool._max_overflow,
+            "timeout_seconds": pool.timeout(),
+            "recycle_seconds": pool._recycle,
+            "pre_ping": bool(pool._pre_ping),
+        })
+
+    with _lock:
+        counters = dict(_counters)
+        waits = sorted(_waits_ms)
+
+    if waits:
+        counters["wait_ms"] = {
+            "avg": round(sum(waits) / len(waits), 3),
+            "p50": round(waits[len(waits) // 2], 3),
+            "p95": round(waits[max(0, int(len(waits) * 0.95) - 1)], 3),
+            "max": round(waits[-1], 3),
+            "samples": len(waits),
+        }
+    data["counters"] = counters
+    if engine.dialect.name != "sqlite":
+        data["plan"] = pool_plan()
+    return data
+
+
+def reset_pool_metrics() -> None:
+    with _lock:
+        for name in _counters:
+            _counters[name] = 0
+        _waits_ms.clear()
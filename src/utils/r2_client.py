@@ -1,11 +1,27 @@
-import boto3
 import os
+import threading
+
+# boto3 é importado só no primeiro uso (cold start) e o client é
+# reaproveitado: clients do boto3 são thread-safe e criar um novo a cada
+# upload custa dezenas de ms.
+_client = None
+_client_lock = threading.Lock()
+
 
 def get_r2_client():
-    return boto3.client(
-        "s3",
-        endpoint_url=f"https://{os.environ['R2_ACCOUNT_ID']}.r2.cloudflarestorage.com",
-        aws_access_key_id=os.environ["R2_ACCESS_KEY_ID"],
-        aws_secret_access_key=os.environ["R2_SECRET_ACCESS_KEY"],
-        region_name="auto",
-    )
+    global _client
+    if _client is not None:
+        return _client
+
+    with _client_lock:
+        if _client is None:
+            import boto3
+
+            _client = boto3.client(
+                "s3",
+                endpoint_url=f"https://{os.environ['R2_ACCOUNT_ID']}.r2.cloudflarestorage.com",
+                aws_access_key_id=os.environ["R2_ACCESS_KEY_ID"],
+                aws_secret_access_key=os.environ["R2_SECRET_ACCESS_KEY"],
+                region_name="auto",
+            )
+    return _client
@@ -0,0 +1,74 @@
+"""
+Configuração comum dos testes.
+"""
+import os
+import shutil
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+# Adiciona src ao path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+# Sem DATABASE_URL o app cria o SQLite de fallback em UPLOAD_DIR, que é
+# servido em /uploads: os testes nunca gravam em src/uploads.
+_UPLOAD_DIR = tempfile.mkdtemp(prefix="agrocrm_tests_")
+os.environ["UPLOAD_DIR"] = _UPLOAD_DIR
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "blueprints(*blueprints): blueprints registrados em /api pelo fixture app"
+    )
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_UPLOAD_DIR, ignore_errors=True)
+
+
+@contextmanager
+def _app_with_db(database_uri, blueprints=()):
+    from flask import Flask
+
+    from models import db
+
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_uri
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+    for blueprint in blueprints:
+        app.register_blueprint(blueprint, url_prefix="/api")
+
+    with app.app_context():
+        # drop_all antes: TEST_POSTGRES_URL aponta para banco descartável já usado
+        db.drop_all()
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(scope="session")
+def make_app():
+    """Fábrica para fixtures com outro escopo/banco: `with make_app(uri, blueprints) as app`."""
+    pytest.importorskip("flask_sqlalchemy")
+    return _app_with_db
+
+
+@pytest.fixture
+def app(request, tmp_path, make_app):
+    """
+    App Flask mínimo com SQLite em tmp_path e as tabelas criadas.
+
+    Os blueprints vêm de @pytest.mark.blueprints(...) ou de parametrização
+    indireta (params=[(bp, ...)]) e são registrados em /api. O seed fica no
+    módulo de teste, num fixture `app(app)` que sobrescreve este.
+    """
+    marker = request.node.get_closest_marker("blueprints")
+    blueprints = getattr(request, "param", None) or (marker.args if marker else ())
+
+    with make_app(f"sqlite:///{tmp_path / 'test.db'}", blueprints) as app:
+        yield app
@@ -0,0 +1,107 @@
+"""
+Testes do pipeline do AgentService: skill em paralelo/especulativa e
+re-resolução de entidades
+
+Roda com: pytest tests/test_agent_pipeline.py -v
+"""
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Adiciona src ao path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+pytest.importorskip("flask_sqlalchemy")
+
+from services.agent import agent_service
+from services.agent.agent_service import AgentService
+
+
+class FakeResolver:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    def resolve(self, entities, context=None):
+        self.calls.append(dict(entities))
+        time.sleep(self.delay)
+        result = dict(entities)
+        result["client"] = {"id": 1 if entities.get("client_name") else None}
+        return result
+
+
+@pytest.fixture
+def service():
+    svc = AgentService()
+    svc.entity_resolver = FakeResolver()
+    svc.decision_engine.decide = lambda intent, entities, context=None: {"action": intent["intent"]}
+    svc.action_executor.execute = lambda decision, context=None: {"action": decision["action"]}
+    return svc
+
+
+def fake_skill(parsed_visit, delay=0.0, calls=None):
+    def interpret(message_text, skill_name, current_state=""):
+        if calls is not None:
+            calls.append(message_text)
+        time.sleep(delay)
+        return {"parsed_visit": parsed_visit, "confidence": "high"}
+    return interpret
+
+
+def test_skill_runs_in_parallel_with_resolution(service, monkeypatch):
+    monkeypatch.setattr(agent_service, "interpret_with_skill", fake_skill({"fenologia_real": "V4"}, delay=0.2))
+    service.entity_resolver = FakeResolver(delay=0.2)
+
+    started = time.perf_counter()
+    result = service.process("cliente Joao soja AS 3700 V4 ontem")
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.35
+    assert result["pipeline"]["skill"] == "parallel"
+    assert result["entities"]["fenologia_real"] == "V4"
+    assert result["intent_result"]["matched_by"] == "skill:lancamento_visita"
+    assert len(service.entity_resolver.calls) == 1
+    assert set(result["pipeline"]["stages_ms"]) >= {"classify_fast", "extract", "resolve", "skill"}
+
+
+def test_skill_filling_resolver_input_triggers_re_resolve(service, monkeypatch):
+    monkeypatch.setattr(agent_service, "interpret_with_skill", fake_skill({"property_name": "Santa Rita"}))
+
+    result = service.process("cliente Joao soja AS 3700 V4 ontem")
+
+    assert result["pipeline"]["re_resolved"] is True
+    assert service.entity_resolver.calls[-1]["property_name"] == "Santa Rita"
+    assert result["entities"]["property_name"] == "Santa Rita"
+
+
+def test_speculative_skill_is_discarded_when_intent_differs(service, monkeypatch):
+    calls = []
+    monkeypatch.setattr(agent_service, "interpret_with_skill", fake_skill({"property_name": "X"}, calls=calls))
+    monkeypatch.setattr(service.intent_classifier, "classify_fast", lambda text, context=None: None)
+    monkeypatch.setattr(
+        service.intent_classifier, "classify_slow",
+        lambda text, context=None: {"intent": "LIST_WEEK", "confidence": "high", "matched_by": "embedding"},
+    )
+
+    result = service.process("como ta a soja do cliente")
+
+    assert result["pipeline"]["skill"] == "discarded"
+    assert result["intent_result"]["intent"] == "LIST_WEEK"
+    assert result["entities"].get("property_name") != "X"
+
+
+def test_slow_path_visit_without_prediction_runs_skill_after(service, monkeypatch):
+    monkeypatch.setattr(agent_service, "interpret_with_skill", fake_skill({"fenologia_real": "R1"}))
+    monkeypatch.setattr(service.intent_classifier, "classify_fast", lambda text, context=None: None)
+    monkeypatch.setattr(service.intent_classifier, "predicts_visit", lambda text: False)
+    monkeypatch.setattr(
+        service.intent_classifier, "classify_slow",
+        lambda text, context=None: {"intent": "CREATE_VISIT_LIKE_MESSAGE", "confidence": "medium", "matched_by": "ai_fallback"},
+    )
+
+    result = service.process("passei la hoje de manha")
+
+    assert result["pipeline"]["skill"] == "sequential"
+    assert result["entities"]["fenologia_real"] == "R1"
@@ -0,0 +1,93 @@
+"""
+Testes do pipeline de transcrição de áudio (cache e coalescência)
+
+Roda com: pytest tests/test_audio_transcription.py -v
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Adiciona src ao path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+pytest.importorskip("flask_sqlalchemy")
+
+from models import AudioTranscription
+from services import audio_transcription_service as audio
+
+
+AUDIO = b"OggS fake voice note"
+
+
+@pytest.fixture
+def app(app, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    return app
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+
+    def fake_transcribe(audio_bytes, filename="audio.wav"):
+        calls.append(filename)
+        return "visitei o João hoje", None
+
+    monkeypatch.setattr(audio, "transcribe_audio_bytes", fake_transcribe)
+    return calls
+
+
+def test_cache_hit_skips_transcription(app, calls):
+    assert audio.transcribe_audio(AUDIO, ".ogg", file_unique_id="AgAD1") == ("visitei o João hoje", None)
+    assert calls == ["audio.ogg"]  # ogg vai direto, sem ffmpeg
+
+    # Mesmo conteúdo (retry) e mesmo file_unique_id (encaminhado, outro file_id)
+    assert audio.transcribe_audio(AUDIO, ".ogg") == ("visitei o João hoje", None)
+    assert audio.find_cached_transcription(file_unique_id="AgAD1") == "visitei o João hoje"
+    assert calls == ["audio.ogg"]
+    assert AudioTranscription.query.count() == 1
+
+
+def test_concurrent_requests_for_same_audio_make_one_call(app, monkeypatch):
+    calls = []
+    release = threading.Event()
+    lookups = []
+    find_cached = audio.find_cached_transcription
+
+    def slow_transcribe(audio_bytes, filename="audio.wav"):
+        calls.append(filename)
+        release.wait(5)
+        return "milho em V8", None
+
+    def counting_find(*args, **kwargs):
+        lookups.append(1)
+        return find_cached(*args, **kwargs)
+
+    monkeypatch.setattr(audio, "transcribe_audio_bytes", slow_transcribe)
+    monkeypatch.setattr(audio, "find_cached_transcription", counting_find)
+
+    results = []
+
+    def request():
+        with app.app_context():
+            results.append(audio.transcribe_audio(AUDIO, ".ogg"))
+
+    threads = [threading.Thread(target=request) for _ in range(2)]
+    for t in threads:
+        t.start()
+
+    # Os dois já passaram pelo cache (vazio) antes do job terminar
+    deadline = time.monotonic() + 5
+    while (len(lookups) < 2 or not calls) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert results == [("milho em V8", None)] * 2
+    assert calls == ["audio.ogg"]
+    assert not audio._inflight
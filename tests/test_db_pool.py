@@ -0,0 +1,107 @@
+"""
+Testes do dimensionamento do pool de conexões e das métricas do pool
+
+Roda com: pytest tests/test_db_pool.py -v
+"""
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Adiciona src ao path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+pytest.importorskip("flask_sqlalchemy")
+
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.pool import NullPool
+
+from utils import db_pool
+from utils.db_pool import MeteredQueuePool, build_engine_options, pool_plan
+
+
+PG_URL = "postgresql://user:pw@localhost/agro"
+
+
+def test_budget_is_split_between_workers():
+    plan = pool_plan({"WEB_CONCURRENCY": "3", "DB_MAX_CONNECTIONS": "30"})
+    assert plan["per_worker_budget"] == 10
+    assert plan["background"] == 6  # 4 etapas do agente + 2 de áudio
+    assert plan["pool_size"] == 7  # 1 thread + 6 de fundo
+    assert plan["max_overflow"] == 3
+    assert plan["max_connections"] <= 30
+
+
+def test_background_follows_worker_pools():
+    plan = pool_plan({"AGENT_STAGE_WORKERS": "2", "AUDIO_TRANSCRIBE_WORKERS": "1", "DB_MAX_CONNECTIONS": "20"})
+    assert (plan["background"], plan["pool_size"]) == (3, 4)
+    plan = pool_plan({"AGENT_STAGE_WORKERS": "2", "DB_BACKGROUND_CONNECTIONS": "0"})
+    assert (plan["background"], plan["pool_size"]) == (0, 1)
+
+
+def test_threads_capped_by_budget():
+    plan = pool_plan({"WEB_CONCURRENCY": "2", "GUNICORN_THREADS": "8", "DB_MAX_CONNECTIONS": "10"})
+    assert plan["pool_size"] == 5
+    assert plan["max_overflow"] == 0
+
+
+def test_gevent_sized_by_worker_connections():
+    plan = pool_plan({
+        "WEB_CONCURRENCY": "2", "GUNICORN_WORKER_CLASS": "gevent",
+        "GUNICORN_WORKER_CONNECTIONS": "50", "GUNICORN_THREADS": "8", "DB_MAX_CONNECTIONS": "20",
+    })
+    assert plan["threads"] == 50
+    assert (plan["pool_size"], plan["max_overflow"]) == (10, 0)
+
+
+def test_explicit_overrides():
+    plan = pool_plan({"DB_POOL_SIZE": "4", "DB_MAX_OVERFLOW": "1"})
+    assert (plan["pool_size"], plan["max_overflow"]) == (4, 1)
+
+
+def test_engine_options_without_pre_ping():
+    options = build_engine_options(PG_URL, {"WEB_CONCURRENCY": "3"})
+    assert options["poolclass"] is MeteredQueuePool
+    assert options["pool_pre_ping"] is False
+    assert options["pool_use_lifo"] is True
+    assert build_engine_options(PG_URL, {"DB_POOL_PRE_PING": "1"})["pool_pre_ping"] is True
+    assert build_engine_options("sqlite:///x.db", {}) == {}
+
+
+def test_pgbouncer_uses_null_pool():
+    options = build_engine_options(PG_URL, {"DB_PGBOUNCER": "1"})
+    assert options == {"poolclass": NullPool, "pool_pre_ping": False}
+
+
+def test_metered_pool_counts_checkouts_and_timeouts(tmp_path):
+    db_pool.reset_pool_metrics()
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=MeteredQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05,
+    )
+
+    holding = engine.connect()
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    metrics = db_pool.get_pool_metrics(engine)
+    assert metrics["checked_out"] == 1
+    assert metrics["counters"]["timeouts"] == 1
+    holding.close()
+
+    def query():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    threads = [threading.Thread(target=query) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    metrics = db_pool.get_pool_metrics(engine)
+    assert metrics["checked_out"] == 0
+    assert metrics["counters"]["checkouts"] == 5
+    assert metrics["counters"]["connects"] == 1
+    assert metrics["counters"]["wait_ms"]["samples"] == 5
+    engine.dispose()
@@ -0,0 +1,94 @@
+"""
+Testes para a base de pragas e doenças (arquivo de dados + busca)
+
+Roda com: pytest tests/test_diseases_database.py -v
+"""
+import json
+import sys
+from pathlib import Path
+
+# Adiciona src ao path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from services import diseases_database as dd
+
+
+class TestDataFile:
+    """O arquivo versionado deve estar consistente com a busca"""
+
+    def test_arquivo_tem_versao_e_doencas(self):
+        data = dd.read_diseases_file(dd.DEFAULT_DISEASES_DATA_PATH)
+        assert int(data["version"]) >= 1
+        assert len(data["diseases"]) > 0
+
+    def test_campos_de_busca_pre_normalizados(self):
+        for disease in dd.get_diseases_database():
+            assert disease["search"] == dd.build_search_fields(disease)
+
+    def test_atributo_legado(self):
+        assert dd.DISEASES_DATABASE is dd.get_diseases_database()
+
+
+class TestSearch:
+    """Busca continua funcionando sobre os dados carregados do arquivo"""
+
+    def test_match_exato_keyword(self):
+        result = dd.search_disease("ferrugem asiatica")
+        assert result["found"] is True
+        assert result["disease"]["slug"] == "ferrugem-asiatica"
+
+    def test_filtro_por_cultura(self):
+        result = dd.search_disease("ferrugem", crop="milho")
+        assert result["found"] is True
+        assert result["disease"]["crop"] == "milho"
+
+    def test_nao_encontrado(self):
+        result = dd.search_disease("xyzqw")
+        assert result["found"] is False
+
+
+class TestReload:
+    """Hot reload a partir de outro arquivo"""
+
+    def test_reload_troca_versao(self, tmp_path, monkeypatch):
+        path = tmp_path / "diseases.json"
+        dd.write_diseases_file(str(path), [{
+            "slug": "teste",
+            "name": "Doença Teste",
+            "crop": "soja",
+            "keywords": ["teste"],
+        }], version=7)
+
+        monkeypatch.setenv("DISEASES_DATA_PATH", str(path))
+        try:
+            info = dd.reload_diseases_database()
+            assert info["version"] == 7
+            assert info["count"] == 1
+            assert "path" not in info
+            assert dd.search_disease("Doença Teste")["disease"]["slug"] == "teste"
+
+            stored = json.loads(path.read_text(encoding="utf-8"))
+            assert stored["diseases"][0]["search"]["name"] == "doenca teste"
+        finally:
+            monkeypatch.delenv("DISEASES_DATA_PATH")
+            dd.reload_diseases_database()
+
+    def test_endpoint_nao_expoe_caminho(self, app, tmp_path, monkeypatch):
+        from routes.admin import admin_bp
+
+        app.register_blueprint(admin_bp, url_prefix="/api")
+        client = app.test_client()
+
+        response = client.post("/api/admin/diseases/reload")
+        body = response.get_json()
+        assert response.status_code == 200
+        assert set(body) == {"ok", "previous_version", "version", "count"}
+
+        monkeypatch.setenv("DISEASES_DATA_PATH", str(tmp_path / "nao_existe.json"))
+        try:
+            response = client.post("/api/admin/diseases/reload")
+            assert response.status_code == 500
+            assert str(tmp_path) not in response.get_data(as_text=True)
+        finally:
+            monkeypatch.delenv("DISEASES_DATA_PATH")
+            dd.reload_diseases_database()
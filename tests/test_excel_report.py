@@ -0,0 +1,147 @@
+"""
+Testes do relatório mensal em XLSX (GET /api/reports/monthly.xlsx)
+
+O fixture tests/fixtures/monthly_report_xlsx.json guarda as células
+geradas pela versão anterior ao report_engine (commit 59cdb46) sobre os
+mesmos dados de _seed: o renderizador colunar tem que produzir o mesmo
+conteúdo.
+
+Roda com: pytest tests/test_excel_report.py -v
+"""
+import json
+import re
+import sys
+from datetime import date, datetime
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+
+# Adiciona src ao path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+pytest.importorskip("flask_sqlalchemy")
+openpyxl = pytest.importorskip("openpyxl")
+
+import models
+from routes.admin import admin_bp
+
+pytestmark = pytest.mark.blueprints(admin_bp)
+
+
+FIXTURE = Path(__file__).parent / "fixtures" / "monthly_report_xlsx.json"
+
+QUERIES = (
+    "month=2025-11",
+    "month=2025-11&region=Norte&season=safra-25-26",
+    "start=2025-11-03&end=2025-11-09&consultant=7",
+)
+
+
+def _seed(db, m):
+    """Carteira, visitas repetidas no dia, fotos, produtos e fora do período."""
+    db.session.add_all([
+        m.Client(id=1, name="João", region="Norte"),
+        m.Client(id=2, name="Ana", region="Norte"),
+        m.Client(id=3, name="Pedro", region="Norte"),
+        m.Client(id=4, name="Lúcia", region="Sul"),
+        m.Consultant(id=7, name="Carlos"),
+        m.Consultant(id=8, name="Marta"),
+    ])
+    db.session.flush()
+    db.session.add_all([
+        m.Property(id=1, client_id=1, name="Fazenda Boa Vista"),
+        m.Property(id=2, client_id=2, name="Sítio Alegre"),
+        m.Property(id=3, client_id=3, name="Fazenda Serra"),
+        m.Property(id=4, client_id=4, name="Fazenda Sul"),
+    ])
+    db.session.flush()
+    db.session.add_all([
+        m.Plot(id=1, property_id=1, name="Talhão 1"),
+        m.Plot(id=2, property_id=2, name="Talhão A"),
+        m.Plot(id=3, property_id=3, name="Talhão Serra"),
+        m.Plot(id=4, property_id=4, name="Talhão Sul"),
+    ])
+    db.session.flush()
+    db.session.add_all([
+        m.Planting(id=1, plot_id=1, culture="Soja", variety="AS 3680", planting_date=date(2025, 10, 1)),
+        m.Planting(id=2, plot_id=2, culture="Soja", variety="K8575", planting_date=date(2025, 10, 10)),
+        m.Planting(id=3, plot_id=3, culture="Milho", planting_date=date(2025, 12, 15)),
+    ])
+    db.session.flush()
+
+    def visit(vid, client_id, day, consultant_id=None, culture=None, planting_id=None, photo=False, **kw):
+        db.session.add(m.Visit(
+            id=vid, client_id=client_id, property_id=client_id, plot_id=client_id,
+            consultant_id=consultant_id, date=day, culture=culture, planting_id=planting_id,
+            status=kw.pop("status", "done"), **kw,
+        ))
+        db.session.flush()
+        if photo:
+            db.session.add(m.Photo(visit_id=vid, url=f"https://cdn.test/{vid}.jpg"))
+
+    # Três lançamentos no mesmo dia/cultura (um sem cultura, resolvida pelo plantio)
+    visit(1, 1, date(2025, 11, 3), 7, "Soja", 1, photo=True, fenologia_real="R1",
+          recommendation="Aplicar fungicida " * 20)
+    visit(2, 1, date(2025, 11, 3), 8, "Soja", 1)
+    visit(3, 1, date(2025, 11, 3), None, None, 1, photo=True)
+    for vid, day in ((4, 4), (5, 5), (6, 6), (7, 12)):
+        visit(vid, 1, date(2025, 11, day), 7, "Soja", 1, photo=True)
+    visit(8, 2, date(2025, 11, 12), 8, "Milho", photo=True, variety="P3858", status="planned")
+    visit(9, 2, date(2025, 11, 13), 8, "Soja", 2)
+    visit(10, 4, date(2025, 11, 20), None, "Soja", photo=True, status="canceled")
+    visit(11, 2, date(2025, 10, 30), 7, "Soja", 2, photo=True)  # fora do período
+
+    db.session.add_all([
+        m.VisitProduct(visit_id=1, product_name="Fox Xpro", dose="0,5", unit="L/ha",
+                       application_date=date(2025, 11, 5)),
+        m.VisitProduct(visit_id=1, product_name="Óleo mineral", dose="0,25", unit="L/ha"),
+        m.VisitProduct(visit_id=8, product_name="Engeo Pleno", dose="0,2", unit="L/ha"),
+        m.VisitProduct(visit_id=11, product_name="Fora do mês", dose="1", unit="kg/ha"),
+    ])
+    db.session.commit()
+
+
+def _cell_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, str):
+        # Rodapé com a hora da geração
+        return re.sub(r"\d{2}/\d{2}/\d{4} às \d{2}:\d{2}", "<agora>", value)
+    return value
+
+
+def workbook_cells(content: bytes) -> dict:
+    """Conteúdo comparável do XLSX: células não vazias, formatos e mesclas por aba."""
+    wb = openpyxl.load_workbook(BytesIO(content))
+    sheets = {}
+    for ws in wb.worksheets:
+        cells = {}
+        for row in ws.iter_rows():
+            for cell in row:
+                if cell.value is not None:
+                    cells[cell.coordinate] = [_cell_value(cell.value), cell.number_format]
+        sheets[ws.title] = {
+            "cells": cells,
+            "merged": sorted(str(r) for r in ws.merged_cells.ranges),
+        }
+    return sheets
+
+
+@pytest.fixture
+def client(app):
+    _seed(models.db, models)
+    return app.test_client()
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_xlsx_matches_previous_renderer(client, query):
+    response = client.get(f"/api/reports/monthly.xlsx?{query}")
+    assert response.status_code == 200
+
+    expected = json.loads(FIXTURE.read_text(encoding="utf-8"))[query]
+    assert workbook_cells(response.data) == expected
+
+
+def test_xlsx_rejects_missing_period(client):
+    assert client.get("/api/reports/monthly.xlsx").status_code == 400
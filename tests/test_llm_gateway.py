@@ -0,0 +1,188 @@
+"""
+Testes do gateway de LLM: circuit breaker, prazo/retry, chave e gravação
+do cache
+
+Roda com: pytest tests/test_llm_gateway.py -v
+"""
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Adiciona src ao path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+pytest.importorskip("flask_sqlalchemy")
+openai = pytest.importorskip("openai")
+
+from services import llm_gateway
+from services.llm_gateway import CircuitBreaker, LLMUnavailable, is_json_object, parse_json_object, prompt_hash
+
+
+def timeout_error():
+    return openai.APITimeoutError(request=None)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    llm_gateway._breakers.clear()
+    llm_gateway.reset_llm_metrics()
+    yield
+    llm_gateway._breakers.clear()
+    llm_gateway.reset_llm_metrics()
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold_and_half_opens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=3, reset_seconds=30, clock=clock)
+
+        for _ in range(3):
+            assert breaker.allow()
+            breaker.record_failure()
+        assert breaker.state == "open"
+        assert not breaker.allow()
+
+        clock.now = 31
+        assert breaker.allow()        # uma tentativa de teste
+        assert not breaker.allow()    # as demais esperam
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+    def test_failed_probe_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 11
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == "open"
+
+
+class TestCall:
+    def test_retries_transient_errors_within_deadline(self):
+        timeouts = []
+        sleeps = []
+
+        def request_fn(timeout):
+            timeouts.append(timeout)
+            if len(timeouts) < 3:
+                raise timeout_error()
+            return "ok"
+
+        result, _ = llm_gateway._call("t", "m1", request_fn, deadline_seconds=10, sleep=sleeps.append)
+
+        assert result == "ok"
+        assert sleeps == [0.5, 1.0]
+        assert all(0 < t <= 10 for t in timeouts)
+
+    def test_non_transient_error_is_not_retried(self):
+        calls = []
+
+        def request_fn(timeout):
+            calls.append(timeout)
+            raise ValueError("bad request")
+
+        with pytest.raises(ValueError):
+            llm_gateway._call("t", "m2", request_fn, deadline_seconds=10, sleep=lambda s: None)
+        assert len(calls) == 1
+        assert llm_gateway.get_breaker("m2").state == "closed"
+
+    def test_backoff_never_exceeds_deadline(self):
+        calls = []
+
+        def request_fn(timeout):
+            calls.append(timeout)
+            raise timeout_error()
+
+        with pytest.raises(openai.APITimeoutError):
+            llm_gateway._call("t", "m3", request_fn, deadline_seconds=0.3, sleep=lambda s: None)
+        assert len(calls) == 1
+
+        metrics = llm_gateway.get_llm_metrics()["purposes"]["t"]
+        assert metrics["calls"] == 1
+        assert metrics["errors"] == 1
+
+    def test_open_circuit_fails_fast(self):
+        breaker = llm_gateway.get_breaker("m4")
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+
+        with pytest.raises(LLMUnavailable):
+            llm_gateway._call("t", "m4", lambda timeout: "never", deadline_seconds=10)
+
+
+class TestCacheKey:
+    def test_key_depends_on_model_and_messages(self):
+        messages = [{"role": "user", "content": "agenda da semana"}]
+        key = prompt_hash("gpt-4o-mini", {"messages": messages, "max_tokens": None})
+
+        assert key == prompt_hash("gpt-4o-mini", {"max_tokens": None, "messages": list(messages)})
+        assert key != prompt_hash("gpt-4.1-mini", {"messages": messages, "max_tokens": None})
+        assert len(key) == 64
+
+
+class FakeOpenAI:
+    """chat.completions.create devolvendo as respostas na ordem."""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        answer = self.answers[min(self.calls, len(self.answers) - 1)]
+        self.calls += 1
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=answer))],
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5),
+        )
+
+
+class TestCompleteCache:
+    MESSAGES = [{"role": "user", "content": "agenda da semana"}]
+
+    @pytest.fixture(autouse=True)
+    def app(self, app):
+        llm_gateway.clear_memory_cache()
+        yield app
+        llm_gateway.clear_memory_cache()
+
+    def test_invalid_output_is_not_cached(self, monkeypatch):
+        client = FakeOpenAI('{"intent": "week_sched', '{"intent": "week_schedule_request"}')
+        monkeypatch.setattr(llm_gateway, "get_client", lambda: client)
+
+        first = llm_gateway.complete("t", self.MESSAGES, validate=is_json_object)
+        assert parse_json_object(first) is None
+
+        second = llm_gateway.complete("t", self.MESSAGES, validate=is_json_object)
+        assert parse_json_object(second) == {"intent": "week_schedule_request"}
+
+        # Só a resposta válida ficou no cache (memória e banco)
+        llm_gateway.clear_memory_cache()
+        assert llm_gateway.complete("t", self.MESSAGES, validate=is_json_object) == second
+        assert client.calls == 2
+        assert llm_gateway.get_llm_metrics()["purposes"]["t"]["cache_hits"] == 1
+
+    def test_invalid_cache_hit_is_ignored(self, monkeypatch):
+        monkeypatch.setattr(llm_gateway, "get_client", lambda: FakeOpenAI("texto livre"))
+        assert llm_gateway.complete("t", self.MESSAGES) == "texto livre"  # sem validate: grava
+
+        client = FakeOpenAI('{"intent": "unknown"}')
+        monkeypatch.setattr(llm_gateway, "get_client", lambda: client)
+        assert llm_gateway.complete("t", self.MESSAGES, validate=is_json_object) == '{"intent": "unknown"}'
+        assert client.calls == 1
+
+    def test_parse_json_object(self):
+        assert parse_json_object('Claro! {"intent": "confirm"} ok') == {"intent": "confirm"}
+        assert parse_json_object("[1, 2]") is None
+        assert parse_json_object("") is None
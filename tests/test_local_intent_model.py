@@ -0,0 +1,135 @@
+"""
+Testes do modelo local de intents (n-gramas hasheados)
+
+Roda com: pytest tests/test_local_intent_model.py -v
+"""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Adiciona src ao path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from services.agent import local_intent_model as lim
+from services.agent.local_intent_model import (
+    LinearHead,
+    LocalIntentModel,
+    examples_from_decision_logs,
+    extract_features,
+)
+
+
+EXAMPLES = [
+    ("agenda da semana", "LIST_WEEK"),
+    ("minha agenda semanal", "LIST_WEEK"),
+    ("visitas da semana", "LIST_WEEK"),
+    ("gera pdf da ultima visita", "GENERATE_PDF"),
+    ("me manda o pdf", "GENERATE_PDF"),
+    ("relatorio em pdf", "GENERATE_PDF"),
+    ("clientes atrasados", "LIST_LATE"),
+    ("clientes sem visita", "LIST_LATE"),
+    ("ranking de atraso", "LIST_LATE"),
+]
+
+
+@pytest.fixture(scope="module")
+def head():
+    return LinearHead.train(EXAMPLES, epochs=60)
+
+
+def test_features_are_stable_and_normalized():
+    a = extract_features("Agenda da SEMANA")
+    b = extract_features("agenda da semana")
+    assert a == b
+    assert sum(v * v for v in a.values()) == pytest.approx(1.0)
+    assert extract_features("  ") == {}
+
+
+def test_predicts_typo_variants(head):
+    assert head.predict_proba("agnda da semna")[0] == "LIST_WEEK"
+    assert head.predict_proba("manda o pdff")[0] == "GENERATE_PDF"
+    label, prob = head.predict_proba("clientes atrazados")
+    assert label == "LIST_LATE" and prob > 0.5
+
+
+def test_allowed_labels_restrict_prediction(head):
+    label, _ = head.predict_proba("agenda da semana", allowed=["GENERATE_PDF", "LIST_LATE"])
+    assert label in {"GENERATE_PDF", "LIST_LATE"}
+    assert head.predict_proba("agenda", allowed=["OUTRO"]) == (None, 0.0)
+
+
+def test_roundtrip_through_json(head):
+    model = LocalIntentModel({"intent": head})
+    restored = LocalIntentModel.from_dict(json.loads(json.dumps(model.to_dict())))
+    for text, _ in EXAMPLES:
+        assert restored.predict("intent", text) == model.predict("intent", text)
+
+
+def test_decision_log_rows_filtering():
+    rows = [
+        ("agenda da semana", "", "LIST_WEEK", "high", None),
+        ("7", "awaiting_visit_index", "STATEFUL_REPLY", "high", None),
+        ("nao sei", "", "UNKNOWN", "low", None),
+        ("pdf", "", "GENERATE_PDF", "low", None),
+        ("ta em v quatro", "awaiting_fenologia", "STATEFUL_REPLY", "high", json.dumps({"fenologia_real": "v4"})),
+    ]
+    heads = examples_from_decision_logs(rows)
+    assert heads["intent"] == [("agenda da semana", "LIST_WEEK")]
+    assert heads["fenologia"] == [("ta em v quatro", "V4")]
+
+
+def test_shipped_artifact_loads():
+    model = lim.load_model(lim.DEFAULT_MODEL_PATH)
+    assert {"intent", "fenologia", "visit_purpose"} <= set(model.heads)
+    assert model.predict("intent", "gera o pdf da ultima visita")[0] == "GENERATE_PDF"
+
+
+@pytest.fixture
+def shipped_model(monkeypatch):
+    monkeypatch.setenv("LOCAL_INTENT_MODEL_ENABLED", "1")
+    monkeypatch.setenv("LOCAL_INTENT_MODEL_PATH", lim.DEFAULT_MODEL_PATH)
+    lim.reload_local_model()
+    yield
+    lim.reload_local_model()
+
+
+def test_disabled_by_default(monkeypatch):
+    monkeypatch.delenv("LOCAL_INTENT_MODEL_ENABLED", raising=False)
+    lim.reload_local_model()
+    assert lim.get_local_model() is None
+    assert lim.predict_intent("cancela") is None
+    assert lim.predict_visit_purpose("colheita") is None
+
+
+@pytest.mark.parametrize("text", ["nao quero cancelar", "não cancela não", "não confirma", "nem confirma ainda"])
+def test_negated_confirm_cancel_left_to_ai(shipped_model, text):
+    result = lim.predict_intent(text)
+    assert result is None or result["intent"] not in lim.NEGATION_SENSITIVE_INTENTS
+
+
+def test_plain_confirm_cancel_still_local(shipped_model):
+    assert lim.predict_intent("cancela")["intent"] == "CANCEL"
+
+
+@pytest.mark.parametrize("text", ["aplicação", "pulverização"])
+def test_out_of_vocabulary_visit_purpose(shipped_model, text):
+    assert lim.predict_visit_purpose(text) is None
+
+
+def test_negated_cancel_goes_to_openai(shipped_model, monkeypatch):
+    pytest.importorskip("flask_sqlalchemy")
+    from services import llm_gateway
+    import api_routes
+
+    calls = []
+
+    def fake_complete(name, messages, **kwargs):
+        calls.append(name)
+        return '{"intent": "unknown"}'
+
+    monkeypatch.setattr(llm_gateway, "complete", fake_complete)
+    result = api_routes.interpret_user_message_with_ai("não cancela não", "awaiting_final_confirmation")
+    assert calls
+    assert (result or {}).get("intent") != "cancel"
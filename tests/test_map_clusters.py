@@ -0,0 +1,57 @@
+"""
+Testes dos clusters do mapa de propriedades (GET /api/properties/map?zoom=)
+
+Roda com: pytest tests/test_map_clusters.py -v
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Adiciona src ao path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+pytest.importorskip("flask_sqlalchemy")
+
+from sqlalchemy import event
+
+from models import Client, Property, db
+from routes.entities import MAP_CLUSTER_CELL_PX, entities_bp
+
+
+pytestmark = pytest.mark.blueprints(entities_bp)
+
+# Zoom 0: célula de 84.375 graus
+CELL = MAP_CLUSTER_CELL_PX * 360.0 / 256
+
+
+@pytest.fixture
+def client(app):
+    db.session.add(Client(id=1, name="João"))
+    # Longitude no meio da célula; latitudes em 1.2, 1.5 e 2.1 células
+    for pid, cells in ((1, 1.2), (2, 1.5), (3, 2.1)):
+        db.session.add(Property(
+            id=pid, client_id=1, name=f"Fazenda {pid}", area_ha=10.0,
+            latitude=cells * CELL - 90, longitude=0.5 * CELL - 180,
+        ))
+    db.session.commit()
+    return app.test_client()
+
+
+def test_point_at_half_cell_stays_in_its_cell(client):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        response = client.get("/api/properties/map?zoom=0")
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+
+    assert response.status_code == 200
+    clusters = sorted(response.get_json()["clusters"], key=lambda c: c["latitude"])
+    assert [c["count"] for c in clusters] == [2, 1]
+    assert clusters[1]["property_id"] == 3
+    assert clusters[0]["area_ha"] == 20.0
+
+    # Célula pelo floor, não pelo CAST (que arredonda no Postgres)
+    assert any("floor(" in s.lower() for s in statements)
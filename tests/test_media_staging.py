@@ -0,0 +1,100 @@
+"""
+Testes do vínculo das fotos de staging do Telegram com a visita
+
+Roda com: pytest tests/test_media_staging.py -v
+"""
+import sys
+import threading
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+# Adiciona src ao path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+pytest.importorskip("flask_sqlalchemy")
+
+from models import Client, Photo, TelegramPendingMedia, Visit, db
+from services import media_staging_service as staging
+
+
+class FakeR2:
+    """Bucket falso: upload falha para arquivos com "falha" no caminho."""
+
+    def __init__(self, on_upload=None):
+        self.uploaded = []
+        self.on_upload = on_upload
+        self.lock = threading.Lock()
+
+    def upload_fileobj(self, Fileobj, Bucket, Key, ExtraArgs=None):
+        if "falha" in getattr(Fileobj, "name", ""):
+            raise IOError("upload recusado")
+        with self.lock:
+            self.uploaded.append(Key)
+        if self.on_upload:
+            self.on_upload()
+
+    def delete_objects(self, Bucket, Delete):
+        pass
+
+
+@pytest.fixture
+def app(app, monkeypatch):
+    monkeypatch.setenv("R2_BUCKET", "bucket")
+    monkeypatch.setenv("R2_PUBLIC_BASE_URL", "https://cdn.test")
+
+    db.session.add(Client(id=1, name="João"))
+    db.session.add(Visit(id=1, client_id=1, date=date(2026, 10, 19), status="done"))
+    db.session.commit()
+    return app
+
+
+def _stage(tmp_path, name, chat_id="42"):
+    path = tmp_path / name
+    path.write_bytes(b"JPEG")
+    row = TelegramPendingMedia(chat_id=chat_id, storage="local", storage_key=str(path), filename=name)
+    db.session.add(row)
+    db.session.commit()
+    return row.id
+
+
+def test_attach_keeps_late_and_failed_photos(app, tmp_path, monkeypatch):
+    _stage(tmp_path, "a.jpg")
+    failed_id = _stage(tmp_path, "falha.jpg")
+    _stage(tmp_path, "b.jpg")
+
+    engine = db.engine
+    late = {}
+    late_lock = threading.Lock()
+
+    def album_photo_arrives():
+        # Resto do álbum chegando (outro worker) durante as cópias
+        with late_lock:
+            if late:
+                return
+            late["id"] = None
+        with engine.begin() as conn:
+            late["id"] = conn.execute(
+                TelegramPendingMedia.__table__.insert().returning(TelegramPendingMedia.id),
+                {"chat_id": "42", "storage": "local", "storage_key": str(tmp_path / "c.jpg")},
+            ).scalar_one()
+
+    r2 = FakeR2(on_upload=album_photo_arrives)
+    monkeypatch.setattr(staging, "_get_r2_client", lambda: r2)
+
+    attached, errors = staging.attach_pending_telegram_photos_to_visit("42", db.session.get(Visit, 1))
+
+    assert attached == 2
+    assert errors == ["upload recusado"]
+    assert Photo.query.filter_by(visit_id=1).count() == 2
+
+    remaining = {row.id for row in TelegramPendingMedia.query.filter_by(chat_id="42")}
+    assert remaining == {failed_id, late["id"]}
+    assert (tmp_path / "falha.jpg").exists()
+    assert not (tmp_path / "a.jpg").exists()
+
+
+def test_attach_without_pending_photos(app, monkeypatch):
+    monkeypatch.setattr(staging, "_get_r2_client", lambda: FakeR2())
+    assert staging.attach_pending_telegram_photos_to_visit("42", db.session.get(Visit, 1)) == (0, [])
@@ -0,0 +1,146 @@
+"""
+Testes do modelo fenológico em memória (phenology_stages)
+
+Roda com: pytest tests/test_phenology_service.py -v
+"""
+import importlib.util
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+# Adiciona src ao path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+pytest.importorskip("flask_sqlalchemy")
+
+from sqlalchemy import text
+
+from models import Client, PhenologyStage, Plot, Property, Visit, db
+from services import phenology_service as ph
+
+
+@pytest.fixture
+def app(app):
+    db.session.add_all([
+        PhenologyStage(culture="Soja", code="PL", name="Plantio", days=0),
+        PhenologyStage(culture="Soja", code="VE", name="Emergência", days=7),
+        PhenologyStage(culture="Soja", code="R1", name="Florescimento", days=45),
+        PhenologyStage(culture="Algodão", code="B1", name="Botão floral", days=40),
+        Client(id=1, name="João"),
+        Property(id=1, client_id=1, name="Fazenda Boa Vista"),
+        Plot(id=1, property_id=1, name="Talhão 1"),
+    ])
+    db.session.commit()
+    ph.invalidate_phenology_model()
+    yield app
+    ph.invalidate_phenology_model()
+
+
+def test_exact_and_normalized_culture(app):
+    assert [s.code for s in ph.get_culture_stages("Soja")] == ["PL", "VE", "R1"]
+    assert [s.code for s in ph.get_culture_stages(" soja ")] == ["PL", "VE", "R1"]
+    assert [s.code for s in ph.get_culture_stages("ALGODAO")] == ["B1"]
+    assert ph.get_culture_stages("Trigo") == []
+    assert ph.get_culture_stages("") == []
+
+
+def test_project_schedule(app):
+    schedule = ph.project_schedule("soja", date(2026, 10, 1))
+    assert [(e["code"], e["suggested_date"]) for e in schedule] == [
+        ("PL", "2026-10-01"), ("VE", "2026-10-08"), ("R1", "2026-11-15"),
+    ]
+
+
+def test_next_stage_table_then_defaults(app):
+    assert ph.get_next_stage("Soja", "ve") == ("R1", 38)
+    assert ph.get_next_stage("Trigo", "V4") == ("V5", 7)
+    assert ph.get_next_stage("Soja", "XX") == (None, None)
+
+
+def test_writes_invalidate_model(app):
+    assert len(ph.get_culture_stages("Soja")) == 3
+    db.session.add(PhenologyStage(culture="Soja", code="R8", name="Maturação", days=120))
+    db.session.commit()
+    assert ph.get_culture_stages("Soja")[-1].code == "R8"
+
+
+def test_create_planting_uses_phenology_stages(app):
+    from api_routes import bp
+
+    app.register_blueprint(bp)
+    response = app.test_client().post("/api/plantings", json={
+        "plot_id": 1, "culture": "soja", "planting_date": "2026-10-01", "consultant_id": 3,
+    })
+    assert response.status_code == 201
+
+    visits = Visit.query.order_by(Visit.date).all()
+    assert [(v.date, v.recommendation) for v in visits] == [
+        (date(2026, 10, 8), "Emergência"), (date(2026, 11, 15), "Florescimento"),
+    ]
+    assert {(v.client_id, v.property_id, v.consultant_id) for v in visits} == {(1, 1, 3)}
+
+
+LEGACY_ROWS = [("Soja", "VE", "Emergência", 6), ("Soja", "R1", "Florescimento", 50), ("Milho", "V4", "Quatro folhas", 20)]
+
+
+def _create_legacy_table():
+    db.session.execute(text(
+        "CREATE TABLE phenology_stage (id INTEGER PRIMARY KEY, culture VARCHAR(50), "
+        "code VARCHAR(20), name VARCHAR(100), days INTEGER)"
+    ))
+    for row in LEGACY_ROWS:
+        db.session.execute(
+            text("INSERT INTO phenology_stage (culture, code, name, days) VALUES (:c, :code, :n, :d)"),
+            dict(zip(("c", "code", "n", "d"), row)),
+        )
+    db.session.commit()
+
+
+def _run_copy_migration():
+    from alembic.migration import MigrationContext
+    from alembic.operations import Operations
+
+    path = Path(__file__).parent.parent / "src/migrations/versions/20261019_copy_legacy_phenology_stage.py"
+    spec = importlib.util.spec_from_file_location("copy_phenology_stage", path)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+
+    with db.engine.begin() as conn:
+        with Operations.context(MigrationContext.configure(conn)):
+            migration.upgrade()
+
+
+def test_falls_back_to_legacy_table_until_migrated(app):
+    PhenologyStage.query.delete()
+    db.session.commit()
+    _create_legacy_table()
+    ph.invalidate_phenology_model()
+
+    assert [(s.code, s.days) for s in ph.get_culture_stages("Soja")] == [("VE", 6), ("R1", 50)]
+    assert ph.project_schedule("milho", date(2026, 10, 1))[0]["suggested_date"] == "2026-10-21"
+
+    # Tabela nova preenchida: passa a valer ela
+    db.session.add(PhenologyStage(culture="Soja", code="VE", name="Emergência", days=8))
+    db.session.commit()
+    assert [s.days for s in ph.get_culture_stages("Soja")] == [8]
+
+
+def test_migration_copies_legacy_rows_once(app):
+    PhenologyStage.query.delete()
+    db.session.commit()
+    _create_legacy_table()
+
+    _run_copy_migration()
+    rows = db.session.query(PhenologyStage.culture, PhenologyStage.code, PhenologyStage.name, PhenologyStage.days)
+    assert sorted(rows.all()) == sorted(LEGACY_ROWS)
+
+    # Tabela nova com dados: não duplica
+    _run_copy_migration()
+    assert PhenologyStage.query.count() == len(LEGACY_ROWS)
+
+
+def test_migration_without_legacy_table_is_noop(app):
+    _run_copy_migration()
+    assert PhenologyStage.query.count() == 4
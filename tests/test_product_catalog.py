@@ -0,0 +1,60 @@
+"""
+Testes para o índice de nomes de produtos (match exato + trigramas)
+
+Roda com: pytest tests/test_product_catalog.py -v
+"""
+import sys
+from difflib import SequenceMatcher
+from pathlib import Path
+
+import pytest
+
+# Adiciona src ao path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+pytest.importorskip("flask_sqlalchemy")
+
+from services.product_catalog_service import ProductCatalog, normalize_product_name
+
+NAMES = [
+    "Fox Xpro", "Elatus", "Priori Xtra", "Engeo Pleno", "Roundup WG",
+    "Glifosato Atar", "Verdavis", "Cripton", "Sphere Max", "Ampligo",
+    "Orkestra", "Fox Supra", "Belt", "Prêmio", "Connect", "Abacus HC",
+]
+
+
+def full_scan(raw_name):
+    target = normalize_product_name(raw_name)
+    best_name, best_score = None, 0.0
+    for name in NAMES:
+        score = SequenceMatcher(None, target, normalize_product_name(name)).ratio()
+        if score > best_score:
+            best_name, best_score = name, score
+    return best_name, best_score
+
+
+class TestProductCatalog:
+
+    def test_match_exato_ignora_acento_e_caixa(self):
+        catalog = ProductCatalog(NAMES)
+        assert catalog.best_match("  premio ") == ("Prêmio", 1.0)
+
+    @pytest.mark.parametrize("raw", ["foxpro", "elatos", "priory xtra", "orquestra", "belti", "conect", "abacus"])
+    def test_mesmo_resultado_da_varredura_completa(self, raw):
+        catalog = ProductCatalog(NAMES)
+        assert catalog.best_match(raw) == full_scan(raw)
+
+    def test_sem_limite_de_nomes(self):
+        names = [f"Produto {i:05d}" for i in range(2000)]
+        catalog = ProductCatalog(names)
+        assert len(catalog.names) == 2000
+        assert catalog.best_match("produto 01999")[0] == "Produto 01999"
+
+    def test_add_many_ignora_duplicados(self):
+        catalog = ProductCatalog(["Elatus"])
+        catalog.add_many(["elatus", "ELATUS ", "Nativo"])
+        assert catalog.names == ["Elatus", "Nativo"]
+
+    def test_vazio(self):
+        assert ProductCatalog().best_match("fox") == (None, 0.0)
+        assert ProductCatalog(NAMES).best_match("") == (None, 0.0)
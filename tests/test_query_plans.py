@@ -0,0 +1,216 @@
+"""
+Regressão de plano das consultas quentes de visitas
+
+Cria o schema dos models num banco semeado, executa as funções reais
+(insights, agenda da semana, ciclo do PDF...), captura o SQL que elas
+mandam para `visits` e roda EXPLAIN em cada consulta. Falha se alguma
+cair em varredura sequencial de `visits` ou deixar de usar o índice
+composto esperado.
+
+SQLite sempre; PostgreSQL quando TEST_POSTGRES_URL estiver definido
+(banco descartável: as tabelas são recriadas).
+
+Roda com: pytest tests/test_query_plans.py -v
+"""
+import os
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+# Adiciona src ao path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+pytest.importorskip("flask_sqlalchemy")
+
+from sqlalchemy import event
+
+from models import Client, Planting, Plot, Property, Visit, db
+
+
+TODAY = date(2026, 10, 19)
+CONSULTANTS = 8
+CLIENTS = 200
+VISITS_PER_CLIENT = 15
+CULTURES = ("Soja", "Milho", "Algodão")
+
+HOT_VISIT_INDEXES = {
+    "ix_visits_consultant_id_date_status",
+    "ix_visits_open_consultant_id_date",
+    "ix_visits_client_id_status_date",
+    "ix_visits_planting_id_date",
+    "ix_visits_cycle",
+}
+
+
+def _seed():
+    clients, properties, plots, plantings, visits = [], [], [], [], []
+    for client_id in range(1, CLIENTS + 1):
+        culture = CULTURES[client_id % len(CULTURES)]
+        clients.append({"id": client_id, "name": f"Cliente {client_id}"})
+        properties.append({"id": client_id, "client_id": client_id, "name": f"Fazenda {client_id}"})
+        plots.append({"id": client_id, "property_id": client_id, "name": "Talhão 1"})
+        plantings.append({
+            "id": client_id, "plot_id": client_id, "culture": culture,
+            "variety": f"V{client_id % 7}", "planting_date": TODAY - timedelta(days=120),
+        })
+        for n in range(VISITS_PER_CLIENT):
+            day = TODAY - timedelta(days=(client_id * 7 + n * 11) % 240 - 30)
+            visits.append({
+                "client_id": client_id,
+                "property_id": client_id,
+                "plot_id": client_id,
+                "planting_id": client_id if n % 2 else None,
+                "consultant_id": client_id % CONSULTANTS + 1,
+                "date": day,
+                "status": "done" if day <= TODAY else "planned",
+                "culture": culture,
+                "variety": f"V{client_id % 7}",
+            })
+
+    db.session.execute(Client.__table__.insert(), clients)
+    db.session.execute(Property.__table__.insert(), properties)
+    db.session.execute(Plot.__table__.insert(), plots)
+    db.session.execute(Planting.__table__.insert(), plantings)
+    db.session.execute(Visit.__table__.insert(), visits)
+    db.session.commit()
+
+
+def _database_urls():
+    yield pytest.param("sqlite", id="sqlite")
+    yield pytest.param(
+        "postgresql",
+        id="postgresql",
+        marks=pytest.mark.skipif(not os.getenv("TEST_POSTGRES_URL"), reason="TEST_POSTGRES_URL não definido"),
+    )
+
+
+@pytest.fixture(scope="module", params=list(_database_urls()))
+def app(request, tmp_path_factory, make_app):
+    if request.param == "sqlite":
+        database_uri = f"sqlite:///{tmp_path_factory.mktemp('plans') / 'plans.db'}"
+    else:
+        database_uri = os.environ["TEST_POSTGRES_URL"]
+
+    with make_app(database_uri) as app:
+        _seed()
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql("ANALYZE")
+        yield app
+
+
+def _capture_visit_queries(fn):
+    """Executa fn() e devolve [(sql, params)] dos SELECTs que leem visits."""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM visits" in statement:
+            captured.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        fn()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+    assert captured, "nenhuma consulta em visits foi executada"
+    return captured
+
+
+def _explain(statement, parameters):
+    """Plano como texto, uma linha por nó."""
+    with db.engine.connect() as conn:
+        if db.engine.dialect.name == "sqlite":
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+            return [row[-1] for row in rows]
+        # Com a tabela pequena o Postgres prefere seq scan mesmo com índice;
+        # desligar a opção mostra se existe caminho por índice.
+        conn.exec_driver_sql("SET enable_seqscan = off")
+        rows = conn.exec_driver_sql(f"EXPLAIN {statement}", parameters).fetchall()
+        return [row[0] for row in rows]
+
+
+def _is_seq_scan(line):
+    if db.engine.dialect.name == "sqlite":
+        return line.startswith("SCAN visits")
+    return "Seq Scan on visits" in line
+
+
+def assert_uses_index(fn, expected_index=None):
+    plans = [_explain(sql, params) for sql, params in _capture_visit_queries(fn)]
+    for plan in plans:
+        scans = [line for line in plan if _is_seq_scan(line)]
+        assert not scans, "varredura sequencial em visits:\n" + "\n".join(plan)
+    if expected_index:
+        used = "\n".join(line for plan in plans for line in plan)
+        assert expected_index in used, f"{expected_index} não usado:\n{used}"
+
+
+def test_models_and_migration_declare_the_same_indexes():
+    migration = (
+        Path(__file__).parent.parent
+        / "src" / "migrations" / "versions" / "20261019_add_visit_hot_query_indexes.py"
+    ).read_text(encoding="utf-8")
+    declared = {index.name for index in Visit.__table__.indexes}
+    assert HOT_VISIT_INDEXES <= declared
+    for name in HOT_VISIT_INDEXES:
+        assert f'"{name}"' in migration
+
+
+def test_pending_today_and_week_summary(app):
+    from services.proactive_insights import _pending_today_by_consultant, _week_summary_by_consultant
+
+    ids = list(range(1, CONSULTANTS + 1))
+    assert_uses_index(lambda: _pending_today_by_consultant(ids, TODAY), "ix_visits_consultant_id_date_status")
+    assert_uses_index(lambda: _week_summary_by_consultant(ids, TODAY), "ix_visits_consultant_id_date_status")
+
+
+def test_stale_clients(app):
+    from services.proactive_insights import _stale_clients_by_consultant
+
+    assert_uses_index(lambda: _stale_clients_by_consultant([1, 2], TODAY, 30, 10))
+
+
+def test_calendar_window(app):
+    from services.visit_calendar_service import get_visit_calendar, invalidate_calendar, window_for
+
+    invalidate_calendar()
+    start, end = window_for("month", TODAY)
+    assert_uses_index(lambda: get_visit_calendar(3, start, end, today=TODAY), "ix_visits_consultant_id_date_status")
+
+
+def test_week_priority_open_visits(app):
+    from api_routes import build_week_priority_items
+
+    assert_uses_index(lambda: build_week_priority_items(3, TODAY), "ix_visits_open_consultant_id_date")
+
+
+def test_last_done_visit_for_client(app):
+    def query():
+        return (
+            Visit.query
+            .filter(Visit.consultant_id == 2)
+            .filter(Visit.client_id == 9)
+            .filter(Visit.status == "done")
+            .order_by(Visit.date.desc().nullslast(), Visit.id.desc())
+            .first()
+        )
+
+    assert_uses_index(query, "ix_visits_client_id_status_date")
+
+
+def test_same_cycle_by_planting(app):
+    from api_routes import build_same_cycle_visit_query
+
+    base = Visit.query.filter(Visit.planting_id.isnot(None)).first()
+    assert_uses_index(
+        lambda: build_same_cycle_visit_query(base).order_by(Visit.date.desc()).all(),
+        "ix_visits_planting_id_date",
+    )
+
+
+def test_same_cycle_without_planting(app):
+    from api_routes import build_same_cycle_visit_query
+
+    base = Visit.query.filter(Visit.planting_id.is_(None)).first()
+    assert_uses_index(lambda: build_same_cycle_visit_query(base).all(), "ix_visits_cycle")
@@ -0,0 +1,112 @@
+"""
+Testes para os KPIs colunares do relatório de visitas e o CSV de exportação
+
+Roda com: pytest tests/test_report_engine.py -v
+"""
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+# Adiciona src ao path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+pytest.importorskip("flask_sqlalchemy")
+
+from services.report_engine import ReportData, compute_kpis
+from services.report_export_service import build_export_table, iter_csv
+
+
+def make_data(rows, all_client_ids):
+    """rows: (client_id, date, culture, consultant_id, has_photo)"""
+    data = ReportData(params=None)
+    for i, (client_id, day, culture, consultant_id, photo) in enumerate(rows, start=1):
+        v = data.visits
+        v["id"].append(i)
+        v["client_id"].append(client_id)
+        v["property_id"].append(0)
+        v["plot_id"].append(0)
+        v["consultant_id"].append(consultant_id)
+        v["date"].append(day.toordinal() if day else 0)
+        v["planting_date"].append(0)
+        v["culture"].append(data.strings.encode(culture))
+        v["variety"].append(0)
+        v["planting_variety"].append(0)
+        v["fenologia"].append(0)
+        v["status"].append(data.strings.encode("done"))
+        v["has_planting"].append(0)
+        v["has_photo"].append(1 if photo else 0)
+        data.recommendations.append(None)
+    data.all_client_ids = list(all_client_ids)
+    data.carteira_ids = set(all_client_ids)
+    data.clients_map = {cid: f"Cliente {cid}" for cid in all_client_ids}
+    return data
+
+
+D1 = date(2025, 11, 3)   # segunda
+D2 = date(2025, 11, 4)
+D3 = date(2025, 11, 12)  # semana seguinte
+
+
+class TestComputeKpis:
+    def test_same_client_day_culture_counts_once(self):
+        data = make_data([
+            (1, D1, "Soja", 0, False),
+            (1, D1, "Soja", 7, True),
+            (1, D1, "Milho", 7, False),
+        ], [1])
+        kpis = compute_kpis(data)
+
+        assert kpis.total_visits_unique == 2
+        assert kpis.visits_with_photo == 1
+        assert kpis.total_launches_with_photo == 1
+        assert list(kpis.group_launches) == [2, 1]
+        # consultor do primeiro lançamento vazio: usa o próximo preenchido
+        assert kpis.consultant_counts == {7: 1}
+
+    def test_rows_without_client_or_date_are_ignored(self):
+        data = make_data([
+            (0, D1, "Soja", 1, True),
+            (2, None, "Soja", 1, True),
+            (2, D2, "", 1, True),
+        ], [2])
+        kpis = compute_kpis(data)
+
+        assert kpis.total_visits_unique == 1
+        assert kpis.culture_counts == {"—": 1}
+
+    def test_target_and_weeks(self):
+        rows = [(1, date(2025, 11, d), "Soja", 1, True) for d in (3, 4, 5, 6, 12)]
+        rows.append((2, D3, "Soja", 1, False))
+        data = make_data(rows, [1, 2, 3])
+        kpis = compute_kpis(data)
+
+        assert kpis.photo_visits_by_client == {1: 5}
+        assert kpis.clients_in_target == 1
+        assert kpis.meta_total == 15
+        assert kpis.target_pct == pytest.approx(5 / 15)
+        assert kpis.coverage == pytest.approx(1 / 3)
+        assert kpis.weeks == [("03/11–09/11", 4), ("10/11–16/11", 1)]
+
+
+class TestCsvExport:
+    def test_unique_visits_csv(self):
+        data = make_data([
+            (1, D1, "Soja", 0, False),
+            (1, D1, "Soja", 0, True),
+        ], [1])
+        kpis = compute_kpis(data)
+        columns = build_export_table(data, kpis, "unique_visits")
+
+        text = "".join(iter_csv(columns, data.strings)).splitlines()
+        assert text[0] == "client_id,client,date,culture,consultant_id,consultant,launches,has_photo"
+        assert text[1:] == ["1,Cliente 1,2025-11-03,Soja,,,2,1"]
+
+    def test_csv_is_chunked(self):
+        data = make_data([(1, date(2025, 11, d), "Soja", 1, True) for d in range(1, 11)], [1])
+        columns = build_export_table(data, compute_kpis(data), "visits")
+
+        chunks = list(iter_csv(columns, data.strings, chunk_rows=3))
+        assert len(chunks) == 4
+        assert len("".join(chunks).splitlines()) == 11
@@ -0,0 +1,75 @@
+"""
+Orçamento de import do app (cold start no Render free)
+
+Roda `python -X importtime -c "import app"` num processo separado e falha se
+módulos pesados voltarem a ser importados no boot ou se o tempo total de
+import passar do orçamento (STARTUP_IMPORT_BUDGET_MS, padrão 2000 ms).
+
+Roda com: pytest tests/test_startup_imports.py -v
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("flask_sqlalchemy")
+
+SRC_DIR = Path(__file__).parent.parent / "src"
+
+# Devem ser importados só sob demanda (PDF, XLSX, IA, storage, migrations)
+LAZY_MODULES = {
+    "reportlab",
+    "openpyxl",
+    "PIL",
+    "openai",
+    "boto3",
+    "botocore",
+    "flask_migrate",
+    "alembic",
+}
+
+BUDGET_MS = int(os.getenv("STARTUP_IMPORT_BUDGET_MS", "2000"))
+
+
+def _profile_app_import(tmp_path):
+    env = dict(os.environ)
+    env.pop("DATABASE_URL", None)
+    env["UPLOAD_DIR"] = str(tmp_path)
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=str(SRC_DIR),
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = [p.strip() for p in line[len("import time:"):].split("|")]
+        if len(parts) != 3 or not parts[1].isdigit():
+            continue
+        timings[parts[2]] = int(parts[1])
+    return timings
+
+
+@pytest.fixture(scope="module")
+def import_timings(tmp_path_factory):
+    return _profile_app_import(tmp_path_factory.mktemp("uploads"))
+
+
+def test_modulos_pesados_nao_carregam_no_boot(import_timings):
+    loaded = {name.split(".")[0] for name in import_timings}
+    assert not (loaded & LAZY_MODULES), sorted(loaded & LAZY_MODULES)
+
+
+def test_orcamento_de_import(import_timings):
+    total_ms = import_timings["app"] / 1000
+    assert total_ms <= BUDGET_MS, f"import app levou {total_ms:.0f} ms (orçamento {BUDGET_MS} ms)"
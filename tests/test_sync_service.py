@@ -0,0 +1,93 @@
+"""
+Testes da sincronização incremental do catálogo (GET /api/sync)
+
+Roda com: pytest tests/test_sync_service.py -v
+"""
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# Adiciona src ao path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+pytest.importorskip("flask_sqlalchemy")
+
+from models import Client, SyncChange, db
+from routes.admin import admin_bp
+from routes.sync import sync_bp
+from services import sync_service
+
+
+pytestmark = pytest.mark.blueprints(sync_bp, admin_bp)
+
+
+@pytest.fixture
+def client(app):
+    db.session.add(Client(id=1, name="João"))
+    db.session.commit()
+    return app.test_client()
+
+
+def test_delta_sends_created_rows(client):
+    since = sync_service.get_current_version()
+    db.session.add(Client(id=2, name="Ana"))
+    db.session.commit()
+
+    body = client.get(f"/api/sync?since={since}").get_json()
+    assert body["version"] == since + 1
+    assert (body["has_more"], body["retry_after"]) == (False, None)
+    assert body["entities"] == {"clients": {"columns": ["id", "name"], "rows": [[2, "Ana"]], "deleted": []}}
+
+
+def test_delta_sends_tombstones(client):
+    since = sync_service.get_current_version()
+    db.session.add(Client(id=2, name="Ana"))
+    db.session.commit()
+    db.session.delete(db.session.get(Client, 2))
+    db.session.delete(db.session.get(Client, 1))
+    db.session.commit()
+
+    body = client.get(f"/api/sync?since={since}").get_json()
+    assert body["version"] == sync_service.get_current_version()
+    assert body["entities"]["clients"]["rows"] == []
+    assert body["entities"]["clients"]["deleted"] == [1, 2]
+
+
+def test_recent_gap_waits_instead_of_looping(client):
+    since = sync_service.get_current_version()
+    now = datetime.utcnow()
+    # since+1 ainda não commitado (transação aberta); since+2 já visível
+    db.session.add(SyncChange(id=since + 2, entity="clients", entity_id=1, op="upsert", created_at=now))
+    db.session.commit()
+
+    response = client.get(f"/api/sync?since={since}")
+    body = response.get_json()
+    assert body["version"] == since
+    assert body["has_more"] is False
+    assert 1 <= body["retry_after"] <= sync_service.SYNC_GAP_GRACE_SECONDS
+    assert response.headers["Retry-After"] == str(body["retry_after"])
+
+    # Passada a carência, o buraco é ignorado e a versão avança
+    db.session.get(SyncChange, since + 2).created_at = now - timedelta(
+        seconds=sync_service.SYNC_GAP_GRACE_SECONDS + 1
+    )
+    db.session.commit()
+    response = client.get(f"/api/sync?since={since}")
+    body = response.get_json()
+    assert (body["version"], body["retry_after"]) == (since + 2, None)
+    assert "Retry-After" not in response.headers
+
+
+def test_seed_carries_sync_version_for_first_delta(client):
+    seed = client.get("/api/admin/generate-seed").get_json()
+    assert seed["sync_version"] == sync_service.get_current_version()
+    assert seed["clients"] == [{"id": 1, "name": "João"}]
+
+    db.session.add(Client(id=2, name="Ana"))
+    db.session.commit()
+
+    body = client.get(f"/api/sync?since={seed['sync_version']}").get_json()
+    assert body.get("full") is not True
+    assert body["entities"]["clients"]["rows"] == [[2, "Ana"]]
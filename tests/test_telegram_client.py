@@ -0,0 +1,190 @@
+"""
+Testes do cliente do Bot API (pool, 429, retries, quebra e agrupamento
+de textos)
+
+Sobe um servidor HTTP local no lugar do api.telegram.org.
+
+Roda com: pytest tests/test_telegram_client.py -v
+"""
+import json
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# Adiciona src ao path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+pytest.importorskip("requests")
+
+from services.telegram_client import TelegramClient, coalesce_texts
+
+
+class FakeTelegram:
+    """Bot API falso: registra as chamadas e devolve 429 nas primeiras `fail_429`."""
+
+    def __init__(self):
+        self.calls = []
+        self.ports = set()
+        self.fail_429 = 0
+        self.delay = 0
+        self.lock = threading.Lock()
+
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, body, content_type="application/json"):
+                data = body if isinstance(body, bytes) else json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path.startswith("/file/bot"):
+                    return self._reply(200, b"AUDIO", "application/octet-stream")
+                self._reply(404, {"ok": False})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                method = self.path.rsplit("/", 1)[-1]
+                with fake.lock:
+                    fake.calls.append((method, payload))
+                    fake.ports.add(self.client_address[1])
+                    throttled = fake.fail_429 > 0
+                    if throttled:
+                        fake.fail_429 -= 1
+                time.sleep(fake.delay)
+                if throttled:
+                    return self._reply(429, {"ok": False, "error_code": 429, "parameters": {"retry_after": 2}})
+                if method == "getFile":
+                    return self._reply(200, {"ok": True, "result": {"file_path": "voice/file_1.oga"}})
+                if not payload.get("text", "x"):
+                    return self._reply(400, {"ok": False, "description": "Bad Request: message text is empty"})
+                self._reply(200, {"ok": True, "result": {"message_id": len(fake.calls)}})
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def methods(self):
+        return [method for method, _ in self.calls]
+
+
+@pytest.fixture
+def fake():
+    server = FakeTelegram()
+    server.thread.start()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
+
+
+@pytest.fixture
+def sleeps():
+    return []
+
+
+@pytest.fixture
+def client(fake, sleeps):
+    return TelegramClient(
+        token="TEST",
+        base_url=fake.base_url,
+        global_rate=1000,
+        per_chat_rate=1000,
+        per_chat_burst=1000,
+        sleep=sleeps.append,
+    )
+
+
+def test_reutiliza_a_conexao(fake, client):
+    for i in range(5):
+        assert client.send_message("1", f"msg {i}")["ok"] is True
+    assert len(fake.calls) == 5
+    assert len(fake.ports) == 1
+
+
+def test_429_espera_retry_after(fake, client, sleeps):
+    fake.fail_429 = 2
+    result = client.send_message("1", "oi")
+    assert result["ok"] is True
+    assert result["attempts"] == 3
+    assert sleeps == [2.0, 2.0]
+
+
+def test_400_nao_repete(fake, client, sleeps):
+    result = client.send_message("1", "")
+    assert result["ok"] is False
+    assert result["status_code"] == 400
+    assert result["attempts"] == 1
+    assert sleeps == []
+
+
+def test_timeout_de_leitura_nao_reenvia_mensagem(fake, client, sleeps):
+    fake.delay = 0.3
+    result = client.call("sendMessage", {"chat_id": "1", "text": "oi"}, chat_id="1", timeout=0.05)
+    assert result["ok"] is False
+    assert result["attempts"] == 1
+    assert fake.methods() == ["sendMessage"]
+    assert sleeps == []
+
+
+def test_timeout_de_leitura_repete_metodo_idempotente(fake, client, sleeps):
+    fake.delay = 0.3
+    result = client.call("getFile", {"file_id": "F"}, timeout=0.05, max_retries=1)
+    assert result["attempts"] == 2
+    assert fake.methods() == ["getFile", "getFile"]
+
+
+def test_falha_de_conexao_repete_envio(sleeps):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    client = TelegramClient(token="TEST", base_url=f"http://127.0.0.1:{port}", sleep=sleeps.append)
+
+    result = client.call("sendMessage", {"chat_id": "1", "text": "oi"}, max_retries=2)
+    assert result["ok"] is False
+    assert result["attempts"] == 3
+    assert sleeps == [0.5, 1.0]
+
+
+def test_texto_longo_vira_varias_mensagens(fake, client):
+    lines = [f"linha {i} " + "x" * 90 for i in range(100)]
+    result = client.send_message("1", "\n".join(lines), reply_markup={"inline_keyboard": []})
+    assert result["ok"] is True
+    assert result["messages"] == 3
+    texts = [payload["text"] for _, payload in fake.calls]
+    assert all(len(text) <= 4096 for text in texts)
+    assert "\n".join(texts).split("\n") == lines
+    assert ["reply_markup" in payload for _, payload in fake.calls] == [False, False, True]
+
+
+def test_send_texts_agrupa_partes(fake, client):
+    result = client.send_texts("1", ["primeira", "segunda", "terceira"])
+    assert result["ok"] is True
+    assert fake.methods() == ["sendMessage"]
+    assert fake.calls[0][1]["text"] == "primeira\n\nsegunda\n\nterceira"
+
+
+def test_coalesce_texts_respeita_limite():
+    assert coalesce_texts(["a" * 6, "b" * 6, "c" * 6], limit=14) == ["a" * 6 + "\n\n" + "b" * 6, "c" * 6]
+    assert coalesce_texts(["", None, "ok"]) == ["ok"]
+    assert coalesce_texts(["palavra " * 5], limit=16) == ["palavra palavra", "palavra palavra", "palavra"]
+
+
+def test_download_file(fake, client):
+    content, error = client.download_file("abc")
+    assert error is None
+    assert content == b"AUDIO"
+    assert fake.calls == [("getFile", {"file_id": "abc"})]
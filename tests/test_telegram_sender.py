@@ -0,0 +1,109 @@
+"""
+Testes para o envio em lote do Telegram (limites, retry e ordem)
+
+Roda com: pytest tests/test_telegram_sender.py -v
+"""
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Adiciona src ao path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+pytest.importorskip("requests")
+
+from services import telegram_sender as ts
+
+
+class TestRetry:
+    """429 respeita retry_after; erro definitivo não é repetido"""
+
+    def test_429_usa_retry_after(self):
+        calls = []
+        sleeps = []
+
+        def fake_send(chat_id, text):
+            calls.append(chat_id)
+            if len(calls) == 1:
+                return {"ok": False, "status_code": 429, "response": {"parameters": {"retry_after": 3}}}
+            return {"ok": True, "status_code": 200}
+
+        result = ts.send_with_retry("1", "oi", send=fake_send, sleep=sleeps.append)
+        assert result["ok"] is True
+        assert result["attempts"] == 2
+        assert sleeps == [3.0]
+
+    def test_erro_400_nao_repete(self):
+        calls = []
+
+        def fake_send(chat_id, text):
+            calls.append(chat_id)
+            return {"ok": False, "status_code": 400, "response": {"description": "chat not found"}}
+
+        result = ts.send_with_retry("1", "oi", send=fake_send, sleep=lambda s: None)
+        assert result["ok"] is False
+        assert len(calls) == 1
+
+    def test_erro_de_rede_para_no_limite(self):
+        calls = []
+
+        def fake_send(chat_id, text):
+            calls.append(chat_id)
+            raise ConnectionError("timeout")
+
+        result = ts.send_with_retry("1", "oi", send=fake_send, max_retries=2, sleep=lambda s: None)
+        assert result["ok"] is False
+        assert len(calls) == 3
+
+
+class TestBatch:
+    """Envio concorrente mantém a ordem e reporta falhas"""
+
+    def test_ordem_e_falhas(self):
+        lock = threading.Lock()
+        sent = []
+
+        def fake_send(chat_id, text):
+            with lock:
+                sent.append(chat_id)
+            if chat_id == "bad":
+                return {"ok": False, "status_code": 403, "response": {"description": "blocked"}}
+            return {"ok": True, "status_code": 200}
+
+        messages = [{"key": i, "chat_id": c, "text": "x"} for i, c in enumerate(["a", "bad", "c", "d"])]
+        results = ts.send_telegram_messages(messages, send=fake_send, global_rate=1000, per_chat_interval=0)
+
+        assert [r["key"] for r in results] == [0, 1, 2, 3]
+        assert [r["ok"] for r in results] == [True, False, True, True]
+        assert results[1]["error"] == "blocked"
+        assert sorted(sent) == ["a", "bad", "c", "d"]
+
+    def test_lista_vazia(self):
+        assert ts.send_telegram_messages([]) == []
+
+
+class TestCoalesce:
+    """Mensagens para o mesmo chat saem juntas"""
+
+    def test_agrupa_por_chat_e_mantem_ordem(self):
+        sent = []
+
+        def fake_send(chat_id, text):
+            sent.append((chat_id, text))
+            return {"ok": True, "status_code": 200}
+
+        messages = [
+            {"chat_id": "1", "text": "a", "key": 1},
+            {"chat_id": "2", "text": "b", "key": 2},
+            {"chat_id": "1", "text": "c", "key": 3},
+        ]
+        results = ts.send_telegram_messages(messages, send=fake_send, global_rate=1000, per_chat_interval=0)
+        assert sorted(sent) == [("1", "a\n\nc"), ("2", "b")]
+        assert [r["key"] for r in results] == [1, 2, 3]
+        assert all(r["ok"] for r in results)
+
+    def test_respeita_limite_de_tamanho(self):
+        batches = ts.coalesce_batch([{"chat_id": 1, "text": "x" * 3000}, {"chat_id": 1, "text": "y" * 2000}])
+        assert [b["members"] for b in batches] == [[0], [1]]
@@ -0,0 +1,108 @@
+"""
+Testes dos caches globais compartilhados pelas threads do worker
+(gthread): memória de conversa, EntityResolver e skills.
+
+Roda com: pytest tests/test_thread_safety.py -v
+"""
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+# Adiciona src ao path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+pytest.importorskip("flask_sqlalchemy")
+
+from models import Client, Culture, Variety, db
+from services.agent import conversation_memory as memory
+from services.agent import entity_resolver, skill_loader
+from services.agent.entity_resolver import EntityResolver
+
+
+def _run_concurrently(fn, count, workers=8):
+    barrier = threading.Barrier(workers)
+
+    def run(n):
+        if n < workers:
+            barrier.wait()
+        return fn(n)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run, range(count)))
+
+
+@pytest.fixture
+def app(app):
+    db.session.add_all([
+        Client(id=1, name="Marcelo Alonso"),
+        Client(id=2, name="Ana Paula"),
+        Culture(id=1, name="Soja"),
+    ])
+    db.session.add(Variety(id=1, culture_id=1, name="AS 3680 IPRO"))
+    db.session.commit()
+    entity_resolver.invalidate_entity_cache()
+    yield app
+    entity_resolver.invalidate_entity_cache()
+
+
+def test_conversation_memory_concurrent_writes():
+    memory.clear_chat_memory("test", "threads")
+
+    def write(n):
+        memory.add_message("test", "threads", f"msg {n}")
+        memory.update_last_message_with_result("test", "threads", intent=f"intent {n}")
+        return memory.get_recent_messages("test", "threads", limit=10)
+
+    for messages in _run_concurrently(write, 200):
+        assert 1 <= len(messages) <= memory.MAX_MESSAGES_PER_CHAT
+
+    messages = memory.get_recent_messages("test", "threads", limit=50)
+    assert len(messages) == memory.MAX_MESSAGES_PER_CHAT
+    assert all(m.intent for m in messages[-1:])
+    memory.clear_chat_memory("test", "threads")
+
+
+def test_recent_messages_are_copies():
+    memory.clear_chat_memory("test", "copy")
+    memory.add_message("test", "copy", "visita no Marcelo")
+    memory.get_recent_messages("test", "copy").clear()
+    before = memory.get_recent_messages("test", "copy")[0]
+
+    memory.update_last_message_with_result("test", "copy", intent="CREATE_VISIT", visit_id=7)
+
+    after = memory.get_recent_messages("test", "copy")[0]
+    assert before.intent is None  # quem já leu não vê a mensagem mudar
+    assert (after.intent, after.visit_id) == ("CREATE_VISIT", 7)
+    memory.clear_chat_memory("test", "copy")
+
+
+def test_entity_cache_holds_rows_not_orm_objects(app):
+    def resolve(n):
+        # cada thread com o próprio app context (= própria sessão), como no gthread
+        with app.app_context():
+            return EntityResolver().resolve(
+                {"client_name": "marcelo", "variety": "AS 3680"},
+                {"consultant_id": 1},
+            )
+
+    results = _run_concurrently(resolve, 32)
+
+    for result in results:
+        assert result["client"]["id"] == 1
+        assert result["variety_resolved"]["culture"] == "Soja"
+        assert result["culture"] == "Soja"
+
+    for value in (entity_resolver._get_cached("clients:all"), entity_resolver._get_cached("varieties:all")):
+        assert isinstance(value, tuple)
+        assert not any(isinstance(row, db.Model) for row in value)
+    assert isinstance(entity_resolver._get_cached("portfolio:1"), frozenset)
+
+
+def test_load_skill_concurrently():
+    skill_loader.invalidate_skills_cache()
+    contents = _run_concurrently(lambda n: skill_loader.load_skill("lancamento_visita"), 32)
+    assert contents[0]
+    assert all(content is contents[0] for content in contents)
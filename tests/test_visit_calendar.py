@@ -0,0 +1,132 @@
+"""
+Testes do calendário de visitas (agregados por dia, filtros, cache e ETag)
+
+Roda com: pytest tests/test_visit_calendar.py -v
+"""
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+# Adiciona src ao path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+pytest.importorskip("flask_sqlalchemy")
+
+from models import Client, Consultant, Planting, Plot, Property, Visit, db
+from routes.visits import visits_bp
+from services import visit_calendar_service as cal
+
+
+pytestmark = pytest.mark.blueprints(visits_bp)
+
+TODAY = date(2026, 10, 14)  # quarta
+
+
+@pytest.fixture
+def app(app):
+    db.session.add_all([
+        Client(id=1, name="João"),
+        Client(id=2, name="Ana"),
+        Planting(id=1, culture="Milho"),
+        Consultant(id=7, name="Carlos"),
+        Property(id=1, client_id=1, name="Fazenda Boa Vista"),
+        Plot(id=1, property_id=1, name="Talhão 1"),
+    ])
+    db.session.add_all([
+        Visit(client_id=1, consultant_id=7, date=date(2026, 10, 12), status="done", culture="Soja"),
+        Visit(client_id=2, consultant_id=7, date=date(2026, 10, 13), status="planned", planting_id=1),
+        Visit(client_id=1, consultant_id=7, date=date(2026, 10, 16), status="planned", culture="Soja"),
+        Visit(client_id=2, consultant_id=8, date=date(2026, 10, 13), status="planned", culture="Soja"),
+        Visit(client_id=2, consultant_id=7, date=date(2026, 11, 2), status="planned", culture="Soja"),
+    ])
+    db.session.commit()
+    cal.invalidate_calendar()
+    return app
+
+
+def _week():
+    start, end = cal.window_for("week", TODAY)
+    return cal.get_visit_calendar(7, start, end, today=TODAY)
+
+
+def test_window_ranges():
+    assert cal.window_for("day", TODAY) == (TODAY, TODAY)
+    assert cal.window_for("week", TODAY) == (date(2026, 10, 12), date(2026, 10, 18))
+    assert cal.window_for("month", date(2026, 12, 5)) == (date(2026, 12, 1), date(2026, 12, 31))
+    with pytest.raises(ValueError):
+        cal.window_for("year", TODAY)
+
+
+def test_week_aggregates(app):
+    payload = _week().payload
+
+    assert payload["totals"] == {"total": 3, "done": 1, "pending": 2, "overdue": 1}
+    assert [d["date"] for d in payload["days"]][:2] == ["2026-10-12", "2026-10-13"]
+    assert len(payload["days"]) == 7
+
+    monday, tuesday = payload["days"][0], payload["days"][1]
+    assert monday["statuses"] == {"done": 1}
+    assert tuesday["overdue"] == 1
+    visit = tuesday["visits"][0]
+    assert visit["client_name"] == "Ana"
+    assert visit["culture"] == "Milho"  # cultura do plantio quando a visita não tem
+    assert visit["overdue"] is True
+
+
+def test_filters(app):
+    payload = _week().payload
+    assert [v["date"] for v in cal.calendar_visits(payload, "pending")] == ["2026-10-13", "2026-10-16"]
+    assert [v["date"] for v in cal.calendar_visits(payload, "overdue")] == ["2026-10-13"]
+    assert len(cal.calendar_visits(payload, "done")) == 1
+    assert len(cal.calendar_visits(payload, limit=2)) == 2
+
+
+def test_cache_and_invalidation_on_commit(app):
+    first = _week()
+    assert _week() is first
+
+    visit = Visit.query.filter_by(consultant_id=7, date=date(2026, 10, 16)).one()
+    visit.status = "done"
+    db.session.commit()
+
+    second = _week()
+    assert second is not first
+    assert second.etag != first.etag
+    assert second.payload["totals"]["done"] == 2
+
+
+def test_window_too_large(app):
+    with pytest.raises(ValueError):
+        cal.get_visit_calendar(7, date(2026, 1, 1), date(2026, 6, 1))
+
+
+def test_endpoint_etag(app):
+    client = app.test_client()
+    url = "/api/visits/calendar?view=week&date=2026-10-14&consultant_id=7"
+
+    response = client.get(url)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert response.get_json()["start"] == "2026-10-12"
+
+    again = client.get(url, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+
+    assert client.get("/api/visits/calendar?view=year&consultant_id=7").status_code == 400
+    assert client.get("/api/visits/calendar?view=week").status_code == 400
+
+
+def test_bulk_insert_invalidates_cached_window(app):
+    first = _week()
+    assert first.payload["totals"]["total"] == 3
+
+    response = app.test_client().post("/api/visits/bulk", json={"items": [
+        {"client_id": 1, "property_id": 1, "plot_id": 1, "consultant_id": 7, "date": "2026-10-15"},
+    ]})
+    assert response.status_code == 201
+
+    second = _week()
+    assert second.etag != first.etag
+    assert second.payload["totals"]["total"] == 4
@@ -0,0 +1,95 @@
+"""
+Testes do cache da página pública da visita (GET /api/view/visit/<id>)
+
+Roda com: pytest tests/test_visit_view.py -v
+"""
+import sys
+from datetime import date
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Adiciona src ao path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+pytest.importorskip("flask_sqlalchemy")
+
+from models import Client, Photo, Visit, db
+from routes.visits import visits_bp
+from services import visit_view_service
+
+
+pytestmark = pytest.mark.blueprints(visits_bp)
+
+
+@pytest.fixture
+def client(app):
+    visit_view_service.invalidate_visit_page()
+    db.session.add(Client(id=1, name="João"))
+    db.session.add(Visit(id=1, client_id=1, date=date(2026, 10, 19), status="done", recommendation="Fungicida"))
+    db.session.commit()
+    yield app.test_client()
+    visit_view_service.invalidate_visit_page()
+
+
+def _write_from_other_worker(statement):
+    # Core direto no engine: não passa pelos hooks de sessão deste worker
+    with db.engine.begin() as conn:
+        conn.execute(statement)
+
+
+def test_etag_revalidation(client):
+    first = client.get("/api/view/visit/1")
+    assert first.status_code == 200
+    assert "Fungicida" in first.get_data(as_text=True)
+
+    again = client.get("/api/view/visit/1", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+    assert client.get("/api/view/visit/999").status_code == 404
+
+
+def test_commit_in_this_worker_invalidates(client):
+    etag = client.get("/api/view/visit/1").headers["ETag"]
+
+    db.session.add(Photo(visit_id=1, url="https://cdn.test/a.jpg", caption="Lagarta"))
+    db.session.commit()
+
+    response = client.get("/api/view/visit/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert "Lagarta" in response.get_data(as_text=True)
+
+
+def test_other_worker_writes_show_after_ttl(client, monkeypatch):
+    assert visit_view_service.VISIT_VIEW_CACHE_TTL_SECONDS <= 60
+
+    now = [1000.0]
+    monkeypatch.setattr(visit_view_service, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    client.get("/api/view/visit/1")
+
+    _write_from_other_worker(Visit.__table__.update().where(Visit.id == 1).values(recommendation="Inseticida"))
+
+    now[0] += visit_view_service.VISIT_VIEW_CACHE_TTL_SECONDS - 1
+    assert "Fungicida" in client.get("/api/view/visit/1").get_data(as_text=True)
+
+    now[0] += 2
+    assert "Inseticida" in client.get("/api/view/visit/1").get_data(as_text=True)
+
+
+def test_revalidates_after_cache_miss(client, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(visit_view_service, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    etag = client.get("/api/view/visit/1").headers["ETag"]
+
+    # Cache expirado, página re-renderizada igual: 304 em vez do HTML
+    now[0] += visit_view_service.VISIT_VIEW_CACHE_TTL_SECONDS + 1
+    assert visit_view_service.get_cached_visit_page(1) is None
+    response = client.get("/api/view/visit/1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+
+def test_browser_max_age_not_above_server_ttl(client):
+    cache_control = client.get("/api/view/visit/1").headers["Cache-Control"]
+    max_age = int(cache_control.split("max-age=")[1].split(",")[0])
+    assert max_age <= visit_view_service.VISIT_VIEW_CACHE_TTL_SECONDS
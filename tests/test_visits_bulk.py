@@ -0,0 +1,93 @@
+"""
+Testes do POST /api/visits/bulk (pré-validação, rejeição parcial, ids)
+
+Roda com: pytest tests/test_visits_bulk.py -v
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Adiciona src ao path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+pytest.importorskip("flask_sqlalchemy")
+
+from models import Client, Consultant, Plot, Property, Visit, db
+from routes.visits import visits_bp
+
+pytestmark = pytest.mark.blueprints(visits_bp)
+
+
+ITEMS = [
+    {"client_id": 1, "property_id": 1, "plot_id": 1, "consultant_id": 7, "date": "2026-10-20",
+     "recommendation": "Plantio"},
+    {"client_id": 99, "property_id": 1, "plot_id": 1, "date": "2026-10-21"},           # cliente inexistente
+    {"client_id": 1, "property_id": 1, "plot_id": 1, "date": "20/10/2026"},            # data inválida
+    {"client_id": 1, "property_id": 1, "date": "2026-10-22"},                          # sem talhão
+    {"client_id": 1, "property_id": 1, "plot_id": 1, "consultant_id": 8, "date": "2026-10-23"},  # consultor inexistente
+    {"client_id": "x", "property_id": 1, "plot_id": 1, "date": "2026-10-24"},          # id inválido
+    {"client_id": 1, "property_id": 1, "plot_id": 1, "date": "2026-10-25", "status": "Done"},
+]
+
+
+@pytest.fixture
+def client(app):
+    db.session.add_all([
+        Client(id=1, name="João"),
+        Consultant(id=7, name="Carlos"),
+        Property(id=1, client_id=1, name="Fazenda Boa Vista"),
+        Plot(id=1, property_id=1, name="Talhão 1"),
+    ])
+    db.session.commit()
+    return app.test_client()
+
+
+def test_returns_list_of_created_visits(client):
+    response = client.post("/api/visits/bulk", json={"items": ITEMS})
+    assert response.status_code == 201
+    assert response.headers["X-Bulk-Rejected"] == "5"
+
+    created = response.get_json()
+    assert isinstance(created, list)
+    assert [v["date"] for v in created] == ["2026-10-20", "2026-10-25"]
+    assert [v["status"] for v in created] == ["planned", "done"]
+
+    # ids devolvidos são os gravados, no formato de Visit.to_dict
+    for visit in created:
+        stored = db.session.get(Visit, visit["id"])
+        assert stored is not None
+        expected = stored.to_dict()
+        assert {k: visit[k] for k in expected} == expected
+
+
+def test_details_reports_each_rejection(client):
+    response = client.post("/api/visits/bulk?details=1", json={"items": ITEMS})
+    assert response.status_code == 201
+    body = response.get_json()
+
+    assert (body["created"], body["rejected"]) == (2, 5)
+    errors = {r["index"]: r.get("error") for r in body["results"] if not r["ok"]}
+    assert errors == {
+        1: "cliente não encontrado",
+        2: "data inválida",
+        3: "client_id, property_id, plot_id e date são obrigatórios",
+        4: "consultor não encontrado",
+        5: "id inválido",
+    }
+    ids = [r["id"] for r in body["results"] if r["ok"]]
+    assert ids == [v["id"] for v in body["visits"]]
+    assert Visit.query.count() == 2
+
+
+def test_identical_items_get_distinct_ids(client):
+    item = {"client_id": 1, "property_id": 1, "plot_id": 1, "date": "2026-11-01"}
+    created = client.post("/api/visits/bulk", json={"items": [item, item, item]}).get_json()
+    assert len({v["id"] for v in created}) == 3
+
+
+def test_rejects_bad_payload(client):
+    assert client.post("/api/visits/bulk", json={"items": {"a": 1}}).status_code == 400
+    assert client.post("/api/visits/bulk", json={"items": [{}] * 1001}).status_code == 400
+    empty = client.post("/api/visits/bulk", json={"items": []})
+    assert (empty.status_code, empty.get_json()) == (201, [])